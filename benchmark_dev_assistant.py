@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark für den DevAssistantExtended.
+
+Der Benchmark startet einen lokalen, OpenAI-kompatiblen Stub-Server mit einstellbarer
+Latenz und Token-Durchsatz sowie Stub-Programme für terraform, aws, javac, java, julia
+und pip. Anschließend werden mehrere Aufgaben im Batch-Betrieb (ohne Benutzereingaben)
+vollständig durch DevAssistantExtended.run geschickt.
+
+Gemessen werden p50/p95-Latenz pro Aufgabe, Durchsatz, LLM-Aufrufe und Subprozesse pro
+Aufgabe. Die Ergebnisse werden zusammen mit dem aktuellen Git-Commit an eine JSONL-Datei
+angehängt und mit dem letzten Lauf derselben Konfiguration verglichen.
+
+Verwendung:
+    python benchmark_dev_assistant.py --tasks 20 --concurrency 4 --latency 0.2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import numpy as np
+import openai
+
+from dev_assistant_extended import DevAssistantExtended
+from llm_scheduler import LLMScheduler
+
+DEFAULT_RESULTS_PATH = "bench_results.jsonl"
+
+# Kennzahlen, bei denen ein höherer Wert eine Verschlechterung bedeutet
+LOWER_IS_BETTER = ("latency_p50", "latency_p95", "llm_calls_per_task", "subprocesses_per_task")
+
+BENCHMARK_TASKS = [
+    "Erstelle ein Python-Skript, das AWS EC2-Instanzen mit Terraform provisioniert.",
+    "Baue eine REST-API für eine Aufgabenliste mit Deployment auf AWS.",
+    "Schreibe einen CSV-Parser mit Tests und einer S3-Anbindung.",
+    "Implementiere einen Web-Crawler, der Ergebnisse in einer Datenbank speichert.",
+]
+
+FAKE_TOOLS = {
+    "terraform": "Terraform has been successfully initialized!",
+    "aws": "",
+    "javac": "",
+    "java": "Hallo aus Java",
+    "julia": "Hallo aus Julia",
+    "pip": "Successfully installed package",
+}
+
+# Ausgabe von `terraform show -json <plan>`: ein Plan, der eine Instanz anlegt
+FAKE_PLAN = {"resource_changes": [{"address": "aws_instance.example", "type": "aws_instance",
+                                   "change": {"actions": ["create"]}}]}
+
+_FAKE_TOOL_TEMPLATE = """#!{python}
+import os, sys, time
+with open(os.environ["BENCH_TOOL_LOG"], "a") as log:
+    log.write(os.path.basename(sys.argv[0]) + " " + " ".join(sys.argv[1:]) + "\\n")
+time.sleep(float(os.environ.get("BENCH_TOOL_LATENCY", "0")))
+if os.path.basename(sys.argv[0]) == "javac" and len(sys.argv) > 1:
+    open(sys.argv[-1].replace(".java", ".class"), "w").close()
+if os.path.basename(sys.argv[0]) == "terraform" and sys.argv[1:3] == ["show", "-json"]:
+    print({plan!r})
+else:
+    print({output!r})
+"""
+
+
+def _stub_reply(messages: List[Dict[str, str]], json_mode: bool) -> str:
+    """Wählt eine plausible Antwort passend zum Prompt des Assistenten."""
+    prompt = messages[-1].get("content", "") if messages else ""
+    if json_mode and "Projektstruktur" in prompt:
+        return json.dumps({"src": {"__init__.py": "", "main.py": ""}, "tests": {"__init__.py": ""}})
+    if json_mode:
+        return json.dumps({"frameworks": ["fastapi"], "libraries": ["boto3"], "tools": ["terraform"]})
+    if "Bibliotheken werden" in prompt:
+        return "requests\nboto3"
+    if "Schreibe Tests" in prompt:
+        return "print('tests ok')"
+    if "Kernfunktionalität" in prompt:
+        return "print('hallo')"
+    if "Terraform" in prompt:
+        return 'resource "aws_instance" "example" {}'
+    if "Generiere python-Code" in prompt:
+        return "def solution():\n    return 42\n"
+    return "Analyse abgeschlossen."
+
+
+class StubLLMServer:
+    """Ein lokaler OpenAI-kompatibler Server für /v1/chat/completions."""
+
+    def __init__(self, latency: float = 0.0, tokens_per_second: float = 0.0,
+                 completion_tokens: int = 0):
+        """Initialisiert den Server.
+
+        Args:
+            latency: Feste Latenz bis zum ersten Token in Sekunden
+            tokens_per_second: Simulierter Ausgabedurchsatz (0 = unbegrenzt)
+            completion_tokens: Anzahl zusätzlicher Fülltokens pro Antwort
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+
+                messages = body.get("messages", [])
+                json_mode = (body.get("response_format") or {}).get("type") == "json_object"
+                content = _stub_reply(messages, json_mode)
+                if stub.completion_tokens and not json_mode:
+                    content += "\n" + "# fill\n" * (stub.completion_tokens // 3)
+
+                prompt_tokens = sum(len(m.get("content") or "") for m in messages) // 4
+                completion_tokens = max(1, len(content) // 4)
+                delay = stub.latency
+                if stub.tokens_per_second:
+                    delay += completion_tokens / stub.tokens_per_second
+                time.sleep(delay)
+
+                payload = json.dumps({
+                    "id": f"chatcmpl-bench-{stub.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "gpt-4"),
+                    "choices": [{
+                        "index": index,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    } for index in range(body.get("n") or 1)],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubLLMServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def install_fake_toolchain(directory: str) -> str:
+    """Legt Stub-Programme für die externen Werkzeuge an.
+
+    Args:
+        directory: Das Verzeichnis für die Stub-Programme
+
+    Returns:
+        Der Pfad der Logdatei, in die jeder Aufruf geschrieben wird
+    """
+    for tool, output in FAKE_TOOLS.items():
+        path = os.path.join(directory, tool)
+        with open(path, "w") as f:
+            f.write(_FAKE_TOOL_TEMPLATE.format(python=sys.executable, output=output,
+                                               plan=json.dumps(FAKE_PLAN)))
+        os.chmod(path, 0o755)
+    return os.path.join(directory, "calls.log")
+
+
+def _answer(workdir: str, task_index: int):
+    """Erzeugt eine Antwortfunktion für die Rückfragen von run()."""
+    def answer(prompt: str) -> str:
+        if "Dateiname für die Tests" in prompt:
+            return os.path.join(workdir, f"test_task_{task_index}.py")
+        if "Dateiname" in prompt:
+            return os.path.join(workdir, f"task_{task_index}.py")
+        return "j"
+    return answer
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmark(tasks: int = 8, concurrency: int = 1, latency: float = 0.0,
+                  tokens_per_second: float = 0.0, completion_tokens: int = 0,
+                  tool_latency: float = 0.0) -> Dict[str, Any]:
+    """Führt den Benchmark aus.
+
+    Args:
+        tasks: Anzahl der Aufgaben
+        concurrency: Anzahl parallel bearbeiteter Aufgaben
+        latency: Latenz des Stub-Servers in Sekunden
+        tokens_per_second: Ausgabedurchsatz des Stub-Servers
+        completion_tokens: Zusätzliche Fülltokens pro Antwort
+        tool_latency: Laufzeit der Stub-Programme in Sekunden
+
+    Returns:
+        Konfiguration und Kennzahlen des Laufs
+    """
+    config = {
+        "tasks": tasks, "concurrency": concurrency, "latency": latency,
+        "tokens_per_second": tokens_per_second, "completion_tokens": completion_tokens,
+        "tool_latency": tool_latency,
+    }
+    workdir = tempfile.mkdtemp(prefix="dev_assistant_bench_")
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir)
+    tool_log = install_fake_toolchain(bin_dir)
+
+    env = {
+        "PATH": bin_dir + os.pathsep + os.environ.get("PATH", ""),
+        "BENCH_TOOL_LOG": tool_log,
+        "BENCH_TOOL_LATENCY": str(tool_latency),
+    }
+    old_cwd = os.getcwd()
+    scheduler = LLMScheduler(initial_concurrency=max(4, concurrency))
+    results: List[Dict[str, Any]] = []
+
+    def run_task(index: int) -> Dict[str, Any]:
+        # Eigenes Projektverzeichnis pro Aufgabe, damit sich main.tf, tfplan und die
+        # Projektstruktur paralleler Aufgaben nicht überschreiben
+        project_dir = os.path.join(workdir, f"task_{index}")
+        os.makedirs(project_dir, exist_ok=True)
+        assistant = DevAssistantExtended(
+            api_key="bench", scheduler=scheduler, priority="batch",
+            answer_fn=_answer(project_dir, index), project_dir=project_dir
+        )
+        start = time.perf_counter()
+        assistant.run(BENCHMARK_TASKS[index % len(BENCHMARK_TASKS)])
+        elapsed = time.perf_counter() - start
+        spans = assistant.last_trace.spans
+        return {
+            "latency": elapsed,
+            "llm_calls": sum(1 for s in spans if s.category == "llm"),
+            "subprocesses": sum(1 for s in spans if s.category == "subprocess"),
+            "tokens": sum(s.attributes.get("total_tokens") or 0 for s in spans if s.category == "llm"),
+        }
+
+    try:
+        with StubLLMServer(latency, tokens_per_second, completion_tokens) as server, \
+                mock.patch.dict(os.environ, env):
+            client = openai.OpenAI(base_url=server.base_url, api_key="bench", max_retries=0)
+            os.chdir(workdir)
+            with mock.patch.object(openai.ChatCompletion, "create", client.chat.completions.create), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                batch_start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    results = list(pool.map(run_task, range(tasks)))
+                wall = time.perf_counter() - batch_start
+            stub_requests = server.requests
+        with open(tool_log) as f:
+            applies = sum(1 for line in f if line.startswith("terraform apply"))
+    finally:
+        os.chdir(old_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies = np.array([r["latency"] for r in results])
+    metrics = {
+        "latency_p50": float(np.percentile(latencies, 50)),
+        "latency_p95": float(np.percentile(latencies, 95)),
+        "throughput": tasks / wall if wall else 0.0,
+        "llm_calls_per_task": float(np.mean([r["llm_calls"] for r in results])),
+        "subprocesses_per_task": float(np.mean([r["subprocesses"] for r in results])),
+        "tokens_per_task": float(np.mean([r["tokens"] for r in results])),
+        "applies_per_task": applies / tasks if tasks else 0.0,
+        "stub_requests": stub_requests,
+        "wall_time": wall,
+    }
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": config,
+        "metrics": metrics,
+    }
+
+
+def load_previous(path: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Lädt den letzten gespeicherten Lauf mit derselben Konfiguration."""
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                if record.get("config") == config:
+                    previous = record
+    return previous
+
+
+def compare(current: Dict[str, Any], previous: Optional[Dict[str, Any]],
+            threshold: float = 0.1) -> List[str]:
+    """Vergleicht zwei Läufe und gibt Regressionen oberhalb der Schwelle zurück."""
+    if previous is None:
+        return []
+    regressions = []
+    for key, value in current["metrics"].items():
+        old = previous["metrics"].get(key)
+        if not old or key not in LOWER_IS_BETTER + ("throughput",):
+            continue
+        change = (value - old) / old
+        worse = change > threshold if key in LOWER_IS_BETTER else change < -threshold
+        if worse:
+            regressions.append(f"{key}: {old:.3f} -> {value:.3f} ({change:+.0%})")
+    return regressions
+
+
+def format_report(record: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> str:
+    """Formatiert das Ergebnis eines Laufs für die Konsole."""
+    metrics = record["metrics"]
+    lines = [
+        f"Benchmark ({record['config']['tasks']} Aufgaben, Parallelität {record['config']['concurrency']})",
+        f"  Latenz p50:            {metrics['latency_p50']:.3f}s",
+        f"  Latenz p95:            {metrics['latency_p95']:.3f}s",
+        f"  Durchsatz:             {metrics['throughput']:.2f} Aufgaben/s",
+        f"  LLM-Aufrufe/Aufgabe:   {metrics['llm_calls_per_task']:.1f}",
+        f"  Subprozesse/Aufgabe:   {metrics['subprocesses_per_task']:.1f}",
+        f"  Tokens/Aufgabe:        {metrics['tokens_per_task']:.0f}",
+    ]
+    if previous is not None:
+        lines.append(f"Vergleich mit {previous.get('commit') or 'vorherigem Lauf'}:")
+        regressions = compare(record, previous)
+        lines.extend(f"  REGRESSION {line}" for line in regressions)
+        if not regressions:
+            lines.append("  Keine Regressionen.")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark für DevAssistantExtended")
+    parser.add_argument("--tasks", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--completion-tokens", type=int, default=0)
+    parser.add_argument("--tool-latency", type=float, default=0.0)
+    parser.add_argument("--results", default=DEFAULT_RESULTS_PATH)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args(argv)
+
+    record = run_benchmark(args.tasks, args.concurrency, args.latency, args.tokens_per_second,
+                           args.completion_tokens, args.tool_latency)
+    previous = load_previous(args.results, record["config"])
+    print(format_report(record, previous))
+
+    if not args.no_save:
+        with open(args.results, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    return 1 if compare(record, previous) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
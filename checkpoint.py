@@ -0,0 +1,187 @@
+"""
+Checkpoints für lange, mehrstufige Aufgaben.
+
+Ein CheckpointStore protokolliert pro Aufgabe in einer Append-only-JSONL-Datei:
+- die Ergebnisse einzelner LLM-Aufrufe (Schlüssel: Hash von Modell und Prompt),
+- abgeschlossene Plan-Schritte mit Eingabe-Hash und erzeugten Artefakten.
+
+Artefakte (generierter Code, Tests, Terraform-Dateien) werden inhaltsadressiert unter
+blobs/ abgelegt. Wird eine Aufgabe nach einem Absturz erneut gestartet, werden
+abgeschlossene Schritte übersprungen, ihre Artefakte bei Bedarf wiederhergestellt und
+bereits bezahlte LLM-Antworten wiederverwendet.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from llm_output import normalize_task
+
+
+def content_hash(data: Any) -> str:
+    """Berechnet einen SHA-256-Hash über Text, Bytes oder JSON-serialisierbare Daten."""
+    if isinstance(data, bytes):
+        raw = data
+    elif isinstance(data, str):
+        raw = data.encode("utf-8")
+    else:
+        raw = json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class CheckpointStore:
+    """Append-only-Protokoll der abgeschlossenen Schritte einer Aufgabe."""
+
+    def __init__(self, path: str):
+        """Initialisiert den Store und liest vorhandene Einträge ein.
+
+        Args:
+            path: Der Pfad der JSONL-Datei dieser Aufgabe
+        """
+        self.path = path
+        self.blob_dir = os.path.join(os.path.dirname(path) or ".", "blobs")
+        self.llm_results: Dict[str, Any] = {}
+        self.steps: Dict[int, Dict[str, Any]] = {}
+        # Trefferstatistik des LLM-Caches
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_task(cls, directory: str, task: str) -> "CheckpointStore":
+        """Öffnet den Store für eine Aufgabe (ein Store pro normalisierter Aufgabe).
+
+        Args:
+            directory: Das Checkpoint-Verzeichnis
+            task: Die Aufgabenbeschreibung
+
+        Returns:
+            Der CheckpointStore der Aufgabe
+        """
+        os.makedirs(directory, exist_ok=True)
+        task_id = content_hash(normalize_task(task))[:16]
+        return cls(os.path.join(directory, f"{task_id}.jsonl"))
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Letzte Zeile eines abgebrochenen Schreibvorgangs
+                    continue
+                if entry.get("type") == "llm":
+                    self.llm_results[entry["key"]] = entry["output"]
+                elif entry.get("type") == "step":
+                    self.steps[entry["index"]] = entry
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        entry["time"] = time.time()
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def llm_key(self, **inputs) -> str:
+        """Berechnet den Schlüssel eines LLM-Aufrufs aus seinen Eingaben."""
+        return content_hash(inputs)
+
+    def get_llm_result(self, key: str) -> Optional[Any]:
+        """Gibt ein gespeichertes LLM-Ergebnis zurück oder None."""
+        result = self.llm_results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def record_llm_result(self, key: str, output: Any) -> None:
+        """Speichert das Ergebnis eines LLM-Aufrufs."""
+        self.llm_results[key] = output
+        self._append({"type": "llm", "key": key, "output": output})
+
+    def _store_blob(self, path: str) -> Optional[str]:
+        digest = _file_hash(path)
+        if digest is None:
+            return None
+        os.makedirs(self.blob_dir, exist_ok=True)
+        blob_path = os.path.join(self.blob_dir, digest)
+        if not os.path.exists(blob_path):
+            with open(path, "rb") as src, open(blob_path + ".tmp", "wb") as dst:
+                dst.write(src.read())
+            os.replace(blob_path + ".tmp", blob_path)
+        return digest
+
+    def step_input_hash(self, task: str, index: int, step: str) -> str:
+        """Berechnet den Eingabe-Hash eines Plan-Schritts."""
+        return content_hash({"task": normalize_task(task), "index": index, "step": step})
+
+    def is_step_complete(self, index: int, input_hash: str) -> bool:
+        """Prüft, ob ein Schritt mit identischen Eingaben bereits abgeschlossen wurde."""
+        entry = self.steps.get(index)
+        return entry is not None and entry["input_hash"] == input_hash
+
+    def complete_step(self, index: int, step: str, input_hash: str, artifacts: Dict[str, str],
+                      outputs: Optional[Dict[str, Any]] = None) -> None:
+        """Markiert einen Schritt als abgeschlossen.
+
+        Args:
+            index: Der Index des Schritts im Plan
+            step: Die Beschreibung des Schritts
+            input_hash: Der Eingabe-Hash des Schritts
+            artifacts: Die erzeugten Dateien (Pfad -> Pfad), deren Inhalt gesichert wird
+            outputs: Zusätzliche Ergebnisse des Schritts
+        """
+        hashes = {}
+        for path in artifacts:
+            digest = self._store_blob(path)
+            if digest is not None:
+                hashes[os.path.abspath(path)] = digest
+        entry = {
+            "type": "step",
+            "index": index,
+            "step": step,
+            "input_hash": input_hash,
+            "artifacts": hashes,
+            "outputs": outputs or {},
+        }
+        self.steps[index] = entry
+        self._append(entry)
+
+    def restore_artifacts(self, index: int) -> int:
+        """Stellt fehlende oder veränderte Artefakte eines Schritts wieder her.
+
+        Args:
+            index: Der Index des Schritts
+
+        Returns:
+            Die Anzahl wiederhergestellter Dateien
+        """
+        restored = 0
+        for path, digest in self.steps[index]["artifacts"].items():
+            if _file_hash(path) == digest:
+                continue
+            blob_path = os.path.join(self.blob_dir, digest)
+            if not os.path.exists(blob_path):
+                continue
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(blob_path, "rb") as src, open(path, "wb") as dst:
+                dst.write(src.read())
+            restored += 1
+        return restored
@@ -0,0 +1,705 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Lokaler, inkrementell aufgefrischter Bestand der Cloud-Ressourcen.
+
+Ohne Bestand weiß der CloudAgent nicht, was in einem Konto bereits existiert; jede
+Frage danach kostet ein Terraform-Refresh oder einzelne AWS-CLI-Aufrufe, die bei
+vielen Ressourcen langsam sind und gedrosselt werden. CloudInventory hält die
+Ergebnisse der describe-/list-Aufrufe in einer SQLite-Datei:
+
+- pro Ressourcentyp eine eigene Gültigkeitsdauer (TTL): Instanzen ändern sich oft,
+  VPCs und Subnetze selten; abgelaufene Typen werden bei der nächsten Frage
+  nachgeladen, alle übrigen Fragen beantwortet die Datenbank in Millisekunden,
+- Typen und Regionen werden parallel geladen, jeder Typ mit den Paginatoren von boto3,
+- eine Auffrischung schreibt nur, was sich geändert hat: jede Ressource trägt einen
+  Inhalts-Hash als ETag, unveränderte Zeilen bleiben unangetastet, verschwundene
+  werden gelöscht; invalidate() lässt gezielt einzelne Typen neu laden (z.B. die
+  Typen eines gerade angewendeten Plans),
+- reconcile() gleicht geplante Ressourcen (Format von infra_templates) mit dem
+  Bestand ab: was existiert bereits, und welche Attribute weichen ab (Drift).
+
+Lässt sich eine Quelle nicht laden (fehlende Rechte, Drosselung), bleiben die alten
+Einträge stehen und werden weiter verwendet; erneut gefragt wird sie frühestens nach
+RETRY_AFTER Sekunden. LocalAWS ist ein prozessinterner Ersatz
+für die verwendeten AWS-Aufrufe, für Tests und Entwicklung ohne Konto.
+
+Verwendung:
+    python cloud_inventory.py --db inventory.db --region eu-central-1 refresh
+    python cloud_inventory.py --db inventory.db exists aws_s3_bucket daten-archiv
+    python cloud_inventory.py --db inventory.db stats
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from infra_templates import DEFAULT_REGION
+from lazy_imports import lazy_module
+from tracing import span
+
+boto3 = lazy_module("boto3")
+
+# Parallele describe-Aufrufe (über Typen und Regionen)
+MAX_WORKERS = 8
+
+# Region, unter der Ressourcen globaler Dienste (S3-Bucketliste) abgelegt werden
+GLOBAL_REGION = "global"
+
+# ECS beschreibt höchstens so viele Cluster pro Aufruf
+ECS_DESCRIBE_BATCH = 100
+
+# Nach einem fehlgeschlagenen Laden wird eine Quelle so lange nicht erneut gefragt (Sekunden)
+RETRY_AFTER = 30.0
+
+# Instanzen in diesen Zuständen gelten noch als vorhanden
+LIVE_INSTANCE_STATES = ["pending", "running", "stopping", "stopped"]
+
+
+def _tag(item: Dict[str, Any], key: str = "Name") -> Optional[str]:
+    for tag in item.get("Tags") or []:
+        if tag.get("Key") == key:
+            return tag.get("Value")
+    return None
+
+
+def _tags(item: Dict[str, Any]) -> Dict[str, str]:
+    tags = item.get("Tags") or item.get("tags") or []
+    return {tag.get("Key", tag.get("key")): tag.get("Value", tag.get("value")) for tag in tags}
+
+
+def _describe_clusters(client: Any, arns: List[str]) -> List[Dict[str, Any]]:
+    clusters: List[Dict[str, Any]] = []
+    for start in range(0, len(arns), ECS_DESCRIBE_BATCH):
+        response = client.describe_clusters(clusters=arns[start:start + ECS_DESCRIBE_BATCH], include=["TAGS"])
+        clusters.extend(response.get("clusters", []))
+    return clusters
+
+
+class InventorySource:
+    """Beschreibt, wie ein Ressourcentyp aus der AWS-API gelesen wird."""
+
+    def __init__(self, resource_type: str, service: str, operation: str, result_key: str, id_key: str,
+                 ttl: float, name: Callable[[Dict[str, Any]], Optional[str]] = _tag,
+                 nested_key: Optional[str] = None, paginate: Optional[Dict[str, Any]] = None,
+                 describe: Optional[Callable[[Any, List[Any]], List[Dict[str, Any]]]] = None,
+                 attributes: Optional[Dict[str, str]] = None, regional: bool = True):
+        """Initialisiert die Quelle.
+
+        Args:
+            resource_type: Der Terraform-Ressourcentyp (z.B. "aws_instance")
+            service: Der boto3-Dienst
+            operation: Die paginierbare Operation (z.B. "describe_instances")
+            result_key: Die Liste der Einträge in jeder Seite
+            id_key: Das Feld mit der eindeutigen ID
+            ttl: Gültigkeitsdauer des Bestands in Sekunden
+            name: Liefert den Namen eines Eintrags (Standard: Tag "Name")
+            nested_key: Die Einträge liegen eine Ebene tiefer (z.B. Reservations -> Instances)
+            paginate: Zusätzliche Parameter für paginate() (z.B. Filter)
+            describe: Lädt Details zu den gelisteten Einträgen (list -> describe)
+            attributes: Terraform-Attribut -> API-Feld, verglichen von reconcile()
+            regional: False für Dienste, deren Liste nicht von der Region abhängt
+        """
+        self.resource_type = resource_type
+        self.service = service
+        self.operation = operation
+        self.result_key = result_key
+        self.id_key = id_key
+        self.ttl = ttl
+        self.name = name
+        self.nested_key = nested_key
+        self.paginate = paginate or {}
+        self.describe = describe
+        self.attributes = attributes or {}
+        self.regional = regional
+
+    def fetch(self, client: Any) -> Tuple[List[Dict[str, Any]], int]:
+        """Lädt alle Einträge.
+
+        Returns:
+            Die Einträge und die Anzahl der API-Aufrufe (Seiten)
+        """
+        items: List[Any] = []
+        pages = 0
+        for page in client.get_paginator(self.operation).paginate(**self.paginate):
+            pages += 1
+            for entry in page.get(self.result_key, []):
+                items.extend(entry.get(self.nested_key, []) if self.nested_key else [entry])
+        if self.describe is not None and items:
+            pages += (len(items) + ECS_DESCRIBE_BATCH - 1) // ECS_DESCRIBE_BATCH
+            items = self.describe(client, items)
+        return items, pages
+
+
+SOURCES: Dict[str, InventorySource] = {
+    source.resource_type: source for source in (
+        InventorySource(
+            "aws_instance", "ec2", "describe_instances", "Reservations", "InstanceId", ttl=60,
+            nested_key="Instances",
+            paginate={"Filters": [{"Name": "instance-state-name", "Values": LIVE_INSTANCE_STATES}]},
+            attributes={"instance_type": "InstanceType", "ami": "ImageId", "subnet_id": "SubnetId"},
+        ),
+        InventorySource(
+            "aws_vpc", "ec2", "describe_vpcs", "Vpcs", "VpcId", ttl=900,
+            attributes={"cidr_block": "CidrBlock"},
+        ),
+        InventorySource(
+            "aws_subnet", "ec2", "describe_subnets", "Subnets", "SubnetId", ttl=900,
+            attributes={"cidr_block": "CidrBlock", "vpc_id": "VpcId", "availability_zone": "AvailabilityZone",
+                        "map_public_ip_on_launch": "MapPublicIpOnLaunch"},
+        ),
+        InventorySource(
+            "aws_security_group", "ec2", "describe_security_groups", "SecurityGroups", "GroupId", ttl=300,
+            name=lambda item: item.get("GroupName"),
+            attributes={"name": "GroupName", "vpc_id": "VpcId", "description": "Description"},
+        ),
+        InventorySource(
+            "aws_s3_bucket", "s3", "list_buckets", "Buckets", "Name", ttl=900,
+            name=lambda item: item.get("Name"), regional=False,
+            attributes={"bucket": "Name"},
+        ),
+        InventorySource(
+            "aws_ecs_cluster", "ecs", "list_clusters", "clusterArns", "clusterArn", ttl=300,
+            name=lambda item: item.get("clusterName"), describe=_describe_clusters,
+            attributes={"name": "clusterName"},
+        ),
+    )
+}
+
+
+def planned_name(resource: Dict[str, Any]) -> Optional[str]:
+    """Der Name, unter dem eine geplante Ressource im Bestand gesucht wird.
+
+    Args:
+        resource: Eine Ressourcen-Definition (Format von infra_templates)
+
+    Returns:
+        "bucket" bzw. "name" oder der Tag "Name"; None, wenn der Name erst beim
+        Anwenden feststeht (Terraform-Ausdruck, bucket_prefix)
+    """
+    attributes = resource.get("attributes", {})
+    if "bucket_prefix" in attributes:
+        return None
+    for key in ("bucket", "name"):
+        value = attributes.get(key)
+        if isinstance(value, str):
+            return None if value.startswith("${") else value
+    value = (attributes.get("tags") or {}).get("Name")
+    if isinstance(value, str) and not value.startswith("${"):
+        return value
+    return None
+
+
+def _session_factory(service: str, region: str) -> Any:
+    return boto3.session.Session().client(service, region_name=region)
+
+
+class CloudInventory:
+    """Bestand der Cloud-Ressourcen in einer SQLite-Datei.
+
+    Alle Methoden sind threadsicher; die describe-Aufrufe laufen parallel, geschrieben
+    wird nur im aufrufenden Thread.
+    """
+
+    def __init__(self, path: str = ":memory:", region: str = DEFAULT_REGION,
+                 client_factory: Optional[Callable[[str, str], Any]] = None,
+                 ttls: Optional[Dict[str, float]] = None, max_workers: int = MAX_WORKERS,
+                 sources: Optional[Dict[str, InventorySource]] = None,
+                 clock: Callable[[], float] = time.time):
+        """Initialisiert den Bestand.
+
+        Args:
+            path: Die SQLite-Datei (":memory:" für einen flüchtigen Bestand)
+            region: Die Standardregion der Abfragen
+            client_factory: Erzeugt einen Client für (Dienst, Region); Standard ist boto3,
+                LocalAWS().client für Tests
+            ttls: Abweichende Gültigkeitsdauern pro Ressourcentyp in Sekunden
+            max_workers: Höchstzahl paralleler describe-Aufrufe
+            sources: Die bekannten Ressourcentypen (Standard: SOURCES)
+            clock: Zeitquelle (für Tests)
+        """
+        self.path = path
+        self.region = region
+        self.client_factory = client_factory or _session_factory
+        self.sources = dict(sources or SOURCES)
+        self.ttls = {name: source.ttl for name, source in self.sources.items()}
+        self.ttls.update(ttls or {})
+        self.max_workers = max_workers
+        self.clock = clock
+        self._clients: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.RLock()
+        self._counters = {"queries": 0, "refreshes": 0, "api_calls": 0, "errors": 0,
+                          "added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        self.last_errors: Dict[str, str] = {}
+        self._failed: Dict[Tuple[str, str], float] = {}
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS resources (
+                type TEXT NOT NULL,
+                region TEXT NOT NULL,
+                id TEXT NOT NULL,
+                name TEXT,
+                attributes TEXT NOT NULL,
+                etag TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (type, region, id)
+            );
+            CREATE INDEX IF NOT EXISTS resources_name ON resources (type, region, name);
+            CREATE TABLE IF NOT EXISTS refreshes (
+                type TEXT NOT NULL,
+                region TEXT NOT NULL,
+                refreshed REAL NOT NULL,
+                PRIMARY KEY (type, region)
+            );
+        """)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _region(self, resource_type: str, region: Optional[str]) -> str:
+        if not self.sources[resource_type].regional:
+            return GLOBAL_REGION
+        return region or self.region
+
+    def _client(self, service: str, region: str) -> Any:
+        # boto3-Clients sind threadsicher, ihre Erzeugung über eine Session nicht
+        with self._lock:
+            key = (service, region)
+            if key not in self._clients:
+                self._clients[key] = self.client_factory(
+                    service, self.region if region == GLOBAL_REGION else region)
+            return self._clients[key]
+
+    def _refreshed(self) -> Dict[Tuple[str, str], float]:
+        with self._lock:
+            rows = self._db.execute("SELECT type, region, refreshed FROM refreshes").fetchall()
+        return {(row["type"], row["region"]): row["refreshed"] for row in rows}
+
+    def _pairs(self, types: Optional[Iterable[str]], regions: Optional[Iterable[str]]) -> List[Tuple[str, str]]:
+        pairs: Dict[Tuple[str, str], None] = {}
+        for resource_type in types or self.sources:
+            for region in regions or [self.region]:
+                pairs[(resource_type, self._region(resource_type, region))] = None
+        return list(pairs)
+
+    def stale(self, types: Optional[Iterable[str]] = None,
+              regions: Optional[Iterable[str]] = None) -> List[Tuple[str, str]]:
+        """Die (Typ, Region)-Paare, deren Bestand fehlt oder abgelaufen ist."""
+        refreshed = self._refreshed()
+        now = self.clock()
+        with self._lock:
+            failed = dict(self._failed)
+        return [(resource_type, region) for resource_type, region in self._pairs(types, regions)
+                if now - refreshed.get((resource_type, region), float("-inf")) >= self.ttls[resource_type]
+                and now - failed.get((resource_type, region), float("-inf")) >= RETRY_AFTER]
+
+    def refresh(self, types: Optional[Iterable[str]] = None, regions: Optional[Iterable[str]] = None,
+                force: bool = False) -> Dict[str, Dict[str, int]]:
+        """Lädt abgelaufene Typen parallel nach und schreibt nur die Änderungen.
+
+        Args:
+            types: Die Ressourcentypen (Standard: alle bekannten)
+            regions: Die Regionen (Standard: die Standardregion)
+            force: Auch noch gültige Typen neu laden
+
+        Returns:
+            Pro "typ@region" die Zahl hinzugefügter, geänderter, unveränderter und
+            entfernter Einträge bzw. {"error": 1}, wenn die Quelle nicht ladbar war
+        """
+        pairs = self._pairs(types, regions) if force else self.stale(types, regions)
+        if not pairs:
+            return {}
+        results: Dict[str, Dict[str, int]] = {}
+        with span("inventory_refresh", "infra", pairs=len(pairs)) as active, \
+                ThreadPoolExecutor(max_workers=min(self.max_workers, len(pairs))) as pool:
+            futures = {}
+            for resource_type, region in pairs:
+                source = self.sources[resource_type]
+                # Der Zeitpunkt vor dem Laden gilt als Stand, spätere Änderungen fehlen evtl.
+                started = self.clock()
+                futures[(resource_type, region)] = (pool.submit(source.fetch, self._client(source.service, region)),
+                                                    started)
+            for (resource_type, region), (future, started) in futures.items():
+                label = f"{resource_type}@{region}"
+                try:
+                    items, calls = future.result()
+                except Exception as e:
+                    # Alter Bestand bleibt gültig, bis die Quelle wieder ladbar ist
+                    with self._lock:
+                        self._counters["errors"] += 1
+                        self.last_errors[label] = str(e)
+                        self._failed[(resource_type, region)] = started
+                    results[label] = {"error": 1}
+                    continue
+                counts = self._store(self.sources[resource_type], region, items, started)
+                with self._lock:
+                    self._counters["api_calls"] += calls
+                    self._counters["refreshes"] += 1
+                    self.last_errors.pop(label, None)
+                    self._failed.pop((resource_type, region), None)
+                    for key, value in counts.items():
+                        self._counters[key] += value
+                results[label] = counts
+            active.set(**{key: sum(r.get(key, 0) for r in results.values())
+                          for key in ("added", "updated", "removed", "error")})
+        return results
+
+    def _store(self, source: InventorySource, region: str, items: List[Dict[str, Any]],
+               refreshed: float) -> Dict[str, int]:
+        rows = {}
+        for item in items:
+            attributes = json.dumps(item, sort_keys=True, default=str)
+            etag = hashlib.sha256(attributes.encode("utf-8")).hexdigest()[:16]
+            rows[str(item[source.id_key])] = (source.name(item), attributes, etag)
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                known = dict(db.execute("SELECT id, etag FROM resources WHERE type = ? AND region = ?",
+                                        (source.resource_type, region)).fetchall())
+                for resource_id, (name, attributes, etag) in rows.items():
+                    if known.get(resource_id) == etag:
+                        counts["unchanged"] += 1
+                        continue
+                    counts["updated" if resource_id in known else "added"] += 1
+                    db.execute("INSERT OR REPLACE INTO resources (type, region, id, name, attributes, etag, updated) "
+                               "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (source.resource_type, region, resource_id, name, attributes, etag, refreshed))
+                gone = [resource_id for resource_id in known if resource_id not in rows]
+                db.executemany("DELETE FROM resources WHERE type = ? AND region = ? AND id = ?",
+                               [(source.resource_type, region, resource_id) for resource_id in gone])
+                counts["removed"] = len(gone)
+                db.execute("INSERT OR REPLACE INTO refreshes (type, region, refreshed) VALUES (?, ?, ?)",
+                           (source.resource_type, region, refreshed))
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        return counts
+
+    def invalidate(self, types: Optional[Iterable[str]] = None, region: Optional[str] = None) -> None:
+        """Markiert Typen als abgelaufen (z.B. nach terraform apply).
+
+        Args:
+            types: Die Ressourcentypen; unbekannte werden ignoriert (Standard: alle)
+            region: Nur diese Region (Standard: alle)
+        """
+        types = [t for t in (types or self.sources) if t in self.sources]
+        with self._lock:
+            for resource_type in types:
+                if region is None:
+                    self._db.execute("DELETE FROM refreshes WHERE type = ?", (resource_type,))
+                else:
+                    self._db.execute("DELETE FROM refreshes WHERE type = ? AND region = ?",
+                                     (resource_type, self._region(resource_type, region)))
+
+    def find(self, resource_type: str, name: Optional[str] = None, tags: Optional[Dict[str, str]] = None,
+             region: Optional[str] = None, refresh: bool = True) -> List[Dict[str, Any]]:
+        """Sucht Ressourcen im Bestand.
+
+        Args:
+            resource_type: Der Terraform-Ressourcentyp
+            name: Der Name (Tag "Name", Bucket-, Gruppen- oder Clustername)
+            tags: Tags, die alle übereinstimmen müssen
+            region: Die Region (Standard: die Standardregion)
+            refresh: Einen abgelaufenen Bestand vorher nachladen
+
+        Returns:
+            Die API-Einträge der gefundenen Ressourcen
+        """
+        if resource_type not in self.sources:
+            raise ValueError(f"Unbekannter Ressourcentyp: {resource_type}")
+        region = self._region(resource_type, region)
+        if refresh:
+            self.refresh([resource_type], [region])
+        query = "SELECT attributes FROM resources WHERE type = ? AND region = ?"
+        params: List[Any] = [resource_type, region]
+        if name is not None:
+            query += " AND name = ?"
+            params.append(name)
+        with self._lock:
+            self._counters["queries"] += 1
+            rows = self._db.execute(query + " ORDER BY id", params).fetchall()
+        items = [json.loads(row["attributes"]) for row in rows]
+        if tags:
+            items = [item for item in items if all(_tags(item).get(k) == v for k, v in tags.items())]
+        return items
+
+    def exists(self, resource_type: str, name: Optional[str] = None, tags: Optional[Dict[str, str]] = None,
+               region: Optional[str] = None, refresh: bool = True) -> bool:
+        """Ob eine passende Ressource existiert (Argumente wie find())."""
+        return bool(self.find(resource_type, name, tags, region, refresh))
+
+    def reconcile(self, resources: List[Dict[str, Any]], region: Optional[str] = None,
+                  refresh: bool = True) -> List[Dict[str, Any]]:
+        """Gleicht geplante Ressourcen mit dem Bestand ab.
+
+        Args:
+            resources: Ressourcen-Definitionen (Format von infra_templates)
+            region: Die Region der Planung
+            refresh: Abgelaufene Typen vorher nachladen (in einem parallelen Durchgang)
+
+        Returns:
+            Pro bereits existierender Ressource "address", "ids" und "drift"
+            (Attribut -> (geplant, vorhanden)) für Attribute mit festem Wert
+        """
+        planned = [resource for resource in resources
+                   if resource.get("kind", "resource") == "resource" and resource.get("type") in self.sources]
+        if refresh and planned:
+            self.refresh({resource["type"] for resource in planned}, [region or self.region])
+        matches = []
+        for resource in planned:
+            name = planned_name(resource)
+            if name is None:
+                continue
+            source = self.sources[resource["type"]]
+            found = self.find(resource["type"], name, region=region, refresh=False)
+            if not found:
+                continue
+            drift = {}
+            for attribute, field in source.attributes.items():
+                value = resource.get("attributes", {}).get(attribute)
+                if value is None or (isinstance(value, str) and value.startswith("${")):
+                    continue
+                actual = [item.get(field) for item in found]
+                if any(a != value for a in actual):
+                    drift[attribute] = (value, actual[0] if len(actual) == 1 else actual)
+            matches.append({"address": f'{resource["type"]}.{resource["name"]}',
+                            "ids": [str(item[source.id_key]) for item in found], "drift": drift})
+        return matches
+
+    def stats(self) -> Dict[str, Any]:
+        """Umfang, Alter und Zähler des Bestands."""
+        refreshed = self._refreshed()
+        now = self.clock()
+        with self._lock:
+            rows = self._db.execute("SELECT type, region, COUNT(*) AS n FROM resources GROUP BY type, region").fetchall()
+            counters = dict(self._counters)
+            errors = dict(self.last_errors)
+        types = {}
+        for row in rows:
+            age = now - refreshed[(row["type"], row["region"])] if (row["type"], row["region"]) in refreshed else None
+            types[f'{row["type"]}@{row["region"]}'] = {
+                "count": row["n"], "age": age,
+                "fresh": age is not None and age < self.ttls[row["type"]],
+            }
+        return dict(counters, resources=sum(row["n"] for row in rows), types=types, last_errors=errors)
+
+
+def format_matches(matches: List[Dict[str, Any]]) -> str:
+    """Fasst das Ergebnis von reconcile() für die Ausgabe zusammen."""
+    if not matches:
+        return "Keine der geplanten Ressourcen existiert bereits."
+    lines = [f"Bereits vorhanden ({len(matches)}):"]
+    for match in matches:
+        lines.append(f'  {match["address"]}: {", ".join(match["ids"])}')
+        for attribute, (planned, actual) in match["drift"].items():
+            lines.append(f"    {attribute}: geplant {planned!r}, vorhanden {actual!r}")
+    return "\n".join(lines)
+
+
+class _LocalPaginator:
+    def __init__(self, client: "_LocalClient", operation: str):
+        self.client = client
+        self.operation = operation
+
+    def paginate(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        token = None
+        while True:
+            page = getattr(self.client, self.operation)(NextToken=token, **kwargs)
+            yield page
+            token = page.get("NextToken")
+            if not token:
+                return
+
+
+class _LocalClient:
+    # Operation -> Ressourcentyp
+    OPERATIONS = {
+        "describe_instances": "aws_instance",
+        "describe_vpcs": "aws_vpc",
+        "describe_subnets": "aws_subnet",
+        "describe_security_groups": "aws_security_group",
+        "list_buckets": "aws_s3_bucket",
+        "list_clusters": "aws_ecs_cluster",
+    }
+
+    def __init__(self, aws: "LocalAWS", service: str, region: str):
+        self.aws = aws
+        self.service = service
+        self.region = region
+
+    def get_paginator(self, operation: str) -> _LocalPaginator:
+        return _LocalPaginator(self, operation)
+
+    def _page(self, operation: str, token: Optional[str], filters: Optional[List[Dict[str, Any]]] = None,
+              region: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        resource_type = self.OPERATIONS[operation]
+        with self.aws._lock:
+            self.aws.calls[operation] = self.aws.calls.get(operation, 0) + 1
+            failure = self.aws.failures.get(operation)
+            if failure is not None:
+                raise failure
+            items = [json.loads(json.dumps(item)) for item in
+                     self.aws.resources.get((resource_type, region or self.region), [])]
+        for condition in filters or []:
+            field = LocalAWS.FILTERS[condition["Name"]]
+            items = [item for item in items if LocalAWS._field(item, field) in condition["Values"]]
+        start = int(token or 0)
+        end = start + self.aws.page_size
+        return items[start:end], str(end) if end < len(items) else None
+
+    def describe_instances(self, NextToken: Optional[str] = None, Filters=None, **kwargs) -> Dict[str, Any]:
+        items, token = self._page("describe_instances", NextToken, Filters)
+        # Wie bei AWS: Instanzen gruppiert nach Reservierung
+        page: Dict[str, Any] = {"Reservations": [{"ReservationId": f"r-{item['InstanceId']}", "Instances": [item]}
+                                                 for item in items]}
+        return dict(page, NextToken=token) if token else page
+
+    def _simple(self, operation: str, key: str, token: Optional[str], filters=None, region=None) -> Dict[str, Any]:
+        items, token = self._page(operation, token, filters, region)
+        return {key: items, "NextToken": token} if token else {key: items}
+
+    def describe_vpcs(self, NextToken: Optional[str] = None, Filters=None, **kwargs) -> Dict[str, Any]:
+        return self._simple("describe_vpcs", "Vpcs", NextToken, Filters)
+
+    def describe_subnets(self, NextToken: Optional[str] = None, Filters=None, **kwargs) -> Dict[str, Any]:
+        return self._simple("describe_subnets", "Subnets", NextToken, Filters)
+
+    def describe_security_groups(self, NextToken: Optional[str] = None, Filters=None, **kwargs) -> Dict[str, Any]:
+        return self._simple("describe_security_groups", "SecurityGroups", NextToken, Filters)
+
+    def list_buckets(self, NextToken: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        # S3 listet die Buckets aller Regionen
+        return self._simple("list_buckets", "Buckets", NextToken, region=GLOBAL_REGION)
+
+    def list_clusters(self, NextToken: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        items, token = self._page("list_clusters", NextToken)
+        page: Dict[str, Any] = {"clusterArns": [item["clusterArn"] for item in items]}
+        return dict(page, NextToken=token) if token else page
+
+    def describe_clusters(self, clusters: List[str], include: Optional[List[str]] = None) -> Dict[str, Any]:
+        with self.aws._lock:
+            self.aws.calls["describe_clusters"] = self.aws.calls.get("describe_clusters", 0) + 1
+            known = {item["clusterArn"]: item for item in self.aws.resources.get(("aws_ecs_cluster", self.region), [])}
+        return {"clusters": [json.loads(json.dumps(known[arn])) for arn in clusters if arn in known]}
+
+
+class LocalAWS:
+    """Prozessinterner Ersatz für die von CloudInventory genutzten AWS-Aufrufe.
+
+    Ressourcen werden mit add() als API-Einträge angelegt; calls zählt die Aufrufe
+    pro Operation, failures lässt Operationen mit einer Ausnahme scheitern.
+    """
+
+    # Filtername -> Feld (mit Punkten für verschachtelte Felder)
+    FILTERS = {"instance-state-name": "State.Name", "vpc-id": "VpcId", "tag:Name": "Tags.Name"}
+
+    def __init__(self, page_size: int = 50):
+        self.page_size = page_size
+        self.resources: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self.calls: Dict[str, int] = {}
+        self.failures: Dict[str, Exception] = {}
+        self._lock = threading.Lock()
+        self._ids = 0
+
+    @staticmethod
+    def _field(item: Dict[str, Any], field: str) -> Any:
+        head, _, rest = field.partition(".")
+        if head == "Tags":
+            return _tags(item).get(rest)
+        value = item.get(head)
+        return LocalAWS._field(value, rest) if rest and isinstance(value, dict) else value
+
+    def add(self, resource_type: str, region: str = DEFAULT_REGION, name: Optional[str] = None,
+            **fields) -> Dict[str, Any]:
+        """Legt eine Ressource an und gibt ihren API-Eintrag zurück.
+
+        Args:
+            resource_type: Der Terraform-Ressourcentyp
+            region: Die Region (S3-Buckets sind global)
+            name: Der Name (Tag "Name", Bucket- oder Clustername)
+            **fields: Weitere Felder des API-Eintrags
+        """
+        with self._lock:
+            self._ids += 1
+            number = f"{self._ids:08x}"
+        tags = [{"Key": "Name", "Value": name}] if name else []
+        if resource_type == "aws_instance":
+            item = {"InstanceId": f"i-{number}", "InstanceType": "t3.micro", "ImageId": "ami-00000000",
+                    "State": {"Name": "running"}, "Tags": tags}
+        elif resource_type == "aws_vpc":
+            item = {"VpcId": f"vpc-{number}", "CidrBlock": "10.0.0.0/16", "Tags": tags}
+        elif resource_type == "aws_subnet":
+            item = {"SubnetId": f"subnet-{number}", "CidrBlock": "10.0.0.0/24", "Tags": tags}
+        elif resource_type == "aws_security_group":
+            item = {"GroupId": f"sg-{number}", "GroupName": name or f"sg-{number}", "Tags": tags}
+        elif resource_type == "aws_s3_bucket":
+            region = GLOBAL_REGION
+            item = {"Name": name or f"bucket-{number}", "CreationDate": "2024-01-01T00:00:00Z"}
+        elif resource_type == "aws_ecs_cluster":
+            cluster = name or f"cluster-{number}"
+            item = {"clusterArn": f"arn:aws:ecs:{region}:000000000000:cluster/{cluster}",
+                    "clusterName": cluster, "status": "ACTIVE", "tags": []}
+        else:
+            raise ValueError(f"Unbekannter Ressourcentyp: {resource_type}")
+        item.update(fields)
+        with self._lock:
+            self.resources.setdefault((resource_type, region), []).append(item)
+        return item
+
+    def remove(self, resource_type: str, resource_id: str, region: str = DEFAULT_REGION) -> None:
+        """Entfernt eine Ressource."""
+        source = SOURCES[resource_type]
+        region = region if source.regional else GLOBAL_REGION
+        with self._lock:
+            items = self.resources.get((resource_type, region), [])
+            items[:] = [item for item in items if str(item[source.id_key]) != resource_id]
+
+    def client(self, service: str, region: str = DEFAULT_REGION) -> _LocalClient:
+        """Erzeugt einen Client (Signatur wie client_factory von CloudInventory)."""
+        return _LocalClient(self, service, region)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Lokaler Bestand der Cloud-Ressourcen")
+    parser.add_argument("--db", default=os.environ.get("DEV_ASSISTANT_INVENTORY", "dev_assistant_inventory.db"))
+    parser.add_argument("--region", action="append", help="Region (mehrfach möglich)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    refresh = commands.add_parser("refresh", help="Abgelaufene Typen nachladen")
+    refresh.add_argument("--type", action="append", dest="types", choices=sorted(SOURCES))
+    refresh.add_argument("--force", action="store_true", help="Auch gültige Typen neu laden")
+
+    exists = commands.add_parser("exists", help="Prüfen, ob eine Ressource existiert")
+    exists.add_argument("type", choices=sorted(SOURCES))
+    exists.add_argument("name")
+
+    commands.add_parser("stats", help="Umfang und Alter des Bestands anzeigen")
+    args = parser.parse_args()
+
+    regions = args.region or [os.environ.get("AWS_REGION", DEFAULT_REGION)]
+    inventory = CloudInventory(args.db, region=regions[0])
+    if args.command == "refresh":
+        print(json.dumps(inventory.refresh(args.types, regions, force=args.force), indent=2, ensure_ascii=False))
+    elif args.command == "exists":
+        found = [item for region in regions for item in inventory.find(args.type, args.name, region=region)]
+        print(json.dumps(found, indent=2, ensure_ascii=False, default=str) if found else "Nicht vorhanden.")
+    else:
+        print(json.dumps(inventory.stats(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+Lokaler Suchindex über geklonte Repositories.
+
+Ein CodeIndex zerlegt die Dateien eines Repositories in Abschnitte (an Funktions- und
+Klassengrenzen, höchstens CHUNK_LINES Zeilen) und hält dafür einen invertierten
+BM25-Index. Suchbegriffe, die im Repository nicht vorkommen, werden über einen
+Trigramm-Index auf ähnliche Bezeichner abgebildet (z.B. "tokeniser" -> "tokenizer").
+Optional werden die Abschnitte zusätzlich mit einer Embedding-Funktion eingebettet;
+die Rangfolgen beider Verfahren werden dann per Reciprocal Rank Fusion kombiniert.
+
+Der Index wird neben dem Repository gespeichert und bei update() nur für die Dateien
+erneuert, die sich laut git seit dem zuletzt indizierten Commit geändert haben.
+context_for() liefert die besten Abschnitte für einen Prompt innerhalb eines
+Token-Budgets.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import subprocess
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from lazy_imports import lazy_module
+from tracing import span, traced_run
+
+np = lazy_module("numpy")
+
+INDEX_VERSION = 1
+
+# Maximale Länge eines Abschnitts; neue Abschnitte beginnen bevorzugt an Definitionen
+CHUNK_LINES = 40
+MIN_CHUNK_LINES = 8
+
+# Dateien, die indiziert werden
+INDEXED_EXTENSIONS = {
+    ".py", ".java", ".jl", ".js", ".ts", ".tsx", ".jsx", ".go", ".rs", ".rb", ".c", ".h",
+    ".cc", ".cpp", ".hpp", ".cs", ".kt", ".scala", ".sh", ".tf", ".md", ".rst", ".txt",
+    ".toml", ".yaml", ".yml", ".cfg", ".ini", ".json",
+}
+SKIPPED_DIRECTORIES = {".git", "node_modules", "__pycache__", ".venv", "venv", "build", "dist", ".tox"}
+MAX_FILE_BYTES = 256 * 1024
+
+_DEFINITION_RE = re.compile(
+    r"^(async\s+def|def|class|function|struct|module|interface|public|private|protected|func|fn|export|resource)\b"
+)
+_WORD_RE = re.compile(r"[^\W\d]\w*")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+_STOPWORDS = {
+    "the", "and", "for", "with", "this", "that", "from", "into", "der", "die", "das", "und",
+    "für", "mit", "ein", "eine", "einen", "einer", "folgende", "aufgabe", "von", "zu", "im", "in",
+    "auf", "ist", "den", "dem", "des", "nicht", "oder",
+}
+
+# Konstanten des BM25-Rankings und der Rangfusion
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60
+TRIGRAM_MIN_SIMILARITY = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    """Zerlegt Text oder Code in kleingeschriebene Suchbegriffe.
+
+    Bezeichner werden zusätzlich in ihre Bestandteile (snake_case, CamelCase) zerlegt.
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        lowered = word.lower()
+        if len(lowered) >= 2 and lowered not in _STOPWORDS:
+            tokens.append(lowered)
+        parts = [p.lower() for piece in word.split("_") for p in _CAMEL_RE.findall(piece)]
+        if len(parts) > 1:
+            tokens.extend(p for p in parts if len(p) >= 2 and p not in _STOPWORDS)
+    return tokens
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def split_chunks(text: str) -> List[Tuple[int, int, str]]:
+    """Zerlegt eine Datei in Abschnitte.
+
+    Args:
+        text: Der Dateiinhalt
+
+    Returns:
+        Eine Liste (erste Zeile, letzte Zeile, Text) mit 1-basierten Zeilennummern
+    """
+    lines = text.splitlines()
+    chunks = []
+    start = 0
+    for i, line in enumerate(lines):
+        length = i - start
+        if length >= CHUNK_LINES or (length >= MIN_CHUNK_LINES and _DEFINITION_RE.match(line)):
+            chunks.append((start + 1, i, "\n".join(lines[start:i])))
+            start = i
+    if start < len(lines):
+        chunks.append((start + 1, len(lines), "\n".join(lines[start:])))
+    return [chunk for chunk in chunks if chunk[2].strip()]
+
+
+class Snippet:
+    """Ein Suchtreffer im Repository."""
+
+    def __init__(self, path: str, start: int, end: int, text: str, score: float):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.text = text
+        self.score = score
+
+    def format(self) -> str:
+        return f"# {self.path}:{self.start}-{self.end}\n{self.text}\n"
+
+    def __repr__(self) -> str:
+        return f"Snippet({self.path}:{self.start}-{self.end}, score={self.score:.3f})"
+
+
+class CodeIndex:
+    """Inkrementell aktualisierter Suchindex über ein Repository."""
+
+    def __init__(self, root: str, index_path: Optional[str] = None,
+                 embed_fn: Optional[Callable[[List[str]], "np.ndarray"]] = None):
+        """Initialisiert den Index und lädt einen gespeicherten Stand.
+
+        Args:
+            root: Das Wurzelverzeichnis des Repositories
+            index_path: Speicherort des Index (Standard: in .git, sonst im Repository)
+            embed_fn: Optionale Funktion, die Texte auf Vektoren abbildet (eine Zeile pro Text)
+        """
+        self.root = os.path.abspath(root)
+        if index_path is None:
+            git_dir = os.path.join(self.root, ".git")
+            base = git_dir if os.path.isdir(git_dir) else self.root
+            index_path = os.path.join(base, "dev_assistant_index.json")
+        self.index_path = index_path
+        self.embed_fn = embed_fn
+
+        self.commit: Optional[str] = None
+        self.dirty: Set[str] = set()
+        self.files: Dict[str, Dict] = {}
+        self.chunks: Dict[str, Tuple[str, int, int, str]] = {}
+        self.chunk_terms: Dict[str, Counter] = {}
+        self.chunk_lengths: Dict[str, int] = {}
+        self.chunk_keys: Dict[str, str] = {}
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self.embeddings: Dict[str, "np.ndarray"] = {}
+        self._total_length = 0
+        self._load()
+
+    # Persistenz
+
+    def _load(self) -> None:
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self.commit = data.get("commit")
+        self.dirty = set(data.get("dirty", []))
+        for path, entry in data.get("files", {}).items():
+            self._add_file(path, entry["hash"], [tuple(chunk) for chunk in entry["chunks"]])
+
+        embeddings_path = self.index_path + ".npz"
+        if self.embed_fn is not None and os.path.exists(embeddings_path):
+            stored = np.load(embeddings_path)
+            self.embeddings = dict(zip(stored["keys"].tolist(), stored["vectors"]))
+
+    def save(self) -> None:
+        """Speichert den Index atomar."""
+        data = {
+            "version": INDEX_VERSION,
+            "commit": self.commit,
+            "dirty": sorted(self.dirty),
+            "files": {
+                path: {"hash": entry["hash"], "chunks": [self.chunks[cid][1:] for cid in entry["chunks"]]}
+                for path, entry in self.files.items()
+            },
+        }
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+        if self.embed_fn is not None and self.embeddings:
+            keys = sorted(self.embeddings)
+            with open(self.index_path + ".npz.tmp", "wb") as f:
+                np.savez(f, keys=np.array(keys), vectors=np.stack([self.embeddings[k] for k in keys]))
+            os.replace(self.index_path + ".npz.tmp", self.index_path + ".npz")
+
+    # Pflege der Index-Strukturen
+
+    def _add_file(self, path: str, digest: str, chunks: Iterable[Tuple[int, int, str]]) -> None:
+        chunk_ids = []
+        for start, end, text in chunks:
+            cid = f"{path}:{start}"
+            terms = Counter(tokenize(text))
+            self.chunks[cid] = (path, start, end, text)
+            self.chunk_terms[cid] = terms
+            self.chunk_lengths[cid] = sum(terms.values())
+            self.chunk_keys[cid] = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            self._total_length += self.chunk_lengths[cid]
+            for term, count in terms.items():
+                if not self.postings[term]:
+                    for trigram in _trigrams(term):
+                        self.trigrams[trigram].add(term)
+                self.postings[term][cid] = count
+            chunk_ids.append(cid)
+        self.files[path] = {"hash": digest, "chunks": chunk_ids}
+
+    def _remove_file(self, path: str) -> None:
+        entry = self.files.pop(path, None)
+        if entry is None:
+            return
+        for cid in entry["chunks"]:
+            terms = self.chunk_terms.pop(cid)
+            self._total_length -= self.chunk_lengths.pop(cid)
+            del self.chunk_keys[cid]
+            for term in terms:
+                postings = self.postings[term]
+                postings.pop(cid, None)
+                if not postings:
+                    del self.postings[term]
+                    for trigram in _trigrams(term):
+                        self.trigrams[trigram].discard(term)
+            del self.chunks[cid]
+
+    def _index_file(self, path: str) -> bool:
+        """Indiziert eine Datei neu, falls sich ihr Inhalt geändert hat.
+
+        Returns:
+            True, wenn der Index geändert wurde
+        """
+        full_path = os.path.join(self.root, path)
+        extension = os.path.splitext(path)[1].lower()
+        try:
+            too_large = os.path.getsize(full_path) > MAX_FILE_BYTES
+            with open(full_path, "rb") as f:
+                raw = f.read() if not too_large else b""
+        except OSError:
+            raw = None
+        if raw is None or too_large or extension not in INDEXED_EXTENSIONS:
+            had_file = path in self.files
+            self._remove_file(path)
+            return had_file
+
+        digest = hashlib.sha256(raw).hexdigest()
+        if self.files.get(path, {}).get("hash") == digest:
+            return False
+        self._remove_file(path)
+        self._add_file(path, digest, split_chunks(raw.decode("utf-8", errors="replace")))
+        return True
+
+    # Git
+
+    def _git(self, *args: str) -> Optional[str]:
+        try:
+            result = traced_run(["git", *args], cwd=self.root, capture_output=True, text=True)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return result.stdout if result.returncode == 0 else None
+
+    def _git_paths(self, *args: str) -> Optional[Set[str]]:
+        output = self._git(*args)
+        if output is None:
+            return None
+        return {line.strip() for line in output.splitlines() if line.strip()}
+
+    def _walk(self) -> Set[str]:
+        paths = set()
+        for directory, subdirs, filenames in os.walk(self.root):
+            subdirs[:] = [d for d in subdirs if d not in SKIPPED_DIRECTORIES]
+            for filename in filenames:
+                paths.add(os.path.relpath(os.path.join(directory, filename), self.root))
+        return paths
+
+    def update(self) -> Dict[str, int]:
+        """Bringt den Index auf den Stand des Arbeitsverzeichnisses.
+
+        Mit git werden nur Dateien geprüft, die sich seit dem indizierten Commit geändert
+        haben, sowie unversionierte und beim letzten Mal abweichende Dateien. Ohne git
+        (oder beim ersten Aufbau) werden alle Dateien über ihren Hash verglichen.
+
+        Returns:
+            Die Anzahl geprüfter und neu indizierter Dateien
+        """
+        with span("code_index.update", "index", root=self.root) as s:
+            head = self._git("rev-parse", "HEAD")
+            head = head.strip() if head else None
+
+            candidates = None
+            if head and self.commit:
+                changed = self._git_paths("diff", "--name-only", self.commit)
+                untracked = self._git_paths("ls-files", "--others", "--exclude-standard")
+                if changed is not None and untracked is not None:
+                    dirty = self._git_paths("diff", "--name-only", "HEAD") or set()
+                    candidates = changed | untracked | self.dirty
+                    self.dirty = dirty | untracked
+
+            if candidates is None:
+                # Vollständiger Abgleich
+                if head:
+                    candidates = self._git_paths("ls-files", "--cached", "--others", "--exclude-standard") or set()
+                    self.dirty = ((self._git_paths("diff", "--name-only", "HEAD") or set())
+                                  | (self._git_paths("ls-files", "--others", "--exclude-standard") or set()))
+                else:
+                    candidates = self._walk()
+                candidates |= set(self.files)
+
+            reindexed = sum(1 for path in sorted(candidates) if self._index_file(path))
+            self.commit = head
+            if self.embed_fn is not None:
+                self._embed_missing()
+            self.save()
+
+            s.set(checked=len(candidates), reindexed=reindexed, chunks=len(self.chunks))
+            return {"checked": len(candidates), "reindexed": reindexed}
+
+    def _embed_missing(self) -> None:
+        keys = {key: cid for cid, key in self.chunk_keys.items()}
+        missing = [key for key in keys if key not in self.embeddings]
+        if missing:
+            vectors = np.asarray(self.embed_fn([self.chunks[keys[key]][3] for key in missing]), dtype=np.float32)
+            for key, vector in zip(missing, vectors):
+                self.embeddings[key] = vector
+        # Vektoren gelöschter Abschnitte verwerfen
+        for key in set(self.embeddings) - set(keys):
+            del self.embeddings[key]
+
+    # Suche
+
+    def _query_weights(self, query: str) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for term in tokenize(query):
+            if term in self.postings:
+                weights[term] = 1.0
+                continue
+            if len(term) < 4:
+                continue
+            # Unbekannter Begriff: ähnliche Bezeichner über Trigramme finden
+            grams = _trigrams(term)
+            overlap = Counter(t for gram in grams for t in self.trigrams.get(gram, ()))
+            for candidate, shared in overlap.most_common(3):
+                similarity = shared / len(grams | _trigrams(candidate))
+                if similarity >= TRIGRAM_MIN_SIMILARITY:
+                    weights[candidate] = max(weights.get(candidate, 0.0), similarity)
+        return weights
+
+    def _bm25(self, query: str) -> Dict[str, float]:
+        count = len(self.chunks)
+        if not count:
+            return {}
+        average_length = self._total_length / count or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term, weight in self._query_weights(query).items():
+            postings = self.postings.get(term, {})
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for cid, tf in postings.items():
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.chunk_lengths[cid] / average_length)
+                scores[cid] += weight * idf * tf * (BM25_K1 + 1) / norm
+        return scores
+
+    def _semantic(self, query: str) -> Dict[str, float]:
+        cids = [cid for cid, key in self.chunk_keys.items() if key in self.embeddings]
+        if not cids:
+            return {}
+        matrix = np.stack([self.embeddings[self.chunk_keys[cid]] for cid in cids])
+        vector = np.asarray(self.embed_fn([query]), dtype=np.float32)[0]
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(vector) or 1.0)
+        similarities = matrix @ vector / np.where(norms == 0, 1.0, norms)
+        return dict(zip(cids, similarities.tolist()))
+
+    def search(self, query: str, k: int = 5) -> List[Snippet]:
+        """Sucht die relevantesten Abschnitte.
+
+        Args:
+            query: Aufgabe, Fehlermeldung oder Code
+            k: Maximale Anzahl Treffer
+
+        Returns:
+            Die Treffer, bester zuerst
+        """
+        scores = self._bm25(query)
+        if self.embed_fn is not None and self.embeddings:
+            # Reciprocal Rank Fusion von BM25 und Embeddings
+            fused: Dict[str, float] = defaultdict(float)
+            for ranking in (scores, self._semantic(query)):
+                ordered = sorted(ranking, key=ranking.get, reverse=True)
+                for rank, cid in enumerate(ordered):
+                    fused[cid] += 1.0 / (RRF_K + rank + 1)
+            scores = fused
+
+        best = sorted((cid for cid, score in scores.items() if score > 0), key=scores.get, reverse=True)[:k]
+        return [Snippet(*self.chunks[cid], score=scores[cid]) for cid in best]
+
+    def context_for(self, query: str, token_budget: int = 1500, k: int = 8) -> str:
+        """Formatiert die besten Treffer für einen Prompt.
+
+        Args:
+            query: Aufgabe, Fehlermeldung oder Code
+            token_budget: Obergrenze der Tokens (geschätzt mit vier Zeichen pro Token)
+            k: Maximale Anzahl Treffer
+
+        Returns:
+            Die Abschnitte mit Pfad und Zeilen oder ein leerer String
+        """
+        parts = []
+        used = 0
+        for snippet in self.search(query, k):
+            text = snippet.format()
+            tokens = len(text) // 4 + 1
+            if used + tokens > token_budget:
+                continue
+            parts.append(text)
+            used += tokens
+        return "\n".join(parts)
@@ -0,0 +1,233 @@
+"""
+Gesprächsgedächtnis über die Schritte einer Aufgabe.
+
+Ohne Gedächtnis erhält jeder Modellaufruf in run() einen Prompt ohne Vorgeschichte:
+Tests und Terraform werden geschrieben, ohne den gerade erzeugten Code zu kennen.
+ConversationMemory sammelt die Ergebnisse der Schritte (Code, Tests, Ausgaben) und
+stellt sie späteren Aufrufen als Kontext voran:
+
+- die letzten Einträge wörtlich, ältere als Zusammenfassung (bei Python die
+  Importe, Signaturen und erste Docstring-Zeilen, sonst die Deklarationszeilen),
+- begrenzt auf ein Token-Budget (gezählt mit tiktoken); was auch zusammengefasst
+  nicht mehr passt, entfällt - älteste Einträge zuerst,
+- stabile Teile zuerst (Aufgabe, dann ältere Zusammenfassungen, dann neue Einträge),
+  damit aufeinanderfolgende Prompts einen möglichst langen gemeinsamen Anfang haben
+  und das Prompt-Caching des Anbieters greift.
+
+Zusammenfassungen werden ohne Modellaufruf gebildet und pro Eintrag nur einmal.
+"""
+
+import ast
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+
+# Token-Budget für den Verlauf eines Aufrufs
+DEFAULT_BUDGET = 2000
+
+# So viele der neuesten Einträge werden nach Möglichkeit wörtlich übernommen
+RECENT_ENTRIES = 2
+
+# Höchstlänge der Zusammenfassung eines Texteintrags (Tokens)
+TEXT_SUMMARY_TOKENS = 120
+
+_DECLARATION_RE = re.compile(
+    r"^\s*(?:public|private|protected|static|abstract|final|class|interface|enum|record|"
+    r"function|struct|module|import|using|export|resource|variable|output|data)\b"
+)
+
+_encodings: Dict[str, Any] = {}
+
+
+def _encoding(model: str) -> Optional[Any]:
+    if model not in _encodings:
+        try:
+            import tiktoken
+            try:
+                encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # tiktoken fehlt oder die BPE-Datei ist nicht ladbar (z.B. offline)
+            encoding = None
+        _encodings[model] = encoding
+    return _encodings[model]
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Zählt die Tokens eines Textes (ohne tiktoken geschätzt: vier Zeichen pro Token)."""
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, limit: int, model: str = "gpt-4") -> str:
+    """Kürzt einen Text auf höchstens limit Tokens."""
+    if count_tokens(text, model) <= limit:
+        return text
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:limit * 4].rstrip() + " ..."
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:limit]).rstrip() + " ..."
+
+
+def _python_signature(node: ast.AST, indent: str = "") -> List[str]:
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    line = f"{indent}{prefix} {node.name}({ast.unparse(node.args)})"
+    if node.returns is not None:
+        line += f" -> {ast.unparse(node.returns)}"
+    lines = [line + ": ..."]
+    docstring = ast.get_docstring(node)
+    if docstring:
+        lines.append(f'{indent}    """{docstring.splitlines()[0]}"""')
+    return lines
+
+
+def outline(content: str, language: Optional[str] = None) -> str:
+    """Fasst Code auf seine Schnittstelle zusammen.
+
+    Args:
+        content: Der Code
+        language: Die Programmiersprache (None: Text)
+
+    Returns:
+        Importe, Klassen- und Funktionssignaturen mit erster Docstring-Zeile (Python)
+        bzw. die Deklarationszeilen (andere Sprachen); leer, wenn nichts erkannt wurde
+    """
+    if language == "python":
+        try:
+            tree = ast.parse(content)
+        except SyntaxError:
+            tree = None
+        if tree is not None:
+            lines: List[str] = []
+            for node in tree.body:
+                if isinstance(node, (ast.Import, ast.ImportFrom)):
+                    lines.append(ast.unparse(node))
+                elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    lines += _python_signature(node)
+                elif isinstance(node, ast.ClassDef):
+                    bases = ", ".join(ast.unparse(base) for base in node.bases)
+                    lines.append(f"class {node.name}({bases}):" if bases else f"class {node.name}:")
+                    for child in node.body:
+                        if (isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+                                and (not child.name.startswith("_") or child.name == "__init__")):
+                            lines += _python_signature(child, "    ")
+                elif isinstance(node, ast.Assign) and all(
+                        isinstance(target, ast.Name) and target.id.isupper() for target in node.targets):
+                    lines.append(ast.unparse(node)[:120])
+            return "\n".join(lines)
+    if language is None:
+        return ""
+    return "\n".join(line.rstrip() for line in content.splitlines() if _DECLARATION_RE.match(line))
+
+
+class MemoryEntry:
+    """Ein Ergebnis eines Schritts (Code, Tests, Ausgabe)."""
+
+    def __init__(self, title: str, content: str, language: Optional[str] = None):
+        self.title = title
+        self.content = content
+        self.language = language
+        self._summary: Optional[str] = None
+
+    def _block(self, text: str) -> str:
+        return f"```{self.language}\n{text}\n```" if self.language else text
+
+    def full(self) -> str:
+        return f"### {self.title}\n{self._block(self.content.strip())}"
+
+    def summary(self, model: str) -> str:
+        if self._summary is None:
+            text = outline(self.content, self.language)
+            if not text:
+                text = truncate_tokens(self.content.strip(), TEXT_SUMMARY_TOKENS, model)
+            self._summary = f"### {self.title} (zusammengefasst)\n{self._block(text)}"
+        return self._summary
+
+
+class ConversationMemory:
+    """Verlauf einer Aufgabe mit Token-Budget."""
+
+    def __init__(self, task: str, budget: int = DEFAULT_BUDGET, recent: int = RECENT_ENTRIES,
+                 model: str = "gpt-4"):
+        """Initialisiert das Gedächtnis.
+
+        Args:
+            task: Die Aufgabe (steht als stabiler Anfang vor dem Verlauf)
+            budget: Höchstzahl Tokens für den Verlauf
+            recent: Anzahl der neuesten Einträge, die wörtlich übernommen werden
+            model: Das Modell, nach dessen Tokenizer gezählt wird
+        """
+        self.task = task
+        self.budget = budget
+        self.recent = recent
+        self.model = model
+        self.entries: List[MemoryEntry] = []
+        self._rendered: Optional[str] = None
+        self.last_stats: Dict[str, int] = {}
+
+    def add(self, title: str, content: str, language: Optional[str] = None) -> None:
+        """Nimmt das Ergebnis eines Schritts auf.
+
+        Args:
+            title: Die Überschrift (z.B. "Code (main.py)")
+            content: Der Inhalt
+            language: Die Programmiersprache, falls es sich um Code handelt
+        """
+        if content and content.strip():
+            self.entries.append(MemoryEntry(title, content, language))
+            self._rendered = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def render(self) -> str:
+        """Der Verlauf innerhalb des Budgets, älteste Einträge zuerst."""
+        if self._rendered is not None:
+            return self._rendered
+        header = f"Aufgabe: {self.task}\n\nBisherige Ergebnisse dieser Aufgabe:"
+        remaining = self.budget - count_tokens(header, self.model)
+        chosen: List[str] = []
+        verbatim = summarized = 0
+        # Vom neuesten zum ältesten Eintrag: wörtlich, sonst zusammengefasst, sonst weglassen
+        for age, entry in enumerate(reversed(self.entries)):
+            candidates = [entry.full(), entry.summary(self.model)] if age < self.recent else [entry.summary(self.model)]
+            for text in candidates:
+                tokens = count_tokens(text, self.model)
+                if tokens <= remaining:
+                    remaining -= tokens
+                    chosen.append(text)
+                    if text is candidates[0] and age < self.recent:
+                        verbatim += 1
+                    else:
+                        summarized += 1
+                    break
+            else:
+                break
+        omitted = len(self.entries) - len(chosen)
+        parts = [header]
+        if omitted:
+            parts.append(f"({omitted} ältere Ergebnisse ausgelassen)")
+        parts += reversed(chosen)
+        self._rendered = "\n\n".join(parts)
+        self.last_stats = {"entries": len(self.entries), "verbatim": verbatim, "summarized": summarized,
+                           "omitted": omitted, "tokens": self.budget - remaining}
+        return self._rendered
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Die Nachrichten, die zwischen Systemprompt und aktueller Anfrage eingefügt werden.
+
+        Returns:
+            Eine Nachricht mit Aufgabe und Verlauf oder eine leere Liste ohne Einträge
+        """
+        if not self.entries:
+            return []
+        return [{"role": "user", "content": self.render()}]
+
+    def digest(self) -> str:
+        """Kurzer Hash des Verlaufs für Cache- und Checkpoint-Schlüssel ("" ohne Einträge)."""
+        if not self.entries:
+            return ""
+        return hashlib.sha256(self.render().encode("utf-8")).hexdigest()[:16]
@@ -1,18 +1,18 @@
-import asyncio
 import subprocess
 import os
 import json
+from functools import cached_property
 from typing import List, Dict, Any, Optional
 
-import openai
+from lazy_imports import lazy_module
+from llm_scheduler import LLMScheduler, get_default_scheduler
 
-# OpenManus-Importe
+# OpenManus-Importe: nur die Basisklasse der Agenten wird beim Laden benötigt
 from OpenManus.app.agent.toolcall import ToolCallAgent
-from OpenManus.app.agent.base import BaseAgent
-from OpenManus.app.flow.planning import PlanningFlow
-from OpenManus.app.schema import Message, AgentState
-from OpenManus.app.tool import ToolCollection, Terminate
-from OpenManus.app.logger import logger
+
+# Schwere Abhängigkeiten erst beim ersten Zugriff laden
+openai = lazy_module("openai")
+asyncio = lazy_module("asyncio")
 
 
 class PlanningAgent(ToolCallAgent):
@@ -52,19 +52,28 @@ class PlanningAgent(ToolCallAgent):
 class DevAssistant:
     """Ein KI-gestützter Entwicklerassistent, der auf OpenManus basiert."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, scheduler: Optional[LLMScheduler] = None):
         """Initialisiert den DevAssistant.
         
         Args:
             api_key: Der OpenAI API-Schlüssel (optional, falls lokale Modelle verwendet werden)
+            scheduler: Der Scheduler für LLM-Aufrufe (Standard: prozessweit geteilt)
         """
-        self.planner = PlanningAgent()
-        self.executor = ToolCallAgent()
         self.api_key = api_key
+        self.scheduler = scheduler or get_default_scheduler()
         
         if api_key:
             openai.api_key = api_key
 
+    # Agenten werden erst beim ersten Zugriff erzeugt
+    @cached_property
+    def planner(self) -> PlanningAgent:
+        return PlanningAgent()
+
+    @cached_property
+    def executor(self) -> ToolCallAgent:
+        return ToolCallAgent()
+
     def generate_code(self, prompt: str, model: str = "gpt-4") -> str:
         """Generiert Code mit OpenAI.
         
@@ -75,7 +84,8 @@ class DevAssistant:
         Returns:
             Der generierte Code als String
         """
-        response = openai.ChatCompletion.create(
+        response = self.scheduler.call(
+            openai.ChatCompletion.create,
             model=model,
             messages=[
                 {"role": "system", "content": "Schreibe effizienten, gut dokumentierten Code."},
@@ -1,11 +1,69 @@
-import asyncio
+import contextvars
 import subprocess
 import os
 import json
 import sys
-from typing import List, Dict, Any, Optional, Union
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Union, Callable
 
-import openai
+from lazy_imports import lazy_module
+from checkpoint import CheckpointStore
+from cloud_inventory import CloudInventory, format_matches
+from code_index import CodeIndex
+from conversation import DEFAULT_BUDGET, ConversationMemory
+from execution_scheduler import ExecutionScheduler, Footprint, get_default_execution_scheduler
+from error_index import ErrorIndex, find_remedy, fingerprint
+from infra_templates import (DEFAULT_REGION, TEMPLATES, classify_intent, extract_parameters, find_gaps,
+                             render_block, render_templates)
+from llm_output import normalize_task, parse_json_object, strip_code_fences, validate_syntax
+from llm_scheduler import LLMScheduler, get_default_scheduler
+from patching import apply_edits, parse_patch
+from prefetch import MISSING, Prefetcher, prefetching
+from profiling import ExecutionProfile, benchmark, prepare, profile_command, run_profiled
+from scaffold import materialize, parse_scaffold, safe_join
+from semantic_cache import SemanticCache
+from terraform_plan import PlanSummary, show_plan
+from tracing import Tracer, span, traced_run
+
+# Schwere Abhängigkeiten erst beim ersten Zugriff laden
+openai = lazy_module("openai")
+asyncio = lazy_module("asyncio")
+
+# Token-Budget für Repository-Ausschnitte in Prompts
+REPOSITORY_CONTEXT_TOKENS = 1500
+
+# Ab dieser Dateilänge fordert fix_error im Modus "auto" nur einen Patch an
+PATCH_MIN_LINES = 40
+
+# Optimierungsschritt: Kandidaten pro Anfrage, gemessene Läufe und Mindestgewinn
+OPTIMIZE_CANDIDATES = 3
+OPTIMIZE_REPEATS = 5
+OPTIMIZE_MIN_SPEEDUP = 1.05
+
+LANGUAGE_BY_EXTENSION = {"py": "python", "java": "java", "jl": "julia"}
+
+# Prompts der Plan-Schritte (auch für die spekulative Vorausberechnung)
+PACKAGE_PROMPT = "Welche Bibliotheken werden für folgende Aufgabe benötigt: {task}"
+CODE_PROMPT = "Implementiere die Kernfunktionalität für folgende Aufgabe: {task}"
+TEST_PROMPT = "Schreibe Tests für folgende Aufgabe: {task}"
+
+# Anzahl der folgenden Plan-Schritte, deren Modellaufrufe vorab gestartet werden
+PREFETCH_AHEAD = 2
+
+# Präfixe, mit denen CodeExecutionAgent fehlgeschlagene Ausführungen meldet
+ERROR_PREFIXES = ("Fehler:", "Kompilierungsfehler:", "Laufzeitfehler:", "Ausführungsfehler:")
+
+
+def is_error_output(output: str) -> bool:
+    """Prüft, ob eine Ausgabe des CodeExecutionAgent einen Fehler meldet."""
+    return output.startswith(ERROR_PREFIXES)
+
+
+def _copy_recommendations(recommendations: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Kopiert Tool-Empfehlungen, damit Aufrufer den geteilten Cache nicht verändern."""
+    return {category: list(items) for category, items in recommendations.items()}
 
 # Mock classes for OpenManus imports
 class ToolCallAgent:
@@ -92,6 +150,24 @@ class CodeExecutionAgent(ToolCallAgent):
 
     max_steps: int = 10
 
+    # Erwarteter Ressourcenbedarf pro Lauf; danach lässt der ExecutionScheduler Läufe zu
+    # und begrenzt sie (JVM und Julia reservieren viel Adressraum, daher kein RLIMIT_AS)
+    footprints: Dict[str, Footprint] = {
+        "python": Footprint(cpus=1.0, memory_mb=512),
+        "javac": Footprint(cpus=1.0, memory_mb=512, address_space=False),
+        "java": Footprint(cpus=1.0, memory_mb=768, address_space=False),
+        "julia": Footprint(cpus=1.0, memory_mb=1024, address_space=False),
+    }
+
+    def __init__(self, scheduler: Optional[ExecutionScheduler] = None, priority: str = "interactive"):
+        super().__init__()
+        self.scheduler = scheduler or get_default_execution_scheduler()
+        self.priority = priority
+
+    def _run(self, runner: str, command: List[str], **kwargs) -> subprocess.CompletedProcess:
+        """Führt einen Befehl mit dem Footprint des Runners über den ExecutionScheduler aus."""
+        return self.scheduler.run(command, self.footprints[runner], priority=self.priority, **kwargs)
+
     def execute_python(self, code: str) -> str:
         """Führt Python-Code aus.
         
@@ -102,19 +178,20 @@ class CodeExecutionAgent(ToolCallAgent):
             Die Ausgabe der Code-Ausführung
         """
         try:
-            # Code in temporäre Datei schreiben
-            with open("temp_script.py", "w") as f:
-                f.write(code)
-            
-            # Code ausführen
-            result = subprocess.run(
-                [sys.executable, "temp_script.py"],
-                capture_output=True,
-                text=True
-            )
-            
-            # Temporäre Datei löschen
-            os.remove("temp_script.py")
+            # Code in eigenes temporäres Verzeichnis schreiben, damit parallele
+            # Ausführungen sich nicht gegenseitig überschreiben
+            with tempfile.TemporaryDirectory() as workdir:
+                script = os.path.join(workdir, "temp_script.py")
+                with open(script, "w") as f:
+                    f.write(code)
+                
+                # Code ausführen
+                result = self._run(
+                    "python",
+                    [sys.executable, script],
+                    capture_output=True,
+                    text=True
+                )
             
             if result.returncode == 0:
                 return result.stdout
@@ -134,30 +211,31 @@ class CodeExecutionAgent(ToolCallAgent):
             Die Ausgabe der Code-Ausführung
         """
         try:
-            # Code in temporäre Datei schreiben
-            with open(f"{class_name}.java", "w") as f:
-                f.write(code)
-            
-            # Code kompilieren
-            compile_result = subprocess.run(
-                ["javac", f"{class_name}.java"],
-                capture_output=True,
-                text=True
-            )
-            
-            if compile_result.returncode != 0:
-                return f"Kompilierungsfehler: {compile_result.stderr}"
-            
-            # Code ausführen
-            run_result = subprocess.run(
-                ["java", class_name],
-                capture_output=True,
-                text=True
-            )
-            
-            # Temporäre Dateien löschen
-            os.remove(f"{class_name}.java")
-            os.remove(f"{class_name}.class")
+            with tempfile.TemporaryDirectory() as workdir:
+                # Code in temporäre Datei schreiben
+                source = os.path.join(workdir, f"{class_name}.java")
+                with open(source, "w") as f:
+                    f.write(code)
+                
+                # Code kompilieren
+                compile_result = self._run(
+                    "javac",
+                    ["javac", f"-J-Xmx{self.footprints['javac'].memory_mb * 3 // 4}m", source],
+                    capture_output=True,
+                    text=True
+                )
+                
+                if compile_result.returncode != 0:
+                    return f"Kompilierungsfehler: {compile_result.stderr}"
+                
+                # Code ausführen
+                # Heap unterhalb des Footprints halten (Rest für Metaspace und Threads)
+                run_result = self._run(
+                    "java",
+                    ["java", f"-Xmx{self.footprints['java'].memory_mb * 3 // 4}m", "-cp", workdir, class_name],
+                    capture_output=True,
+                    text=True
+                )
             
             if run_result.returncode == 0:
                 return run_result.stdout
@@ -176,19 +254,19 @@ class CodeExecutionAgent(ToolCallAgent):
             Die Ausgabe der Code-Ausführung
         """
         try:
-            # Code in temporäre Datei schreiben
-            with open("temp_script.jl", "w") as f:
-                f.write(code)
-            
-            # Code ausführen
-            result = subprocess.run(
-                ["julia", "temp_script.jl"],
-                capture_output=True,
-                text=True
-            )
-            
-            # Temporäre Datei löschen
-            os.remove("temp_script.jl")
+            with tempfile.TemporaryDirectory() as workdir:
+                # Code in temporäre Datei schreiben
+                script = os.path.join(workdir, "temp_script.jl")
+                with open(script, "w") as f:
+                    f.write(code)
+                
+                # Code ausführen
+                result = self._run(
+                    "julia",
+                    ["julia", script],
+                    capture_output=True,
+                    text=True
+                )
             
             if result.returncode == 0:
                 return result.stdout
@@ -197,6 +275,33 @@ class CodeExecutionAgent(ToolCallAgent):
         except Exception as e:
             return f"Ausführungsfehler: {str(e)}"
 
+    def profile(self, code: str, language: str = "python", hotspots: bool = True,
+                timeout: Optional[float] = 60) -> ExecutionProfile:
+        """Führt Code aus und misst Wanduhrzeit, CPU-Zeit und Spitzenspeicher.
+        
+        Args:
+            code: Der auszuführende Code
+            language: Die Programmiersprache des Codes
+            hotspots: Zusätzlich Hotspots erfassen (Python: cProfile/tracemalloc, Java: JFR)
+            timeout: Maximale Laufzeit in Sekunden
+            
+        Returns:
+            Das Profil der Ausführung
+        """
+        try:
+            # Messläufe belegen ihren Footprint, damit parallele Läufe sie nicht verfälschen
+            footprint = self.footprints.get(language.lower(), self.footprints["python"])
+            with self.scheduler.admitted(footprint, self.priority) as (_, preexec), \
+                    tempfile.TemporaryDirectory() as workdir:
+                command, error = prepare(code, language, workdir)
+                if command is None:
+                    return ExecutionProfile(error, 1, 0.0)
+                if hotspots:
+                    return profile_command(command, language, workdir, timeout, preexec_fn=preexec)
+                return run_profiled(command, cwd=workdir, timeout=timeout, preexec_fn=preexec)
+        except Exception as e:
+            return ExecutionProfile(f"Ausführungsfehler: {str(e)}", 1, 0.0)
+
 
 class DebugAgent(ToolCallAgent):
     """Ein Agent, der Code-Fehler analysieren und beheben kann."""
@@ -211,12 +316,34 @@ class DebugAgent(ToolCallAgent):
 
     max_steps: int = 10
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, scheduler: Optional[LLMScheduler] = None,
+                 priority: str = "interactive", retriever: Optional[Callable[[str], str]] = None,
+                 error_index: Optional[ErrorIndex] = None, fix_mode: str = "auto",
+                 ask: Optional[Callable[[str], str]] = None, project_dirs: Optional[List[str]] = None):
         super().__init__()
         self.api_key = api_key
+        self.scheduler = scheduler or get_default_scheduler()
+        self.priority = priority
+        # Liefert zu einer Anfrage relevante Ausschnitte aus dem Repository (optional)
+        self.retriever = retriever
+        # Bewährte Korrekturen pro Fehler-Fingerabdruck
+        self.error_index = error_index if error_index is not None else ErrorIndex()
+        # "full": vollständiger Code, "patch": Suchen/Ersetzen-Blöcke, "auto": Patch ab PATCH_MIN_LINES
+        self.fix_mode = fix_mode
+        # Bestätigt Befehle einer Abhilfe (z.B. pip install); ohne Rückfrage wird nichts installiert
+        self.ask = ask
+        # Module, die hier als Datei oder Paket liegen, werden nicht installiert
+        self.project_dirs = project_dirs
         if api_key:
             openai.api_key = api_key
 
+    def _repository_section(self, code: str, error_message: str) -> str:
+        """Formatiert relevante Repository-Ausschnitte für den Prompt."""
+        if self.retriever is None:
+            return ""
+        context = self.retriever(f"{error_message}\n{code}")
+        return f"\n        Relevanter Code aus dem Repository:\n{context}\n" if context else ""
+
     def analyze_error(self, code: str, error_message: str) -> str:
         """Analysiert einen Fehler im Code.
         
@@ -236,16 +363,18 @@ class DebugAgent(ToolCallAgent):
         
         Fehlermeldung:
         {error_message}
-        
+        {self._repository_section(code, error_message)}
         Erkläre, was der Fehler ist und warum er auftritt.
         """
         
-        response = openai.ChatCompletion.create(
+        response = self.scheduler.call(
+            openai.ChatCompletion.create,
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "Du bist ein Debugging-Experte."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            priority=self.priority
         )
         
         return response.choices[0].message.content
@@ -253,6 +382,11 @@ class DebugAgent(ToolCallAgent):
     def fix_error(self, code: str, error_message: str) -> str:
         """Behebt einen Fehler im Code.
         
+        Bei großen Dateien (siehe fix_mode) liefert das Modell nur Suchen/Ersetzen-Blöcke,
+        die lokal angewendet werden; so hängt die Latenz von der Größe der Änderung ab,
+        nicht von der Größe der Datei. Lässt sich der Patch nicht anwenden, wird der
+        vollständige Code angefordert.
+        
         Args:
             code: Der fehlerhafte Code
             error_message: Die Fehlermeldung
@@ -260,6 +394,15 @@ class DebugAgent(ToolCallAgent):
         Returns:
             Der korrigierte Code
         """
+        use_patch = self.fix_mode == "patch" or (
+            self.fix_mode == "auto" and len(code.splitlines()) >= PATCH_MIN_LINES
+        )
+        if use_patch:
+            fixed_code = self._fix_with_patch(code, error_message)
+            if fixed_code is not None:
+                return fixed_code
+            print("Patch nicht anwendbar, fordere den vollständigen Code an.")
+        
         prompt = f"""
         Behebe den Fehler im folgenden Code:
         
@@ -269,20 +412,130 @@ class DebugAgent(ToolCallAgent):
         
         Fehlermeldung:
         {error_message}
-        
+        {self._repository_section(code, error_message)}
         Gib nur den korrigierten Code zurück, ohne Erklärungen.
         """
         
-        response = openai.ChatCompletion.create(
+        response = self.scheduler.call(
+            openai.ChatCompletion.create,
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "Du bist ein Debugging-Experte."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            priority=self.priority
         )
         
         return response.choices[0].message.content
 
+    def _fix_with_patch(self, code: str, error_message: str) -> Optional[str]:
+        """Fordert die Korrektur als Suchen/Ersetzen-Blöcke an und wendet sie an.
+        
+        Returns:
+            Der korrigierte Code oder None, wenn der Patch nicht anwendbar ist
+        """
+        prompt = f"""
+        Behebe den Fehler im folgenden Code:
+        
+        ```
+        {code}
+        ```
+        
+        Fehlermeldung:
+        {error_message}
+        {self._repository_section(code, error_message)}
+        Gib nicht den ganzen Code zurück, sondern nur die nötigen Änderungen als einen oder
+        mehrere Blöcke in genau diesem Format (der SEARCH-Teil muss wörtlich im Code vorkommen
+        und eindeutig sein):
+        
+        <<<<<<< SEARCH
+        unveränderte Zeilen aus dem Code
+        =======
+        korrigierte Zeilen
+        >>>>>>> REPLACE
+        """
+        
+        response = self.scheduler.call(
+            openai.ChatCompletion.create,
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "Du bist ein Debugging-Experte. Antworte nur mit Änderungsblöcken."},
+                {"role": "user", "content": prompt}
+            ],
+            priority=self.priority
+        )
+        
+        edits = parse_patch(response.choices[0].message.content or "")
+        with span("apply_patch", "patch", edits=len(edits)) as s:
+            fixed_code = apply_edits(code, edits)
+            s.set(applied=fixed_code is not None)
+        return fixed_code
+
+    def known_fix(self, code: str, error_message: str, language: str = "python") -> Optional[Dict[str, str]]:
+        """Behebt einen Fehler ohne LLM, falls er bekannt ist.
+        
+        Zuerst werden deterministische Abhilfen versucht (z.B. fehlendes Modul
+        installieren, nach Rückfrage), danach bewährte Korrekturen aus dem Fehlerindex.
+        
+        Args:
+            code: Der fehlerhafte Code
+            error_message: Die Fehlermeldung
+            language: Die Programmiersprache des Codes
+            
+        Returns:
+            Ein Dictionary mit Analyse, korrigiertem Code und Quelle oder None
+        """
+        fp = fingerprint(error_message, language)
+        remedy = find_remedy(fp, code, self.project_dirs)
+        if remedy is not None and remedy.commands:
+            question = f"{remedy.description} Ausführen: {' '.join(remedy.commands[0])}? (j/n): "
+            if self.ask is None or self.ask(question).strip().lower() != "j":
+                remedy = None
+        if remedy is not None:
+            for command in remedy.commands:
+                print(f"Ausführen: {' '.join(command)}")
+                traced_run(command, capture_output=True, text=True)
+            return {"analysis": remedy.description, "fixed_code": remedy.code, "source": "remedy"}
+        
+        found = self.error_index.lookup(fp, code)
+        if found is not None:
+            fixed_code, source = found
+            return {
+                "analysis": f"Bekannter Fehler ({fp.error_type or 'unbekannt'}: {fp.message}); "
+                            f"bewährte Korrektur angewendet.",
+                "fixed_code": fixed_code,
+                "source": source
+            }
+        return None
+
+    def debug(self, code: str, error_message: str, language: str = "python",
+              use_index: bool = True) -> Dict[str, str]:
+        """Analysiert und behebt einen Fehler, bekannte Fehler ohne LLM.
+        
+        Args:
+            code: Der fehlerhafte Code
+            error_message: Die Fehlermeldung
+            language: Die Programmiersprache des Codes
+            use_index: Wenn False, wird direkt das Modell gefragt
+            
+        Returns:
+            Ein Dictionary mit Analyse, korrigiertem Code und Quelle
+            ("remedy", "index", "template" oder "llm")
+        """
+        result = self.known_fix(code, error_message, language) if use_index else None
+        if result is None:
+            result = {
+                "analysis": self.analyze_error(code, error_message),
+                "fixed_code": self.fix_error(code, error_message),
+                "source": "llm"
+            }
+        self.error_index.count(result["source"])
+        return result
+
+    def remember_fix(self, code: str, error_message: str, fixed_code: str, language: str = "python") -> None:
+        """Speichert eine Korrektur, deren Ausführung erfolgreich war."""
+        self.error_index.record(fingerprint(error_message, language), code, fixed_code)
+
 
 class CloudAgent(ToolCallAgent):
     """Ein Agent, der Cloud-Ressourcen verwalten kann."""
@@ -297,6 +550,29 @@ class CloudAgent(ToolCallAgent):
 
     max_steps: int = 15
 
+    def __init__(self, inventory: Optional[CloudInventory] = None, workdir: str = "."):
+        super().__init__()
+        self.inventory = inventory
+        # main.tf, Plandatei und Terraform-Zustand liegen hier (pro Aufgabe getrennt)
+        self.workdir = workdir
+
+    def check_existing(self, resources: List[Dict[str, Any]], region: str = DEFAULT_REGION) -> str:
+        """Prüft im lokalen Bestand, welche geplanten Ressourcen bereits existieren.
+        
+        Args:
+            resources: Eine Liste von Ressourcen-Definitionen
+            region: Die Region der Planung
+            
+        Returns:
+            Die bereits vorhandenen Ressourcen samt abweichender Attribute, leer ohne Bestand
+        """
+        if self.inventory is None:
+            return ""
+        try:
+            return format_matches(self.inventory.reconcile(resources, region))
+        except Exception as e:
+            return f"Bestandsabfrage fehlgeschlagen: {str(e)}"
+
     def configure_aws(self, region: str = "us-east-1") -> str:
         """Konfiguriert die AWS CLI.
         
@@ -308,7 +584,7 @@ class CloudAgent(ToolCallAgent):
         """
         try:
             # AWS CLI konfigurieren
-            result = subprocess.run(
+            result = traced_run(
                 ["aws", "configure", "set", "region", region],
                 capture_output=True,
                 text=True
@@ -321,53 +597,57 @@ class CloudAgent(ToolCallAgent):
         except Exception as e:
             return f"AWS-Konfigurationsfehler: {str(e)}"
 
-    def create_terraform_config(self, resources: List[Dict[str, Any]], provider: str = "aws") -> str:
+    def create_terraform_config(self, resources: List[Dict[str, Any]], provider: str = "aws",
+                                region: str = DEFAULT_REGION) -> str:
         """Erstellt eine Terraform-Konfigurationsdatei.
         
         Args:
-            resources: Eine Liste von Ressourcen-Definitionen
+            resources: Eine Liste von Ressourcen-Definitionen (z.B. aus render_templates())
             provider: Der zu verwendende Cloud-Provider
+            region: Die Region des Providers
             
         Returns:
             Der Pfad zur erstellten Konfigurationsdatei
         """
         try:
             # Terraform-Konfiguration erstellen
-            config = f"""provider "{provider}" {{
-  region = "us-east-1"
-}}"""
+            blocks = [render_block(f'provider "{provider}"', {"region": region})]
             
             for resource in resources:
+                kind = resource.get("kind", "resource")
                 resource_type = resource.get("type", "aws_instance")
                 resource_name = resource.get("name", "example")
-                resource_attrs = resource.get("attributes", {})
-                
-                config += f'resource "{resource_type}" "{resource_name}" {{\n'
-                for key, value in resource_attrs.items():
-                    if isinstance(value, str):
-                        config += f'  {key} = "{value}"\n'
-                    else:
-                        config += f'  {key} = {value}\n'
-                config += "}\n\n"
+                blocks.append(render_block(
+                    f'{kind} "{resource_type}" "{resource_name}"',
+                    resource.get("attributes", {}),
+                    resource.get("blocks")
+                ))
+            config = "\n\n".join(blocks) + "\n"
             
             # Konfiguration in Datei schreiben
-            with open("main.tf", "w") as f:
+            os.makedirs(self.workdir, exist_ok=True)
+            path = os.path.join(self.workdir, "main.tf")
+            with open(path, "w") as f:
                 f.write(config)
             
-            return "Terraform-Konfiguration erstellt: main.tf"
+            return f"Terraform-Konfiguration erstellt: {path}"
         except Exception as e:
             return f"Fehler bei der Terraform-Konfiguration: {str(e)}"
 
-    def apply_terraform(self) -> str:
-        """Wendet die Terraform-Konfiguration an.
+    def plan_terraform(self, plan_file: str = "tfplan") -> str:
+        """Initialisiert Terraform und schreibt einen Plan in eine Datei.
         
+        Args:
+            plan_file: Die Plandatei
+            
         Returns:
-            Die Ausgabe des Terraform-Befehls
+            Eine leere Zeichenkette bei Erfolg, sonst die Fehlermeldung
         """
         try:
             # Terraform initialisieren
-            init_result = subprocess.run(
+            init_result = traced_run(
                 ["terraform", "init"],
+                cwd=self.workdir,
                 capture_output=True,
                 text=True
             )
@@ -375,19 +655,51 @@ class CloudAgent(ToolCallAgent):
             if init_result.returncode != 0:
                 return f"Terraform-Initialisierungsfehler: {init_result.stderr}"
             
-            # Terraform-Plan erstellen
-            plan_result = subprocess.run(
-                ["terraform", "plan", "-out=tfplan"],
-                capture_output=True,
+            # Terraform-Plan erstellen (die Textausgabe wird nicht benötigt)
+            plan_result = traced_run(
+                ["terraform", "plan", "-input=false", f"-out={plan_file}"],
+                cwd=self.workdir,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True
             )
             
             if plan_result.returncode != 0:
                 return f"Terraform-Planungsfehler: {plan_result.stderr}"
+            return ""
+        except Exception as e:
+            return f"Terraform-Ausführungsfehler: {str(e)}"
+
+    def summarize_plan(self, plan_file: str = "tfplan") -> PlanSummary:
+        """Fasst einen Plan über `terraform show -json` zusammen, ohne ihn ganz zu laden.
+        
+        Args:
+            plan_file: Die Plandatei aus plan_terraform()
             
-            # Terraform anwenden (in einer echten Anwendung würde hier eine Bestätigung erfolgen)
-            apply_result = subprocess.run(
-                ["terraform", "apply", "-auto-approve", "tfplan"],
+        Returns:
+            Die Änderungen pro Ressourcentyp und Modul samt destruktiver Änderungen
+        """
+        return show_plan(plan_file, cwd=self.workdir)
+
+    def apply_terraform(self, planned: bool = False, plan_file: str = "tfplan") -> str:
+        """Wendet die Terraform-Konfiguration an.
+        
+        Args:
+            planned: Ob plan_terraform() bereits ausgeführt wurde
+            plan_file: Die Plandatei
+        
+        Returns:
+            Die Ausgabe des Terraform-Befehls
+        """
+        try:
+            if not planned:
+                error = self.plan_terraform(plan_file)
+                if error:
+                    return error
+            
+            apply_result = traced_run(
+                ["terraform", "apply", "-auto-approve", plan_file],
+                cwd=self.workdir,
                 capture_output=True,
                 text=True
             )
@@ -403,24 +715,108 @@ class CloudAgent(ToolCallAgent):
 class DevAssistantExtended:
     """Ein erweiterter KI-gestützter Entwicklerassistent, der auf OpenManus basiert."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, scheduler: Optional[LLMScheduler] = None,
+                 priority: str = "interactive", trace_path: Optional[str] = None,
+                 answer_fn: Optional[Callable[[str], str]] = None,
+                 checkpoint_dir: Optional[str] = None,
+                 event_fn: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 recommendation_cache: Optional[Dict[str, Dict[str, List[str]]]] = None,
+                 project_dir: str = ".", multi_file: bool = False,
+                 repo_path: Optional[str] = None, error_index_path: Optional[str] = None,
+                 optimize: bool = False, semantic_cache: Optional[SemanticCache] = None,
+                 speculate: Optional[bool] = None, memory_budget: int = DEFAULT_BUDGET,
+                 execution_scheduler: Optional[ExecutionScheduler] = None,
+                 inventory: Optional[CloudInventory] = None):
         """Initialisiert den erweiterten DevAssistant.
         
         Args:
             api_key: Der OpenAI API-Schlüssel (optional, falls lokale Modelle verwendet werden)
+            scheduler: Der Scheduler für LLM-Aufrufe (Standard: prozessweit geteilt)
+            priority: Priorität der LLM-Aufrufe, "interactive" oder "batch"
+            trace_path: Zielpfad für den Trace jeder Aufgabe (".jsonl" für JSON Lines,
+                sonst Chrome-Trace-Format)
+            answer_fn: Beantwortet Rückfragen ohne Benutzer (Batch-Betrieb); Standard ist input()
+            checkpoint_dir: Verzeichnis für Checkpoints; wenn gesetzt, setzt run() eine
+                abgebrochene Aufgabe beim ersten unvollständigen Schritt fort
+            event_fn: Empfängt Fortschrittsereignisse (Name, Daten); wenn gesetzt, wird
+                die Code-Generierung gestreamt und als "code_delta" gemeldet
+            recommendation_cache: Geteilter Cache für Tool-Empfehlungen (z.B. im Service-Betrieb)
+            project_dir: Verzeichnis, in dem die Projektstruktur angelegt wird
+            multi_file: Wenn True, erzeugt der Implementierungsschritt ein Projekt aus
+                mehreren Dateien (generate_project) statt einer einzelnen Datei
+            repo_path: Lokales Repository, dessen relevante Ausschnitte in Prompts für
+                Code-Generierung und Debugging eingefügt werden
+            error_index_path: JSONL-Datei, in der bewährte Fehlerkorrekturen gespeichert
+                werden (Standard: nur im Speicher)
+            optimize: Wenn True, wird der Plan um einen Optimierungsschritt ergänzt, der
+                den generierten Code profiliert und schnellere Varianten vermisst
+            semantic_cache: Cache für Antworten auf ähnlich formulierte Prompts in
+                generate_code und recommend_tools (optional, kann geteilt werden)
+            speculate: Ob die Modellaufrufe der folgenden Plan-Schritte vorab im
+                Hintergrund gestartet werden (Standard: nur interaktiv, d.h. ohne answer_fn)
+            memory_budget: Token-Budget für die Ergebnisse früherer Schritte, die run()
+                späteren Modellaufrufen derselben Aufgabe voranstellt (0 schaltet das ab)
+            execution_scheduler: Lässt Code-Ausführungen nur innerhalb des CPU- und
+                Speicherbudgets zu (Standard: prozessweit geteilt)
+            inventory: Lokaler Bestand der Cloud-Ressourcen, gegen den der Deployment-Schritt
+                geplante Ressourcen abgleicht (optional, kann geteilt werden)
         """
         self.api_key = api_key
+        self.scheduler = scheduler or get_default_scheduler()
+        self.execution_scheduler = execution_scheduler or get_default_execution_scheduler()
+        self.priority = priority
+        self.trace_path = trace_path
+        self.answer_fn = answer_fn
+        self.checkpoint_dir = checkpoint_dir
+        self.event_fn = event_fn
+        self.project_dir = project_dir
+        self.multi_file = multi_file
+        self.repo_path = repo_path
+        self.code_index: Optional[CodeIndex] = None
+        self.error_index_path = error_index_path
+        self.optimize = optimize
+        self.semantic_cache = semantic_cache
+        self.inventory = inventory
+        self.speculate = answer_fn is None if speculate is None else speculate
+        self._prefetcher: Optional[Prefetcher] = None
+        self._upcoming: List[str] = []
+        self.memory_budget = memory_budget
+        self.memory: Optional[ConversationMemory] = None
+        self._last_code_file: Optional[str] = None
+        self._last_test_file: Optional[str] = None
+        self.last_trace: Optional[Tracer] = None
+        self._checkpoint: Optional[CheckpointStore] = None
+        self._step_artifacts: Dict[str, str] = {}
         
-        # Agenten initialisieren
-        self.planner = PlanningAgent()
-        self.code_executor = CodeExecutionAgent()
-        self.debugger = DebugAgent(api_key=api_key)
-        self.cloud_agent = CloudAgent()
+        # Cache für Tool-Empfehlungen, Schlüssel ist die normalisierte Aufgabe
+        self._tool_recommendations: Dict[str, Dict[str, List[str]]] = (
+            recommendation_cache if recommendation_cache is not None else {}
+        )
         
-        # OpenAI API-Schlüssel setzen, falls vorhanden
+        # OpenAI API-Schlüssel setzen, falls vorhanden (wird bis zum Import von openai vorgemerkt)
         if api_key:
             openai.api_key = api_key
 
+    # Agenten werden erst beim ersten Zugriff erzeugt
+    @cached_property
+    def planner(self) -> PlanningAgent:
+        return PlanningAgent()
+
+    @cached_property
+    def code_executor(self) -> CodeExecutionAgent:
+        return CodeExecutionAgent(scheduler=self.execution_scheduler, priority=self.priority)
+
+    @cached_property
+    def debugger(self) -> DebugAgent:
+        return DebugAgent(api_key=self.api_key, scheduler=self.scheduler, priority=self.priority,
+                          retriever=self._repository_context,
+                          error_index=ErrorIndex(self.error_index_path), ask=self._ask,
+                          project_dirs=list(dict.fromkeys([os.path.abspath(self.project_dir), os.getcwd()])))
+
+    @cached_property
+    def cloud_agent(self) -> CloudAgent:
+        return CloudAgent(inventory=self.inventory, workdir=self.project_dir)
+
     def generate_code(self, prompt: str, model: str = "gpt-4", language: str = "python") -> str:
         """Generiert Code mit OpenAI.
         
@@ -432,17 +828,373 @@ class DevAssistantExtended:
         Returns:
             Der generierte Code als String
         """
+        prefetched = self._take_prefetched(("generate_code", prompt, model, language))
+        if prefetched is not MISSING:
+            self._emit("code_delta", text=prefetched)
+            return prefetched
+        
+        full_prompt = f"Generiere {language}-Code für folgende Aufgabe: {prompt}"
+        context = self._repository_context(prompt)
+        if context:
+            full_prompt += f"\n\nRelevanter Code aus dem Repository:\n{context}"
+        # Stabiler Anfang zuerst (Systemprompt, Aufgabe, Verlauf), die Anfrage zuletzt
+        history, history_inputs = self._history()
+        messages = [
+            {"role": "system", "content": f"Schreibe effizienten, gut dokumentierten {language}-Code."},
+            *history,
+            {"role": "user", "content": full_prompt}
+        ]
+        
+        def compute() -> str:
+            # Spekulative Aufrufe laufen ohne Stream, ihre Teile kämen sonst zur falschen Zeit
+            if self.event_fn is not None and not prefetching():
+                return self._generate_streaming(model, messages)
+            response = self.scheduler.call(
+                openai.ChatCompletion.create,
+                model=model,
+                messages=messages,
+                priority=self.priority
+            )
+            return response.choices[0].message.content
+        
+        def compute_semantic() -> str:
+            # Ähnlich formulierte Prompts: nur gültigen Code wiederverwenden
+            def valid(code: str) -> bool:
+                if code.lstrip().startswith("```"):
+                    code = strip_code_fences(code)
+                return not validate_syntax(code, language)
+            
+            # Nur der aufgabenspezifische Teil geht in das Embedding ein
+            site = f"generate_code:{model}:{language}"
+            key = f"{prompt}\n{context}" if context else prompt
+            cached = self.semantic_cache.lookup(site, key, verify=valid)
+            if cached is not None:
+                self._emit("code_delta", text=cached)
+                return cached
+            code = compute()
+            self.semantic_cache.put(site, key, code)
+            return code
+        
+        # Mit Verlauf hängt die Antwort von früheren Ergebnissen ab, nicht nur vom Prompt
+        use_semantic = self.semantic_cache is not None and not history
+        return self._checkpointed("generate_code", compute_semantic if use_semantic else compute,
+                                  model=model, language=language, prompt=full_prompt, **history_inputs)
+
+    def generate_samples(self, prompt: str, n: int, model: str = "gpt-4", language: str = "python") -> List[str]:
+        """Generiert mehrere unabhängige Lösungen mit einem einzigen Aufruf (Parameter n).
+        
+        Args:
+            prompt: Die Beschreibung des zu generierenden Codes
+            n: Anzahl der Lösungen
+            model: Das zu verwendende Sprachmodell
+            language: Die gewünschte Programmiersprache
+            
+        Returns:
+            Die generierten Lösungen ohne umschließende Markdown-Codeblöcke
+        """
         full_prompt = f"Generiere {language}-Code für folgende Aufgabe: {prompt}"
+        messages = [
+            {"role": "system", "content": f"Schreibe effizienten, gut dokumentierten {language}-Code. "
+                                          "Gib nur den Code zurück."},
+            {"role": "user", "content": full_prompt}
+        ]
+        
+        def compute() -> List[str]:
+            response = self.scheduler.call(
+                openai.ChatCompletion.create,
+                model=model,
+                messages=messages,
+                priority=self.priority,
+                n=n
+            )
+            return [choice.message.content or "" for choice in response.choices]
+        
+        samples = self._checkpointed("samples", compute, model=model, language=language, prompt=full_prompt, n=n)
+        return [strip_code_fences(text) if text.lstrip().startswith("```") else text for text in samples]
+
+    def use_checkpoint(self, task: str) -> Optional[CheckpointStore]:
+        """Öffnet den Checkpoint-Store für eine Aufgabe, falls checkpoint_dir gesetzt ist.
+        
+        Args:
+            task: Die Aufgabenbeschreibung
+            
+        Returns:
+            Der aktive Store oder None
+        """
+        self._checkpoint = CheckpointStore.for_task(self.checkpoint_dir, task) if self.checkpoint_dir else None
+        return self._checkpoint
+
+    def generate_project_structure(self, task: str, model: str = "gpt-4") -> Dict[str, Any]:
+        """Lässt das Modell ein Projektgerüst als JSON-Baum erstellen.
+        
+        Args:
+            task: Die Aufgabenbeschreibung
+            model: Das zu verwendende Sprachmodell
+            
+        Returns:
+            Der Gerüstbaum (Objekte sind Verzeichnisse, Strings sind Dateiinhalte)
+        """
+        prefetched = self._take_prefetched(("generate_project_structure", task, model))
+        if prefetched is not MISSING:
+            return prefetched
+        
+        prompt = f"""
+        Erstelle eine Projektstruktur für folgende Aufgabe: {task}
+        
+        Gib die Struktur als JSON-Baum zurück. Objekte sind Verzeichnisse, Strings sind Dateien
+        mit ihrem (optionalen) Startinhalt, z.B.:
+        {{"src": {{"__init__.py": "", "main.py": ""}}, "tests": {{}}, "README.md": "# Projekt"}}
+        """
+        
+        def compute() -> str:
+            response = self.scheduler.call(
+                openai.ChatCompletion.create,
+                model=model,
+                messages=[
+                    {"role": "system", "content": "Du bist ein Softwarearchitekt. Antworte ausschließlich mit einem JSON-Objekt."},
+                    {"role": "user", "content": prompt}
+                ],
+                priority=self.priority,
+                response_format={"type": "json_object"}
+            )
+            return response.choices[0].message.content or ""
+        
+        return parse_scaffold(self._checkpointed("project_structure", compute, model=model, prompt=prompt))
+
+    def clone_repo(self, repo_url: str, path: str = "./repo") -> str:
+        """Klont ein Repository und indiziert es für die Code-Suche.
+        
+        Args:
+            repo_url: Die URL des zu klonenden Repositories
+            path: Der Pfad, in den das Repository geklont werden soll
+            
+        Returns:
+            Die Ausgabe von git clone
+        """
+        result = self.execute_command(f"git clone {repo_url} {path}")
+        if os.path.isdir(path):
+            print(f"Repository geklont nach {path}")
+            self.index_repository(path)
+        return result
+
+    def index_repository(self, path: str) -> CodeIndex:
+        """Baut den Suchindex für ein Repository auf oder aktualisiert ihn inkrementell.
         
-        response = openai.ChatCompletion.create(
+        Args:
+            path: Das Wurzelverzeichnis des Repositories
+            
+        Returns:
+            Der aktualisierte Index
+        """
+        if self.code_index is None or self.code_index.root != os.path.abspath(path):
+            self.code_index = CodeIndex(path)
+        stats = self.code_index.update()
+        self.repo_path = path
+        print(f"Repository indiziert: {stats['reindexed']} von {stats['checked']} geprüften Dateien neu")
+        return self.code_index
+
+    def _repository_context(self, query: str) -> str:
+        """Liefert die relevantesten Repository-Ausschnitte innerhalb des Token-Budgets."""
+        if self.code_index is None:
+            if not self.repo_path:
+                return ""
+            self.index_repository(self.repo_path)
+        with span("retrieve", "index"):
+            return self.code_index.context_for(query, REPOSITORY_CONTEXT_TOKENS)
+
+    def _history(self) -> tuple:
+        """Liefert die Verlaufsnachrichten der laufenden Aufgabe und ihren Schlüsselanteil.
+        
+        Returns:
+            Die Nachrichten (leer ohne Verlauf) und die zusätzlichen Checkpoint-Eingaben
+        """
+        if self.memory is None or not len(self.memory):
+            return [], {}
+        with span("memory", "memory") as active:
+            messages = self.memory.messages()
+            active.set(**self.memory.last_stats)
+        return messages, {"history": self.memory.digest()}
+
+    def _feeds_memory(self, step: str) -> bool:
+        """Ob ein Schritt generierten Code in den Verlauf aufnimmt (siehe _execute_step)."""
+        lowered = step.lower()
+        return self.memory is not None and any(
+            keyword in lowered for keyword in ("implementiere", "kernfunktionalität", "teste"))
+
+    def _history_digest(self) -> str:
+        return self.memory.digest() if self.memory is not None else ""
+
+    def _remember(self, title: str, content: str, language: Optional[str] = None) -> None:
+        """Nimmt ein Ergebnis in den Verlauf der laufenden Aufgabe auf."""
+        if self.memory is not None:
+            self.memory.add(title, content, language)
+
+    def _checkpointed(self, kind: str, compute: Callable[[], Any], **inputs) -> Any:
+        """Liefert ein LLM-Ergebnis aus dem Checkpoint oder berechnet und speichert es.
+        
+        Args:
+            kind: Die Art des Aufrufs (Teil des Schlüssels)
+            compute: Führt den eigentlichen Aufruf aus
+            **inputs: Die Eingaben, aus denen der Schlüssel berechnet wird
+            
+        Returns:
+            Das Ergebnis des Aufrufs
+        """
+        checkpoint = self._checkpoint
+        if checkpoint is None:
+            return compute()
+        key = checkpoint.llm_key(kind=kind, **inputs)
+        cached = checkpoint.get_llm_result(key)
+        if cached is not None:
+            return cached
+        result = compute()
+        checkpoint.record_llm_result(key, result)
+        return result
+
+    def _complete(self, messages: List[Dict[str, str]], model: str = "gpt-4", **kwargs) -> str:
+        """Führt einen Chat-Aufruf über den Scheduler aus und gibt den Text zurück."""
+        response = self.scheduler.call(
+            openai.ChatCompletion.create,
             model=model,
-            messages=[
-                {"role": "system", "content": f"Schreibe effizienten, gut dokumentierten {language}-Code."},
-                {"role": "user", "content": full_prompt}
+            messages=messages,
+            priority=self.priority,
+            **kwargs
+        )
+        return response.choices[0].message.content or ""
+
+    def generate_manifest(self, task: str, language: str = "python", model: str = "gpt-4") -> Dict[str, Any]:
+        """Lässt das Modell die Dateien eines Projekts mit ihren Schnittstellen festlegen.
+        
+        Args:
+            task: Die Aufgabenbeschreibung
+            language: Die gewünschte Programmiersprache
+            model: Das zu verwendende Sprachmodell
+            
+        Returns:
+            Ein Dictionary mit "entrypoint" und einer Liste "files" (path, purpose, interface)
+        """
+        prefetched = self._take_prefetched(("generate_manifest", task, language, model))
+        if prefetched is not MISSING:
+            return prefetched
+        
+        prompt = f"""
+        Plane ein {language}-Projekt für folgende Aufgabe: {task}
+        
+        Gib ein JSON-Objekt im folgenden Format zurück:
+        {{"entrypoint": "pfad/zur/hauptdatei", "files": [{{"path": "relativer/pfad", "purpose": "Zweck der Datei", "interface": "öffentliche Klassen und Funktionen mit Signaturen"}}]}}
+        """
+        messages = [
+            {"role": "system", "content": "Du bist ein Softwarearchitekt. Antworte ausschließlich mit einem JSON-Objekt."},
+            {"role": "user", "content": prompt}
+        ]
+        text = self._checkpointed(
+            "manifest", lambda: self._complete(messages, model, response_format={"type": "json_object"}),
+            model=model, prompt=prompt
+        )
+        
+        manifest = parse_json_object(text) or {}
+        files = manifest.get("files", [])
+        if not isinstance(files, list):
+            files = []
+        return {
+            "entrypoint": manifest.get("entrypoint"),
+            "files": [entry for entry in files if isinstance(entry, dict) and entry.get("path")]
+        }
+
+    def generate_project(self, task: str, language: str = "python", model: str = "gpt-4",
+                         max_workers: int = 8, manifest: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """Generiert ein Projekt aus mehreren Dateien parallel.
+        
+        Zuerst wird ein Manifest mit allen Dateien und Schnittstellen erstellt. Danach wird
+        jede Datei in einem eigenen Aufruf generiert; alle Aufrufe beginnen mit demselben
+        Präfix (Systemprompt, Aufgabe, Manifest) und unterscheiden sich nur in der letzten
+        Nachricht, sodass Prompt-Caching des Anbieters greifen kann. Dateien werden in
+        project_dir geschrieben, sobald sie fertig sind.
+        
+        Args:
+            task: Die Aufgabenbeschreibung
+            language: Die gewünschte Programmiersprache
+            model: Das zu verwendende Sprachmodell
+            max_workers: Maximale Anzahl gleichzeitiger Generierungen
+            manifest: Ein bereits erstelltes Manifest (sonst wird es generiert)
+            
+        Returns:
+            Ein Dictionary relativer Pfad -> generierter Inhalt
+        """
+        manifest = manifest or self.generate_manifest(task, language, model)
+        files = manifest["files"]
+        if not files:
+            return {}
+        
+        shared_prefix = [
+            {"role": "system", "content": f"Schreibe effizienten, gut dokumentierten {language}-Code. "
+                                          "Halte dich exakt an die Schnittstellen im Manifest."},
+            {"role": "user", "content": f"Aufgabe: {task}\n\nProjektmanifest:\n"
+                                        f"{json.dumps(manifest, indent=2, ensure_ascii=False)}"}
+        ]
+        
+        def generate_file(path: str) -> str:
+            messages = shared_prefix + [
+                {"role": "user", "content": f"Gib ausschließlich den vollständigen Inhalt der Datei {path} zurück."}
             ]
+            text = self._checkpointed("project_file", lambda: self._complete(messages, model),
+                                      model=model, messages=messages)
+            return strip_code_fences(text) if text.lstrip().startswith("```") else text
+        
+        generated: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as pool:
+            futures = {}
+            for entry in files:
+                # Jeder Thread bekommt eine Kopie des Kontexts (aktiver Tracer)
+                context = contextvars.copy_context()
+                futures[pool.submit(context.run, generate_file, entry["path"])] = entry["path"]
+            
+            for future in as_completed(futures):
+                path = futures[future]
+                content = future.result()
+                try:
+                    self._write_artifact(safe_join(self.project_dir, path), content)
+                except ValueError as e:
+                    print(f"Datei übersprungen: {e}")
+                    continue
+                generated[path] = content
+                print(f"Datei generiert: {path}")
+                self._emit("file_generated", path=path)
+        
+        return generated
+
+    def _generate_streaming(self, model: str, messages: List[Dict[str, str]]) -> str:
+        """Generiert Code als Stream und meldet jeden Teil als "code_delta"-Ereignis.
+        
+        Args:
+            model: Das zu verwendende Sprachmodell
+            messages: Die Chat-Nachrichten
+            
+        Returns:
+            Der vollständige generierte Code
+        """
+        stream = self.scheduler.call(
+            openai.ChatCompletion.create,
+            model=model,
+            messages=messages,
+            priority=self.priority,
+            stream=True
         )
         
-        return response.choices[0].message.content
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                self._emit("code_delta", text=delta)
+        return "".join(parts)
+
+    def _emit(self, event: str, **data) -> None:
+        """Meldet ein Fortschrittsereignis an event_fn, falls gesetzt."""
+        if self.event_fn is not None:
+            self.event_fn(event, data)
 
     def execute_command(self, command: str) -> str:
         """Führt Terminal-Befehle aus.
@@ -455,7 +1207,7 @@ class DevAssistantExtended:
         """
         try:
             print(f"Ausführen: {command}")
-            result = subprocess.run(command, shell=True, capture_output=True, text=True)
+            result = traced_run(command, shell=True, capture_output=True, text=True)
             return result.stdout if result.returncode == 0 else result.stderr
         except Exception as e:
             return str(e)
@@ -470,69 +1222,356 @@ class DevAssistantExtended:
         Returns:
             Die Ausgabe der Code-Ausführung
         """
-        if language.lower() == "python":
-            return self.code_executor.execute_python(code)
-        elif language.lower() == "java":
-            return self.code_executor.execute_java(code)
-        elif language.lower() == "julia":
-            return self.code_executor.execute_julia(code)
-        else:
-            return f"Nicht unterstützte Sprache: {language}"
+        with span("execute_code", "execute", language=language.lower(), code_bytes=len(code)):
+            if language.lower() == "python":
+                return self.code_executor.execute_python(code)
+            elif language.lower() == "java":
+                return self.code_executor.execute_java(code)
+            elif language.lower() == "julia":
+                return self.code_executor.execute_julia(code)
+            else:
+                return f"Nicht unterstützte Sprache: {language}"
 
-    def debug_code(self, code: str, error_message: str) -> Dict[str, str]:
+    def execute_project(self, entrypoint: str) -> str:
+        """Führt den Einstiegspunkt eines generierten Projekts in project_dir aus.
+        
+        Args:
+            entrypoint: Der relative Pfad der Hauptdatei
+            
+        Returns:
+            Die Ausgabe der Ausführung
+        """
+        if not entrypoint.endswith(".py"):
+            # Andere Sprachen: Einzeldatei wie gewohnt ausführen
+            with open(safe_join(self.project_dir, entrypoint)) as f:
+                code = f.read()
+            language = {"java": "java", "jl": "julia"}.get(entrypoint.split('.')[-1], entrypoint.split('.')[-1])
+            return self.execute_code(code, language)
+        
+        with span("execute_project", "execute", language="python", entrypoint=entrypoint):
+            try:
+                result = self.code_executor._run(
+                    "python",
+                    [sys.executable, entrypoint],
+                    cwd=self.project_dir,
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
+                return result.stdout if result.returncode == 0 else result.stderr
+            except Exception as e:
+                return str(e)
+
+    def profile_code(self, code: str, language: str = "python") -> ExecutionProfile:
+        """Führt Code mit Profiling aus.
+        
+        Args:
+            code: Der auszuführende Code
+            language: Die Programmiersprache des Codes
+            
+        Returns:
+            Das Profil mit Ausgabe, Zeiten, Spitzenspeicher und Hotspots
+        """
+        with span("profile_code", "execute", language=language.lower(), code_bytes=len(code)):
+            return self.code_executor.profile(code, language)
+
+    def optimize_code(self, code: str, language: str = "python", model: str = "gpt-4",
+                      candidates: int = OPTIMIZE_CANDIDATES, repeats: int = OPTIMIZE_REPEATS) -> Dict[str, Any]:
+        """Lässt das Modell anhand der Hotspots schnellere Varianten schreiben und vermisst sie.
+        
+        Jede Variante wird wie das Original mehrfach ausgeführt; übernommen wird die
+        schnellste Variante mit identischer Ausgabe, sofern sie mindestens um
+        OPTIMIZE_MIN_SPEEDUP schneller ist.
+        
+        Args:
+            code: Der zu optimierende Code
+            language: Die Programmiersprache des Codes
+            model: Das zu verwendende Sprachmodell
+            candidates: Anzahl der angeforderten Varianten
+            repeats: Anzahl gemessener Läufe pro Variante
+            
+        Returns:
+            Ein Dictionary mit dem besten Code, ob er verbessert wurde, dem Speedup und
+            den Messungen aller Varianten
+        """
+        profile = self.profile_code(code, language)
+        print(profile.format())
+        if not profile.ok:
+            return {"code": code, "improved": False, "speedup": 1.0, "results": [],
+                    "reason": "Der ursprüngliche Code schlägt fehl."}
+        
+        prompt = f"""
+        Optimiere die Laufzeit des folgenden {language}-Codes. Die Ausgabe muss exakt gleich bleiben.
+        
+        ```
+        {code}
+        ```
+        
+        {profile.format()}
+        
+        Gib nur den vollständigen optimierten Code zurück, ohne Erklärungen.
+        """
+        
+        def compute() -> List[str]:
+            response = self.scheduler.call(
+                openai.ChatCompletion.create,
+                model=model,
+                messages=[
+                    {"role": "system", "content": f"Du bist ein Experte für Performance-Optimierung von {language}-Code."},
+                    {"role": "user", "content": prompt}
+                ],
+                priority=self.priority,
+                n=candidates
+            )
+            return [choice.message.content or "" for choice in response.choices]
+        
+        variants = []
+        for text in self._checkpointed("optimize", compute, model=model, prompt=prompt, n=candidates):
+            variant = strip_code_fences(text) if text.lstrip().startswith("```") else text
+            if variant.strip() and variant.strip() != code.strip() and variant not in variants:
+                variants.append(variant)
+        
+        # Original und Varianten nacheinander messen, damit sie sich nicht gegenseitig stören
+        with span("benchmark", "execute", language=language.lower(), variants=len(variants)):
+            measurements = [self._benchmark_variant(candidate, language, repeats) for candidate in [code] + variants]
+        baseline = measurements[0]
+        if not baseline["ok"]:
+            return {"code": code, "improved": False, "speedup": 1.0, "results": measurements,
+                    "reason": "Der ursprüngliche Code schlägt bei wiederholter Ausführung fehl."}
+        
+        results = []
+        for index, measurement in enumerate(measurements):
+            valid = measurement["ok"] and measurement["output"] == baseline["output"]
+            results.append({"variant": index, "valid": valid, **{k: v for k, v in measurement.items() if k != "output"}})
+        
+        best = min((r for r in results[1:] if r["valid"]), key=lambda r: r["wall_seconds"], default=None)
+        speedup = baseline["wall_seconds"] / best["wall_seconds"] if best and best["wall_seconds"] > 0 else 1.0
+        improved = best is not None and speedup >= OPTIMIZE_MIN_SPEEDUP
+        self._emit("optimized", improved=improved, speedup=speedup, variants=len(variants))
+        return {
+            "code": variants[best["variant"] - 1] if improved else code,
+            "improved": improved,
+            "speedup": speedup if improved else 1.0,
+            "results": results
+        }
+
+    def _benchmark_variant(self, code: str, language: str, repeats: int) -> Dict[str, Any]:
+        """Misst eine Codevariante in einem eigenen Arbeitsverzeichnis.
+        
+        Die Messläufe werden wie jede Ausführung vom ExecutionScheduler zugelassen und
+        laufen mit den Ressourcenlimits des Footprints der Sprache.
+        """
+        footprints = self.code_executor.footprints
+        footprint = footprints.get(language.lower(), footprints["python"])
+        with tempfile.TemporaryDirectory() as workdir:
+            command, error = prepare(code, language, workdir)
+            if command is None:
+                return {"ok": False, "output": error, "wall_seconds": float("inf"), "cpu_seconds": None,
+                        "peak_rss_kb": None, "runs": 0}
+            with self.execution_scheduler.admitted(footprint, self.priority) as (_, preexec):
+                return benchmark(command, workdir, repeats, timeout=60, preexec_fn=preexec)
+
+    def debug_code(self, code: str, error_message: str, language: str = "python",
+                   verify: bool = True) -> Dict[str, str]:
         """Analysiert und behebt Fehler im Code.
         
+        Bekannte Fehler werden über den Fehlerindex ohne LLM behoben. Mit verify wird
+        der korrigierte Code ausgeführt; erfolgreiche Korrekturen werden im Index
+        gespeichert, eine fehlgeschlagene bekannte Korrektur fällt auf das Modell zurück.
+        
         Args:
             code: Der fehlerhafte Code
             error_message: Die Fehlermeldung
+            language: Die Programmiersprache des Codes
+            verify: Korrigierten Code ausführen und das Ergebnis prüfen
             
         Returns:
-            Ein Dictionary mit Analyse und korrigiertem Code
+            Ein Dictionary mit Analyse, korrigiertem Code und Quelle
+            (mit verify zusätzlich die Ausgabe)
         """
-        analysis = self.debugger.analyze_error(code, error_message)
-        fixed_code = self.debugger.fix_error(code, error_message)
+        result = self.debugger.debug(code, error_message, language)
+        if not verify:
+            return result
         
+        output = self.execute_code(result["fixed_code"], language)
+        if is_error_output(output) and result["source"] != "llm":
+            self.debugger.error_index.count("rejected")
+            result = self.debugger.debug(code, error_message, language, use_index=False)
+            output = self.execute_code(result["fixed_code"], language)
+        
+        if not is_error_output(output) and result["source"] in ("llm", "template"):
+            self.debugger.remember_fix(code, error_message, result["fixed_code"], language)
+        result["output"] = output
+        return result
+
+    def _ask(self, prompt: str) -> str:
+        """Fragt den Benutzer und zeichnet die Wartezeit als eigenen Span auf.
+        
+        Args:
+            prompt: Die Eingabeaufforderung
+            
+        Returns:
+            Die Eingabe des Benutzers
+        """
+        with span("input", "input", prompt=prompt.strip()):
+            if self.answer_fn is not None:
+                return self.answer_fn(prompt)
+            return input(prompt)
+
+    def plan_infrastructure(self, task: str, model: str = "gpt-4") -> Dict[str, Any]:
+        """Leitet die Cloud-Ressourcen für eine Aufgabe ab.
+        
+        Bekannte Muster (EC2, S3, VPC, ECS) werden ohne Modellaufruf aus Vorlagen
+        erzeugt. Das Modell ergänzt nur Anforderungen, die keine Vorlage abdeckt,
+        oder plant die Ressourcen vollständig, wenn keine Vorlage passt.
+        
+        Args:
+            task: Die Aufgabenbeschreibung
+            model: Das Sprachmodell für nicht abgedeckte Anforderungen
+            
+        Returns:
+            Ein Dictionary mit "templates", "parameters", "gaps", "region" und "resources"
+        """
+        prefetched = self._take_prefetched(("plan_infrastructure", task, model))
+        if prefetched is not MISSING:
+            return prefetched
+        
+        with span("infra_plan", "infra") as active:
+            templates = classify_intent(task)
+            parameters = extract_parameters(task, templates)
+            resources = render_templates(templates, parameters)
+            gaps = find_gaps(task)
+            if not templates or gaps:
+                resources += self._infrastructure_from_llm(task, resources, gaps, model)
+            active.set(templates=",".join(templates), gaps=len(gaps), resources=len(resources),
+                       llm=not templates or bool(gaps))
         return {
-            "analysis": analysis,
-            "fixed_code": fixed_code
+            "templates": templates,
+            "parameters": {key: value for key, value in parameters.items() if key != "templates"},
+            "gaps": gaps,
+            "region": parameters["region"],
+            "resources": resources
         }
 
-    def setup_cloud_infrastructure(self, resources: List[Dict[str, Any]], provider: str = "aws") -> str:
+    def _infrastructure_from_llm(self, task: str, existing: List[Dict[str, Any]], gaps: List[str],
+                                 model: str) -> List[Dict[str, Any]]:
+        """Lässt das Modell die Ressourcen planen, die keine Vorlage liefert."""
+        if existing:
+            present = ", ".join(f'{r.get("kind", "resource")} {r["type"]}.{r["name"]}' for r in existing)
+            scope = (f"Folgende Ressourcen sind bereits vorhanden und können referenziert werden: {present}\n"
+                     f"Ergänze ausschließlich: {', '.join(gaps)}")
+        else:
+            scope = "Plane alle benötigten Ressourcen."
+        prompt = f"""
+        Aufgabe: {task}
+        {scope}
+        
+        Gib ein JSON-Objekt im folgenden Format zurück (Terraform-Ausdrücke als "${{...}}"):
+        {{"resources": [{{"type": "aws_db_instance", "name": "main", "attributes": {{"engine": "postgres"}}, "blocks": [{{"type": "blockname", "attributes": {{}}}}]}}]}}
+        """
+        history, history_inputs = self._history()
+        messages = [
+            {"role": "system", "content": "Du bist ein Cloud-Experte für Terraform auf AWS. Antworte ausschließlich mit einem JSON-Objekt."},
+            *history,
+            {"role": "user", "content": prompt}
+        ]
+        text = self._checkpointed(
+            "infrastructure", lambda: self._complete(messages, model, response_format={"type": "json_object"}),
+            model=model, prompt=prompt, **history_inputs
+        )
+        
+        planned = (parse_json_object(text) or {}).get("resources", [])
+        if not isinstance(planned, list):
+            return []
+        return [
+            resource for resource in planned
+            if isinstance(resource, dict) and resource.get("type") and resource.get("name")
+            and isinstance(resource.get("attributes", {}), dict)
+        ]
+
+    def setup_cloud_infrastructure(self, resources: List[Dict[str, Any]], provider: str = "aws",
+                                   region: str = DEFAULT_REGION) -> str:
         """Richtet Cloud-Infrastruktur ein.
         
         Args:
             resources: Eine Liste von Ressourcen-Definitionen
             provider: Der zu verwendende Cloud-Provider
+            region: Die zu verwendende Region
             
         Returns:
             Die Ausgabe der Infrastruktur-Einrichtung
         """
         # AWS konfigurieren
-        aws_config_result = self.cloud_agent.configure_aws()
+        aws_config_result = self.cloud_agent.configure_aws(region)
         print(aws_config_result)
         
+        # Bereits vorhandene Ressourcen aus dem lokalen Bestand melden
+        existing = self.cloud_agent.check_existing(resources, region)
+        if existing:
+            print(existing)
+        
         # Terraform-Konfiguration erstellen
-        tf_config_result = self.cloud_agent.create_terraform_config(resources, provider)
+        tf_config_result = self.cloud_agent.create_terraform_config(resources, provider, region)
         print(tf_config_result)
         
+        # Plan erstellen und kompakt zusammenfassen, bevor die Bestätigung eingeholt wird
+        error = self.cloud_agent.plan_terraform()
+        if error:
+            return error
+        try:
+            summary = self.cloud_agent.summarize_plan()
+        except (OSError, RuntimeError) as e:
+            return f"Terraform-Planauswertung fehlgeschlagen: {str(e)}"
+        print(summary.format())
+        if not summary.has_changes:
+            return "Keine Änderungen anzuwenden."
+        
         # Bestätigung vom Benutzer einholen
-        confirmation = input("Möchtest du die Terraform-Konfiguration anwenden? (j/n): ")
+        question = "Möchtest du die Terraform-Konfiguration anwenden? (j/n): "
+        if summary.is_destructive:
+            question = "Der Plan löscht oder ersetzt Ressourcen. " + question
+        confirmation = self._ask(question)
         
         if confirmation.lower() == "j":
-            # Terraform anwenden
-            return self.cloud_agent.apply_terraform()
+            # Terraform anwenden; die geänderten Typen gelten danach im Bestand als veraltet
+            result = self.cloud_agent.apply_terraform(planned=True)
+            if self.cloud_agent.inventory is not None:
+                self.cloud_agent.inventory.invalidate(summary.by_type, region)
+            return result
         else:
             return "Terraform-Anwendung abgebrochen."
 
     def recommend_tools(self, task_description: str) -> Dict[str, List[str]]:
         """Empfiehlt Tools und Frameworks für eine Aufgabe.
         
+        Das Modell wird im JSON-Modus aufgerufen; die Antwort wird tolerant geparst, sodass
+        auch Antworten in Codeblöcken oder abgeschnittene Objekte verwertet werden.
+        Ergebnisse werden pro normalisierter Aufgabe zwischengespeichert.
+        
         Args:
             task_description: Die Beschreibung der Aufgabe
             
         Returns:
             Ein Dictionary mit Empfehlungen für verschiedene Kategorien
         """
+        cache_key = normalize_task(task_description)
+        if cache_key in self._tool_recommendations:
+            return _copy_recommendations(self._tool_recommendations[cache_key])
+        
+        checkpoint = self._checkpoint
+        if checkpoint is not None:
+            checkpoint_key = checkpoint.llm_key(kind="recommend_tools", task=cache_key)
+            cached = checkpoint.get_llm_result(checkpoint_key)
+            if cached is not None:
+                self._tool_recommendations[cache_key] = _copy_recommendations(cached)
+                return _copy_recommendations(cached)
+        
+        if self.semantic_cache is not None:
+            similar = self.semantic_cache.lookup("recommend_tools", cache_key)
+            if similar is not None:
+                self._tool_recommendations[cache_key] = _copy_recommendations(similar)
+                return _copy_recommendations(similar)
+        
         prompt = f"""
         Basierend auf der folgenden Aufgabenbeschreibung, empfehle die besten Tools, Frameworks und Bibliotheken:
         
@@ -542,161 +1581,411 @@ class DevAssistantExtended:
         {{"frameworks": ["framework1", "framework2"], "libraries": ["lib1", "lib2"], "tools": ["tool1", "tool2"]}}
         """
         
-        response = openai.ChatCompletion.create(
+        response = self.scheduler.call(
+            openai.ChatCompletion.create,
             model="gpt-4",
             messages=[
-                {"role": "system", "content": "Du bist ein Experte für Softwareentwicklungstools und -frameworks."},
+                {"role": "system", "content": "Du bist ein Experte für Softwareentwicklungstools und -frameworks. Antworte ausschließlich mit einem JSON-Objekt."},
                 {"role": "user", "content": prompt}
-            ]
+            ],
+            priority=self.priority,
+            response_format={"type": "json_object"}
         )
         
-        try:
-            # Versuche, die Antwort als JSON zu parsen
-            recommendations = json.loads(response.choices[0].message.content)
-            return recommendations
-        except json.JSONDecodeError:
-            # Fallback, falls die Antwort kein gültiges JSON ist
+        parsed = parse_json_object(response.choices[0].message.content or "")
+        if parsed is None:
+            # Fallback, falls die Antwort kein verwertbares JSON enthält (wird nicht gecacht)
             return {
                 "frameworks": ["Konnte keine Frameworks extrahieren"],
                 "libraries": ["Konnte keine Bibliotheken extrahieren"],
                 "tools": ["Konnte keine Tools extrahieren"]
             }
+        
+        # Auf das erwartete Schema bringen: feste Kategorien, nur Listen von Strings
+        recommendations = {}
+        for category in ("frameworks", "libraries", "tools"):
+            items = parsed.get(category, [])
+            if isinstance(items, str):
+                items = [items]
+            elif not isinstance(items, list):
+                items = []
+            recommendations[category] = [str(item) for item in items if item]
+        
+        self._tool_recommendations[cache_key] = _copy_recommendations(recommendations)
+        if self.semantic_cache is not None:
+            self.semantic_cache.put("recommend_tools", cache_key, _copy_recommendations(recommendations))
+        if checkpoint is not None:
+            checkpoint.record_llm_result(checkpoint_key, recommendations)
+        return recommendations
+
+    def _take_prefetched(self, key: tuple) -> Any:
+        """Liefert ein spekulativ vorausberechnetes Ergebnis oder MISSING."""
+        if self._prefetcher is None:
+            return MISSING
+        with span("prefetch", "prefetch", kind=key[0]) as active:
+            value = self._prefetcher.take(key + (self._history_digest(),))
+            active.set(hit=value is not MISSING)
+        return value
+
+    def _speculative_call(self, task: str, step: str) -> Optional[tuple]:
+        """Bestimmt den Modellaufruf, mit dem ein Plan-Schritt beginnen wird.
+        
+        Spiegelt die Fallunterscheidung von _execute_step; Schritte ohne
+        vorhersagbaren Modellaufruf liefern None.
+        
+        Returns:
+            (Schlüssel, Aufruf) oder None
+        """
+        lowered = step.lower()
+        if "install" in lowered or "bibliothek" in lowered:
+            prompt = PACKAGE_PROMPT.format(task=task)
+        elif "projektstruktur" in lowered:
+            return ("generate_project_structure", task, "gpt-4"), lambda: self.generate_project_structure(task)
+        elif ("implementiere" in lowered or "kernfunktionalität" in lowered) and self.multi_file:
+            return ("generate_manifest", task, "python", "gpt-4"), lambda: self.generate_manifest(task)
+        elif "implementiere" in lowered or "kernfunktionalität" in lowered:
+            prompt = CODE_PROMPT.format(task=task)
+        elif "teste" in lowered:
+            prompt = TEST_PROMPT.format(task=task)
+        elif "deployment" in lowered or "terraform" in lowered:
+            return ("plan_infrastructure", task, "gpt-4"), lambda: self.plan_infrastructure(task)
+        elif "optimier" in lowered or "git clone" in lowered:
+            return None
+        else:
+            prompt = step
+        return ("generate_code", prompt, "gpt-4", "python"), lambda: self.generate_code(prompt)
+
+    def _speculate(self, task: str, steps: List[str]) -> None:
+        """Startet die Modellaufrufe der angegebenen Plan-Schritte im Hintergrund."""
+        if self._prefetcher is None:
+            return
+        for step in steps:
+            call = self._speculative_call(task, step)
+            if call is not None:
+                key, compute = call
+                # Ändert sich der Verlauf bis zum Abruf, passt der Schlüssel nicht mehr
+                key += (self._history_digest(),)
+                # Spans der Hintergrundaufrufe landen im Trace der Aufgabe
+                context = contextvars.copy_context()
+                self._prefetcher.submit(key, lambda compute=compute, context=context: context.run(compute))
 
     def run(self, task: str) -> None:
         """Verarbeitet eine Entwickleraufgabe.
         
+        Jeder Schritt wird als Span aufgezeichnet; am Ende wird eine Zeitübersicht
+        ausgegeben und der Trace optional exportiert.
+        
         Args:
             task: Die zu erledigende Aufgabe
         """
-        print(f"Planung der Aufgabe: {task}")
+        tracer = Tracer(name=task)
+        self.last_trace = tracer
+        self.use_checkpoint(task)
+        self.memory = ConversationMemory(task, budget=self.memory_budget) if self.memory_budget > 0 else None
         
-        # Tool-Empfehlungen
-        print("\nEmpfohlene Tools und Frameworks:")
-        recommendations = self.recommend_tools(task)
-        for category, items in recommendations.items():
-            print(f"  {category.capitalize()}: {', '.join(items)}")
+        with tracer.activate():
+            print(f"Planung der Aufgabe: {task}")
+            self._emit("task_started", task=task)
+            
+            # Suchindex auf den aktuellen Stand des Repositories bringen (nur Änderungen)
+            if self.repo_path:
+                self.index_repository(self.repo_path)
+            
+            # Tool-Empfehlungen
+            with tracer.span("Tool-Empfehlungen", "step"):
+                print("\nEmpfohlene Tools und Frameworks:")
+                recommendations = self.recommend_tools(task)
+                for category, items in recommendations.items():
+                    print(f"  {category.capitalize()}: {', '.join(items)}")
+                self._emit("recommendations", recommendations=recommendations)
+            
+            # Aufgabe planen
+            with tracer.span("Planung", "step"):
+                plan = self.planner.plan(task)
+            if self.optimize:
+                plan["steps"].append("Optimiere die Performance des Codes")
+            
+            print("\nAusführungsplan:")
+            for i, step in enumerate(plan["steps"]):
+                print(f"  {i+1}. {step}")
+            self._emit("plan", steps=plan["steps"])
+            
+            # Plan ausführen
+            print("\nPlan wird ausgeführt:")
+            checkpoint = self._checkpoint
+            input_hashes = [checkpoint.step_input_hash(task, i, step) if checkpoint else None
+                            for i, step in enumerate(plan["steps"])]
+            pending = [i for i in range(len(plan["steps"]))
+                       if checkpoint is None or not checkpoint.is_step_complete(i, input_hashes[i])]
+            self._prefetcher = Prefetcher() if self.speculate else None
+            try:
+                for i, step in enumerate(plan["steps"]):
+                    print(f"\nSchritt {i+1}: {step}")
+                    input_hash = input_hashes[i]
+                    if checkpoint is not None and checkpoint.is_step_complete(i, input_hash):
+                        restored = checkpoint.restore_artifacts(i)
+                        print(f"Bereits abgeschlossen (Checkpoint), {restored} Datei(en) wiederhergestellt.")
+                        self._remember_files(checkpoint.steps[i]["artifacts"])
+                        self._emit("step_skipped", index=i, step=step)
+                        continue
+                    
+                    # Modellaufrufe der nächsten Schritte laufen, während dieser Schritt
+                    # (und der Benutzer bei Rückfragen) arbeitet
+                    # Hinter einem Schritt, dessen Ergebnis in den Verlauf eingeht, ändert sich
+                    # der Kontext: solche Schritte spekulieren erst mit ihrem Ergebnis weiter
+                    self._upcoming = []
+                    for j in pending:
+                        if j > i and len(self._upcoming) < PREFETCH_AHEAD:
+                            self._upcoming.append(plan["steps"][j])
+                            if self._feeds_memory(plan["steps"][j]):
+                                break
+                    if not self._feeds_memory(step):
+                        self._speculate(task, self._upcoming)
+                    
+                    self._step_artifacts = {}
+                    self._emit("step_started", index=i, step=step)
+                    with tracer.span(f"Schritt {i+1}", "step", step=step) as step_span:
+                        self._execute_step(task, step)
+                    self._emit("step_finished", index=i, step=step, duration=step_span.duration,
+                               artifacts=sorted(self._step_artifacts))
+                    if checkpoint is not None:
+                        checkpoint.complete_step(i, step, input_hash, self._step_artifacts)
+            finally:
+                # Bei Abbruch (z.B. Strg+C während einer Eingabe) Vorausberechnungen verwerfen
+                prefetcher, self._prefetcher = self._prefetcher, None
+                if prefetcher is not None:
+                    prefetcher.shutdown()
         
-        # Aufgabe planen
-        plan = self.planner.plan(task)
+        self._checkpoint = None
+        if prefetcher is not None and prefetcher.submitted:
+            stats = prefetcher.stats()
+            print(f"Vorausberechnet: {stats['used']} von {stats['submitted']} Aufrufen genutzt")
         
-        print("\nAusführungsplan:")
-        for i, step in enumerate(plan["steps"]):
-            print(f"  {i+1}. {step}")
+        print("\n" + tracer.format_summary())
+        if "debugger" in vars(self) and self.debugger.error_index.hit_rate() is not None:
+            print(self.debugger.error_index.format_stats())
+        if self.semantic_cache is not None:
+            self.semantic_cache.flush()
+            stats = self.semantic_cache.stats()
+            print(f"Semantischer Cache: {stats['hits']} Treffer, {stats['misses']} Fehlgriffe, "
+                  f"{stats['rejected']} verworfen ({stats['entries']} Einträge)")
+        self._emit("task_finished", summary=tracer.summary())
+        if self.trace_path:
+            print(f"Trace gespeichert: {tracer.export(self.trace_path)}")
         
-        # Plan ausführen
-        print("\nPlan wird ausgeführt:")
-        for i, step in enumerate(plan["steps"]):
-            print(f"\nSchritt {i+1}: {step}")
+        print("\nAufgabe abgeschlossen.")
+
+    def watch(self, code_files: Optional[List[str]] = None, test_files: Optional[List[str]] = None,
+              debug: bool = True) -> None:
+        """Beobachtet die generierten Dateien und prüft sie nach jeder Änderung erneut.
+        
+        Nur die betroffenen Stufen laufen erneut (Syntaxprüfung, Ausführung, betroffene
+        Tests, bei Fehlern der DebugAgent); Planung und Installationen entfallen.
+        
+        Args:
+            code_files: Die Code-Dateien (Standard: die zuletzt generierte)
+            test_files: Die Testdateien (Standard: die zuletzt generierte)
+            debug: Bei Fehlern den DebugAgent befragen
+        """
+        from watch import WatchSession
+        
+        if code_files is None:
+            code_files = [self._last_code_file] if self._last_code_file else []
+        if test_files is None:
+            test_files = [self._last_test_file] if self._last_test_file else []
+        files = [path for path in code_files + test_files if os.path.exists(path)]
+        if not files:
+            print("Keine generierten Dateien zum Beobachten.")
+            return
+        WatchSession(self, [path for path in code_files if path in files],
+                     [path for path in test_files if path in files], debug=debug).run()
+
+    def _remember_files(self, paths) -> None:
+        """Nimmt (wiederhergestellte) Code-Dateien in den Verlauf auf."""
+        for path in paths:
+            language = LANGUAGE_BY_EXTENSION.get(path.split('.')[-1])
+            if language and os.path.exists(path):
+                with open(path) as f:
+                    self._remember(f"Datei {path}", f.read(), language)
+
+    def _write_artifact(self, path: str, content: str) -> None:
+        """Schreibt eine generierte Datei und merkt sie als Artefakt des Schritts vor.
+        
+        Args:
+            path: Der Zielpfad
+            content: Der Dateiinhalt
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(content)
+        self._step_artifacts[path] = path
+
+    def _execute_step(self, task: str, step: str) -> None:
+        """Führt einen einzelnen Plan-Schritt aus.
+        
+        Args:
+            task: Die zu erledigende Aufgabe
+            step: Der auszuführende Schritt
+        """
+        if "install" in step.lower() or "bibliothek" in step.lower():
+            # Bibliotheken installieren
+            package_prompt = PACKAGE_PROMPT.format(task=task)
+            packages = self.generate_code(package_prompt).strip().split('\n')
             
-            if "install" in step.lower() or "bibliothek" in step.lower():
-                # Bibliotheken installieren
-                package_prompt = f"Welche Bibliotheken werden für folgende Aufgabe benötigt: {task}"
-                packages = self.generate_code(package_prompt).strip().split('\n')
-                
-                for package in packages:
-                    if package.strip():
-                        print(f"Installiere {package}...")
-                        print(self.execute_command(f"pip install {package}"))
-            
-            elif "projektstruktur" in step.lower():
-                # Projektstruktur erstellen
-                structure_prompt = f"Erstelle eine Projektstruktur für folgende Aufgabe: {task}"
-                structure = self.generate_code(structure_prompt)
-                print(structure)
-                
-                # Verzeichnisse erstellen
-                for line in structure.strip().split('\n'):
-                    if line.strip().startswith('mkdir'):
-                        print(self.execute_command(line))
-            
-            elif "implementiere" in step.lower() or "kernfunktionalität" in step.lower():
-                # Code generieren
-                code_prompt = f"Implementiere die Kernfunktionalität für folgende Aufgabe: {task}"
-                code = self.generate_code(code_prompt)
-                
-                print("Generierter Code:")
-                print(code)
-                
-                # Code in Datei speichern
-                filename = input("Dateiname für den generierten Code: ")
-                with open(filename, "w") as f:
-                    f.write(code)
-                
-                print(f"Code in {filename} gespeichert.")
-                
-                # Code ausführen (optional)
-                run_code = input("Möchtest du den Code ausführen? (j/n): ")
+            for package in packages:
+                if package.strip():
+                    print(f"Installiere {package}...")
+                    print(self.execute_command(f"pip install {package}"))
+            
+        elif "projektstruktur" in step.lower():
+            # Projektstruktur erstellen: ein Durchgang im Prozess statt mkdir pro Zeile
+            structure = self.generate_project_structure(task)
+            print(json.dumps(structure, indent=2, ensure_ascii=False))
+            
+            try:
+                with span("scaffold", "scaffold"):
+                    result = materialize(structure, self.project_dir)
+            except (ValueError, OSError) as e:
+                print(f"Projektstruktur nicht angelegt: {e}")
+            else:
+                for path in result.written:
+                    self._step_artifacts[path] = path
+                print(f"Projektstruktur angelegt: {result}")
+        
+        elif ("implementiere" in step.lower() or "kernfunktionalität" in step.lower()) and self.multi_file:
+            # Projekt aus mehreren Dateien parallel generieren
+            manifest = self.generate_manifest(task)
+            generated = self.generate_project(task, manifest=manifest)
+            print(f"{len(generated)} Datei(en) in {self.project_dir} generiert.")
+            for path, content in generated.items():
+                self._remember(f"Datei {path}", content, LANGUAGE_BY_EXTENSION.get(path.split('.')[-1]))
+            self._speculate(task, self._upcoming)
+            
+            entrypoint = manifest["entrypoint"]
+            if entrypoint in generated:
+                run_code = self._ask("Möchtest du den Code ausführen? (j/n): ")
                 if run_code.lower() == "j":
-                    language = filename.split('.')[-1]
-                    if language == "py":
-                        language = "python"
-                    elif language == "java":
-                        language = "java"
-                    elif language == "jl":
-                        language = "julia"
-                    
                     print("Ausgabe:")
-                    print(self.execute_code(code, language))
+                    print(self.execute_project(entrypoint))
+        
+        elif "implementiere" in step.lower() or "kernfunktionalität" in step.lower():
+            # Code generieren
+            code_prompt = CODE_PROMPT.format(task=task)
+            code = self.generate_code(code_prompt)
+            self._remember("Generierter Code", code, "python")
+            self._speculate(task, self._upcoming)
             
-            elif "teste" in step.lower():
-                # Tests generieren und ausführen
-                test_prompt = f"Schreibe Tests für folgende Aufgabe: {task}"
-                tests = self.generate_code(test_prompt)
-                
-                print("Generierte Tests:")
-                print(tests)
-                
-                # Tests in Datei speichern
-                test_filename = input("Dateiname für die Tests: ")
-                with open(test_filename, "w") as f:
-                    f.write(tests)
-                
-                print(f"Tests in {test_filename} gespeichert.")
-                
-                # Tests ausführen (optional)
-                run_tests = input("Möchtest du die Tests ausführen? (j/n): ")
-                if run_tests.lower() == "j":
-                    language = test_filename.split('.')[-1]
-                    if language == "py":
-                        language = "python"
-                    elif language == "java":
-                        language = "java"
-                    elif language == "jl":
-                        language = "julia"
-                    
-                    print("Testergebnisse:")
-                    print(self.execute_code(tests, language))
+            print("Generierter Code:")
+            print(code)
             
-            elif "deployment" in step.lower() or "terraform" in step.lower():
-                # Cloud-Infrastruktur einrichten
-                infra_prompt = f"Erstelle eine Terraform-Konfiguration für folgende Aufgabe: {task}"
-                infra_description = self.generate_code(infra_prompt)
-                
-                print("Infrastrukturbeschreibung:")
-                print(infra_description)
+            # Code in Datei speichern
+            filename = self._ask("Dateiname für den generierten Code: ")
+            self._write_artifact(filename, code)
+            self._last_code_file = filename
+            
+            print(f"Code in {filename} gespeichert.")
+            
+            # Code ausführen (optional)
+            run_code = self._ask("Möchtest du den Code ausführen? (j/n): ")
+            if run_code.lower() == "j":
+                language = filename.split('.')[-1]
+                if language == "py":
+                    language = "python"
+                elif language == "java":
+                    language = "java"
+                elif language == "jl":
+                    language = "julia"
                 
-                # Einfache Beispiel-Ressourcen
-                resources = [
-                    {
-                        "type": "aws_instance",
-                        "name": "example",
-                        "attributes": {
-                            "ami": "ami-123456",
-                            "instance_type": "t2.micro"
-                        }
-                    }
-                ]
+                print("Ausgabe:")
+                print(self.execute_code(code, language))
+        
+        elif "teste" in step.lower():
+            # Tests generieren und ausführen
+            test_prompt = TEST_PROMPT.format(task=task)
+            tests = self.generate_code(test_prompt)
+            self._remember("Generierte Tests", tests, "python")
+            self._speculate(task, self._upcoming)
+            
+            print("Generierte Tests:")
+            print(tests)
+            
+            # Tests in Datei speichern
+            test_filename = self._ask("Dateiname für die Tests: ")
+            self._write_artifact(test_filename, tests)
+            self._last_test_file = test_filename
+            
+            print(f"Tests in {test_filename} gespeichert.")
+            
+            # Tests ausführen (optional)
+            run_tests = self._ask("Möchtest du die Tests ausführen? (j/n): ")
+            if run_tests.lower() == "j":
+                language = test_filename.split('.')[-1]
+                if language == "py":
+                    language = "python"
+                elif language == "java":
+                    language = "java"
+                elif language == "jl":
+                    language = "julia"
                 
-                setup_infra = input("Möchtest du die Cloud-Infrastruktur einrichten? (j/n): ")
-                if setup_infra.lower() == "j":
-                    print(self.setup_cloud_infrastructure(resources))
+                print("Testergebnisse:")
+                print(self.execute_code(tests, language))
             
-            else:
-                # Allgemeiner Code-Generator für andere Schritte
-                code = self.generate_code(step)
-                print(code)
-        
-        print("\nAufgabe abgeschlossen.")
+        elif "deployment" in step.lower() or "terraform" in step.lower():
+            # Cloud-Infrastruktur aus Vorlagen ableiten (Modell nur für Lücken)
+            plan = self.plan_infrastructure(task)
+            resources = plan["resources"]
+            
+            if plan["templates"]:
+                print("Verwendete Vorlagen: " + ", ".join(
+                    f"{name} ({TEMPLATES[name].description})" for name in plan["templates"]))
+            if plan["gaps"]:
+                print("Vom Modell ergänzt: " + ", ".join(plan["gaps"]))
+            print(f"Geplante Ressourcen (Region {plan['region']}):")
+            for resource in resources:
+                print(f"- {resource.get('kind', 'resource')} {resource['type']}.{resource['name']}")
+            if not resources:
+                print("Keine Ressourcen geplant.")
+                return
+            
+            setup_infra = self._ask("Möchtest du die Cloud-Infrastruktur einrichten? (j/n): ")
+            if setup_infra.lower() == "j":
+                print(self.setup_cloud_infrastructure(resources, region=plan["region"]))
+                config_path = os.path.join(self.project_dir, "main.tf")
+                if os.path.exists(config_path):
+                    self._step_artifacts[config_path] = config_path
+            
+        elif "optimier" in step.lower():
+            # Generierten Code profilieren und schnellere Varianten vermessen
+            if not self._last_code_file or not os.path.exists(self._last_code_file):
+                print("Kein generierter Code zum Optimieren vorhanden.")
+                return
+            language = LANGUAGE_BY_EXTENSION.get(self._last_code_file.split('.')[-1])
+            if language is None:
+                print(f"Optimierung für {self._last_code_file} nicht unterstützt.")
+                return
+            with open(self._last_code_file) as f:
+                code = f.read()
+            
+            result = self.optimize_code(code, language)
+            for measurement in result["results"]:
+                label = "Original" if measurement["variant"] == 0 else f"Variante {measurement['variant']}"
+                status = "" if measurement["valid"] else " (ungültig)"
+                print(f"{label}: {measurement['wall_seconds'] * 1000:.1f} ms{status}")
+            
+            if not result["improved"]:
+                print("Keine schnellere Variante mit identischer Ausgabe gefunden.")
+            elif self._ask(f"Optimierte Version ({result['speedup']:.2f}x schneller) übernehmen? (j/n): ").lower() == "j":
+                self._write_artifact(self._last_code_file, result["code"])
+                print(f"Optimierte Version in {self._last_code_file} gespeichert.")
+            
+        elif "git clone" in step.lower():
+            # Repository klonen und für die Code-Suche indizieren
+            self.clone_repo(step.split()[-1])
+            
+        else:
+            # Allgemeiner Code-Generator für andere Schritte
+            code = self.generate_code(step)
+            print(code)
 
 
 async def main():
@@ -706,7 +1995,16 @@ async def main():
     if not api_key:
         api_key = input("Bitte gib deinen OpenAI API-Schlüssel ein (oder drücke Enter, um fortzufahren ohne Schlüssel): ")
     
-    assistant = DevAssistantExtended(api_key=api_key if api_key else None)
+    semantic_cache_path = os.environ.get("DEV_ASSISTANT_SEMANTIC_CACHE")
+    inventory_path = os.environ.get("DEV_ASSISTANT_INVENTORY")
+    assistant = DevAssistantExtended(
+        api_key=api_key if api_key else None,
+        trace_path=os.environ.get("DEV_ASSISTANT_TRACE"),
+        checkpoint_dir=os.environ.get("DEV_ASSISTANT_CHECKPOINTS"),
+        error_index_path=os.environ.get("DEV_ASSISTANT_ERROR_INDEX"),
+        semantic_cache=SemanticCache(semantic_cache_path) if semantic_cache_path else None,
+        inventory=CloudInventory(inventory_path) if inventory_path else None
+    )
     
     try:
         task = input("Gib deine Entwicklungsaufgabe ein: ")
@@ -716,6 +2014,8 @@ async def main():
 
         print("Verarbeite deine Anfrage...")
         assistant.run(task)
+        if os.environ.get("DEV_ASSISTANT_WATCH"):
+            assistant.watch()
     except KeyboardInterrupt:
         print("\nOperation unterbrochen.")
     except Exception as e:
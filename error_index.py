@@ -0,0 +1,357 @@
+"""
+Fingerabdrücke von Fehlermeldungen und ein Index bewährter Korrekturen.
+
+Dieselben Fehlerklassen (fehlende Module, unbekannte Java-Symbole, UndefVarError in
+Julia) treten immer wieder auf und kosten jeweils zwei LLM-Aufrufe. fingerprint()
+normalisiert eine Fehlermeldung (Fehlertyp, ohne Pfade, Zeilennummern und Adressen,
+plus Schlüsselbegriffe wie Modul- oder Symbolnamen). find_remedy() kennt
+deterministische Abhilfen, z.B. das fehlende Modul installieren oder einen fehlenden
+Import ergänzen. Der ErrorIndex speichert erfolgreiche Korrekturen pro Fingerabdruck
+als Patch-Vorlage und wendet sie auf neuen Code an, bevor das Modell gefragt wird.
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Importname -> pip-Paket, wo beide sich unterscheiden
+PACKAGE_ALIASES = {
+    "yaml": "pyyaml",
+    "cv2": "opencv-python",
+    "sklearn": "scikit-learn",
+    "PIL": "pillow",
+    "bs4": "beautifulsoup4",
+    "dateutil": "python-dateutil",
+    "dotenv": "python-dotenv",
+    "git": "gitpython",
+    "jwt": "pyjwt",
+    "serial": "pyserial",
+    "skimage": "scikit-image",
+    "Crypto": "pycryptodome",
+    "OpenSSL": "pyopenssl",
+    "attr": "attrs",
+    "docx": "python-docx",
+    "magic": "python-magic",
+    "MySQLdb": "mysqlclient",
+    "jose": "python-jose",
+    "multipart": "python-multipart",
+    "google.protobuf": "protobuf",
+}
+
+# Häufig vergessene Java-Importe
+JAVA_IMPORTS = {
+    name: f"java.util.{name}"
+    for name in ("List", "ArrayList", "LinkedList", "Map", "HashMap", "TreeMap", "Set", "HashSet",
+                 "TreeSet", "Arrays", "Collections", "Scanner", "Optional", "Random", "Objects",
+                 "Iterator", "Deque", "ArrayDeque", "Queue", "PriorityQueue")
+}
+JAVA_IMPORTS.update({
+    "Collectors": "java.util.stream.Collectors",
+    "Stream": "java.util.stream.Stream",
+    "IntStream": "java.util.stream.IntStream",
+    "Files": "java.nio.file.Files",
+    "Path": "java.nio.file.Path",
+    "Paths": "java.nio.file.Paths",
+    "IOException": "java.io.IOException",
+})
+
+# Patch-Vorlagen nur für kleine, lokale Korrekturen
+MAX_TEMPLATE_HUNKS = 3
+MAX_TEMPLATE_LINES = 20
+
+_PYTHON_ERROR_RE = re.compile(r"^\s*(?:ERROR:\s*)?(?:LoadError:\s*)?([A-Za-z_][\w.]*(?:Error|Exception|Exit|Interrupt))\b:?\s*(.*)$")
+_JAVA_ERROR_RE = re.compile(r"^\S*\.java:\d+:\s*error:\s*(.*)$")
+_JAVA_SYMBOL_RE = re.compile(r"^\s*symbol:\s*(?:class|variable|method)\s+(\w+)")
+_JAVA_EXCEPTION_RE = re.compile(r'Exception in thread "[^"]*"\s+([\w.$]+)(?::\s*(.*))?')
+_QUOTED_RE = re.compile(r"['\"`‘’]([\w.]+)['\"`‘’]")
+_PATH_RE = re.compile(r"(?:[A-Za-z]:)?(?:[\w.\-]*[/\\])+[\w.\-]+")
+_LINE_RE = re.compile(r"\b(?:line|zeile)\s+\d+|:\d+(?::\d+)?\b", re.IGNORECASE)
+_HEX_RE = re.compile(r"0x[0-9a-fA-F]+")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+class ErrorFingerprint:
+    """Normalisierte Form einer Fehlermeldung."""
+
+    def __init__(self, language: str, error_type: str, message: str, tokens: List[str]):
+        self.language = language
+        self.error_type = error_type
+        self.message = message
+        self.tokens = tokens
+        raw = f"{language}|{error_type}|{message}"
+        self.key = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def __repr__(self) -> str:
+        return f"ErrorFingerprint({self.error_type!r}, {self.message!r}, tokens={self.tokens})"
+
+
+def _normalize(message: str) -> str:
+    message = _PATH_RE.sub("<pfad>", message)
+    message = _LINE_RE.sub("", message)
+    message = _HEX_RE.sub("<adresse>", message)
+    message = _NUMBER_RE.sub("<n>", message)
+    return " ".join(message.split())
+
+
+def fingerprint(error_message: str, language: str = "python") -> ErrorFingerprint:
+    """Berechnet den Fingerabdruck einer Fehlermeldung.
+
+    Args:
+        error_message: Die Fehlermeldung (z.B. Traceback oder Compiler-Ausgabe)
+        language: Die Programmiersprache des Codes
+
+    Returns:
+        Der Fingerabdruck
+    """
+    language = language.lower()
+    lines = [line for line in error_message.splitlines() if line.strip()]
+    error_type, message, tokens = "", "", []
+
+    for line in lines:
+        match = _JAVA_ERROR_RE.match(line)
+        if match:
+            # Erster Compilerfehler; das Symbol steht in einer Folgezeile
+            error_type, message = "javac", match.group(1)
+            break
+    if error_type:
+        tokens.extend(m.group(1) for m in map(_JAVA_SYMBOL_RE.match, lines) if m)
+    else:
+        match = _JAVA_EXCEPTION_RE.search(error_message)
+        if match:
+            error_type, message = match.group(1), match.group(2) or ""
+        else:
+            # Python und Julia: die letzte Zeile mit Fehlertyp beschreibt die Ursache
+            for line in reversed(lines):
+                match = _PYTHON_ERROR_RE.match(line)
+                if match:
+                    error_type, message = match.group(1), match.group(2)
+                    break
+    if not error_type:
+        message = lines[-1] if lines else ""
+
+    tokens.extend(_QUOTED_RE.findall(message))
+    if error_type.endswith("UndefVarError"):
+        match = re.match(r"`?(\w+)`?\s+not defined", message)
+        if match:
+            tokens.append(match.group(1))
+    return ErrorFingerprint(language, error_type.split(".")[-1], _normalize(message), list(dict.fromkeys(tokens)))
+
+
+class Remedy:
+    """Eine deterministische Abhilfe ohne LLM."""
+
+    def __init__(self, description: str, code: str, commands: Optional[List[List[str]]] = None):
+        self.description = description
+        self.code = code
+        self.commands = commands or []
+
+
+def _insert_java_imports(code: str, qualified_names: List[str]) -> str:
+    lines = code.splitlines(keepends=True)
+    position = 1 if lines and lines[0].lstrip().startswith("package ") else 0
+    lines[position:position] = [f"import {qualified};\n" for qualified in qualified_names]
+    return "".join(lines)
+
+
+def _is_local_module(module: str, search_paths: List[str]) -> bool:
+    """Ob ein Importname eine Datei oder ein Paket des Projekts bezeichnet."""
+    return any(os.path.isfile(os.path.join(path, module + ".py")) or os.path.isdir(os.path.join(path, module))
+               for path in search_paths)
+
+
+def find_remedy(fp: ErrorFingerprint, code: str, search_paths: Optional[List[str]] = None) -> Optional[Remedy]:
+    """Sucht eine deterministische Abhilfe für einen Fehler.
+
+    Args:
+        fp: Der Fingerabdruck des Fehlers
+        code: Der fehlerhafte Code
+        search_paths: Projektverzeichnisse; Module, die dort als Datei oder Paket
+            liegen, werden nicht von PyPI installiert (Standard: Arbeitsverzeichnis)
+
+    Returns:
+        Die Abhilfe oder None
+    """
+    # Nur ein fehlendes Modul lässt sich installieren; "cannot import name" nennt zuerst das Symbol
+    if (fp.language == "python" and fp.tokens
+            and (fp.error_type == "ModuleNotFoundError" or fp.message.startswith("No module named"))):
+        name = fp.tokens[0]
+        module = name.split(".")[0]
+        if module in getattr(sys, "stdlib_module_names", ()):
+            return None
+        if _is_local_module(module, search_paths or [os.getcwd()]):
+            return None
+        package = PACKAGE_ALIASES.get(name, PACKAGE_ALIASES.get(module, module))
+        return Remedy(f"Das Modul {module} fehlt; installiere das Paket {package}.", code,
+                      [[sys.executable, "-m", "pip", "install", package]])
+
+    if fp.language == "python" and fp.error_type == "NameError" and fp.tokens:
+        name = fp.tokens[0]
+        if name in getattr(sys, "stdlib_module_names", ()):
+            return Remedy(f"Das Modul {name} wird verwendet, aber nicht importiert.", f"import {name}\n{code}")
+
+    if fp.language == "java" and fp.error_type == "javac" and "cannot find symbol" in fp.message:
+        missing = [JAVA_IMPORTS[t] for t in fp.tokens if t in JAVA_IMPORTS and f"import {JAVA_IMPORTS[t]};" not in code]
+        if missing:
+            return Remedy(f"Fehlende Importe ergänzt: {', '.join(missing)}.", _insert_java_imports(code, missing))
+
+    if fp.language == "julia" and fp.error_type == "ArgumentError":
+        match = re.match(r"Package (\w+) not found", fp.message)
+        if match:
+            package = match.group(1)
+            return Remedy(f"Das Julia-Paket {package} fehlt; installiere es mit Pkg.add.", code,
+                          [["julia", "-e", f'using Pkg; Pkg.add("{package}")']])
+
+    return None
+
+
+def make_template(code: str, fixed_code: str) -> Optional[List[Tuple[List[str], List[str]]]]:
+    """Leitet aus einer Korrektur eine Patch-Vorlage (alte -> neue Zeilenblöcke) ab.
+
+    Reine Einfügungen werden an der vorhergehenden Zeile verankert. Große Umbauten
+    ergeben keine Vorlage (None).
+    """
+    old_lines, new_lines = code.splitlines(), fixed_code.splitlines()
+    replacements = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes():
+        if tag == "equal":
+            continue
+        old, new = old_lines[i1:i2], new_lines[j1:j2]
+        if not old and i1 > 0:
+            old, new = [old_lines[i1 - 1]], [old_lines[i1 - 1]] + new
+        if len(old) > MAX_TEMPLATE_LINES or len(new) > MAX_TEMPLATE_LINES:
+            return None
+        replacements.append((old, new))
+    if not replacements or len(replacements) > MAX_TEMPLATE_HUNKS:
+        return None
+    return replacements
+
+
+def apply_template(code: str, replacements: List[Tuple[List[str], List[str]]]) -> Optional[str]:
+    """Wendet eine Patch-Vorlage an.
+
+    Returns:
+        Der korrigierte Code oder None, wenn ein Block nicht gefunden wurde
+    """
+    lines = code.splitlines()
+    for old, new in replacements:
+        if not old:
+            lines = list(new) + lines
+            continue
+        stripped = [line.strip() for line in old]
+        for start in range(len(lines) - len(old) + 1):
+            if [line.strip() for line in lines[start:start + len(old)]] == stripped:
+                # Einrückung der Fundstelle übernehmen
+                indent = lines[start][:len(lines[start]) - len(lines[start].lstrip())]
+                base = old[0][:len(old[0]) - len(old[0].lstrip())]
+                new = [indent + line[len(base):] if line.startswith(base) else line for line in new]
+                lines[start:start + len(old)] = new
+                break
+        else:
+            return None
+    return "\n".join(lines) + ("\n" if code.endswith("\n") else "")
+
+
+class ErrorIndex:
+    """Persistenter Index erfolgreicher Korrekturen pro Fehler-Fingerabdruck."""
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialisiert den Index.
+
+        Args:
+            path: JSONL-Datei für die Korrekturen (None: nur im Speicher)
+        """
+        self.path = path
+        self.fixes: Dict[Tuple[str, str], str] = {}
+        self.templates: Dict[str, List[Dict[str, Any]]] = {}
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._add(entry)
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        self.fixes[(entry["key"], entry["code_hash"])] = entry["fixed_code"]
+        if entry.get("replacements"):
+            templates = self.templates.setdefault(entry["key"], [])
+            replacements = [(list(old), list(new)) for old, new in entry["replacements"]]
+            for template in templates:
+                if template["replacements"] == replacements:
+                    template["successes"] += 1
+                    break
+            else:
+                templates.append({"replacements": replacements, "successes": 1})
+            templates.sort(key=lambda t: -t["successes"])
+
+    def lookup(self, fp: ErrorFingerprint, code: str) -> Optional[Tuple[str, str]]:
+        """Sucht eine bewährte Korrektur.
+
+        Returns:
+            (korrigierter Code, Quelle "index" oder "template") oder None
+        """
+        with self._lock:
+            fixed = self.fixes.get((fp.key, _code_hash(code)))
+            if fixed is not None:
+                return fixed, "index"
+            for template in self.templates.get(fp.key, []):
+                fixed = apply_template(code, template["replacements"])
+                if fixed is not None and fixed != code:
+                    return fixed, "template"
+        return None
+
+    def record(self, fp: ErrorFingerprint, code: str, fixed_code: str) -> None:
+        """Speichert eine erfolgreiche Korrektur."""
+        template = make_template(code, fixed_code)
+        entry = {
+            "type": "fix",
+            "key": fp.key,
+            "error_type": fp.error_type,
+            "message": fp.message,
+            "code_hash": _code_hash(code),
+            "fixed_code": fixed_code,
+            "replacements": template or [],
+            "time": time.time(),
+        }
+        with self._lock:
+            self._add(entry)
+            if self.path:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def count(self, outcome: str) -> None:
+        """Zählt das Ergebnis einer Fehlerbehandlung ("remedy", "index", "template", "llm", "rejected")."""
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def hit_rate(self) -> Optional[float]:
+        """Anteil der Fehler, die ohne LLM behoben wurden (None ohne Anfragen)."""
+        hits = self.stats["remedy"] + self.stats["index"] + self.stats["template"] - self.stats["rejected"]
+        lookups = hits + self.stats["llm"]
+        return hits / lookups if lookups else None
+
+    def format_stats(self) -> str:
+        rate = self.hit_rate()
+        if rate is None:
+            return "Fehlerindex: keine Anfragen"
+        details = ", ".join(f"{name} {self.stats[name]}" for name in ("remedy", "index", "template", "llm", "rejected"))
+        return f"Fehlerindex: {rate:.0%} der Fehler ohne LLM behoben ({details})"
+
+
+def _code_hash(code: str) -> str:
+    return hashlib.sha256(code.strip().encode("utf-8")).hexdigest()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Evaluation des DevAssistantExtended über einen lokalen Aufgabendatensatz.
+
+Jede Aufgabe enthält eine Beschreibung und Referenztests, z.B.
+
+    {"id": "sum", "task": "Schreibe eine Funktion add(a, b) ...", "language": "python",
+     "tests": "assert add(1, 2) == 3"}
+
+Das Format von HumanEval wird ebenfalls verstanden (prompt, test, entry_point). Der
+Datensatz ist eine JSONL-Datei oder ein mit datasets.save_to_disk gespeichertes
+Verzeichnis.
+
+Die Aufgaben werden auf einen Prozesspool verteilt. Pro Aufgabe erzeugt der
+Assistent ohne Benutzereingaben n Lösungen in einem Aufruf; jede Lösung wird mit den
+Tests in einem eigenen temporären Verzeichnis mit Zeitlimit ausgeführt, zugelassen
+und begrenzt vom ExecutionScheduler (die Worker teilen sich das Budget). Aggregiert
+werden pass@k (unverzerrter Schätzer), Tokens, Wanduhrzeit und die Trefferquote des
+LLM-Caches. Der Bericht ist ein sortiertes JSON-Dokument, das sich zwischen zwei
+Läufen diffen lässt; --compare zeigt geänderte Kennzahlen und Aufgaben direkt an.
+
+Verwendung:
+    python evaluate_dev_assistant.py tasks.jsonl --samples 5 --k 1 5 --workers 4
+    python evaluate_dev_assistant.py tasks.jsonl --output neu.json --compare alt.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from dev_assistant_extended import CodeExecutionAgent, DevAssistantExtended
+from execution_scheduler import (MEMORY_FRACTION, ExecutionScheduler, available_cpus, available_memory_mb,
+                                 get_default_execution_scheduler)
+from profiling import prepare, run_profiled
+from tracing import Tracer
+
+DEFAULT_REPORT_PATH = "eval_report.json"
+
+# Zeitlimit pro Testausführung in Sekunden
+TEST_TIMEOUT = 30
+
+# Kennzahlen, bei denen ein höherer Wert eine Verbesserung bedeutet
+HIGHER_IS_BETTER_PREFIXES = ("pass@", "cache_hit_rate")
+
+# Scheduler eines Worker-Prozesses mit seinem Anteil am Budget (siehe _init_worker)
+_worker_scheduler: Optional[ExecutionScheduler] = None
+
+
+def load_tasks(path: str, split: str = "train", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Lädt den Aufgabendatensatz.
+
+    Args:
+        path: JSONL-Datei oder mit datasets gespeichertes Verzeichnis
+        split: Der Split bei einem DatasetDict
+        limit: Maximale Anzahl Aufgaben
+
+    Returns:
+        Die normalisierten Aufgaben (id, task, language, tests)
+    """
+    if os.path.isdir(path):
+        import datasets
+
+        dataset = datasets.load_from_disk(path)
+        if isinstance(dataset, datasets.DatasetDict):
+            dataset = dataset[split]
+        records = list(dataset)
+    else:
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    tasks = []
+    for index, record in enumerate(records[:limit] if limit else records):
+        tests = record.get("tests") or record.get("test") or ""
+        if record.get("entry_point"):
+            # HumanEval: check() ruft die Einstiegsfunktion auf
+            tests += f"\n\ncheck({record['entry_point']})\n"
+        tasks.append({
+            "id": str(record.get("id") or record.get("task_id") or index),
+            "task": record.get("task") or record.get("prompt") or "",
+            "language": record.get("language", "python"),
+            "tests": tests,
+        })
+    return tasks
+
+
+def pass_at_k(n: int, c: int, k: int) -> float:
+    """Unverzerrter Schätzer für pass@k (Chen et al., 2021).
+
+    Args:
+        n: Anzahl der Lösungen
+        c: Anzahl korrekter Lösungen
+        k: Anzahl der Versuche
+
+    Returns:
+        Die Wahrscheinlichkeit, dass mindestens eine von k Lösungen korrekt ist
+    """
+    if n - c < k:
+        return 1.0
+    return float(1.0 - np.prod(1.0 - k / np.arange(n - c + 1, n + 1)))
+
+
+def run_tests(code: str, tests: str, language: str, timeout: float = TEST_TIMEOUT,
+              scheduler: Optional[ExecutionScheduler] = None) -> Dict[str, Any]:
+    """Führt eine Lösung mit ihren Tests in einem eigenen Verzeichnis aus.
+
+    Die Ausführung wird wie beim CodeExecutionAgent vom ExecutionScheduler zugelassen
+    und mit dem Footprint der Sprache begrenzt (CPU-Zeit, Speicher).
+
+    Args:
+        code: Die generierte Lösung
+        tests: Die Referenztests (werden an die Lösung angehängt)
+        language: Die Programmiersprache
+        timeout: Zeitlimit in Sekunden
+        scheduler: Der ExecutionScheduler (Standard: der des Worker-Prozesses)
+
+    Returns:
+        Ob die Tests bestanden wurden, Laufzeit und gekürzte Fehlerausgabe
+    """
+    with tempfile.TemporaryDirectory(prefix="dev_assistant_eval_") as workdir:
+        command, error = prepare(f"{code}\n\n{tests}\n", language, workdir)
+        if command is None:
+            return {"passed": False, "seconds": 0.0, "error": error[-500:]}
+        # Ohne API-Schlüssel und mit leerem Home, damit Lösungen nichts Fremdes erreichen
+        env = {"PATH": os.environ.get("PATH", ""), "HOME": workdir, "PYTHONDONTWRITEBYTECODE": "1"}
+        scheduler = scheduler or _worker_scheduler or get_default_execution_scheduler()
+        footprints = CodeExecutionAgent.footprints
+        footprint = footprints.get(language.lower(), footprints["python"])
+        with scheduler.admitted(footprint, "batch") as (_, preexec):
+            profile = run_profiled(command, cwd=workdir, timeout=timeout, env=env, preexec_fn=preexec)
+    return {
+        "passed": profile.ok,
+        "seconds": profile.wall_seconds,
+        "error": "" if profile.ok else profile.output[-500:],
+    }
+
+
+def evaluate_task(task: Dict[str, Any], samples: int, model: str, cache_dir: Optional[str]) -> Dict[str, Any]:
+    """Bewertet eine Aufgabe (läuft in einem Worker-Prozess).
+
+    Args:
+        task: Die normalisierte Aufgabe
+        samples: Anzahl der Lösungen
+        model: Das Sprachmodell
+        cache_dir: Verzeichnis des LLM-Caches (Checkpoints) oder None
+
+    Returns:
+        Das Ergebnis der Aufgabe
+    """
+    assistant = DevAssistantExtended(
+        api_key=os.environ.get("OPENAI_API_KEY") or None,
+        priority="batch",
+        checkpoint_dir=cache_dir,
+        answer_fn=lambda prompt: "n",
+    )
+    checkpoint = assistant.use_checkpoint(task["task"])
+    tracer = Tracer(name=task["id"])
+
+    start = time.perf_counter()
+    try:
+        with tracer.activate(), contextlib.redirect_stdout(io.StringIO()):
+            solutions = assistant.generate_samples(task["task"], samples, model, task["language"])
+        error = ""
+    except Exception as e:
+        solutions, error = [], str(e)
+    generation_seconds = time.perf_counter() - start
+
+    results = [run_tests(code, task["tests"], task["language"]) for code in solutions]
+    llm_spans = [s for s in tracer.spans if s.category == "llm"]
+    return {
+        "id": task["id"],
+        "samples": len(solutions),
+        "passed": sum(1 for r in results if r["passed"]),
+        "generation_seconds": generation_seconds,
+        "test_seconds": sum(r["seconds"] for r in results),
+        "tokens": sum(s.attributes.get("total_tokens") or 0 for s in llm_spans),
+        "llm_calls": len(llm_spans),
+        "cache_hits": checkpoint.hits if checkpoint else 0,
+        "cache_misses": checkpoint.misses if checkpoint else 0,
+        "error": error or next((r["error"] for r in results if not r["passed"]), ""),
+    }
+
+
+def _init_worker(base_url: Optional[str], workers: int = 1) -> None:
+    """Richtet einen Worker-Prozess ein.
+
+    Die LLM-Aufrufe gehen an einen OpenAI-kompatiblen Server; Testläufe teilen sich das
+    CPU- und Speicherbudget der Maschine mit den übrigen Worker-Prozessen.
+
+    Args:
+        base_url: OpenAI-kompatibler Endpunkt oder None
+        workers: Anzahl der Worker-Prozesse
+    """
+    global _worker_scheduler
+    if workers > 1:
+        _worker_scheduler = ExecutionScheduler(
+            cpus=max(available_cpus() / workers, 1.0),
+            memory_mb=int(available_memory_mb() * MEMORY_FRACTION / workers),
+        )
+    if base_url:
+        import openai
+
+        client = openai.OpenAI(base_url=base_url, api_key=os.environ.get("OPENAI_API_KEY") or "eval")
+        openai.ChatCompletion.create = client.chat.completions.create
+
+
+def run_evaluation(tasks: List[Dict[str, Any]], samples: int = 1, ks: Sequence[int] = (1,),
+                   workers: int = 4, model: str = "gpt-4", cache_dir: Optional[str] = None,
+                   base_url: Optional[str] = None) -> Dict[str, Any]:
+    """Bewertet alle Aufgaben und aggregiert die Kennzahlen.
+
+    Args:
+        tasks: Die Aufgaben aus load_tasks()
+        samples: Lösungen pro Aufgabe (n)
+        ks: Die k-Werte für pass@k (k <= n)
+        workers: Anzahl der Worker-Prozesse (0: im aktuellen Prozess)
+        model: Das Sprachmodell
+        cache_dir: Verzeichnis des LLM-Caches oder None
+        base_url: OpenAI-kompatibler Endpunkt für die Worker
+
+    Returns:
+        Der Bericht mit Konfiguration, Kennzahlen und Ergebnissen pro Aufgabe
+    """
+    ks = sorted(k for k in set(ks) if k <= samples)
+    start = time.perf_counter()
+    if workers:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(base_url, workers)) as pool:
+            futures = [pool.submit(evaluate_task, task, samples, model, cache_dir) for task in tasks]
+            results = [future.result() for future in futures]
+    else:
+        _init_worker(base_url)
+        results = [evaluate_task(task, samples, model, cache_dir) for task in tasks]
+    wall = time.perf_counter() - start
+
+    results.sort(key=lambda r: r["id"])
+    n = np.array([r["samples"] for r in results])
+    c = np.array([r["passed"] for r in results])
+    generation = np.array([r["generation_seconds"] for r in results])
+    tokens = np.array([r["tokens"] for r in results])
+    hits = sum(r["cache_hits"] for r in results)
+    lookups = hits + sum(r["cache_misses"] for r in results)
+
+    metrics: Dict[str, Any] = {}
+    for k in ks:
+        # Aufgaben ohne Lösung (z.B. Fehler beim Aufruf) zählen als nicht bestanden
+        scores = [pass_at_k(int(ni), int(ci), k) if ni >= k else 0.0 for ni, ci in zip(n, c)]
+        metrics[f"pass@{k}"] = float(np.mean(scores)) if scores else 0.0
+    metrics.update({
+        "tasks": len(results),
+        "tokens_total": int(tokens.sum()),
+        "tokens_per_task": float(tokens.mean()) if len(tokens) else 0.0,
+        "generation_seconds_p50": float(np.percentile(generation, 50)) if len(generation) else 0.0,
+        "generation_seconds_p95": float(np.percentile(generation, 95)) if len(generation) else 0.0,
+        "wall_seconds": wall,
+        "cache_hit_rate": hits / lookups if lookups else None,
+    })
+    return {
+        "config": {"samples": samples, "k": ks, "model": model, "workers": workers},
+        "metrics": {key: round(value, 4) if isinstance(value, float) else value for key, value in metrics.items()},
+        "tasks": {r["id"]: {key: round(v, 3) if isinstance(v, float) else v for key, v in r.items() if key != "id"}
+                  for r in results},
+    }
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    """Schreibt den Bericht stabil sortiert, damit er sich zwischen Läufen diffen lässt."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+
+
+def compare_reports(current: Dict[str, Any], previous: Dict[str, Any]) -> List[str]:
+    """Vergleicht zwei Berichte.
+
+    Returns:
+        Geänderte Kennzahlen sowie neu bestandene und neu fehlgeschlagene Aufgaben
+    """
+    lines = []
+    for key, value in sorted(current["metrics"].items()):
+        old = previous.get("metrics", {}).get(key)
+        if isinstance(value, (int, float)) and isinstance(old, (int, float)) and value != old:
+            better = value > old if key.startswith(HIGHER_IS_BETTER_PREFIXES) else value < old
+            lines.append(f"{key}: {old} -> {value} ({'besser' if better else 'schlechter'})")
+
+    old_tasks = previous.get("tasks", {})
+    for task_id, result in sorted(current["tasks"].items()):
+        old = old_tasks.get(task_id)
+        if old is None:
+            continue
+        if result["passed"] and not old["passed"]:
+            lines.append(f"Aufgabe {task_id}: jetzt bestanden ({old['passed']} -> {result['passed']})")
+        elif old["passed"] and not result["passed"]:
+            lines.append(f"Aufgabe {task_id}: jetzt fehlgeschlagen ({old['passed']} -> {result['passed']})")
+    return lines
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Formatiert die Kennzahlen für die Konsole."""
+    metrics = report["metrics"]
+    lines = [f"Evaluation ({metrics['tasks']} Aufgaben, {report['config']['samples']} Lösung(en) pro Aufgabe)"]
+    for key in sorted(k for k in metrics if k.startswith("pass@")):
+        lines.append(f"  {key + ':':<22}{metrics[key]:.3f}")
+    lines += [
+        f"  Tokens/Aufgabe:       {metrics['tokens_per_task']:.0f}",
+        f"  Generierung p50/p95:  {metrics['generation_seconds_p50']:.2f}s / {metrics['generation_seconds_p95']:.2f}s",
+        f"  Gesamtdauer:          {metrics['wall_seconds']:.2f}s",
+    ]
+    if metrics["cache_hit_rate"] is not None:
+        lines.append(f"  Cache-Trefferquote:   {metrics['cache_hit_rate']:.0%}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluation für DevAssistantExtended")
+    parser.add_argument("dataset", help="JSONL-Datei oder datasets-Verzeichnis")
+    parser.add_argument("--split", default="train")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--samples", type=int, default=1)
+    parser.add_argument("--k", type=int, nargs="+", default=[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model", default="gpt-4")
+    parser.add_argument("--cache-dir", help="LLM-Antworten zwischen Läufen wiederverwenden")
+    parser.add_argument("--base-url", help="OpenAI-kompatibler Endpunkt")
+    parser.add_argument("--output", default=DEFAULT_REPORT_PATH)
+    parser.add_argument("--compare", help="Früherer Bericht zum Vergleich")
+    args = parser.parse_args(argv)
+
+    tasks = load_tasks(args.dataset, args.split, args.limit)
+    report = run_evaluation(tasks, args.samples, args.k, args.workers, args.model, args.cache_dir, args.base_url)
+    print(format_report(report))
+    write_report(report, args.output)
+    print(f"Bericht gespeichert: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        changes = compare_reports(report, previous)
+        print(f"Vergleich mit {args.compare}:")
+        print("\n".join(f"  {line}" for line in changes) if changes else "  Keine Änderungen.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,392 @@
+"""
+Zulassungssteuerung für Code-Ausführungen.
+
+Laufen viele Aufgaben parallel (Service, Worker, Evaluation), startet jede Ausführung
+sofort einen eigenen Prozess. Ein entgleistes Skript oder mehrere JVMs gleichzeitig
+bringen den Rechner dann zum Auslagern. Der ExecutionScheduler kennt die CPUs und den
+Arbeitsspeicher der Maschine (bzw. des Containers) und lässt Läufe nur zu, solange ihr
+angemeldeter Bedarf (Footprint) ins Budget passt; die übrigen warten in einer
+Prioritätswarteschlange (interaktiv vor Batch, sonst in Ankunftsreihenfolge).
+
+Damit ein Lauf seinen Footprint nicht überschreitet, werden pro Lauf Grenzen gesetzt:
+- cgroup v2, wenn ein delegiertes Verzeichnis angegeben ist (memory.max, cpu.max,
+  pids.max in einer eigenen Untergruppe pro Lauf),
+- sonst Ressourcenlimits (RLIMIT_AS für den Adressraum, RLIMIT_CPU für die CPU-Zeit).
+
+Kleine Läufe dürfen einen wartenden großen Lauf überholen, wenn nur sie noch
+hineinpassen - höchstens max_overtakes-mal, damit der große Lauf nicht verhungert.
+stats() liefert Auslastung (zeitgewichtet) und Wartezeiten.
+"""
+
+import contextlib
+import heapq
+import itertools
+import os
+import signal
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from llm_scheduler import PRIORITIES
+from tracing import span, traced_run
+
+try:
+    import resource
+except ImportError:  # Windows: keine Ressourcenlimits
+    resource = None
+
+# Anteil des Arbeitsspeichers, der für Ausführungen verplant wird
+MEMORY_FRACTION = 0.8
+
+# So oft darf ein wartender Lauf von kleineren Läufen überholt werden
+MAX_OVERTAKES = 8
+
+# Anzahl der Wartezeiten, über die Perzentile berechnet werden
+WAIT_SAMPLES = 1000
+
+CGROUP_PERIOD_US = 100000
+
+
+class Footprint:
+    """Erwarteter Ressourcenbedarf eines Laufs."""
+
+    def __init__(self, cpus: float = 1.0, memory_mb: int = 512, cpu_seconds: Optional[int] = 300,
+                 address_space: bool = True, pids: int = 256):
+        """Initialisiert den Footprint.
+
+        Args:
+            cpus: Anzahl CPUs, die der Lauf voraussichtlich auslastet
+            memory_mb: Arbeitsspeicher in MiB (wird als Grenze gesetzt)
+            cpu_seconds: Höchstens verbrauchte CPU-Zeit (None: unbegrenzt)
+            address_space: Den Speicher ohne cgroup über RLIMIT_AS begrenzen; für
+                Laufzeitumgebungen, die großen Adressraum reservieren (JVM, Julia), aus
+            pids: Höchstzahl Prozesse/Threads (nur mit cgroup)
+        """
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.address_space = address_space
+        self.pids = pids
+
+    def __repr__(self) -> str:
+        return f"Footprint(cpus={self.cpus}, memory_mb={self.memory_mb})"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def available_cpus() -> float:
+    """CPUs, die dieser Prozess nutzen darf (Affinität und cgroup-Kontingent)."""
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        cpus = float(os.cpu_count() or 1)
+    quota = (_read("/sys/fs/cgroup/cpu.max") or "max").split()
+    if quota and quota[0] != "max":
+        cpus = min(cpus, int(quota[0]) / int(quota[1]))
+    return max(cpus, 1.0)
+
+
+def available_memory_mb() -> int:
+    """Arbeitsspeicher der Maschine bzw. des Containers in MiB."""
+    total = None
+    meminfo = _read("/proc/meminfo")
+    if meminfo:
+        for line in meminfo.splitlines():
+            if line.startswith("MemTotal:"):
+                total = int(line.split()[1]) // 1024
+    if total is None:
+        try:
+            total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+        except (AttributeError, ValueError, OSError):
+            total = 4096
+    limit = _read("/sys/fs/cgroup/memory.max")
+    if limit and limit.isdigit():
+        total = min(total, int(limit) // (1024 * 1024))
+    return total
+
+
+class _Waiter:
+    def __init__(self, priority: int, sequence: int, cpus: float, memory_mb: int):
+        self.key = (priority, sequence)
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self.overtaken = 0
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.key < other.key
+
+
+class ExecutionScheduler:
+    """Lässt Code-Ausführungen nur innerhalb des CPU- und Speicherbudgets zu."""
+
+    def __init__(self, cpus: Optional[float] = None, memory_mb: Optional[int] = None,
+                 limits: str = "auto", cgroup_root: Optional[str] = None,
+                 max_overtakes: int = MAX_OVERTAKES, clock: Callable[[], float] = time.monotonic):
+        """Initialisiert den Scheduler.
+
+        Args:
+            cpus: CPU-Budget (Standard: verfügbare CPUs)
+            memory_mb: Speicherbudget in MiB (Standard: MEMORY_FRACTION des Arbeitsspeichers)
+            limits: "auto", "cgroup", "rlimit" oder "none"
+            cgroup_root: Delegiertes cgroup-v2-Verzeichnis für Untergruppen pro Lauf
+                (Standard: Umgebungsvariable DEV_ASSISTANT_CGROUP)
+            max_overtakes: Wie oft ein wartender Lauf überholt werden darf
+            clock: Zeitquelle (für Tests austauschbar)
+        """
+        self.cpus = cpus if cpus is not None else available_cpus()
+        self.memory_mb = memory_mb if memory_mb is not None else int(available_memory_mb() * MEMORY_FRACTION)
+        self.cgroup_root = cgroup_root or os.environ.get("DEV_ASSISTANT_CGROUP")
+        self.limits = self._choose_limits(limits)
+        self.max_overtakes = max_overtakes
+        self.clock = clock
+
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._waiters: List[_Waiter] = []
+        self.cpus_in_use = 0.0
+        self.memory_in_use = 0
+        self.running = 0
+        self._started = clock()
+        self._last_change = self._started
+        self._cpu_busy = 0.0
+        self._memory_busy = 0.0
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.counters = {"admitted": 0, "overtakes": 0, "limit_kills": 0}
+
+    def _choose_limits(self, limits: str) -> str:
+        if limits == "auto":
+            if self.cgroup_root and self._prepare_cgroup_root():
+                return "cgroup"
+            return "rlimit" if resource is not None else "none"
+        if limits == "cgroup" and not (self.cgroup_root and self._prepare_cgroup_root()):
+            raise ValueError("cgroup-Limits brauchen ein delegiertes cgroup-v2-Verzeichnis (cgroup_root)")
+        if limits == "rlimit" and resource is None:
+            raise ValueError("Ressourcenlimits sind auf dieser Plattform nicht verfügbar")
+        return limits
+
+    def _prepare_cgroup_root(self) -> bool:
+        """Aktiviert cpu, memory und pids für Untergruppen; False, wenn das nicht geht."""
+        controllers = (_read(os.path.join(self.cgroup_root, "cgroup.controllers")) or "").split()
+        if not {"cpu", "memory", "pids"} <= set(controllers):
+            return False
+        try:
+            with open(os.path.join(self.cgroup_root, "cgroup.subtree_control"), "w") as f:
+                f.write("+cpu +memory +pids")
+        except OSError:
+            enabled = (_read(os.path.join(self.cgroup_root, "cgroup.subtree_control")) or "").split()
+            return {"cpu", "memory", "pids"} <= set(enabled)
+        return True
+
+    def _account(self) -> None:
+        # Zeitgewichtete Auslastung: belegte Ressourcen mal Dauer seit der letzten Änderung
+        now = self.clock()
+        self._cpu_busy += self.cpus_in_use * (now - self._last_change)
+        self._memory_busy += self.memory_in_use * (now - self._last_change)
+        self._last_change = now
+
+    def _fits(self, waiter: _Waiter) -> bool:
+        return (self.cpus_in_use + waiter.cpus <= self.cpus + 1e-9
+                and self.memory_in_use + waiter.memory_mb <= self.memory_mb)
+
+    def _admissible(self, ticket: _Waiter) -> bool:
+        """Ob ticket jetzt starten darf; vorher wartende Läufe werden ggf. als überholt gezählt."""
+        if not self._fits(ticket):
+            return False
+        ahead = [waiter for waiter in self._waiters if waiter < ticket]
+        # Überholt werden nur Läufe, die gerade nicht passen, und auch die nur begrenzt oft
+        if any(self._fits(waiter) or waiter.overtaken >= self.max_overtakes for waiter in ahead):
+            return False
+        for waiter in ahead:
+            waiter.overtaken += 1
+        self.counters["overtakes"] += len(ahead)
+        return True
+
+    @contextlib.contextmanager
+    def slot(self, footprint: Footprint, priority: str = "interactive") -> Iterator[float]:
+        """Wartet, bis der Footprint ins Budget passt, und belegt ihn bis zum Ende des Blocks.
+
+        Ein Footprint, der größer als das gesamte Budget ist, wird auf das Budget
+        gekürzt und läuft dann allein.
+
+        Args:
+            footprint: Der angemeldete Bedarf
+            priority: "interactive" oder "batch"
+
+        Returns:
+            Die Wartezeit in Sekunden (als Wert des Kontextmanagers)
+        """
+        ticket = _Waiter(PRIORITIES.get(priority, 1), next(self._sequence),
+                         min(footprint.cpus, self.cpus), min(footprint.memory_mb, self.memory_mb))
+        start = self.clock()
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while not self._admissible(ticket):
+                    self._condition.wait()
+            except BaseException:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+                raise
+            self._waiters.remove(ticket)
+            heapq.heapify(self._waiters)
+            self._account()
+            self.cpus_in_use += ticket.cpus
+            self.memory_in_use += ticket.memory_mb
+            self.running += 1
+            self.counters["admitted"] += 1
+            waited = self.clock() - start
+            self._waits.append(waited)
+        try:
+            yield waited
+        finally:
+            with self._condition:
+                self._account()
+                self.cpus_in_use -= ticket.cpus
+                self.memory_in_use -= ticket.memory_mb
+                self.running -= 1
+                self._condition.notify_all()
+
+    def _rlimit_preexec(self, footprint: Footprint) -> Callable[[], None]:
+        limits = []
+        if footprint.address_space:
+            size = footprint.memory_mb * 1024 * 1024
+            limits.append((resource.RLIMIT_AS, (size, size)))
+        if footprint.cpu_seconds:
+            # Weiche Grenze sendet SIGXCPU, die harte eine Sekunde später SIGKILL
+            limits.append((resource.RLIMIT_CPU, (footprint.cpu_seconds, footprint.cpu_seconds + 1)))
+
+        def preexec() -> None:
+            # Läuft im Kindprozess vor exec: nur Systemaufrufe, keine Sperren
+            for kind, value in limits:
+                resource.setrlimit(kind, value)
+
+        return preexec
+
+    @contextlib.contextmanager
+    def _cgroup(self, footprint: Footprint) -> Iterator[Callable[[], None]]:
+        path = os.path.join(self.cgroup_root, f"job-{os.getpid()}-{next(self._sequence)}")
+        os.mkdir(path)
+        try:
+            settings = {
+                "memory.max": str(footprint.memory_mb * 1024 * 1024),
+                "memory.swap.max": "0",
+                "cpu.max": f"{max(int(footprint.cpus * CGROUP_PERIOD_US), 1000)} {CGROUP_PERIOD_US}",
+                "pids.max": str(footprint.pids),
+            }
+            for name, value in settings.items():
+                with contextlib.suppress(FileNotFoundError):
+                    with open(os.path.join(path, name), "w") as f:
+                        f.write(value)
+            procs = os.open(os.path.join(path, "cgroup.procs"), os.O_WRONLY)
+            rlimits = self._rlimit_preexec(Footprint(footprint.cpus, footprint.memory_mb, footprint.cpu_seconds,
+                                                     address_space=False)) if resource else None
+
+            def preexec() -> None:
+                # "0" verschiebt den schreibenden Prozess, also das Kind vor exec
+                os.write(procs, b"0")
+                if rlimits is not None:
+                    rlimits()
+
+            try:
+                yield preexec
+            finally:
+                os.close(procs)
+        finally:
+            with contextlib.suppress(OSError):
+                os.rmdir(path)
+
+    @contextlib.contextmanager
+    def _limited(self, footprint: Footprint) -> Iterator[Optional[Callable[[], None]]]:
+        if self.limits == "cgroup":
+            with self._cgroup(footprint) as preexec:
+                yield preexec
+        elif self.limits == "rlimit":
+            yield self._rlimit_preexec(footprint)
+        else:
+            yield None
+
+    @contextlib.contextmanager
+    def admitted(self, footprint: Footprint, priority: str = "interactive") -> Iterator[Tuple[float, Optional[Callable[[], None]]]]:
+        """Belegt einen Slot und liefert die Grenzen für Prozesse, die nicht über run() starten.
+
+        Args:
+            footprint: Der angemeldete Bedarf
+            priority: "interactive" oder "batch"
+
+        Returns:
+            Kontextmanager mit (Wartezeit in Sekunden, preexec_fn für Popen oder None)
+        """
+        with self.slot(footprint, priority) as waited, self._limited(footprint) as preexec:
+            yield waited, preexec
+
+    def run(self, command: List[str], footprint: Footprint, priority: str = "interactive", **kwargs) -> Any:
+        """Führt einen Befehl aus, sobald sein Footprint zugelassen ist, mit Grenzen pro Lauf.
+
+        Args:
+            command: Der Befehl wie bei subprocess.run
+            footprint: Der angemeldete Bedarf
+            priority: "interactive" oder "batch"
+            **kwargs: Weitere Argumente für subprocess.run
+
+        Returns:
+            Das Ergebnis von subprocess.run; bei Abbruch durch ein Limit mit Hinweis in stderr
+        """
+        with span("execution", "execute", command=os.path.basename(str(command[0])), cpus=footprint.cpus,
+                  memory_mb=footprint.memory_mb, priority=priority) as active:
+            with self.admitted(footprint, priority) as (waited, preexec):
+                active.set(queued_seconds=round(waited, 4), limits=self.limits)
+                if preexec is not None:
+                    kwargs["preexec_fn"] = preexec
+                result = traced_run(command, **kwargs)
+
+        killed = result.returncode in (-signal.SIGKILL, -getattr(signal, "SIGXCPU", signal.SIGKILL))
+        if killed and self.limits != "none":
+            with self._condition:
+                self.counters["limit_kills"] += 1
+            note = (f"\nAbgebrochen: Ressourcenlimit überschritten (Signal {-result.returncode}; "
+                    f"{footprint.memory_mb} MiB, {footprint.cpu_seconds} s CPU)")
+            if isinstance(result.stderr, str):
+                result.stderr += note
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Budget, Belegung, zeitgewichtete Auslastung und Wartezeiten."""
+        with self._condition:
+            self._account()
+            elapsed = max(self._last_change - self._started, 1e-9)
+            waits = sorted(self._waits)
+            return {
+                "limits": self.limits,
+                "cpus": self.cpus,
+                "memory_mb": self.memory_mb,
+                "running": self.running,
+                "queued": len(self._waiters),
+                "cpus_in_use": self.cpus_in_use,
+                "memory_in_use_mb": self.memory_in_use,
+                "cpu_utilization": self._cpu_busy / (self.cpus * elapsed),
+                "memory_utilization": self._memory_busy / (self.memory_mb * elapsed),
+                "queue_wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                "queue_wait_p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                **self.counters,
+            }
+
+
+_default_scheduler: Optional[ExecutionScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_default_execution_scheduler() -> ExecutionScheduler:
+    """Gibt den prozessweit geteilten Scheduler zurück."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = ExecutionScheduler()
+        return _default_scheduler
@@ -0,0 +1,401 @@
+"""
+Parametrisierte Infrastruktur-Vorlagen für den Deployment-Schritt.
+
+Die meisten Infrastruktur-Anfragen sind Varianten weniger Muster: eine EC2-Instanz,
+ein S3-Bucket, ein VPC mit Subnetzen, ein ECS-Service. Für diese Muster muss kein
+Sprachmodell gefragt werden. classify_intent() ordnet eine Aufgabe anhand gewichteter
+Schlüsselwörter den passenden Vorlagen zu, extract_parameters() liest Region,
+Instanztyp, Anzahl, Namen usw. aus dem Text und render_templates() erzeugt daraus
+Ressourcen-Definitionen im Format von CloudAgent.create_terraform_config.
+
+find_gaps() meldet Anforderungen, die keine Vorlage abdeckt (z.B. eine Datenbank);
+nur dafür wird das Modell noch aufgerufen.
+
+Ressourcen-Definitionen sind Dictionaries mit "type", "name", "attributes" und
+optional "kind" ("resource" oder "data") sowie "blocks" (verschachtelte Blöcke mit
+"type" und "attributes"). Zeichenketten der Form "${...}" werden als
+Terraform-Ausdruck ohne Anführungszeichen ausgegeben.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_REGION = "us-east-1"
+
+# Mindestpunktzahl, ab der eine Vorlage als erkannt gilt
+MIN_INTENT_SCORE = 2
+
+# Parameter: Name -> (Regex mit einer Gruppe, Standardwert, Umwandlung)
+Parameter = Tuple[str, Any, Callable[[str], Any]]
+
+_NAME_PATTERN = r"(?:namens|names|named|called|mit dem namen)\s+[\"'`]?([A-Za-z0-9][\w.-]*)"
+
+COMMON_PARAMETERS: Dict[str, Parameter] = {
+    "region": (r"\b((?:us|eu|ap|sa|ca|me|af)-[a-z]+-\d)\b", DEFAULT_REGION, str),
+    "name": (_NAME_PATTERN, "app", str),
+    "count": (r"\b(\d+)\s+(?:ec2-)?(?:instanzen|instances|server|vms|tasks|replikate|replicas|container)\b", 1, int),
+}
+
+# Anforderungen, für die es (noch) keine Vorlage gibt
+GAP_HINTS = {
+    "Datenbank (RDS)": r"\brds\b|datenbank|database|postgres|mysql|aurora",
+    "Load Balancer": r"load.?balancer|\balb\b|\belb\b",
+    "Lambda-Funktion": r"\blambda\b",
+    "DynamoDB-Tabelle": r"dynamo",
+    "CDN (CloudFront)": r"cloudfront|\bcdn\b",
+    "Nachrichten (SQS/SNS)": r"\bsqs\b|\bsns\b|warteschlange|queue",
+    "DNS (Route 53)": r"route\s?53|\bdns\b|\bdomain",
+    "Kubernetes (EKS)": r"\beks\b|kubernetes",
+}
+
+
+def ref(expression: str) -> str:
+    """Kennzeichnet einen Terraform-Ausdruck (Referenz, Funktionsaufruf)."""
+    return "${" + expression + "}"
+
+
+def identifier(name: str) -> str:
+    """Macht aus einem Namen einen gültigen Terraform-Bezeichner."""
+    cleaned = re.sub(r"\W", "_", name).strip("_").lower() or "main"
+    return cleaned if not cleaned[0].isdigit() else f"r_{cleaned}"
+
+
+def _tags(params: Dict[str, Any]) -> Dict[str, str]:
+    return {"Name": params["name"]}
+
+
+def _ec2(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    name = identifier(params["name"])
+    attributes: Dict[str, Any] = {
+        "ami": ref("data.aws_ami.default.id"),
+        "instance_type": params["instance_type"],
+        "tags": _tags(params),
+    }
+    if params["count"] > 1:
+        attributes["count"] = params["count"]
+    if "vpc" in params["templates"]:
+        attributes["subnet_id"] = ref("aws_subnet.public[0].id")
+    return [
+        {
+            "kind": "data",
+            "type": "aws_ami",
+            "name": "default",
+            "attributes": {"most_recent": True, "owners": ["amazon"]},
+            "blocks": [{"type": "filter", "attributes": {"name": "name", "values": ["al2023-ami-*-x86_64"]}}],
+        },
+        {"type": "aws_instance", "name": name, "attributes": attributes},
+    ]
+
+
+def _s3(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    name = identifier(params["name"])
+    bucket: Dict[str, Any] = {"tags": _tags(params)}
+    if params["bucket"]:
+        bucket["bucket"] = params["bucket"]
+    else:
+        # Bucket-Namen sind global eindeutig; ohne Vorgabe erzeugt Terraform einen Suffix
+        bucket["bucket_prefix"] = f"{params['name'].lower()}-"
+    resources = [
+        {"type": "aws_s3_bucket", "name": name, "attributes": bucket},
+        {
+            "type": "aws_s3_bucket_public_access_block",
+            "name": name,
+            "attributes": {
+                "bucket": ref(f"aws_s3_bucket.{name}.id"),
+                "block_public_acls": True,
+                "block_public_policy": True,
+                "ignore_public_acls": True,
+                "restrict_public_buckets": True,
+            },
+        },
+    ]
+    if params["versioning"]:
+        resources.append({
+            "type": "aws_s3_bucket_versioning",
+            "name": name,
+            "attributes": {"bucket": ref(f"aws_s3_bucket.{name}.id")},
+            "blocks": [{"type": "versioning_configuration", "attributes": {"status": "Enabled"}}],
+        })
+    return resources
+
+
+def _vpc(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "kind": "data",
+            "type": "aws_availability_zones",
+            "name": "available",
+            "attributes": {"state": "available"},
+        },
+        {
+            "type": "aws_vpc",
+            "name": "main",
+            "attributes": {
+                "cidr_block": params["cidr"],
+                "enable_dns_hostnames": True,
+                "tags": _tags(params),
+            },
+        },
+        {
+            "type": "aws_subnet",
+            "name": "public",
+            "attributes": {
+                "count": params["subnets"],
+                "vpc_id": ref("aws_vpc.main.id"),
+                "cidr_block": ref("cidrsubnet(aws_vpc.main.cidr_block, 8, count.index)"),
+                "availability_zone": ref("data.aws_availability_zones.available.names[count.index]"),
+                "map_public_ip_on_launch": True,
+            },
+        },
+        {"type": "aws_internet_gateway", "name": "main", "attributes": {"vpc_id": ref("aws_vpc.main.id")}},
+        {
+            "type": "aws_route_table",
+            "name": "public",
+            "attributes": {"vpc_id": ref("aws_vpc.main.id")},
+            "blocks": [{"type": "route", "attributes": {
+                "cidr_block": "0.0.0.0/0",
+                "gateway_id": ref("aws_internet_gateway.main.id"),
+            }}],
+        },
+        {
+            "type": "aws_route_table_association",
+            "name": "public",
+            "attributes": {
+                "count": params["subnets"],
+                "subnet_id": ref("aws_subnet.public[count.index].id"),
+                "route_table_id": ref("aws_route_table.public.id"),
+            },
+        },
+    ]
+
+
+def _ecs(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    name = identifier(params["name"])
+    container = {
+        "name": params["name"],
+        "image": params["image"],
+        "essential": True,
+        "portMappings": [{"containerPort": params["port"], "protocol": "tcp"}],
+    }
+    return [
+        {"type": "aws_ecs_cluster", "name": name, "attributes": {"name": params["name"]}},
+        {
+            "type": "aws_ecs_task_definition",
+            "name": name,
+            "attributes": {
+                "family": params["name"],
+                "network_mode": "awsvpc",
+                "requires_compatibilities": ["FARGATE"],
+                "cpu": str(params["cpu"]),
+                "memory": str(params["memory"]),
+                "container_definitions": json.dumps([container]),
+            },
+        },
+        {
+            "type": "aws_security_group",
+            "name": name,
+            "attributes": {"vpc_id": ref("aws_vpc.main.id")},
+            "blocks": [
+                {"type": "ingress", "attributes": {
+                    "from_port": params["port"], "to_port": params["port"],
+                    "protocol": "tcp", "cidr_blocks": ["0.0.0.0/0"],
+                }},
+                {"type": "egress", "attributes": {
+                    "from_port": 0, "to_port": 0, "protocol": "-1", "cidr_blocks": ["0.0.0.0/0"],
+                }},
+            ],
+        },
+        {
+            "type": "aws_ecs_service",
+            "name": name,
+            "attributes": {
+                "name": params["name"],
+                "cluster": ref(f"aws_ecs_cluster.{name}.id"),
+                "task_definition": ref(f"aws_ecs_task_definition.{name}.arn"),
+                "desired_count": params["count"],
+                "launch_type": "FARGATE",
+            },
+            "blocks": [{"type": "network_configuration", "attributes": {
+                "subnets": ref("aws_subnet.public[*].id"),
+                "security_groups": [ref(f"aws_security_group.{name}.id")],
+                "assign_public_ip": True,
+            }}],
+        },
+    ]
+
+
+class InfraTemplate:
+    """Eine parametrisierte Vorlage für ein Infrastruktur-Muster."""
+
+    def __init__(self, name: str, description: str, keywords: Dict[str, int],
+                 parameters: Dict[str, Parameter], build: Callable[[Dict[str, Any]], List[Dict[str, Any]]],
+                 requires: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.keywords = keywords
+        self.parameters = parameters
+        self.build = build
+        self.requires = requires
+
+    def score(self, text: str) -> int:
+        """Summiert die Gewichte der Schlüsselwörter, die im (kleingeschriebenen) Text vorkommen."""
+        return sum(weight for pattern, weight in self.keywords.items() if re.search(pattern, text))
+
+
+TEMPLATES: Dict[str, InfraTemplate] = {
+    template.name: template for template in (
+        InfraTemplate(
+            "vpc", "VPC mit öffentlichen Subnetzen, Internet-Gateway und Routing",
+            {r"\bvpc\b": 2, r"subnet": 2, r"netzwerk|network": 1},
+            {
+                "cidr": (r"\b(\d{1,3}(?:\.\d{1,3}){3}/\d{1,2})\b", "10.0.0.0/16", str),
+                "subnets": (r"\b(\d+)\s+(?:öffentliche\s+|public\s+)?subnet", 2, int),
+            },
+            _vpc,
+        ),
+        InfraTemplate(
+            "ec2", "EC2-Instanz(en) mit aktuellem Amazon-Linux-AMI",
+            {r"\bec2\b": 2, r"virtuelle[nr]? maschine|virtual machine|\bvms?\b": 2,
+             r"instanz|instance": 1, r"\bserver\b": 1},
+            {"instance_type": (r"\b([a-z]\d[a-z]*\.(?:nano|micro|small|medium|large|\d*xlarge))\b", "t3.micro", str)},
+            _ec2,
+        ),
+        InfraTemplate(
+            "s3", "S3-Bucket ohne öffentlichen Zugriff, optional versioniert",
+            {r"\bs3\b": 2, r"bucket": 2, r"object storage|objektspeicher": 1},
+            {
+                "bucket": (r"bucket\s+(?:namens\s+|named\s+|called\s+)?[\"'`]([a-z0-9][a-z0-9.-]{2,62})[\"'`]", None, str),
+                "versioning": (r"(versionier|versioning)", False, bool),
+            },
+            _s3,
+        ),
+        InfraTemplate(
+            "ecs", "ECS-Service auf Fargate mit Security Group",
+            {r"\becs\b": 2, r"fargate": 2, r"container": 1, r"docker": 1},
+            {
+                "image": (r"(?:image|abbild)\s+[\"'`]?([\w.\-/]+(?::[\w.-]+)?)", "nginx:latest", str),
+                "port": (r"\bport\s+(\d+)", 80, int),
+                "cpu": (r"\bcpu\s+(\d+)", 256, int),
+                "memory": (r"(?:memory|speicher)\s+(\d+)", 512, int),
+            },
+            _ecs,
+            requires=("vpc",),
+        ),
+    )
+}
+
+
+def classify_intent(task: str) -> List[str]:
+    """Ordnet eine Aufgabe den passenden Vorlagen zu.
+
+    Args:
+        task: Die Aufgabenbeschreibung
+
+    Returns:
+        Die Namen der erkannten Vorlagen samt Abhängigkeiten in Render-Reihenfolge
+        (leer, wenn keine Vorlage passt)
+    """
+    text = task.lower()
+    matched = {name for name, template in TEMPLATES.items() if template.score(text) >= MIN_INTENT_SCORE}
+    for name in list(matched):
+        matched.update(TEMPLATES[name].requires)
+    return [name for name in TEMPLATES if name in matched]
+
+
+def extract_parameters(task: str, templates: List[str]) -> Dict[str, Any]:
+    """Liest die Parameter der Vorlagen aus der Aufgabenbeschreibung.
+
+    Args:
+        task: Die Aufgabenbeschreibung
+        templates: Die Vorlagen aus classify_intent()
+
+    Returns:
+        Die Parameter (nicht genannte Werte erhalten ihren Standardwert)
+    """
+    parameters = dict(COMMON_PARAMETERS)
+    for name in templates:
+        parameters.update(TEMPLATES[name].parameters)
+
+    values: Dict[str, Any] = {"templates": list(templates)}
+    for key, (pattern, default, convert) in parameters.items():
+        match = re.search(pattern, task, re.IGNORECASE)
+        values[key] = convert(match.group(1)) if match else default
+    return values
+
+
+def find_gaps(task: str) -> List[str]:
+    """Meldet Anforderungen der Aufgabe, die keine Vorlage abdeckt."""
+    text = task.lower()
+    return [label for label, pattern in GAP_HINTS.items() if re.search(pattern, text)]
+
+
+def render_templates(templates: List[str], params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Erzeugt die Ressourcen-Definitionen der Vorlagen.
+
+    Args:
+        templates: Die Vorlagen aus classify_intent()
+        params: Die Parameter aus extract_parameters()
+
+    Returns:
+        Die Ressourcen-Definitionen für CloudAgent.create_terraform_config
+    """
+    params = dict(params, templates=list(templates))
+    resources: List[Dict[str, Any]] = []
+    for name in templates:
+        resources.extend(TEMPLATES[name].build(params))
+    return resources
+
+
+def _hcl_string(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return '"' + escaped.replace("${", "$${").replace("%{", "%%{") + '"'
+
+
+def hcl_value(value: Any, indent: int = 2) -> str:
+    """Gibt einen Python-Wert als HCL-Ausdruck aus.
+
+    Args:
+        value: Zeichenkette, Zahl, Wahrheitswert, Liste oder Dictionary
+        indent: Einrückung der aktuellen Ebene (für Maps)
+
+    Returns:
+        Der HCL-Ausdruck
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return "null"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if isinstance(value, str):
+        if value.startswith("${") and value.endswith("}"):
+            return value[2:-1]
+        return _hcl_string(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(hcl_value(item, indent) for item in value) + "]"
+    if isinstance(value, dict):
+        if not value:
+            return "{}"
+        pad = " " * (indent + 2)
+        lines = [f"{pad}{_hcl_key(key)} = {hcl_value(item, indent + 2)}" for key, item in value.items()]
+        return "{\n" + "\n".join(lines) + "\n" + " " * indent + "}"
+    return _hcl_string(str(value))
+
+
+def _hcl_key(key: str) -> str:
+    return key if re.fullmatch(r"[A-Za-z_][\w-]*", key) else _hcl_string(key)
+
+
+def render_block(header: str, attributes: Dict[str, Any], blocks: Optional[List[Dict[str, Any]]] = None,
+                 indent: int = 0) -> str:
+    """Gibt einen HCL-Block mit Attributen und verschachtelten Blöcken aus."""
+    pad = " " * (indent + 2)
+    lines = [" " * indent + header + " {"]
+    for key, value in attributes.items():
+        lines.append(f"{pad}{_hcl_key(key)} = {hcl_value(value, indent + 2)}")
+    for block in blocks or []:
+        lines.append("")
+        lines.append(render_block(block["type"], block.get("attributes", {}), block.get("blocks"), indent + 2))
+    lines.append(" " * indent + "}")
+    return "\n".join(lines)
@@ -0,0 +1,73 @@
+"""
+Verzögertes Laden schwerer Abhängigkeiten.
+
+Module wie openai, boto3 oder git (gitpython) brauchen beim Import mehrere hundert
+Millisekunden, werden aber für kurze CLI-Aufrufe und beim Sammeln der Tests oft gar
+nicht benötigt. lazy_module() gibt einen Platzhalter zurück, der das echte Modul erst
+beim ersten Attributzugriff importiert.
+"""
+
+import importlib
+import sys
+import threading
+import types
+from typing import Any
+
+
+class LazyModule(types.ModuleType):
+    """Platzhalter für ein Modul, das erst beim ersten Zugriff importiert wird.
+
+    Attribute, die vor dem Import gesetzt werden (z.B. openai.api_key), werden
+    vorgemerkt und nach dem Import auf das echte Modul übertragen.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_pending"] = {}
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                module = importlib.import_module(self.__name__)
+                for attr, value in self.__dict__["_lazy_pending"].items():
+                    setattr(module, attr, value)
+                self.__dict__["_lazy_pending"].clear()
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            self.__dict__["_lazy_pending"][attr] = value
+        else:
+            setattr(module, attr, value)
+
+    def __repr__(self) -> str:
+        state = "geladen" if self.__dict__["_lazy_module"] is not None else "nicht geladen"
+        return f"<LazyModule {self.__name__!r} ({state})>"
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """Gibt ein Modul zurück, das erst beim ersten Attributzugriff importiert wird.
+
+    Ist das Modul bereits importiert, wird es direkt zurückgegeben.
+
+    Args:
+        name: Der vollständige Modulname, z.B. "openai" oder "boto3"
+
+    Returns:
+        Das Modul oder ein LazyModule-Platzhalter
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
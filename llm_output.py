@@ -0,0 +1,187 @@
+"""
+Hilfsfunktionen zum robusten Auslesen von Modellausgaben.
+
+Sprachmodelle liefern strukturierte Antworten nicht immer sauber: JSON steht oft in
+Markdown-Fences, ist von Erklärtext umgeben oder wurde am Token-Limit abgeschnitten.
+Die Funktionen in diesem Modul extrahieren trotzdem das verwertbare Objekt, damit ein
+bereits bezahlter Modellaufruf nicht verworfen werden muss.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+_FENCE_RE = re.compile(r"```[ \t]*([A-Za-z0-9_+-]*)[ \t]*\n(.*?)(?:```|\Z)", re.DOTALL)
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def strip_code_fences(text: str) -> str:
+    """Entfernt einen umschließenden Markdown-Codeblock.
+
+    Args:
+        text: Die Modellausgabe
+
+    Returns:
+        Der Inhalt des ersten Codeblocks oder der unveränderte Text
+    """
+    match = _FENCE_RE.search(text)
+    return match.group(2) if match else text
+
+
+def _parse_truncated(fragment: str) -> Optional[Any]:
+    """Parst ein am Ende abgeschnittenes JSON-Fragment.
+
+    Das Fragment wird einmal Zeichen für Zeichen durchlaufen. Dabei werden mögliche
+    Schnittpunkte zusammen mit dem Stapel der offenen Klammern gemerkt; anschließend
+    wird vom spätesten Schnittpunkt rückwärts versucht, das Fragment zu schließen.
+
+    Args:
+        fragment: Ein JSON-Text, der mit "{" oder "[" beginnt
+
+    Returns:
+        Der geparste Wert oder None
+    """
+    stack: List[str] = []
+    cuts: List[tuple] = []
+    in_string = False
+    escaped = False
+
+    for i, char in enumerate(fragment):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+                cuts.append((i + 1, "".join(stack)))
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+            cuts.append((i + 1, "".join(stack)))
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            cuts.append((i + 1, "".join(stack)))
+            if not stack:
+                break
+        elif not char.isspace() and char not in ",:":
+            cuts.append((i + 1, "".join(stack)))
+
+    if in_string:
+        cuts.append((len(fragment), '"' + "".join(stack)))
+
+    for cut, open_brackets in reversed(cuts):
+        prefix = fragment[:cut]
+        if open_brackets.startswith('"'):
+            prefix += '"'
+            open_brackets = open_brackets[1:]
+        candidate = prefix.rstrip().rstrip(",") + "".join(reversed(open_brackets))
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+
+    return None
+
+
+def parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Extrahiert das erste JSON-Objekt aus einer Modellausgabe.
+
+    Es wird zunächst der komplette Text, dann der Inhalt eines Codeblocks und schließlich
+    jedes "{" im Text als Startpunkt versucht. Abgeschnittene Objekte werden repariert.
+
+    Args:
+        text: Die Modellausgabe
+
+    Returns:
+        Das gefundene Objekt oder None, falls kein Objekt extrahiert werden konnte
+    """
+    if not text:
+        return None
+
+    decoder = json.JSONDecoder()
+    candidates = [text.strip(), strip_code_fences(text).strip()]
+
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+            if isinstance(value, dict):
+                return value
+        except json.JSONDecodeError:
+            pass
+
+    body = candidates[1]
+    start = body.find("{")
+    while start != -1:
+        try:
+            value, _ = decoder.raw_decode(body, start)
+            if isinstance(value, dict):
+                return value
+        except json.JSONDecodeError:
+            value = _parse_truncated(body[start:])
+            if isinstance(value, dict):
+                return value
+        start = body.find("{", start + 1)
+
+    return None
+
+
+def normalize_task(task: str) -> str:
+    """Normalisiert eine Aufgabenbeschreibung als Cache-Schlüssel.
+
+    Args:
+        task: Die Aufgabenbeschreibung
+
+    Returns:
+        Die kleingeschriebene Beschreibung mit vereinheitlichten Leerzeichen
+    """
+    return " ".join(task.lower().split()).rstrip(".!?")
+
+
+_STRINGS_AND_COMMENTS = {
+    "java": re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|//[^\n]*|/\*.*?\*/', re.DOTALL),
+    "julia": re.compile(r'"(?:\\.|[^"\\])*"|#=.*?=#|#[^\n]*', re.DOTALL),
+}
+_BRACKETS = {")": "(", "]": "[", "}": "{"}
+
+
+def validate_syntax(code: str, language: str) -> str:
+    """Prüft generierten Code ohne ihn auszuführen.
+
+    Python wird vollständig kompiliert; für Java und Julia wird geprüft, ob der Code
+    nicht leer ist und die Klammern (ohne Zeichenketten und Kommentare) aufgehen.
+
+    Args:
+        code: Der Code
+        language: Die Programmiersprache
+
+    Returns:
+        Eine Fehlermeldung oder "" bei gültigem Code
+    """
+    if not code.strip():
+        return "Leerer Code"
+    language = language.lower()
+    if language == "python":
+        try:
+            compile(code, "<generiert>", "exec")
+        except (SyntaxError, ValueError) as e:
+            return f"SyntaxError: {e}"
+        return ""
+
+    pattern = _STRINGS_AND_COMMENTS.get(language)
+    if pattern is None:
+        return ""
+    stack: List[str] = []
+    for line_number, line in enumerate(pattern.sub(lambda m: "\n" * m.group(0).count("\n"), code).splitlines(), 1):
+        for char in line:
+            if char in "([{":
+                stack.append(char)
+            elif char in _BRACKETS:
+                if not stack or stack.pop() != _BRACKETS[char]:
+                    return f"Unerwartetes '{char}' in Zeile {line_number}"
+    return f"Nicht geschlossenes '{stack[-1]}'" if stack else ""
@@ -0,0 +1,384 @@
+"""
+Zentraler Scheduler für LLM-Aufrufe.
+
+Alle Modellaufrufe des Assistenten laufen über einen LLMScheduler. Er führt pro Modell
+ein Anfrage- und ein Token-Budget (pro Minute), passt die erlaubte Parallelität nach dem
+AIMD-Prinzip an (additive Erhöhung bei Erfolg, multiplikative Senkung bei 429 oder zu
+hoher Latenz), wiederholt fehlgeschlagene Aufrufe mit Jitter-Backoff (tenacity) und
+bevorzugt interaktive Aufrufe gegenüber Batch-Aufrufen.
+
+tenacity wird erst beim ersten Aufruf importiert, um den Start kurz zu halten.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from tracing import span
+
+# Prioritäten: kleinere Werte werden zuerst zugelassen
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# HTTP-Statuscodes, bei denen sich ein erneuter Versuch lohnt
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Grobe Schätzung: ein Token entspricht etwa vier Zeichen
+CHARS_PER_TOKEN = 4
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Liest den HTTP-Statuscode aus einer Exception, falls vorhanden."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Prüft, ob eine Exception ein Rate-Limit (HTTP 429) signalisiert."""
+    if _status_code(exc) == 429:
+        return True
+    return type(exc).__name__ == "RateLimitError"
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Prüft, ob eine Exception ein vorübergehender Fehler ist."""
+    if is_rate_limit_error(exc):
+        return True
+    if _status_code(exc) in RETRYABLE_STATUS_CODES:
+        return True
+    return type(exc).__name__ in ("APITimeoutError", "APIConnectionError", "InternalServerError")
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Liest einen Retry-After-Header aus der Antwort einer Exception."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int] = None) -> int:
+    """Schätzt den Tokenverbrauch eines Chat-Aufrufs.
+
+    Args:
+        messages: Die Chat-Nachrichten
+        max_tokens: Die maximale Anzahl Ausgabetokens, falls gesetzt
+
+    Returns:
+        Die geschätzte Anzahl Tokens für Eingabe und Ausgabe
+    """
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // CHARS_PER_TOKEN + (max_tokens or 512)
+
+
+def response_tokens(response: Any, field: str = "total_tokens") -> Optional[int]:
+    """Liest die tatsächlich verbrauchten Tokens aus einer Antwort."""
+    usage = getattr(response, "usage", None)
+    total = getattr(usage, field, None)
+    return total if isinstance(total, int) else None
+
+
+class _HeldStream:
+    """Reicht die Teile einer gestreamten Antwort durch und hält so lange den Slot.
+
+    Der Slot wird erst freigegeben, wenn der Stream vollständig gelesen, mit einem Fehler
+    abgebrochen, geschlossen oder vom Garbage Collector eingesammelt wurde.
+    """
+
+    def __init__(self, chunks: Iterable[Any], release: Callable[[Optional[int], Optional[BaseException]], None]):
+        self._chunks = iter(chunks)
+        self._release = release
+        self._tokens: Optional[int] = None
+        self._open = True
+
+    def __iter__(self) -> "_HeldStream":
+        return self
+
+    def __next__(self) -> Any:
+        if not self._open:
+            raise StopIteration
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            self._finish(None)
+            raise
+        except BaseException as e:
+            self._finish(e)
+            raise
+        self._tokens = response_tokens(chunk) or self._tokens
+        return chunk
+
+    def close(self) -> None:
+        """Bricht den Stream ab und gibt den Slot frei."""
+        close = getattr(self._chunks, "close", None)
+        try:
+            if self._open and close is not None:
+                close()
+        finally:
+            self._finish(None)
+
+    def _finish(self, error: Optional[BaseException]) -> None:
+        if self._open:
+            self._open = False
+            self._release(self._tokens, error)
+
+    def __del__(self):
+        self._finish(None)
+
+
+class _TokenBucket:
+    """Ein kontinuierlich auffüllender Eimer für ein Budget pro Minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Gibt zurück, wie lange gewartet werden muss, bis amount verfügbar ist."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Entnimmt amount; negative Werte geben Budget zurück."""
+        self._refill()
+        self.level = min(self.capacity, self.level - amount)
+
+
+class _ModelState:
+    """Budget, Parallelitätsgrenze und Statistiken für ein Modell."""
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int], initial_concurrency: float):
+        self.requests = _TokenBucket(rpm) if rpm else None
+        self.tokens = _TokenBucket(tpm) if tpm else None
+        self.limit = initial_concurrency
+        self.in_flight = 0
+        self.waiters: List[tuple] = []
+        self.latency_ewma: Optional[float] = None
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "errors": 0, "tokens": 0}
+
+
+class LLMScheduler:
+    """Steuert Durchsatz und Wiederholungen aller LLM-Aufrufe."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Dict[str, int]]] = None,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        latency_target: float = 60.0,
+        max_attempts: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """Initialisiert den Scheduler.
+
+        Args:
+            limits: Budgets pro Modell, z.B. {"gpt-4": {"rpm": 500, "tpm": 300000}}
+            initial_concurrency: Anfängliche Anzahl paralleler Aufrufe pro Modell
+            min_concurrency: Untergrenze der Parallelität
+            max_concurrency: Obergrenze der Parallelität
+            latency_target: Latenz in Sekunden, ab der die Parallelität gesenkt wird
+            max_attempts: Maximale Anzahl Versuche pro Aufruf
+            base_delay: Basis für den exponentiellen Backoff in Sekunden
+            max_delay: Maximale Wartezeit zwischen zwei Versuchen
+            sleep: Funktion zum Warten (für Tests austauschbar)
+        """
+        self.limits = limits or {}
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+
+        self._models: Dict[str, _ModelState] = {}
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._backoff = None
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is None:
+            limit = self.limits.get(model, {})
+            state = _ModelState(limit.get("rpm"), limit.get("tpm"), float(self.initial_concurrency))
+            self._models[model] = state
+        return state
+
+    def _acquire(self, model: str, tokens: int, priority: str) -> None:
+        """Wartet, bis ein Aufruf für das Modell zugelassen wird."""
+        ticket = (PRIORITIES.get(priority, 1), next(self._sequence))
+        with self._condition:
+            state = self._state(model)
+            heapq.heappush(state.waiters, ticket)
+            try:
+                while True:
+                    if state.waiters[0] == ticket and state.in_flight < int(state.limit):
+                        delay = 0.0
+                        if state.requests:
+                            delay = max(delay, state.requests.wait_time(1))
+                        if state.tokens:
+                            delay = max(delay, state.tokens.wait_time(tokens))
+                        if delay <= 0:
+                            break
+                        self._condition.wait(timeout=delay)
+                    else:
+                        self._condition.wait()
+            except BaseException:
+                state.waiters.remove(ticket)
+                heapq.heapify(state.waiters)
+                self._condition.notify_all()
+                raise
+
+            heapq.heappop(state.waiters)
+            state.in_flight += 1
+            if state.requests:
+                state.requests.consume(1)
+            if state.tokens:
+                state.tokens.consume(tokens)
+            self._condition.notify_all()
+
+    def _release(self, model: str, estimated: int, actual: Optional[int],
+                 latency: Optional[float], error: Optional[BaseException]) -> None:
+        """Gibt einen Slot frei und passt die Parallelitätsgrenze an (AIMD)."""
+        with self._condition:
+            state = self._state(model)
+            state.in_flight -= 1
+
+            if actual is not None:
+                state.stats["tokens"] += actual
+                if state.tokens:
+                    state.tokens.consume(actual - estimated)
+
+            if error is not None and is_rate_limit_error(error):
+                state.stats["rate_limited"] += 1
+                state.limit = max(self.min_concurrency, state.limit / 2)
+            elif error is not None:
+                state.stats["errors"] += 1
+            elif latency is not None:
+                if state.latency_ewma is None:
+                    state.latency_ewma = latency
+                else:
+                    state.latency_ewma = 0.8 * state.latency_ewma + 0.2 * latency
+                if state.latency_ewma > self.latency_target:
+                    state.limit = max(self.min_concurrency, state.limit * 0.9)
+                else:
+                    state.limit = min(self.max_concurrency, state.limit + 1.0 / state.limit)
+
+            self._condition.notify_all()
+
+    def _wait(self, retry_state) -> float:
+        """Berechnet die Wartezeit vor dem nächsten Versuch."""
+        if self._backoff is None:
+            from tenacity import wait_random_exponential
+            self._backoff = wait_random_exponential(multiplier=self.base_delay, max=self.max_delay)
+        exc = retry_state.outcome.exception()
+        backoff = self._backoff(retry_state)
+        retry_after = _retry_after(exc) if exc is not None else None
+        return max(backoff, retry_after or 0.0)
+
+    def call(self, create: Callable[..., Any], model: str, messages: List[Dict[str, str]],
+             priority: str = "interactive", **kwargs) -> Any:
+        """Führt einen Chat-Aufruf unter Einhaltung der Budgets aus.
+
+        Args:
+            create: Die aufzurufende Funktion, z.B. openai.ChatCompletion.create
+            model: Das zu verwendende Sprachmodell
+            messages: Die Chat-Nachrichten
+            priority: "interactive" oder "batch"
+            **kwargs: Weitere Argumente für create
+
+        Returns:
+            Die Antwort des Modells
+        """
+        from tenacity import Retrying, retry_if_exception, stop_after_attempt
+
+        estimated = estimate_tokens(messages, kwargs.get("max_tokens"))
+        queued = 0.0
+
+        def attempt():
+            nonlocal queued
+            wait_start = time.monotonic()
+            self._acquire(model, estimated, priority)
+            start = time.monotonic()
+            queued += start - wait_start
+            try:
+                response = create(model=model, messages=messages, **kwargs)
+            except BaseException as e:
+                self._release(model, estimated, None, None, e)
+                raise
+            if kwargs.get("stream"):
+                return _HeldStream(response, lambda tokens, error: self._release(
+                    model, estimated, tokens, time.monotonic() - start, error))
+            self._release(model, estimated, response_tokens(response), time.monotonic() - start, None)
+            return response
+
+        retrying = Retrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=self._wait,
+            retry=retry_if_exception(is_retryable_error),
+            sleep=self.sleep,
+            reraise=True,
+        )
+
+        with self._condition:
+            self._state(model).stats["calls"] += 1
+
+        with span("llm", "llm", model=model, priority=priority) as active:
+            for attempt_state in retrying:
+                with attempt_state:
+                    if attempt_state.retry_state.attempt_number > 1:
+                        with self._condition:
+                            self._state(model).stats["retries"] += 1
+                    response = attempt()
+            active.set(
+                attempts=retrying.statistics.get("attempt_number", 1),
+                queued_seconds=round(queued, 4),
+                prompt_tokens=response_tokens(response, "prompt_tokens"),
+                completion_tokens=response_tokens(response, "completion_tokens"),
+                total_tokens=response_tokens(response),
+            )
+        return response
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Gibt den aktuellen Zustand aller Modelle zurück."""
+        with self._condition:
+            return {
+                model: dict(state.stats, limit=round(state.limit, 2), in_flight=state.in_flight,
+                            queued=len(state.waiters))
+                for model, state in self._models.items()
+            }
+
+
+_default_scheduler: Optional[LLMScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_default_scheduler() -> LLMScheduler:
+    """Gibt den prozessweit geteilten Scheduler zurück."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = LLMScheduler()
+        return _default_scheduler
@@ -0,0 +1,165 @@
+"""
+Änderungen als Patch statt als vollständige Datei.
+
+Bei großen Dateien dominiert die Ausgabe der Tokens die Latenz einer Korrektur,
+obwohl fast die gesamte Datei unverändert bleibt. Das Modell liefert deshalb nur
+Suchen/Ersetzen-Blöcke
+
+    <<<<<<< SEARCH
+    alter Code
+    =======
+    neuer Code
+    >>>>>>> REPLACE
+
+oder einen Unified Diff. apply_edits() wendet die Blöcke an und sucht die Fundstelle
+dabei schrittweise toleranter: exakt, ohne Rücksicht auf Einrückung und Leerzeichen
+am Zeilenende, zuletzt unscharf per difflib. Lässt sich ein Block nicht eindeutig
+zuordnen, gibt apply_edits() None zurück und der Aufrufer fällt auf die vollständige
+Datei zurück.
+"""
+
+import difflib
+import re
+from typing import List, Optional, Tuple
+
+from llm_output import strip_code_fences
+
+Edit = Tuple[str, str]
+
+# Mindestähnlichkeit für die unscharfe Zuordnung eines Suchblocks
+FUZZY_THRESHOLD = 0.85
+
+_BLOCK_RE = re.compile(
+    r"^[ \t]*<{5,}[ \t]*SEARCH[ \t]*\n(.*?)^[ \t]*={5,}[ \t]*\n(.*?)^[ \t]*>{5,}[ \t]*REPLACE[ \t]*$",
+    re.DOTALL | re.MULTILINE,
+)
+_HUNK_RE = re.compile(r"^@@ .* @@")
+
+
+def parse_edit_blocks(text: str) -> List[Edit]:
+    """Liest Suchen/Ersetzen-Blöcke aus einer Modellausgabe."""
+    return [(search, replace) for search, replace in _BLOCK_RE.findall(text)]
+
+
+def parse_unified_diff(text: str) -> List[Edit]:
+    """Wandelt die Hunks eines Unified Diff in Suchen/Ersetzen-Paare um.
+
+    Zeilennummern werden ignoriert; die Fundstelle ergibt sich aus Kontext und
+    entfernten Zeilen.
+    """
+    edits: List[Edit] = []
+    old: List[str] = []
+    new: List[str] = []
+    in_hunk = False
+
+    def flush() -> None:
+        if old != new:
+            edits.append(("".join(old), "".join(new)))
+        old.clear()
+        new.clear()
+
+    for line in strip_code_fences(text).splitlines(keepends=True):
+        if _HUNK_RE.match(line):
+            flush()
+            in_hunk = True
+        elif line.startswith(("--- ", "+++ ", "diff ", "index ")):
+            flush()
+            in_hunk = False
+        elif in_hunk:
+            if line.startswith("+"):
+                new.append(line[1:])
+            elif line.startswith("-"):
+                old.append(line[1:])
+            elif line.startswith(" ") or line in ("\n", "\r\n"):
+                old.append(line[1:] if line.startswith(" ") else line)
+                new.append(line[1:] if line.startswith(" ") else line)
+            elif line.startswith("\\"):
+                continue
+            else:
+                flush()
+                in_hunk = False
+    flush()
+    return edits
+
+
+def parse_patch(text: str) -> List[Edit]:
+    """Liest eine Patch-Antwort (Suchen/Ersetzen-Blöcke oder Unified Diff)."""
+    return parse_edit_blocks(text) or parse_unified_diff(text)
+
+
+def _indent(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _locate(lines: List[str], search: List[str]) -> Optional[Tuple[int, int]]:
+    """Findet den Suchblock in lines; liefert (Start, Ende) oder None."""
+    size = len(search)
+    if size == 0 or size > len(lines):
+        return None
+
+    # Ohne Rücksicht auf Einrückung und Leerzeichen am Zeilenende
+    stripped = [line.strip() for line in search]
+    matches = [start for start in range(len(lines) - size + 1)
+               if [line.strip() for line in lines[start:start + size]] == stripped]
+    if len(matches) == 1:
+        return matches[0], matches[0] + size
+    if len(matches) > 1:
+        return None
+
+    # Unscharf: beste Fensterposition mit leicht abweichender Länge
+    target = "\n".join(stripped)
+    best: Tuple[float, int, int] = (0.0, 0, 0)
+    for window in {size - 1, size, size + 1}:
+        if window < 1:
+            continue
+        for start in range(len(lines) - window + 1):
+            candidate = "\n".join(line.strip() for line in lines[start:start + window])
+            matcher = difflib.SequenceMatcher(None, target, candidate, autojunk=False)
+            if matcher.real_quick_ratio() < FUZZY_THRESHOLD or matcher.quick_ratio() < FUZZY_THRESHOLD:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best[0]:
+                best = (ratio, start, start + window)
+    return (best[1], best[2]) if best[0] >= FUZZY_THRESHOLD else None
+
+
+def apply_edits(code: str, edits: List[Edit]) -> Optional[str]:
+    """Wendet Suchen/Ersetzen-Paare der Reihe nach an.
+
+    Args:
+        code: Der ursprüngliche Code
+        edits: Die Paare (Suchtext, Ersatztext)
+
+    Returns:
+        Der geänderte Code oder None, wenn ein Suchblock nicht eindeutig gefunden wurde
+    """
+    if not edits:
+        return None
+    for search, replace in edits:
+        if not search.strip():
+            # Leerer Suchblock: Ersatz am Dateianfang einfügen
+            code = replace + code
+            continue
+        if code.count(search) == 1:
+            code = code.replace(search, replace)
+            continue
+
+        lines = code.splitlines(keepends=True)
+        search_lines = search.splitlines(keepends=True)
+        location = _locate(lines, search_lines)
+        if location is None:
+            return None
+        start, end = location
+
+        # Einrückung der Fundstelle auf den Ersatz übertragen
+        found, expected = _indent(lines[start]), _indent(search_lines[0])
+        replace_lines = []
+        for line in replace.splitlines(keepends=True):
+            if line.strip() and line.startswith(expected):
+                line = found + line[len(expected):]
+            replace_lines.append(line)
+        if replace_lines and not replace_lines[-1].endswith("\n") and end < len(lines):
+            replace_lines[-1] += "\n"
+        lines[start:end] = replace_lines
+        code = "".join(lines)
+    return code
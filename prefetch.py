@@ -0,0 +1,135 @@
+"""
+Spekulative Vorausberechnung von Modellaufrufen.
+
+Im interaktiven Betrieb wartet run() immer wieder auf Eingaben (Dateinamen,
+Bestätigungen), und erst danach startet der Modellaufruf des nächsten Schritts. Da die
+Prompts der folgenden Plan-Schritte nur von der Aufgabe abhängen, können sie schon
+während der Wartezeit im Hintergrund laufen. Der Prefetcher hält die Ergebnisse
+kurzlebig vor: take() liefert ein fertiges Ergebnis sofort bzw. wartet auf einen bereits
+laufenden Aufruf, statt ihn erneut zu starten. Bricht der Benutzer ab, verwirft
+cancel() alles, was noch nicht begonnen hat.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Lebensdauer eines vorausberechneten Ergebnisses in Sekunden
+DEFAULT_TTL = 120.0
+
+# Markiert "kein Ergebnis vorhanden" (None ist ein gültiges Ergebnis)
+MISSING = object()
+
+_state = threading.local()
+
+
+def prefetching() -> bool:
+    """True, wenn der aktuelle Thread gerade einen spekulativen Aufruf ausführt."""
+    return getattr(_state, "active", False)
+
+
+def _run_speculative(fn: Callable[[], Any]) -> Any:
+    _state.active = True
+    try:
+        return fn()
+    finally:
+        _state.active = False
+
+
+class Prefetcher:
+    """Führt Aufrufe spekulativ aus und hält ihre Ergebnisse kurz vor."""
+
+    def __init__(self, max_workers: int = 2, ttl: float = DEFAULT_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialisiert den Prefetcher.
+
+        Args:
+            max_workers: Maximale Anzahl gleichzeitiger spekulativer Aufrufe
+            ttl: Lebensdauer eines Ergebnisses in Sekunden
+            clock: Zeitquelle (für Tests austauschbar)
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._entries: Dict[Hashable, Tuple[Future, float]] = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.used = 0
+        self.wasted = 0
+
+    def submit(self, key: Hashable, fn: Callable[[], Any]) -> bool:
+        """Startet einen Aufruf im Hintergrund, sofern er nicht schon vorliegt.
+
+        Args:
+            key: Schlüssel, unter dem take() das Ergebnis findet
+            fn: Der Aufruf
+
+        Returns:
+            True, wenn der Aufruf neu gestartet wurde
+        """
+        with self._lock:
+            self._expire()
+            if key in self._entries:
+                return False
+            self._entries[key] = (self._executor.submit(_run_speculative, fn), self.clock())
+            self.submitted += 1
+            return True
+
+    def take(self, key: Hashable, timeout: Optional[float] = None) -> Any:
+        """Entnimmt ein vorausberechnetes Ergebnis.
+
+        Ein noch laufender Aufruf wird abgewartet. Ist der Aufruf fehlgeschlagen,
+        abgelaufen oder unbekannt, wird MISSING geliefert und der Aufrufer rechnet selbst;
+        ebenso innerhalb eines spekulativen Aufrufs, der sonst auf sich selbst warten würde.
+
+        Args:
+            key: Der Schlüssel aus submit()
+            timeout: Maximale Wartezeit auf einen laufenden Aufruf
+
+        Returns:
+            Das Ergebnis oder MISSING
+        """
+        if prefetching():
+            return MISSING
+        with self._lock:
+            self._expire()
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return MISSING
+        future, _ = entry
+        try:
+            value = future.result(timeout=timeout)
+        except Exception:
+            self.wasted += 1
+            return MISSING
+        self.used += 1
+        return value
+
+    def _expire(self) -> None:
+        now = self.clock()
+        for key, (future, created) in list(self._entries.items()):
+            if now - created > self.ttl and future.done():
+                del self._entries[key]
+                self.wasted += 1
+
+    def cancel(self) -> int:
+        """Verwirft alle offenen Ergebnisse; noch nicht begonnene Aufrufe werden abgebrochen.
+
+        Returns:
+            Die Anzahl verworfener Einträge
+        """
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        for future, _ in entries.values():
+            future.cancel()
+        self.wasted += len(entries)
+        return len(entries)
+
+    def shutdown(self) -> None:
+        """Verwirft offene Ergebnisse und beendet die Hintergrund-Threads."""
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"submitted": self.submitted, "used": self.used, "wasted": self.wasted}
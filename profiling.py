@@ -0,0 +1,272 @@
+"""
+Laufzeit- und Speicherprofile für ausgeführten Code.
+
+run_profiled() startet ein Programm und misst Wanduhrzeit, CPU-Zeit (user + system)
+und den maximalen Arbeitsspeicher (peak RSS) genau dieses Kindprozesses über
+os.wait4/getrusage. Für Python sammelt profile_command() zusätzlich eine Übersicht der
+Hotspots mit cProfile und tracemalloc, für Java mit dem Java Flight Recorder, sofern
+das jfr-Werkzeug verfügbar ist.
+
+benchmark() führt ein Programm mehrfach aus und liefert den Median; darauf baut der
+Optimierungsschritt des DevAssistantExtended auf.
+"""
+
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tracing import span, traced_run
+
+try:
+    import resource
+except ImportError:  # Windows: nur Wanduhrzeit
+    resource = None
+
+# Wrapper, der ein Skript unter cProfile und tracemalloc ausführt und die
+# Hotspot-Übersicht in eine Datei schreibt (die Ausgabe des Skripts bleibt unverändert)
+_PYTHON_PROFILER = """
+import cProfile, io, pstats, runpy, sys, tracemalloc
+summary_path, script = sys.argv[1], sys.argv[2]
+sys.argv = sys.argv[2:]
+tracemalloc.start(10)
+profiler = cProfile.Profile()
+try:
+    profiler.runcall(runpy.run_path, script, run_name="__main__")
+finally:
+    current, peak = tracemalloc.get_traced_memory()
+    allocations = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(True, script)]).statistics("lineno")[:5]
+    tracemalloc.stop()
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(12)
+    with open(summary_path, "w") as f:
+        f.write("Funktionen nach kumulierter Zeit:\\n")
+        f.write("\\n".join(line for line in stream.getvalue().splitlines() if line.strip()))
+        f.write(f"\\n\\nSpeicher (tracemalloc): Spitze {peak / 1024:.1f} KiB\\n")
+        for stat in allocations:
+            f.write(f"  {stat}\\n")
+"""
+
+_JFR_FRAME_RE = re.compile(r"^\s+([\w.$<>]+\([^)]*\))\s+line:")
+
+
+class ExecutionProfile:
+    """Ergebnis einer gemessenen Ausführung."""
+
+    def __init__(self, output: str, exit_code: int, wall_seconds: float,
+                 cpu_seconds: Optional[float] = None, peak_rss_kb: Optional[int] = None,
+                 hotspots: str = ""):
+        self.output = output
+        self.exit_code = exit_code
+        self.wall_seconds = wall_seconds
+        self.cpu_seconds = cpu_seconds
+        self.peak_rss_kb = peak_rss_kb
+        self.hotspots = hotspots
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "exit_code": self.exit_code,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_kb": self.peak_rss_kb,
+        }
+
+    def format(self) -> str:
+        parts = [f"Wanduhrzeit {self.wall_seconds * 1000:.1f} ms"]
+        if self.cpu_seconds is not None:
+            parts.append(f"CPU {self.cpu_seconds * 1000:.1f} ms")
+        if self.peak_rss_kb is not None:
+            parts.append(f"Spitzenspeicher {self.peak_rss_kb / 1024:.1f} MiB")
+        text = "Profil: " + ", ".join(parts)
+        if self.hotspots:
+            text += "\n" + self.hotspots
+        return text
+
+
+def run_profiled(command: List[str], cwd: Optional[str] = None, timeout: Optional[float] = None,
+                 env: Optional[Dict[str, str]] = None,
+                 preexec_fn: Optional[Callable[[], None]] = None) -> ExecutionProfile:
+    """Führt einen Befehl aus und misst Zeit und Speicher genau dieses Prozesses.
+
+    Args:
+        command: Der Befehl
+        cwd: Das Arbeitsverzeichnis
+        timeout: Maximale Laufzeit in Sekunden (danach wird der Prozess beendet)
+        env: Umgebungsvariablen
+        preexec_fn: Wird im Kindprozess vor exec aufgerufen (z.B. Ressourcenlimits)
+
+    Returns:
+        Das Profil mit Ausgabe (stdout, bei Fehler stderr)
+    """
+    with span(os.path.basename(command[0]), "subprocess", command=" ".join(command)) as active, \
+            tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdout=stdout, stderr=stderr, preexec_fn=preexec_fn)
+        timer = threading.Timer(timeout, process.kill) if timeout else None
+        if timer:
+            timer.start()
+        try:
+            if resource is not None:
+                _, status, usage = os.wait4(process.pid, 0)
+                wall = time.perf_counter() - start
+                process.returncode = os.waitstatus_to_exitcode(status)
+                cpu = usage.ru_utime + usage.ru_stime
+                # ru_maxrss ist unter Linux in KiB, unter macOS in Bytes
+                peak = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+            else:
+                process.wait()
+                wall = time.perf_counter() - start
+                cpu, peak = None, None
+        finally:
+            if timer:
+                timer.cancel()
+
+        stdout.seek(0)
+        stderr.seek(0)
+        out = stdout.read().decode("utf-8", errors="replace")
+        err = stderr.read().decode("utf-8", errors="replace")
+        active.set(exit_code=process.returncode, wall_seconds=wall, cpu_seconds=cpu, peak_rss_kb=peak)
+
+    return ExecutionProfile(out if process.returncode == 0 else err, process.returncode, wall, cpu, peak)
+
+
+def prepare(code: str, language: str, workdir: str) -> Tuple[Optional[List[str]], str]:
+    """Schreibt den Code nach workdir und kompiliert ihn bei Bedarf.
+
+    Args:
+        code: Der Quellcode
+        language: "python", "java" oder "julia"
+        workdir: Ein leeres Arbeitsverzeichnis
+
+    Returns:
+        (Befehl zum Ausführen, Fehlermeldung); der Befehl ist None bei einem Fehler
+    """
+    language = language.lower()
+    if language == "python":
+        script = os.path.join(workdir, "temp_script.py")
+        command = [sys.executable, script]
+    elif language == "java":
+        match = re.search(r"public\s+(?:final\s+)?class\s+(\w+)", code)
+        class_name = match.group(1) if match else "Main"
+        script = os.path.join(workdir, f"{class_name}.java")
+        command = ["java", "-cp", workdir, class_name]
+    elif language == "julia":
+        script = os.path.join(workdir, "temp_script.jl")
+        command = ["julia", script]
+    else:
+        return None, f"Nicht unterstützte Sprache: {language}"
+
+    with open(script, "w") as f:
+        f.write(code)
+    if language == "java":
+        result = traced_run(["javac", script], capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, f"Kompilierungsfehler: {result.stderr}"
+    return command, ""
+
+
+def _java_hotspots(recording: str, limit: int = 10) -> str:
+    """Fasst die häufigsten obersten Stack-Frames einer JFR-Aufzeichnung zusammen."""
+    result = traced_run(["jfr", "print", "--events", "jdk.ExecutionSample", recording],
+                        capture_output=True, text=True)
+    if result.returncode != 0:
+        return ""
+    frames: Counter = Counter()
+    expect_top = False
+    for line in result.stdout.splitlines():
+        if "stackTrace = [" in line:
+            expect_top = True
+            continue
+        if expect_top:
+            match = _JFR_FRAME_RE.match(line)
+            if match:
+                frames[match.group(1)] += 1
+            expect_top = False
+    total = sum(frames.values())
+    if not total:
+        return ""
+    lines = [f"  {count / total:6.1%}  {frame}" for frame, count in frames.most_common(limit)]
+    return "Java-Hotspots (JFR, Anteil der Stichproben):\n" + "\n".join(lines)
+
+
+def profile_command(command: List[str], language: str, workdir: str,
+                    timeout: Optional[float] = None,
+                    preexec_fn: Optional[Callable[[], None]] = None) -> ExecutionProfile:
+    """Führt einen vorbereiteten Befehl einmal mit Hotspot-Erfassung aus.
+
+    Args:
+        command: Der Befehl aus prepare()
+        language: Die Programmiersprache
+        workdir: Das Arbeitsverzeichnis aus prepare()
+        timeout: Maximale Laufzeit in Sekunden
+        preexec_fn: Wird im Kindprozess vor exec aufgerufen (z.B. Ressourcenlimits)
+
+    Returns:
+        Das Profil inklusive Hotspot-Übersicht (soweit verfügbar)
+    """
+    language = language.lower()
+    if language == "python":
+        summary = os.path.join(workdir, "profile.txt")
+        profile = run_profiled([command[0], "-c", _PYTHON_PROFILER, summary, *command[1:]],
+                               cwd=workdir, timeout=timeout, preexec_fn=preexec_fn)
+        if os.path.exists(summary):
+            with open(summary) as f:
+                profile.hotspots = f.read().strip()
+        return profile
+
+    if language == "java" and shutil.which("jfr"):
+        recording = os.path.join(workdir, "recording.jfr")
+        profile = run_profiled(
+            [command[0], f"-XX:StartFlightRecording=filename={recording},settings=profile", *command[1:]],
+            cwd=workdir, timeout=timeout, preexec_fn=preexec_fn,
+        )
+        # Die JFR-Statusmeldung beim Start gehört nicht zur Programmausgabe
+        profile.output = "\n".join(line for line in profile.output.splitlines(keepends=False)
+                                   if "Started recording" not in line and "jcmd" not in line)
+        if os.path.exists(recording):
+            profile.hotspots = _java_hotspots(recording)
+        return profile
+
+    return run_profiled(command, cwd=workdir, timeout=timeout, preexec_fn=preexec_fn)
+
+
+def benchmark(command: List[str], workdir: str, repeats: int = 5,
+              timeout: Optional[float] = None,
+              preexec_fn: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Führt einen Befehl mehrfach aus und fasst die Messungen zusammen.
+
+    Args:
+        command: Der Befehl aus prepare()
+        workdir: Das Arbeitsverzeichnis
+        repeats: Anzahl der gemessenen Läufe
+        timeout: Maximale Laufzeit pro Lauf in Sekunden
+        preexec_fn: Wird in jedem Lauf vor exec aufgerufen (z.B. Ressourcenlimits)
+
+    Returns:
+        Median der Wanduhr- und CPU-Zeit, maximaler Spitzenspeicher, Ausgabe des
+        ersten Laufs und ob alle Läufe erfolgreich waren
+    """
+    runs = [run_profiled(command, cwd=workdir, timeout=timeout, preexec_fn=preexec_fn) for _ in range(repeats)]
+    cpu_times = [run.cpu_seconds for run in runs if run.cpu_seconds is not None]
+    peaks = [run.peak_rss_kb for run in runs if run.peak_rss_kb is not None]
+    return {
+        "ok": all(run.ok for run in runs),
+        "output": runs[0].output,
+        "wall_seconds": statistics.median(run.wall_seconds for run in runs),
+        "cpu_seconds": statistics.median(cpu_times) if cpu_times else None,
+        "peak_rss_kb": max(peaks) if peaks else None,
+        "runs": repeats,
+    }
@@ -0,0 +1,185 @@
+"""
+Projektgerüste im Prozess anlegen.
+
+Ein Gerüst ist ein JSON-Baum: Objekte sind Verzeichnisse, Strings (oder null) sind
+Dateien mit optionalem Vorlageninhalt, z.B.
+
+    {"src": {"__init__.py": "", "main.py": "# $project"}, "tests": {}, "README.md": "# $project"}
+
+materialize() legt den gesamten Baum in einem Durchgang mit os.makedirs an und schreibt
+alle Dateien gesammelt, ohne eine Shell zu starten. Der Vorgang ist idempotent:
+Dateien, deren Inhalt sich laut Hash nicht geändert hat, werden übersprungen.
+"""
+
+import hashlib
+import os
+import re
+import shlex
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+
+from llm_output import parse_json_object
+
+
+class ScaffoldResult:
+    """Zusammenfassung eines materialize()-Aufrufs."""
+
+    def __init__(self):
+        self.directories: List[str] = []
+        self.written: List[str] = []
+        self.skipped: List[str] = []
+
+    def __str__(self) -> str:
+        return (f"{len(self.directories)} Verzeichnis(se), {len(self.written)} Datei(en) geschrieben, "
+                f"{len(self.skipped)} unverändert")
+
+
+def safe_join(root: str, relative: str) -> str:
+    """Verbindet root und relative und verhindert Pfade außerhalb von root."""
+    if os.path.isabs(relative):
+        raise ValueError(f"Absoluter Pfad im Projektgerüst nicht erlaubt: {relative}")
+    root = os.path.abspath(root)
+    path = os.path.abspath(os.path.join(root, relative))
+    if path != root and not path.startswith(root + os.sep):
+        raise ValueError(f"Pfad außerhalb des Projektverzeichnisses: {relative}")
+    return path
+
+
+def flatten(tree: Dict[str, Any], prefix: str = "") -> Tuple[List[str], Dict[str, str]]:
+    """Zerlegt einen Gerüstbaum in Verzeichnisse und Dateien.
+
+    Args:
+        tree: Der Gerüstbaum
+        prefix: Der relative Pfad des Teilbaums
+
+    Returns:
+        Die relativen Verzeichnispfade und ein Dictionary Dateipfad -> Inhalt
+
+    Raises:
+        ValueError: Wenn ein Pfad zugleich Datei und Verzeichnis wäre
+    """
+    directories: List[str] = []
+    files: Dict[str, str] = {}
+    for name, node in tree.items():
+        path = os.path.join(prefix, name.strip("/")) if prefix else name.strip("/")
+        if not path:
+            continue
+        if name.endswith("/") and not isinstance(node, (dict, list)):
+            # "src/": "" bezeichnet ein (leeres) Verzeichnis, keine Datei
+            node = {}
+        if isinstance(node, list):
+            # Verzeichnis als Liste von Dateinamen oder Teilbäumen
+            merged: Dict[str, Any] = {}
+            for item in node:
+                if isinstance(item, dict):
+                    merged.update(item)
+                elif item:
+                    merged[str(item)] = {} if str(item).endswith("/") else ""
+            node = merged
+        if isinstance(node, dict):
+            directories.append(path)
+            sub_dirs, sub_files = flatten(node, path)
+            directories.extend(sub_dirs)
+            files.update(sub_files)
+        else:
+            files[path] = "" if node is None else str(node)
+    if not prefix:
+        # Kein Dateipfad darf Verzeichnis oder Elternverzeichnis eines anderen Eintrags sein
+        for path in files.keys() | set(directories):
+            parent = path if path in files and path in directories else os.path.dirname(path)
+            while parent:
+                if parent in files:
+                    raise ValueError(f"Pfad ist zugleich Datei und Verzeichnis: {parent}")
+                parent = os.path.dirname(parent)
+    return directories, files
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def materialize(tree: Dict[str, Any], root: str = ".",
+                variables: Optional[Dict[str, str]] = None) -> ScaffoldResult:
+    """Legt ein Projektgerüst an.
+
+    Args:
+        tree: Der Gerüstbaum
+        root: Das Zielverzeichnis
+        variables: Werte für $-Platzhalter im Dateiinhalt (string.Template)
+
+    Returns:
+        Ein ScaffoldResult mit angelegten Verzeichnissen und geschriebenen Dateien
+    """
+    result = ScaffoldResult()
+    directories, files = flatten(tree)
+
+    # Nur Blattverzeichnisse anlegen; makedirs erzeugt die Eltern mit
+    targets = {safe_join(root, d) for d in directories}
+    targets.update(os.path.dirname(safe_join(root, f)) for f in files)
+    for directory in sorted(targets):
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+            result.directories.append(directory)
+
+    for relative, content in files.items():
+        path = safe_join(root, relative)
+        if variables:
+            content = Template(content).safe_substitute(variables)
+        data = content.encode("utf-8")
+        if _file_digest(path) == hashlib.sha256(data).hexdigest():
+            result.skipped.append(path)
+            continue
+        tmp_path = path + ".scaffold.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        result.written.append(path)
+
+    return result
+
+
+_TREE_PREFIX_RE = re.compile(r"^[\s│├└─|`\-$>]*")
+
+
+def parse_scaffold(text: str) -> Dict[str, Any]:
+    """Liest ein Projektgerüst aus einer Modellausgabe.
+
+    Bevorzugt wird ein JSON-Baum. Als Rückfall werden mkdir-Befehle ausgewertet
+    (ohne sie in einer Shell auszuführen).
+
+    Args:
+        text: Die Modellausgabe
+
+    Returns:
+        Der Gerüstbaum (leer, wenn nichts erkannt wurde)
+    """
+    parsed = parse_json_object(text)
+    if parsed is not None:
+        # Häufige Hülle: {"structure": {...}}
+        if len(parsed) == 1:
+            (only_value,) = parsed.values()
+            key = next(iter(parsed))
+            if isinstance(only_value, dict) and key.lower() in ("structure", "scaffold", "tree", "projektstruktur"):
+                return only_value
+        return parsed
+
+    tree: Dict[str, Any] = {}
+    for line in text.splitlines():
+        line = _TREE_PREFIX_RE.sub("", line).strip()
+        if not line.startswith("mkdir"):
+            continue
+        try:
+            args = shlex.split(line)[1:]
+        except ValueError:
+            continue
+        for arg in args:
+            if arg.startswith("-") or "{" in arg:
+                continue
+            node = tree
+            for part in [p for p in arg.split("/") if p and p != "."]:
+                node = node.setdefault(part, {})
+    return tree
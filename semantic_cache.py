@@ -0,0 +1,228 @@
+"""
+Semantischer Cache für Modellantworten auf fast gleichlautende Prompts.
+
+Der exakte Cache (Checkpoints, Tool-Empfehlungen pro normalisierter Aufgabe) verfehlt
+Prompts, die sich nur in der Formulierung unterscheiden. SemanticCache speichert die
+Embeddings der Prompts als zusammenhängende float32-Matrix in einer per np.memmap
+eingeblendeten Datei und beantwortet Anfragen mit einem einzigen Matrixprodukt
+(Kosinusähnlichkeit normierter Vektoren) gegen alle Einträge einer Aufrufstelle.
+
+Schutzmechanismen gegen falsche Treffer:
+- Schwellwerte pro Aufrufstelle (Code braucht eine höhere Ähnlichkeit als Empfehlungen),
+- Zahlen und Zeichenketten in Anführungszeichen müssen exakt übereinstimmen
+  ("Port 80" ist nicht "Port 8080"),
+- ein optionaler Prüf-Hook verwirft Treffer, die die Validierung nicht bestehen.
+
+Ist der Cache voll, wird der am längsten nicht genutzte Eintrag ersetzt (LRU).
+Ohne eigene Embedding-Funktion werden Feature-Hashing-Vektoren aus Wörtern,
+Wortpaaren und Zeichen-Trigrammen verwendet, die ohne Modellaufruf auskommen.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from lazy_imports import lazy_module
+from llm_output import normalize_task
+
+np = lazy_module("numpy")
+
+DEFAULT_DIM = 512
+DEFAULT_CAPACITY = 4096
+
+# Mindestähnlichkeit pro Aufrufstelle (Teil vor dem ersten ":")
+DEFAULT_THRESHOLDS = {"generate_code": 0.88, "recommend_tools": 0.82}
+DEFAULT_THRESHOLD = 0.9
+
+# Höchstens so viele Kandidaten werden dem Prüf-Hook vorgelegt
+MAX_VERIFIED_CANDIDATES = 3
+
+_WORD_RE = re.compile(r"\w+")
+_GUARD_RE = re.compile(r"\d+(?:\.\d+)*|\"[^\"]*\"|'[^']*'|`[^`]*`")
+
+
+def hashed_embedding(texts: Sequence[str], dim: int = DEFAULT_DIM) -> "np.ndarray":
+    """Bildet Texte per Feature-Hashing auf normierte Vektoren ab.
+
+    Args:
+        texts: Die Texte
+        dim: Die Dimension der Vektoren
+
+    Returns:
+        Eine float32-Matrix mit einer Zeile pro Text
+    """
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = _WORD_RE.findall(normalize_task(text))
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        features += [f"#{word[i:i + 3]}" for word in words for i in range(max(len(word) - 2, 1))]
+        for feature in features:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            matrix[row, digest % dim] += 1.0 if digest & 0x80000000 else -1.0
+    return _normalized(matrix)
+
+
+def _normalized(vectors: "np.ndarray") -> "np.ndarray":
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def guard_tokens(text: str) -> List[str]:
+    """Zahlen und Zeichenketten in Anführungszeichen, die exakt übereinstimmen müssen."""
+    return sorted(set(_GUARD_RE.findall(text)))
+
+
+class SemanticCache:
+    """Cache für Modellantworten mit Suche nach ähnlichen Prompts."""
+
+    def __init__(self, path: str, dim: int = DEFAULT_DIM, capacity: int = DEFAULT_CAPACITY,
+                 embed_fn: Optional[Callable[[Sequence[str]], "np.ndarray"]] = None,
+                 thresholds: Optional[Dict[str, float]] = None, max_age: Optional[float] = None):
+        """Initialisiert den Cache und lädt vorhandene Einträge.
+
+        Args:
+            path: Verzeichnis für Vektoren (vectors.f32) und Metadaten (entries.json)
+            dim: Die Dimension der Embeddings
+            capacity: Maximale Anzahl Einträge
+            embed_fn: Bildet Texte auf Vektoren ab (Standard: hashed_embedding)
+            thresholds: Mindestähnlichkeit pro Aufrufstelle (ergänzt DEFAULT_THRESHOLDS)
+            max_age: Maximales Alter eines Eintrags in Sekunden (None: unbegrenzt)
+        """
+        self.path = path
+        self.dim = dim
+        self.capacity = capacity
+        self.embed_fn = embed_fn or (lambda texts: hashed_embedding(texts, dim))
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._meta_path = os.path.join(path, "entries.json")
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._load()
+
+    def _load(self) -> None:
+        meta: Dict[str, Any] = {}
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        compatible = (meta.get("dim") == self.dim and meta.get("capacity") == self.capacity
+                      and os.path.exists(self._vectors_path))
+        self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+" if compatible else "w+",
+                                 shape=(self.capacity, self.dim))
+        # Slot -> Metadaten; sites hält die Aufrufstelle jedes Slots für die Maskierung
+        self.entries: Dict[int, Dict[str, Any]] = {}
+        self.sites = np.full(self.capacity, "", dtype=object)
+        if compatible:
+            for slot, entry in meta.get("entries", {}).items():
+                self.entries[int(slot)] = entry
+                self.sites[int(slot)] = entry["site"]
+
+    def _save(self) -> None:
+        self.vectors.flush()
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "capacity": self.capacity,
+                       "entries": {str(slot): entry for slot, entry in self.entries.items()}},
+                      f, ensure_ascii=False)
+        os.replace(tmp, self._meta_path)
+
+    def threshold(self, site: str) -> float:
+        """Die Mindestähnlichkeit einer Aufrufstelle ("generate_code:gpt-4:python" -> "generate_code")."""
+        return self.thresholds.get(site, self.thresholds.get(site.split(":")[0], DEFAULT_THRESHOLD))
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.max_age is not None and now - entry["created"] > self.max_age
+
+    def lookup_many(self, site: str, texts: Sequence[str],
+                    verify: Optional[Callable[[Any], bool]] = None) -> List[Optional[Any]]:
+        """Sucht für mehrere Prompts gleichzeitig einen ausreichend ähnlichen Eintrag.
+
+        Args:
+            site: Die Aufrufstelle; nur Einträge derselben Stelle kommen in Frage
+            texts: Die Prompts
+            verify: Prüft einen gefundenen Wert; abgelehnte Werte werden übersprungen
+
+        Returns:
+            Pro Prompt der gespeicherte Wert oder None
+        """
+        with self._lock:
+            slots = np.flatnonzero(self.sites == site)
+            if not len(slots) or not texts:
+                self.misses += len(texts)
+                return [None] * len(texts)
+            queries = _normalized(self.embed_fn(texts))
+            # Eine Matrixmultiplikation für alle Anfragen gegen alle Einträge der Stelle
+            similarities = queries @ np.asarray(self.vectors[slots]).T
+            threshold = self.threshold(site)
+            now = time.time()
+
+            results: List[Optional[Any]] = []
+            for text, row in zip(texts, similarities):
+                guard = guard_tokens(text)
+                found = None
+                tried = 0
+                for index in np.argsort(-row):
+                    if row[index] < threshold or tried >= MAX_VERIFIED_CANDIDATES:
+                        break
+                    entry = self.entries[int(slots[index])]
+                    if entry["guard"] != guard or self._expired(entry, now):
+                        continue
+                    tried += 1
+                    if verify is not None and not verify(entry["value"]):
+                        self.rejected += 1
+                        continue
+                    entry["last_used"] = now
+                    entry["hits"] += 1
+                    found = entry["value"]
+                    break
+                if found is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                results.append(found)
+            return results
+
+    def lookup(self, site: str, text: str, verify: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """Sucht einen ausreichend ähnlichen Eintrag für einen Prompt (siehe lookup_many)."""
+        return self.lookup_many(site, [text], verify)[0]
+
+    def put(self, site: str, text: str, value: Any) -> None:
+        """Speichert eine Antwort; ein voller Cache ersetzt den am längsten ungenutzten Eintrag.
+
+        Args:
+            site: Die Aufrufstelle
+            text: Der Prompt
+            value: Die JSON-serialisierbare Antwort
+        """
+        vector = _normalized(self.embed_fn([text]))[0]
+        now = time.time()
+        with self._lock:
+            free = np.flatnonzero(self.sites == "")
+            if len(free):
+                slot = int(free[0])
+            else:
+                slot = min(self.entries, key=lambda s: (not self._expired(self.entries[s], now),
+                                                        self.entries[s]["last_used"]))
+            self.vectors[slot] = vector
+            self.sites[slot] = site
+            self.entries[slot] = {"site": site, "text": text, "guard": guard_tokens(text), "value": value,
+                                  "created": now, "last_used": now, "hits": 0}
+            self._save()
+
+    def flush(self) -> None:
+        """Schreibt Nutzungsstatistik (für LRU) auf die Platte."""
+        with self._lock:
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "rejected": self.rejected, "hit_rate": self.hits / lookups if lookups else 0.0}
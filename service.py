@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP-Service für den DevAssistantExtended.
+
+Statt pro Anfrage einen CLI-Prozess kalt zu starten, nimmt ein langlebiger Prozess
+Aufgaben per HTTP entgegen und stellt sie in eine Warteschlange. Ein Pool asynchroner
+Worker arbeitet sie ab; alle Worker teilen sich den LLM-Scheduler und den Cache für
+Tool-Empfehlungen. Fortschritt und gestreamte Code-Generierung werden per
+Server-Sent Events an die Clients geliefert. Beendete Aufgaben werden nach einer
+Frist vergessen; ihre gestreamten Code-Teile werden zu einem Ereignis zusammengefasst.
+
+Endpunkte:
+    POST /tasks               Aufgabe einreihen
+    GET  /tasks/{id}          Status und Ergebnis einer Aufgabe
+    GET  /tasks/{id}/events   Fortschritt als Server-Sent Events
+    GET  /metrics             Warteschlangenlänge, Latenzen, Scheduler-Statistik
+
+Verwendung:
+    python service.py --host 0.0.0.0 --port 8000 --workers 4
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from dev_assistant_extended import DevAssistantExtended
+from execution_scheduler import get_default_execution_scheduler
+from llm_scheduler import LLMScheduler, get_default_scheduler
+from task_queue import headless_answers
+
+# Ereignisse, nach denen eine Aufgabe beendet ist
+FINAL_EVENTS = ("task_finished", "task_failed")
+
+# Beendete Aufgaben werden nach JOB_TTL Sekunden vergessen, höchstens MAX_FINISHED_JOBS bleiben
+JOB_TTL = 3600
+MAX_FINISHED_JOBS = 1000
+
+# Höchstzahl gespeicherter Ereignisse pro Aufgabe; ältere fallen aus dem Verlauf
+MAX_EVENTS = 2000
+
+
+class TaskRequest(BaseModel):
+    """Eine eingereichte Entwicklungsaufgabe."""
+
+    task: str
+    execute: bool = False
+    deploy: bool = False
+    priority: str = "interactive"
+
+
+class Job:
+    """Zustand einer Aufgabe im Service."""
+
+    def __init__(self, job_id: str, request: TaskRequest, workdir: str):
+        self.id = job_id
+        self.request = request
+        self.workdir = workdir
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.summary: Optional[List[Dict[str, Any]]] = None
+        self.artifacts: List[str] = []
+        self.events: List[Dict[str, Any]] = []
+        self.listeners = 0
+        self.created = time.monotonic()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._last_id = 0
+        self._changed = asyncio.Event()
+
+    def push(self, event: str, data: Dict[str, Any]) -> None:
+        """Hängt ein Ereignis an und weckt wartende SSE-Clients (nur im Event-Loop aufrufen)."""
+        self._last_id += 1
+        self.events.append({"id": self._last_id, "event": event, "data": data})
+        if len(self.events) > MAX_EVENTS:
+            del self.events[:len(self.events) - MAX_EVENTS]
+        if event == "step_finished":
+            self.artifacts.extend(data.get("artifacts", []))
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait_for_events(self, seen: int) -> None:
+        """Wartet, bis ein Ereignis mit einer ID größer als seen vorliegt."""
+        while self._last_id <= seen:
+            await self._changed.wait()
+
+    def events_after(self, seen: int) -> List[Dict[str, Any]]:
+        """Gibt die gespeicherten Ereignisse mit einer ID größer als seen zurück."""
+        return [event for event in self.events if event["id"] > seen]
+
+    def compact(self) -> None:
+        """Fasst aufeinanderfolgende "code_delta"-Ereignisse einer beendeten Aufgabe zusammen.
+
+        Das zusammengefasste Ereignis trägt die ID des letzten Teils, sodass Clients
+        weiterhin ab einer ID fortsetzen können. Nur aufrufen, solange kein Client liest.
+        """
+        compacted: List[Dict[str, Any]] = []
+        for event in self.events:
+            previous = compacted[-1] if compacted else None
+            if event["event"] == "code_delta" and previous is not None and previous["event"] == "code_delta":
+                text = previous["data"].get("text", "") + event["data"].get("text", "")
+                compacted[-1] = {"id": event["id"], "event": "code_delta", "data": dict(event["data"], text=text)}
+            else:
+                compacted.append(event)
+        self.events = compacted
+
+    def answer(self, prompt: str) -> str:
+        """Beantwortet die Rückfragen von run() anhand der Optionen der Aufgabe."""
+        return headless_answers(self.workdir, self.request.execute, self.request.deploy)(prompt)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "task": self.request.task,
+            "status": self.status,
+            "error": self.error,
+            "artifacts": self.artifacts,
+            "summary": self.summary,
+            "queue_seconds": (self.started - self.created) if self.started else None,
+            "run_seconds": (self.finished - self.started) if self.finished and self.started else None,
+        }
+
+
+class AssistantService:
+    """Warteschlange, Worker-Pool und geteilter Zustand des Service."""
+
+    def __init__(self, workers: int = 4, api_key: Optional[str] = None,
+                 scheduler: Optional[LLMScheduler] = None, workdir: Optional[str] = None):
+        """Initialisiert den Service.
+
+        Args:
+            workers: Anzahl paralleler Worker
+            api_key: Der OpenAI API-Schlüssel
+            scheduler: Der geteilte LLM-Scheduler (Standard: prozessweit geteilt)
+            workdir: Basisverzeichnis für die Dateien der Aufgaben
+        """
+        self.workers = workers
+        self.api_key = api_key
+        self.scheduler = scheduler or get_default_scheduler()
+        self.workdir = workdir or tempfile.mkdtemp(prefix="dev_assistant_service_")
+        self.recommendation_cache: Dict[str, Dict[str, List[str]]] = {}
+        self.jobs: Dict[str, Job] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self.running = 0
+        self.counts = {"finished": 0, "failed": 0}
+        self._ids = itertools.count(1)
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, request: TaskRequest) -> Job:
+        """Reiht eine Aufgabe ein."""
+        self.evict()
+        job_id = str(next(self._ids))
+        workdir = os.path.join(self.workdir, job_id)
+        os.makedirs(workdir, exist_ok=True)
+        job = Job(job_id, request, workdir)
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job)
+        return job
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Vergisst beendete Aufgaben nach JOB_TTL bzw. über MAX_FINISHED_JOBS hinaus.
+
+        Die Dateien der Aufgaben bleiben im Arbeitsverzeichnis erhalten.
+
+        Args:
+            now: Der aktuelle Zeitpunkt (Standard: time.monotonic())
+
+        Returns:
+            Die Anzahl entfernter Aufgaben
+        """
+        now = time.monotonic() if now is None else now
+        done = sorted((job for job in self.jobs.values() if job.finished is not None), key=lambda job: job.finished)
+        excess = max(len(done) - MAX_FINISHED_JOBS, 0)
+        expired = [job for index, job in enumerate(done) if index < excess or now - job.finished > JOB_TTL]
+        for job in expired:
+            del self.jobs[job.id]
+        return len(expired)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._process(job)
+            finally:
+                self.queue.task_done()
+
+    async def _process(self, job: Job) -> None:
+        loop = self._loop
+
+        def emit(event: str, data: Dict[str, Any]) -> None:
+            loop.call_soon_threadsafe(job.push, event, data)
+
+        assistant = DevAssistantExtended(
+            api_key=self.api_key,
+            scheduler=self.scheduler,
+            priority=job.request.priority,
+            answer_fn=job.answer,
+            event_fn=emit,
+            recommendation_cache=self.recommendation_cache,
+            project_dir=job.workdir,
+        )
+
+        job.status = "running"
+        job.started = time.monotonic()
+        self.running += 1
+        try:
+            await asyncio.to_thread(assistant.run, job.request.task)
+            job.summary = assistant.last_trace.summary() if assistant.last_trace else None
+            job.status = "finished"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            job.push("task_failed", {"error": job.error})
+        finally:
+            self.running -= 1
+            if job.status in self.counts:
+                self.counts[job.status] += 1
+            job.finished = time.monotonic()
+            if not job.listeners:
+                job.compact()
+            self.evict()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Gibt Warteschlangen- und Latenzmetriken zurück."""
+        done = [job for job in self.jobs.values() if job.finished is not None]
+        queue_waits = [job.started - job.created for job in done]
+        run_times = [job.finished - job.started for job in done]
+
+        def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+            if not values:
+                return {"p50": None, "p95": None}
+            return {"p50": float(np.percentile(values, 50)), "p95": float(np.percentile(values, 95))}
+
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "running": self.running,
+            "workers": self.workers,
+            "finished": self.counts["finished"],
+            "failed": self.counts["failed"],
+            "jobs": len(self.jobs),
+            "queue_seconds": percentiles(queue_waits),
+            "run_seconds": percentiles(run_times),
+            "llm": self.scheduler.stats(),
+            "execution": get_default_execution_scheduler().stats(),
+        }
+
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    data = json.dumps(event["data"], ensure_ascii=False, default=str)
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+
+def create_app(service: Optional[AssistantService] = None) -> FastAPI:
+    """Erstellt die FastAPI-Anwendung.
+
+    Args:
+        service: Der zu verwendende Service (Standard: neuer AssistantService)
+
+    Returns:
+        Die FastAPI-Anwendung
+    """
+    service = service or AssistantService(api_key=os.environ.get("OPENAI_API_KEY") or None)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await service.start()
+        yield
+        await service.stop()
+
+    app = FastAPI(title="DevAssistant Service", lifespan=lifespan)
+    app.state.service = service
+
+    def get_job(job_id: str) -> Job:
+        job = service.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Aufgabe nicht gefunden")
+        return job
+
+    @app.post("/tasks", status_code=202)
+    async def submit_task(request: TaskRequest) -> Dict[str, Any]:
+        if not request.task.strip():
+            raise HTTPException(status_code=400, detail="Keine Aufgabe eingegeben.")
+        job = service.submit(request)
+        return {"id": job.id, "status": job.status, "queue_depth": service.queue.qsize()}
+
+    @app.get("/tasks/{job_id}")
+    async def get_task(job_id: str) -> Dict[str, Any]:
+        return get_job(job_id).to_dict()
+
+    @app.get("/tasks/{job_id}/events")
+    async def stream_events(job_id: str, since: int = 0) -> StreamingResponse:
+        job = get_job(job_id)
+
+        async def generate():
+            seen = since
+            job.listeners += 1
+            try:
+                while True:
+                    await job.wait_for_events(seen)
+                    for event in job.events_after(seen):
+                        yield _format_sse(event)
+                        seen = event["id"]
+                        if event["event"] in FINAL_EVENTS:
+                            return
+            finally:
+                job.listeners -= 1
+                if job.finished is not None and not job.listeners:
+                    job.compact()
+
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    @app.get("/metrics")
+    async def get_metrics() -> Dict[str, Any]:
+        return service.metrics()
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DevAssistant als HTTP-Service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    service = AssistantService(workers=args.workers, api_key=os.environ.get("OPENAI_API_KEY") or None)
+    uvicorn.run(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,763 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Geteilte, dauerhafte Warteschlange für den Worker-Betrieb auf mehreren Rechnern.
+
+Worker holen Aufgaben nicht einfach ab, sondern leihen sie mit einer Sichtbarkeitsfrist
+(Lease) aus. Solange ein Worker arbeitet, verlängert er die Frist per Heartbeat. Stirbt
+er, läuft die Frist ab und reclaim() stellt die Aufgabe wieder ein; nach max_attempts
+Versuchen landet sie als "dead" in der Warteschlange. Jede Lease trägt ein Token;
+complete() und fail() eines Workers, der seine Lease verloren hat, werden abgewiesen.
+
+Mandanten (tenant) werden reihum bedient, sodass ein Mandant mit vielen Aufgaben die
+übrigen nicht aushungert; innerhalb eines Mandanten gilt FIFO.
+
+Backends:
+    SQLiteTaskQueue   eine SQLite-Datei, lokal oder auf einem gemeinsamen Dateisystem
+    RedisTaskQueue    Redis (redis-py mit decode_responses=True) oder LocalRedis als
+                      prozessinterner Ersatz für Tests und Entwicklung
+
+Verwendung:
+    python task_queue.py --queue sqlite:///srv/queue.db submit "Baue eine API" --tenant team-a
+    python task_queue.py --queue redis://build-cache:6379/0 worker --workers 4
+    python task_queue.py --queue sqlite:///srv/queue.db stats
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Standard-Sichtbarkeitsfrist einer Lease in Sekunden
+VISIBILITY_TIMEOUT = 300.0
+
+# Versuche, bevor eine Aufgabe als "dead" aufgegeben wird
+MAX_ATTEMPTS = 3
+
+STATUSES = ("queued", "leased", "done", "failed", "dead")
+
+
+class Lease:
+    """Eine ausgeliehene Aufgabe."""
+
+    def __init__(self, task_id: str, token: str, tenant: str, payload: Dict[str, Any],
+                 attempt: int, expires: float):
+        self.task_id = task_id
+        self.token = token
+        self.tenant = tenant
+        self.payload = payload
+        self.attempt = attempt
+        self.expires = expires
+
+
+def headless_answers(workdir: str, execute: bool = False, deploy: bool = False) -> Callable[[str], str]:
+    """Erzeugt eine answer_fn, die die Rückfragen von run() ohne Benutzer beantwortet.
+
+    Args:
+        workdir: Verzeichnis für generierte Dateien
+        execute: Ob generierter Code und Tests ausgeführt werden sollen
+        deploy: Ob Infrastruktur eingerichtet werden soll
+
+    Returns:
+        Die Antwortfunktion
+    """
+    def answer(prompt: str) -> str:
+        if "Dateiname für die Tests" in prompt:
+            return os.path.join(workdir, "test_main.py")
+        if "Dateiname" in prompt:
+            return os.path.join(workdir, "main.py")
+        if "Cloud-Infrastruktur" in prompt or "Terraform" in prompt:
+            return "j" if deploy else "n"
+        return "j" if execute else "n"
+
+    return answer
+
+
+class SQLiteTaskQueue:
+    """Warteschlange in einer SQLite-Datei.
+
+    Alle Zustandswechsel laufen in BEGIN IMMEDIATE-Transaktionen, sodass mehrere
+    Prozesse (auch auf verschiedenen Rechnern mit gemeinsamem Dateisystem) dieselbe
+    Datei nutzen können. Auf Netzwerk-Dateisystemen wird bewusst kein WAL-Journal
+    verwendet, da es gemeinsamen Speicher voraussetzt.
+    """
+
+    def __init__(self, path: str, visibility_timeout: float = VISIBILITY_TIMEOUT,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.clock = clock
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL,
+                tenant TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                owner TEXT,
+                token TEXT,
+                expires REAL,
+                result TEXT,
+                error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, tenant, seq);
+            CREATE TABLE IF NOT EXISTS tenants (
+                tenant TEXT PRIMARY KEY,
+                last_served INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            self._local.db = db
+        return db
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def enqueue(self, payload: Dict[str, Any], tenant: str = "default",
+                max_attempts: int = MAX_ATTEMPTS) -> str:
+        """Stellt eine Aufgabe ein und gibt ihre ID zurück."""
+        task_id = uuid.uuid4().hex
+        now = self.clock()
+        with self._transaction() as db:
+            seq = db.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM tasks").fetchone()[0]
+            db.execute(
+                "INSERT INTO tasks (id, seq, tenant, payload, status, max_attempts, created, updated) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (task_id, seq, tenant, json.dumps(payload), max_attempts, now, now),
+            )
+            db.execute("INSERT OR IGNORE INTO tenants (tenant) VALUES (?)", (tenant,))
+        return task_id
+
+    def _reclaim(self, db: sqlite3.Connection, now: float) -> int:
+        expired = db.execute(
+            "SELECT id, attempts, max_attempts FROM tasks WHERE status = 'leased' AND expires < ?", (now,)
+        ).fetchall()
+        for row in expired:
+            status = "dead" if row["attempts"] >= row["max_attempts"] else "queued"
+            db.execute(
+                "UPDATE tasks SET status = ?, owner = NULL, token = NULL, expires = NULL, "
+                "error = 'Lease abgelaufen', updated = ? WHERE id = ?",
+                (status, now, row["id"]),
+            )
+        return len(expired)
+
+    def reclaim(self) -> int:
+        """Stellt Aufgaben mit abgelaufener Lease wieder ein; gibt ihre Anzahl zurück."""
+        with self._transaction() as db:
+            return self._reclaim(db, self.clock())
+
+    def lease(self, worker_id: str, visibility_timeout: Optional[float] = None) -> Optional[Lease]:
+        """Leiht die nächste Aufgabe aus (Mandanten reihum, innerhalb FIFO).
+
+        Args:
+            worker_id: Kennung des Workers (nur zur Diagnose)
+            visibility_timeout: Frist in Sekunden (Standard: die der Warteschlange)
+
+        Returns:
+            Die Lease oder None, wenn keine Aufgabe bereitsteht
+        """
+        timeout = visibility_timeout or self.visibility_timeout
+        now = self.clock()
+        with self._transaction() as db:
+            self._reclaim(db, now)
+            row = db.execute("""
+                SELECT t.id, t.tenant, t.payload, t.attempts FROM tasks t
+                JOIN tenants n ON n.tenant = t.tenant
+                WHERE t.status = 'queued'
+                ORDER BY n.last_served, t.seq
+                LIMIT 1
+            """).fetchone()
+            if row is None:
+                return None
+            token = uuid.uuid4().hex
+            expires = now + timeout
+            db.execute(
+                "UPDATE tasks SET status = 'leased', attempts = attempts + 1, owner = ?, token = ?, "
+                "expires = ?, updated = ? WHERE id = ?",
+                (worker_id, token, expires, now, row["id"]),
+            )
+            db.execute(
+                "UPDATE tenants SET last_served = (SELECT MAX(last_served) + 1 FROM tenants) WHERE tenant = ?",
+                (row["tenant"],),
+            )
+        return Lease(row["id"], token, row["tenant"], json.loads(row["payload"]), row["attempts"] + 1, expires)
+
+    def heartbeat(self, lease: Lease, visibility_timeout: Optional[float] = None) -> bool:
+        """Verlängert eine Lease; False, wenn sie inzwischen verloren ist."""
+        expires = self.clock() + (visibility_timeout or self.visibility_timeout)
+        with self._transaction() as db:
+            changed = db.execute(
+                "UPDATE tasks SET expires = ? WHERE id = ? AND token = ? AND status = 'leased'",
+                (expires, lease.task_id, lease.token),
+            ).rowcount
+        if changed:
+            lease.expires = expires
+        return bool(changed)
+
+    def complete(self, lease: Lease, result: Any = None) -> bool:
+        """Markiert eine Aufgabe als erledigt; False, wenn die Lease verloren ist."""
+        return self._finish(lease, "'done'", result=json.dumps(result, default=str))
+
+    def fail(self, lease: Lease, error: str, retry: bool = True) -> bool:
+        """Meldet einen Fehlschlag; die Aufgabe wird bei retry erneut eingestellt, solange Versuche übrig sind."""
+        requeue = "CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END" if retry else "'failed'"
+        return self._finish(lease, requeue, error=error)
+
+    def _finish(self, lease: Lease, status_sql: str, result: Optional[str] = None,
+                error: Optional[str] = None) -> bool:
+        with self._transaction() as db:
+            changed = db.execute(
+                f"UPDATE tasks SET status = {status_sql}, result = ?, error = ?, owner = NULL, token = NULL, "
+                "expires = NULL, updated = ? WHERE id = ? AND token = ? AND status = 'leased'",
+                (result, error, self.clock(), lease.task_id, lease.token),
+            ).rowcount
+        return bool(changed)
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Gibt den Zustand einer Aufgabe zurück."""
+        row = self._connection().execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "tenant": row["tenant"],
+            "payload": json.loads(row["payload"]),
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "owner": row["owner"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Zählt Aufgaben pro Status und wartende Aufgaben pro Mandant."""
+        db = self._connection()
+        counts = dict(db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+        tenants = dict(db.execute(
+            "SELECT tenant, COUNT(*) FROM tasks WHERE status = 'queued' GROUP BY tenant").fetchall())
+        return {"tasks": {status: counts.get(status, 0) for status in STATUSES}, "queued_by_tenant": tenants}
+
+
+class LocalRedis:
+    """Prozessinterner Ersatz für die von RedisTaskQueue genutzten Redis-Befehle.
+
+    Verhält sich wie redis.Redis(decode_responses=True); jeder Befehl ist atomar.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, factory):
+        value = self._data.get(key)
+        if value is None:
+            value = self._data[key] = factory()
+        return value
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._data[key] = int(self._data.get(key, 0)) + 1
+            return self._data[key]
+
+    def hset(self, key: str, mapping: Dict[str, Any]) -> int:
+        with self._lock:
+            data = self._get(key, dict)
+            added = sum(1 for field in mapping if field not in data)
+            data.update({field: str(value) for field, value in mapping.items()})
+            return added
+
+    def hget(self, key: str, field: str) -> Optional[str]:
+        with self._lock:
+            return self._data.get(key, {}).get(field)
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._data.get(key, {}))
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        with self._lock:
+            data = self._get(key, dict)
+            data[field] = str(int(data.get(field, 0)) + amount)
+            return int(data[field])
+
+    def rpush(self, key: str, *values: str) -> int:
+        with self._lock:
+            items = self._get(key, list)
+            items.extend(str(value) for value in values)
+            return len(items)
+
+    def lpop(self, key: str) -> Optional[str]:
+        with self._lock:
+            items = self._data.get(key)
+            return items.pop(0) if items else None
+
+    def lrange(self, key: str, start: int, end: int) -> List[str]:
+        with self._lock:
+            items = self._data.get(key, [])
+            return list(items[start:] if end == -1 else items[start:end + 1])
+
+    def lrem(self, key: str, count: int, value: str) -> int:
+        with self._lock:
+            items = self._data.get(key, [])
+            removed = 0
+            while value in items and (count == 0 or removed < abs(count)):
+                items.remove(value)
+                removed += 1
+            return removed
+
+    def llen(self, key: str) -> int:
+        with self._lock:
+            return len(self._data.get(key, []))
+
+    def lmove(self, source: str, destination: str, src: str = "LEFT", dest: str = "RIGHT") -> Optional[str]:
+        with self._lock:
+            items = self._data.get(source)
+            if not items:
+                return None
+            value = items.pop(0 if src == "LEFT" else -1)
+            target = self._get(destination, list)
+            if dest == "RIGHT":
+                target.append(value)
+            else:
+                target.insert(0, value)
+            return value
+
+    def sadd(self, key: str, *members: str) -> int:
+        with self._lock:
+            items = self._get(key, set)
+            added = sum(1 for member in members if member not in items)
+            items.update(members)
+            return added
+
+    def zadd(self, key: str, mapping: Dict[str, float], xx: bool = False, nx: bool = False) -> int:
+        with self._lock:
+            scores = self._get(key, dict)
+            added = 0
+            for member, score in mapping.items():
+                if (xx and member not in scores) or (nx and member in scores):
+                    continue
+                added += member not in scores
+                scores[member] = float(score)
+            return added
+
+    def zrem(self, key: str, *members: str) -> int:
+        with self._lock:
+            scores = self._data.get(key, {})
+            return sum(1 for member in members if scores.pop(member, None) is not None)
+
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        with self._lock:
+            return self._data.get(key, {}).get(member)
+
+    def zrangebyscore(self, key: str, minimum: float, maximum: float) -> List[str]:
+        with self._lock:
+            scores = self._data.get(key, {})
+            return [member for member, score in sorted(scores.items(), key=lambda item: item[1])
+                    if float(minimum) <= score <= float(maximum)]
+
+
+class RedisTaskQueue:
+    """Warteschlange in Redis, ausschließlich mit atomaren Einzelbefehlen (ohne Lua).
+
+    Schlüssel (Präfix p):
+        p:task:<id>        Hash mit Nutzlast und Zustand
+        p:ready:<tenant>   Liste wartender Aufgaben eines Mandanten (FIFO)
+        p:claiming         Aufgaben, die ein Worker gerade übernimmt (noch ohne Lease)
+        p:tenants          Ring der Mandanten; lmove rotiert ihn für die Reihum-Auswahl
+        p:tenant_set       Menge der bekannten Mandanten
+        p:leases           Sorted Set Aufgabe -> Ablaufzeitpunkt
+
+    Wer eine Aufgabe per zrem aus p:leases entfernt, besitzt die Entscheidung über sie;
+    so kann eine Aufgabe nie zugleich abgeschlossen und zurückgeholt werden.
+
+    lease() verschiebt eine Aufgabe per lmove von p:ready nach p:claiming, trägt dann
+    die Lease ein und entfernt sie erst danach aus p:claiming. Fällt ein Worker
+    dazwischen aus, liegt die Aufgabe weiter in p:claiming (bzw. hat eine Lease) und
+    reclaim() stellt sie nach Ablauf der Sichtbarkeitsfrist wieder ein. Die Lease wird
+    mit NX eingetragen; findet ein verspäteter Worker bereits eine fremde vor, gibt er
+    die Aufgabe auf.
+    """
+
+    def __init__(self, client: Any, prefix: str = "dev_assistant", visibility_timeout: float = VISIBILITY_TIMEOUT,
+                 clock: Callable[[], float] = time.time):
+        self.client = client
+        self.prefix = prefix
+        self.visibility_timeout = visibility_timeout
+        self.clock = clock
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix,) + parts)
+
+    def enqueue(self, payload: Dict[str, Any], tenant: str = "default",
+                max_attempts: int = MAX_ATTEMPTS) -> str:
+        """Stellt eine Aufgabe ein und gibt ihre ID zurück."""
+        task_id = uuid.uuid4().hex
+        self.client.hset(self._key("task", task_id), mapping={
+            "tenant": tenant,
+            "payload": json.dumps(payload),
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": max_attempts,
+            "created": self.clock(),
+        })
+        if self.client.sadd(self._key("tenant_set"), tenant):
+            self.client.rpush(self._key("tenants"), tenant)
+        self.client.rpush(self._key("ready", tenant), task_id)
+        return task_id
+
+    def reclaim(self) -> int:
+        """Stellt Aufgaben mit abgelaufener Lease wieder ein; gibt ihre Anzahl zurück."""
+        reclaimed = 0
+        now = self.clock()
+        for task_id in self.client.zrangebyscore(self._key("leases"), "-inf", now):
+            if not self.client.zrem(self._key("leases"), task_id):
+                continue  # ein anderer Worker war schneller
+            # Ein Worker, der nach der Lease ausfiel, hinterlässt die Aufgabe auch in p:claiming
+            self.client.lrem(self._key("claiming"), 0, task_id)
+            key = self._key("task", task_id)
+            task = self.client.hgetall(key)
+            if int(task["attempts"]) >= int(task["max_attempts"]):
+                self.client.hset(key, mapping={"status": "dead", "token": "", "owner": "", "error": "Lease abgelaufen"})
+            else:
+                self.client.hset(key, mapping={"status": "queued", "token": "", "owner": "", "error": "Lease abgelaufen",
+                                               "claim_seen": ""})
+                self.client.rpush(self._key("ready", task["tenant"]), task_id)
+            reclaimed += 1
+
+        # Aufgaben, die ein Worker übernommen, aber nie mit einer Lease versehen hat
+        for task_id in self.client.lrange(self._key("claiming"), 0, -1):
+            if self.client.zscore(self._key("leases"), task_id) is not None:
+                continue
+            key = self._key("task", task_id)
+            seen = self.client.hget(key, "claim_seen")
+            if not seen:
+                # Erst beim nächsten Durchgang nach Ablauf der Frist gilt sie als verwaist
+                self.client.hset(key, mapping={"claim_seen": now})
+                continue
+            if now - float(seen) < self.visibility_timeout:
+                continue
+            if not self.client.lrem(self._key("claiming"), 1, task_id):
+                continue  # inzwischen übernommen oder von einem anderen Worker zurückgeholt
+            self.client.hset(key, mapping={"status": "queued", "token": "", "owner": "",
+                                           "error": "Übernahme abgebrochen", "claim_seen": ""})
+            self.client.rpush(self._key("ready", self.client.hget(key, "tenant")), task_id)
+            reclaimed += 1
+        return reclaimed
+
+    def lease(self, worker_id: str, visibility_timeout: Optional[float] = None) -> Optional[Lease]:
+        """Leiht die nächste Aufgabe aus (Mandanten reihum, innerhalb FIFO).
+
+        Args:
+            worker_id: Kennung des Workers (nur zur Diagnose)
+            visibility_timeout: Frist in Sekunden (Standard: die der Warteschlange)
+
+        Returns:
+            Die Lease oder None, wenn keine Aufgabe bereitsteht
+        """
+        self.reclaim()
+        tenants = self._key("tenants")
+        for _ in range(self.client.llen(tenants)):
+            tenant = self.client.lmove(tenants, tenants, "LEFT", "RIGHT")
+            if tenant is None:
+                return None
+            # Atomar nach p:claiming, damit die Aufgabe bei einem Ausfall nicht verloren geht
+            claiming = self._key("claiming")
+            task_id = self.client.lmove(self._key("ready", tenant), claiming, "LEFT", "RIGHT")
+            if task_id is None:
+                continue
+            expires = self.clock() + (visibility_timeout or self.visibility_timeout)
+            token = uuid.uuid4().hex
+            key = self._key("task", task_id)
+            # NX: ein Worker, der nach seinem LMOVE zu lange stand, überschreibt keine fremde Lease
+            if not self.client.zadd(self._key("leases"), {task_id: expires}, nx=True):
+                # Die Aufgabe wurde zurückgeholt und gehört inzwischen einem anderen Worker. Den
+                # eigenen Eintrag in p:claiming (falls noch vorhanden) räumt reclaim() auf.
+                continue
+            if not self.client.lrem(claiming, 1, task_id):
+                # reclaim() hielt die Übernahme für abgebrochen und hat die Aufgabe wieder eingestellt
+                if self.client.zscore(self._key("leases"), task_id) == expires:
+                    self.client.zrem(self._key("leases"), task_id)
+                continue
+            self.client.hset(key, mapping={"status": "leased", "token": token, "owner": worker_id, "claim_seen": ""})
+            attempt = self.client.hincrby(key, "attempts", 1)
+            payload = json.loads(self.client.hget(key, "payload"))
+            return Lease(task_id, token, tenant, payload, attempt, expires)
+        return None
+
+    def _owns(self, lease: Lease) -> bool:
+        return self.client.hget(self._key("task", lease.task_id), "token") == lease.token
+
+    def heartbeat(self, lease: Lease, visibility_timeout: Optional[float] = None) -> bool:
+        """Verlängert eine Lease; False, wenn sie inzwischen verloren ist."""
+        if not self._owns(lease):
+            return False
+        expires = self.clock() + (visibility_timeout or self.visibility_timeout)
+        # XX: nur aktualisieren, falls die Lease nicht gerade zurückgeholt wurde
+        self.client.zadd(self._key("leases"), {lease.task_id: expires}, xx=True)
+        if self.client.zscore(self._key("leases"), lease.task_id) != expires:
+            return False
+        lease.expires = expires
+        return True
+
+    def complete(self, lease: Lease, result: Any = None) -> bool:
+        """Markiert eine Aufgabe als erledigt; False, wenn die Lease verloren ist."""
+        if not self._owns(lease) or not self.client.zrem(self._key("leases"), lease.task_id):
+            return False
+        self.client.hset(self._key("task", lease.task_id), mapping={
+            "status": "done", "token": "", "owner": "", "error": "",
+            "result": json.dumps(result, default=str),
+        })
+        return True
+
+    def fail(self, lease: Lease, error: str, retry: bool = True) -> bool:
+        """Meldet einen Fehlschlag; die Aufgabe wird bei retry erneut eingestellt, solange Versuche übrig sind."""
+        if not self._owns(lease) or not self.client.zrem(self._key("leases"), lease.task_id):
+            return False
+        key = self._key("task", lease.task_id)
+        task = self.client.hgetall(key)
+        requeue = retry and int(task["attempts"]) < int(task["max_attempts"])
+        self.client.hset(key, mapping={"status": "queued" if requeue else "failed",
+                                       "token": "", "owner": "", "error": error, "claim_seen": ""})
+        if requeue:
+            self.client.rpush(self._key("ready", task["tenant"]), lease.task_id)
+        return True
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Gibt den Zustand einer Aufgabe zurück."""
+        task = self.client.hgetall(self._key("task", task_id))
+        if not task:
+            return None
+        return {
+            "id": task_id,
+            "tenant": task["tenant"],
+            "payload": json.loads(task["payload"]),
+            "status": task["status"],
+            "attempts": int(task["attempts"]),
+            "owner": task.get("owner") or None,
+            "result": json.loads(task["result"]) if task.get("result") else None,
+            "error": task.get("error") or None,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Wartende Aufgaben pro Mandant und laufende Leases."""
+        tenants = {tenant: self.client.llen(self._key("ready", tenant))
+                   for tenant in self.client.lrange(self._key("tenants"), 0, -1)}
+        leased = len(self.client.zrangebyscore(self._key("leases"), "-inf", "+inf"))
+        return {"tasks": {"queued": sum(tenants.values()), "leased": leased},
+                "queued_by_tenant": {tenant: count for tenant, count in tenants.items() if count}}
+
+
+def open_queue(url: str, visibility_timeout: float = VISIBILITY_TIMEOUT):
+    """Öffnet eine Warteschlange anhand einer URL.
+
+    Args:
+        url: "sqlite:///pfad/queue.db" (oder ein Dateipfad), "redis://host:port/db"
+            oder "memory://" (LocalRedis)
+        visibility_timeout: Standard-Sichtbarkeitsfrist der Leases
+
+    Returns:
+        Die Warteschlange
+    """
+    if url.startswith(("redis://", "rediss://")):
+        import redis
+
+        client = redis.Redis.from_url(url, decode_responses=True)
+        return RedisTaskQueue(client, visibility_timeout=visibility_timeout)
+    if url.startswith("memory://"):
+        return RedisTaskQueue(LocalRedis(), visibility_timeout=visibility_timeout)
+    path = url[len("sqlite://"):] if url.startswith("sqlite://") else url
+    # sqlite:///abs/pfad -> /abs/pfad, sqlite://rel/pfad -> rel/pfad
+    return SQLiteTaskQueue(path, visibility_timeout=visibility_timeout)
+
+
+class QueueWorker:
+    """Arbeitet Aufgaben aus einer geteilten Warteschlange mit dem DevAssistantExtended ab.
+
+    Die Nutzlast einer Aufgabe entspricht dem TaskRequest des Service ("task",
+    "execute", "deploy", "priority"). Dateien und Checkpoints liegen unter
+    workdir/<Aufgaben-ID>; liegt workdir auf einem gemeinsamen Dateisystem, setzt ein
+    anderer Worker eine zurückgeholte Aufgabe an ihrem letzten Checkpoint fort.
+    """
+
+    def __init__(self, queue, workdir: str, worker_id: Optional[str] = None,
+                 visibility_timeout: Optional[float] = None, heartbeat_interval: Optional[float] = None,
+                 api_key: Optional[str] = None, scheduler=None,
+                 assistant_factory: Optional[Callable[..., Any]] = None):
+        """Initialisiert den Worker.
+
+        Args:
+            queue: Die Warteschlange (SQLiteTaskQueue oder RedisTaskQueue)
+            workdir: Basisverzeichnis für Dateien und Checkpoints der Aufgaben
+            worker_id: Kennung des Workers (Standard: Rechnername und PID)
+            visibility_timeout: Sichtbarkeitsfrist der Leases (Standard: die der Warteschlange)
+            heartbeat_interval: Abstand der Heartbeats (Standard: ein Drittel der Frist)
+            api_key: Der OpenAI API-Schlüssel
+            scheduler: Der LLM-Scheduler (Standard: prozessweit geteilt)
+            assistant_factory: Erzeugt den Assistenten (Standard: DevAssistantExtended)
+        """
+        self.queue = queue
+        self.workdir = workdir
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.visibility_timeout = visibility_timeout or queue.visibility_timeout
+        self.heartbeat_interval = heartbeat_interval or self.visibility_timeout / 3
+        self.api_key = api_key
+        self.scheduler = scheduler
+        self.assistant_factory = assistant_factory
+        self.processed = 0
+        self.lost_leases = 0
+
+    def _assistant(self, payload: Dict[str, Any], workdir: str):
+        factory = self.assistant_factory
+        if factory is None:
+            from dev_assistant_extended import DevAssistantExtended as factory
+        return factory(
+            api_key=self.api_key,
+            scheduler=self.scheduler,
+            priority=payload.get("priority", "batch"),
+            answer_fn=headless_answers(workdir, payload.get("execute", False), payload.get("deploy", False)),
+            checkpoint_dir=os.path.join(workdir, ".checkpoints"),
+            project_dir=workdir,
+        )
+
+    def _heartbeat(self, lease: Lease, stop: threading.Event, lost: threading.Event) -> None:
+        while not stop.wait(self.heartbeat_interval):
+            if not self.queue.heartbeat(lease, self.visibility_timeout):
+                lost.set()
+                return
+
+    def process(self, lease: Lease) -> Tuple[str, Any]:
+        """Führt eine ausgeliehene Aufgabe aus und meldet das Ergebnis.
+
+        Returns:
+            ("done" | "failed" | "lost", Ergebnis oder Fehlermeldung)
+        """
+        workdir = os.path.join(self.workdir, lease.task_id)
+        os.makedirs(workdir, exist_ok=True)
+        stop, lost = threading.Event(), threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(lease, stop, lost), daemon=True)
+        heartbeat.start()
+        try:
+            assistant = self._assistant(lease.payload, workdir)
+            assistant.run(lease.payload["task"])
+            trace = getattr(assistant, "last_trace", None)
+            outcome: Tuple[str, Any] = ("done", {"summary": trace.summary() if trace else None, "workdir": workdir})
+        except Exception as e:
+            outcome = ("failed", str(e))
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        status, value = outcome
+        accepted = self.queue.complete(lease, value) if status == "done" else self.queue.fail(lease, value)
+        if lost.is_set() or not accepted:
+            # Ein anderer Worker hat die Aufgabe übernommen; das Ergebnis wird verworfen
+            self.lost_leases += 1
+            return "lost", value
+        self.processed += 1
+        return outcome
+
+    def run_once(self) -> Optional[Tuple[str, Any]]:
+        """Leiht und bearbeitet höchstens eine Aufgabe; None, wenn keine bereitsteht."""
+        lease = self.queue.lease(self.worker_id, self.visibility_timeout)
+        if lease is None:
+            return None
+        print(f"[{self.worker_id}] Aufgabe {lease.task_id} ({lease.tenant}, Versuch {lease.attempt}): "
+              f"{lease.payload['task']}")
+        return self.process(lease)
+
+    def run(self, poll_interval: float = 1.0, stop: Optional[threading.Event] = None,
+            max_tasks: Optional[int] = None) -> None:
+        """Bearbeitet Aufgaben, bis stop gesetzt ist oder max_tasks erreicht sind.
+
+        Args:
+            poll_interval: Wartezeit, wenn die Warteschlange leer ist
+            stop: Beendet die Schleife nach der laufenden Aufgabe
+            max_tasks: Maximale Anzahl bearbeiteter Aufgaben
+        """
+        stop = stop or threading.Event()
+        handled = 0
+        while not stop.is_set() and (max_tasks is None or handled < max_tasks):
+            if self.run_once() is None:
+                stop.wait(poll_interval)
+            else:
+                handled += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Geteilte Warteschlange für den DevAssistant")
+    parser.add_argument("--queue", default=os.environ.get("DEV_ASSISTANT_QUEUE", "sqlite:///dev_assistant_queue.db"),
+                        help="sqlite:///pfad, redis://host:port/db oder memory://")
+    parser.add_argument("--visibility-timeout", type=float, default=VISIBILITY_TIMEOUT)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Aufgabe einreihen")
+    submit.add_argument("task")
+    submit.add_argument("--tenant", default="default")
+    submit.add_argument("--execute", action="store_true")
+    submit.add_argument("--deploy", action="store_true")
+    submit.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS)
+
+    worker = commands.add_parser("worker", help="Aufgaben abarbeiten")
+    worker.add_argument("--workers", type=int, default=1, help="Worker-Threads in diesem Prozess")
+    worker.add_argument("--workdir", default="dev_assistant_jobs")
+    worker.add_argument("--poll-interval", type=float, default=1.0)
+
+    commands.add_parser("stats", help="Zustand der Warteschlange anzeigen")
+    args = parser.parse_args()
+
+    queue = open_queue(args.queue, args.visibility_timeout)
+    if args.command == "submit":
+        task_id = queue.enqueue({"task": args.task, "execute": args.execute, "deploy": args.deploy,
+                                 "priority": "batch"}, tenant=args.tenant, max_attempts=args.max_attempts)
+        print(task_id)
+    elif args.command == "stats":
+        print(json.dumps(queue.stats(), indent=2, ensure_ascii=False))
+    else:
+        api_key = os.environ.get("OPENAI_API_KEY") or None
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=QueueWorker(queue, args.workdir, api_key=api_key).run,
+                             kwargs={"poll_interval": args.poll_interval, "stop": stop})
+            for _ in range(args.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            print("Beende Worker nach der laufenden Aufgabe...")
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Zusammenfassung von Terraform-Plänen aus `terraform show -json`.
+
+Die JSON-Darstellung eines Plans enthält neben den Änderungen (resource_changes) auch
+den vollständigen bisherigen und geplanten Zustand und wird bei großen Stacks schnell
+Hunderte Megabyte groß. iter_resource_changes() liest sie deshalb als Strom: Die
+übrigen Schlüssel auf oberster Ebene werden per Regex übersprungen, ohne Objekte
+anzulegen, und von resource_changes wird immer nur ein Element dekodiert. Der
+Speicherbedarf hängt damit von der größten einzelnen Änderung ab, nicht vom Plan.
+
+PlanSummary zählt Erstellen/Ändern/Ersetzen/Löschen pro Ressourcentyp und Modul und
+merkt sich destruktive Änderungen (Löschen und Ersetzen) bis zu einer festen Anzahl.
+"""
+
+import json
+import re
+import subprocess
+import tempfile
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from tracing import span
+
+CHUNK_SIZE = 1 << 16
+
+# So viele destruktive Änderungen werden namentlich aufgeführt
+MAX_LISTED_DESTRUCTIVE = 20
+
+# So viele Ressourcentypen bzw. Module zeigt format() höchstens an
+MAX_LISTED_GROUPS = 15
+
+ROOT_MODULE = "(root)"
+
+ACTIONS = ("create", "update", "replace", "delete")
+ACTION_LABELS = {"create": "zu erstellen", "update": "zu ändern", "replace": "zu ersetzen", "delete": "zu löschen"}
+ACTION_SYMBOLS = {"create": "+", "update": "~", "replace": "-/+", "delete": "-"}
+
+_WS_RE = re.compile(r"[ \t\r\n]*")
+_STRUCTURE_RE = re.compile(r'["{}\[\]]')
+_STRING_END_RE = re.compile(r'["\\]')
+_SCALAR_RE = re.compile(r"[^,\]}\s]*")
+
+_decoder = json.JSONDecoder()
+
+
+class JsonStream:
+    """Liest JSON stückweise aus einem Textstrom."""
+
+    def __init__(self, stream: TextIO, chunk_size: int = CHUNK_SIZE):
+        """Initialisiert den Leser.
+
+        Args:
+            stream: Der Textstrom (z.B. stdout von terraform show -json)
+            chunk_size: Anzahl Zeichen pro Lesevorgang
+        """
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.max_buffer = 0
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Bereits verarbeitete Zeichen verwerfen, damit der Puffer begrenzt bleibt
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.max_buffer = max(self.max_buffer, len(self.buffer))
+        return True
+
+    def _need_more(self) -> None:
+        if not self._fill():
+            raise ValueError("Unerwartetes Ende der JSON-Daten")
+
+    def peek(self) -> str:
+        """Überspringt Leerraum und liefert das nächste Zeichen ("" am Ende)."""
+        while True:
+            self.pos = _WS_RE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, allowed: str) -> str:
+        """Liest das nächste Strukturzeichen, das in allowed enthalten sein muss."""
+        char = self.peek()
+        if not char or char not in allowed:
+            raise ValueError(f"Erwartet {allowed!r}, gefunden {char or 'Dateiende'!r} an Position {self.pos}")
+        self.pos += 1
+        return char
+
+    def read_string(self) -> str:
+        """Liest eine Zeichenkette (z.B. einen Schlüssel)."""
+        self.expect('"')
+        while True:
+            try:
+                value, end = json.decoder.scanstring(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                self._need_more()
+                continue
+            self.pos = end
+            return value
+
+    def decode_value(self) -> Any:
+        """Dekodiert den nächsten Wert vollständig."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Große Werte mit wachsenden Blöcken nachladen, sonst wird quadratisch oft dekodiert
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            self.pos = end
+            return value
+
+    def _skip_string_body(self) -> None:
+        while True:
+            match = _STRING_END_RE.search(self.buffer, self.pos)
+            if match is None or (match.group() == "\\" and match.end() >= len(self.buffer)):
+                self.pos = len(self.buffer) if match is None else match.start()
+                self._need_more()
+                continue
+            if match.group() == '"':
+                self.pos = match.end()
+                return
+            self.pos = match.end() + 1
+
+    def skip_value(self) -> None:
+        """Überspringt den nächsten Wert, ohne ihn zu dekodieren."""
+        char = self.peek()
+        if char == '"':
+            self.pos += 1
+            self._skip_string_body()
+            return
+        if char not in "{[":
+            while True:
+                end = _SCALAR_RE.match(self.buffer, self.pos).end()
+                if end < len(self.buffer) or not self._fill():
+                    break
+            self.pos = end
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURE_RE.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+                self._need_more()
+                continue
+            self.pos = match.end()
+            token = match.group()
+            if token == '"':
+                self._skip_string_body()
+            elif token in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+
+def iter_resource_changes(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """Liefert die Einträge von resource_changes eines JSON-Plans nacheinander.
+
+    Args:
+        stream: Die Ausgabe von `terraform show -json <planfile>` als Textstrom
+        chunk_size: Anzahl Zeichen pro Lesevorgang
+
+    Returns:
+        Ein Iterator über die Änderungen (jeweils ein dict)
+    """
+    reader = JsonStream(stream, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.read_string()
+        reader.expect(":")
+        if key == "resource_changes" and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    yield reader.decode_value()
+                    if reader.expect(",]") == "]":
+                        break
+        else:
+            reader.skip_value()
+        if reader.expect(",}") == "}":
+            return
+
+
+def classify_actions(actions: List[str]) -> Optional[str]:
+    """Bildet die Aktionsliste einer Änderung auf create/update/replace/delete ab.
+
+    Returns:
+        Die Aktion oder None für no-op und read
+    """
+    if "delete" in actions and "create" in actions:
+        return "replace"
+    for action in ("create", "update", "delete"):
+        if action in actions:
+            return action
+    return None
+
+
+class PlanSummary:
+    """Aggregierte Änderungen eines Terraform-Plans."""
+
+    def __init__(self, max_listed: int = MAX_LISTED_DESTRUCTIVE):
+        self.max_listed = max_listed
+        self.totals: Counter = Counter()
+        self.by_type: Dict[str, Counter] = defaultdict(Counter)
+        self.by_module: Dict[str, Counter] = defaultdict(Counter)
+        self.destructive: List[Tuple[str, str]] = []
+        self.destructive_count = 0
+        self.unchanged = 0
+
+    def add(self, change: Dict[str, Any]) -> None:
+        """Zählt eine Änderung aus resource_changes."""
+        action = classify_actions(change.get("change", {}).get("actions", []))
+        if action is None:
+            self.unchanged += 1
+            return
+        self.totals[action] += 1
+        self.by_type[change.get("type", "?")][action] += 1
+        self.by_module[change.get("module_address") or ROOT_MODULE][action] += 1
+        if action in ("delete", "replace"):
+            self.destructive_count += 1
+            if len(self.destructive) < self.max_listed:
+                self.destructive.append((change.get("address", "?"), action))
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.totals)
+
+    @property
+    def is_destructive(self) -> bool:
+        return self.destructive_count > 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "totals": {action: self.totals[action] for action in ACTIONS},
+            "by_type": {name: dict(counts) for name, counts in self.by_type.items()},
+            "by_module": {name: dict(counts) for name, counts in self.by_module.items()},
+            "destructive": [{"address": address, "action": action} for address, action in self.destructive],
+            "destructive_count": self.destructive_count,
+        }
+
+    @staticmethod
+    def _format_groups(title: str, groups: Dict[str, Counter]) -> List[str]:
+        ranked = sorted(groups.items(), key=lambda item: (-sum(item[1].values()), item[0]))
+        width = max(len(name) for name, _ in ranked[:MAX_LISTED_GROUPS])
+        lines = [title]
+        for name, counts in ranked[:MAX_LISTED_GROUPS]:
+            cells = " ".join(f"{ACTION_SYMBOLS[action]}{counts[action]}" for action in ACTIONS if counts[action])
+            lines.append(f"  {name.ljust(width)}  {cells}")
+        if len(ranked) > MAX_LISTED_GROUPS:
+            lines.append(f"  ... und {len(ranked) - MAX_LISTED_GROUPS} weitere")
+        return lines
+
+    def format(self) -> str:
+        if not self.has_changes:
+            return "Plan: keine Änderungen."
+        lines = ["Plan: " + ", ".join(f"{self.totals[action]} {ACTION_LABELS[action]}" for action in ACTIONS)]
+        lines += self._format_groups("Nach Ressourcentyp:", self.by_type)
+        if set(self.by_module) != {ROOT_MODULE}:
+            lines += self._format_groups("Nach Modul:", self.by_module)
+        if self.is_destructive:
+            lines.append(f"ACHTUNG: {self.destructive_count} destruktive Änderung(en):")
+            lines += [f"  - {address} ({ACTION_LABELS[action]})" for address, action in self.destructive]
+            if self.destructive_count > len(self.destructive):
+                lines.append(f"  ... und {self.destructive_count - len(self.destructive)} weitere")
+        return "\n".join(lines)
+
+
+def summarize_plan(stream: TextIO, chunk_size: int = CHUNK_SIZE) -> PlanSummary:
+    """Fasst einen JSON-Plan aus einem Textstrom zusammen."""
+    summary = PlanSummary()
+    for change in iter_resource_changes(stream, chunk_size):
+        summary.add(change)
+    return summary
+
+
+def show_plan(plan_file: str = "tfplan", cwd: Optional[str] = None,
+              command: Optional[List[str]] = None) -> PlanSummary:
+    """Führt `terraform show -json` aus und fasst die Ausgabe zusammen, während sie entsteht.
+
+    Args:
+        plan_file: Die mit `terraform plan -out` erzeugte Plandatei
+        cwd: Das Arbeitsverzeichnis
+        command: Ein anderer Befehl, der den JSON-Plan auf stdout schreibt
+
+    Returns:
+        Die Zusammenfassung
+
+    Raises:
+        RuntimeError: Wenn der Befehl fehlschlägt
+    """
+    command = command or ["terraform", "show", "-json", plan_file]
+    with span("terraform", "subprocess", command=" ".join(command)) as active, \
+            tempfile.TemporaryFile("w+") as stderr:
+        # stderr in eine Datei, damit eine volle Pipe den Prozess nicht blockiert
+        with subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE, stderr=stderr, text=True) as process:
+            try:
+                summary = summarize_plan(process.stdout)
+            except ValueError as e:
+                process.kill()
+                raise RuntimeError(f"Ungültige Planausgabe: {e}") from e
+        active.set(exit_code=process.returncode, changes=sum(summary.totals.values()))
+        if process.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(stderr.read().strip() or f"terraform show beendet mit Code {process.returncode}")
+    return summary
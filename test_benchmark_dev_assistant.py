@@ -0,0 +1,44 @@
+import unittest
+from unittest import mock
+
+from benchmark_dev_assistant import compare, run_benchmark
+from dev_assistant_extended import DevAssistantExtended
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases for the benchmark harness."""
+
+    def test_end_to_end_run(self):
+        """Test that a small batch runs against the stub server and fake tools."""
+        record = run_benchmark(tasks=2, concurrency=1)
+
+        metrics = record["metrics"]
+        self.assertEqual(metrics["stub_requests"], 2 * metrics["llm_calls_per_task"])
+        self.assertGreater(metrics["llm_calls_per_task"], 0)
+        self.assertGreater(metrics["subprocesses_per_task"], 0)
+        self.assertGreaterEqual(metrics["latency_p95"], metrics["latency_p50"])
+        # Der Deployment-Schritt wertet den Plan aus und wendet ihn an
+        self.assertEqual(metrics["applies_per_task"], 1.0)
+
+    def test_concurrent_tasks_use_separate_project_dirs(self):
+        """Test that parallel tasks do not share main.tf, tfplan or the scaffold."""
+        with mock.patch("benchmark_dev_assistant.DevAssistantExtended", side_effect=DevAssistantExtended) as factory:
+            record = run_benchmark(tasks=2, concurrency=2)
+
+        project_dirs = {call.kwargs["project_dir"] for call in factory.call_args_list}
+        self.assertEqual(len(project_dirs), 2)
+        self.assertEqual(record["metrics"]["applies_per_task"], 1.0)
+
+    def test_compare_flags_regressions(self):
+        """Test that slower latency and lower throughput are reported."""
+        previous = {"metrics": {"latency_p50": 1.0, "throughput": 2.0, "llm_calls_per_task": 7}}
+        current = {"metrics": {"latency_p50": 1.5, "throughput": 1.0, "llm_calls_per_task": 7}}
+
+        regressions = compare(current, previous)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(compare(current, None), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
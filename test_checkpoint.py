@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from checkpoint import CheckpointStore
+from dev_assistant_extended import DevAssistantExtended
+from testutils import make_response
+
+
+class TestCheckpointStore(unittest.TestCase):
+    """Test cases for the CheckpointStore."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_llm_results_and_steps_survive_reload(self):
+        """Test that entries are read back from the JSONL log."""
+        store = CheckpointStore.for_task(self.tmp, "Baue eine API")
+        key = store.llm_key(prompt="hallo")
+        store.record_llm_result(key, "antwort")
+        artifact = os.path.join(self.tmp, "main.py")
+        with open(artifact, "w") as f:
+            f.write("print('hallo')")
+        input_hash = store.step_input_hash("Baue eine API", 0, "Implementiere")
+        store.complete_step(0, "Implementiere", input_hash, {artifact: artifact})
+
+        reloaded = CheckpointStore.for_task(self.tmp, "  baue eine api ")
+        self.assertEqual(reloaded.get_llm_result(key), "antwort")
+        self.assertTrue(reloaded.is_step_complete(0, input_hash))
+        self.assertFalse(reloaded.is_step_complete(0, "anderer-hash"))
+
+        os.remove(artifact)
+        self.assertEqual(reloaded.restore_artifacts(0), 1)
+        with open(artifact) as f:
+            self.assertEqual(f.read(), "print('hallo')")
+
+    def test_truncated_last_line_is_ignored(self):
+        """Test that a partially written entry from a crash does not break loading."""
+        store = CheckpointStore.for_task(self.tmp, "Aufgabe")
+        store.record_llm_result("k", "v")
+        with open(store.path, "a") as f:
+            f.write('{"type": "llm", "key": "x", "out')
+
+        self.assertEqual(CheckpointStore(store.path).llm_results, {"k": "v"})
+
+
+class TestResumableRun(unittest.TestCase):
+    """Test that run() resumes from the first incomplete step."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp)
+
+    @patch('dev_assistant_extended.DevAssistantExtended.execute_command', return_value="ok")
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_resume_after_crash_reuses_completed_steps(self, mock_create, mock_command):
+        """Test that a crash in the deployment step does not repeat earlier LLM calls."""
+        mock_create.return_value = make_response('{"frameworks": [], "libraries": [], "tools": []}')
+
+        def crashing_answers(prompt):
+            if "Cloud-Infrastruktur" in prompt:
+                raise RuntimeError("Absturz")
+            return "main.py" if "Dateiname für den generierten" in prompt else (
+                "test_main.py" if "Dateiname" in prompt else "n")
+
+        assistant = DevAssistantExtended(api_key="k", answer_fn=crashing_answers,
+                                         checkpoint_dir=os.path.join(self.tmp, "ckpt"))
+        with self.assertRaises(RuntimeError):
+            assistant.run("Baue eine API auf EC2")
+        first_calls = mock_create.call_count
+        os.remove("main.py")
+
+        mock_create.reset_mock()
+        assistant = DevAssistantExtended(api_key="k", answer_fn=lambda prompt: "n",
+                                         checkpoint_dir=os.path.join(self.tmp, "ckpt"))
+        assistant.run("Baue eine API auf EC2")
+
+        self.assertGreater(first_calls, 1)
+        self.assertEqual(mock_create.call_count, 0)
+        self.assertTrue(os.path.exists("main.py"))
+
+
+if __name__ == '__main__':
+    unittest.main()
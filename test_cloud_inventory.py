@@ -0,0 +1,196 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from cloud_inventory import GLOBAL_REGION, CloudInventory, LocalAWS, planned_name
+from dev_assistant_extended import DevAssistantExtended
+from infra_templates import render_templates
+from terraform_plan import summarize_plan
+
+
+class TestRefresh(unittest.TestCase):
+    """Test cases for populating and refreshing the inventory."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.aws = LocalAWS(page_size=10)
+        self.now = [1000.0]
+        self.inventory = CloudInventory(os.path.join(self.tmp, "inventory.db"), client_factory=self.aws.client,
+                                        clock=lambda: self.now[0])
+
+    def tearDown(self):
+        self.inventory.close()
+        shutil.rmtree(self.tmp)
+
+    def test_paginated_parallel_population(self):
+        """Test that all pages of all types and regions are loaded concurrently."""
+        for i in range(35):
+            self.aws.add("aws_instance", name=f"web-{i}")
+        self.aws.add("aws_instance", name="alt", State={"Name": "terminated"})
+        self.aws.add("aws_vpc", region="eu-central-1", name="netz")
+        self.aws.add("aws_s3_bucket", name="daten")
+        self.aws.add("aws_ecs_cluster", name="app")
+
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def slow_client(service, region):
+            client = self.aws.client(service, region)
+            for operation in ("describe_instances", "describe_vpcs", "list_buckets"):
+                original = getattr(client, operation)
+
+                def wrapped(*args, _original=original, **kwargs):
+                    with lock:
+                        active[0] += 1
+                        peak[0] = max(peak[0], active[0])
+                    time.sleep(0.02)
+                    with lock:
+                        active[0] -= 1
+                    return _original(*args, **kwargs)
+                setattr(client, operation, wrapped)
+            return client
+
+        inventory = CloudInventory(client_factory=slow_client)
+        results = inventory.refresh(regions=["us-east-1", "eu-central-1"])
+        self.assertGreater(peak[0], 1)
+        self.assertEqual(results["aws_instance@us-east-1"]["added"], 35)
+        self.assertEqual(len(inventory.find("aws_instance", refresh=False)), 35)
+        self.assertFalse(inventory.exists("aws_instance", "alt", refresh=False))
+        self.assertTrue(inventory.exists("aws_vpc", "netz", region="eu-central-1", refresh=False))
+        self.assertFalse(inventory.exists("aws_vpc", "netz", refresh=False))
+        # Die Bucketliste ist global und wird nur einmal geladen
+        self.assertIn(f"aws_s3_bucket@{GLOBAL_REGION}", results)
+        self.assertTrue(inventory.exists("aws_s3_bucket", "daten", region="eu-central-1", refresh=False))
+        self.assertEqual(inventory.find("aws_ecs_cluster", "app", refresh=False)[0]["status"], "ACTIVE")
+
+    def test_ttl_and_incremental_changes(self):
+        """Test that only expired types are refetched and only changed rows are written."""
+        web = self.aws.add("aws_instance", name="web")
+        old = self.aws.add("aws_instance", name="alt")
+        self.aws.add("aws_vpc", name="netz")
+        self.inventory.refresh()
+        self.assertEqual(self.aws.calls["describe_instances"], 1)
+
+        # Innerhalb der TTL beantwortet die Datenbank alles ohne API-Aufruf
+        self.assertTrue(self.inventory.exists("aws_instance", "web"))
+        self.assertEqual(self.inventory.refresh(), {})
+        self.assertEqual(self.aws.calls["describe_instances"], 1)
+
+        web["InstanceType"] = "t3.large"
+        self.aws.remove("aws_instance", old["InstanceId"])
+        self.aws.add("aws_instance", name="neu")
+        self.now[0] += 61
+        results = self.inventory.refresh()
+        self.assertEqual(list(results), ["aws_instance@us-east-1"])
+        self.assertEqual(results["aws_instance@us-east-1"],
+                         {"added": 1, "updated": 1, "unchanged": 0, "removed": 1})
+        self.assertEqual(self.aws.calls["describe_vpcs"], 1)
+        self.assertEqual(self.inventory.find("aws_instance", "web")[0]["InstanceType"], "t3.large")
+        self.assertFalse(self.inventory.exists("aws_instance", "alt"))
+
+        self.inventory.invalidate(["aws_vpc", "aws_unbekannt"])
+        self.assertEqual(self.inventory.refresh()["aws_vpc@us-east-1"]["unchanged"], 1)
+        stats = self.inventory.stats()
+        self.assertEqual(stats["resources"], 3)
+        self.assertTrue(stats["types"]["aws_instance@us-east-1"]["fresh"])
+
+        # Der Bestand bleibt über Prozessgrenzen erhalten
+        reopened = CloudInventory(self.inventory.path, client_factory=self.aws.client, clock=lambda: self.now[0])
+        self.assertTrue(reopened.exists("aws_instance", "neu"))
+        self.assertEqual(self.aws.calls["describe_instances"], 2)
+        reopened.close()
+
+    def test_failed_source_keeps_stale_entries(self):
+        """Test that an unavailable API leaves the old inventory usable."""
+        self.aws.add("aws_s3_bucket", name="daten")
+        self.inventory.refresh(["aws_s3_bucket"])
+        self.aws.failures["list_buckets"] = RuntimeError("Throttling")
+        self.now[0] += 1000
+        self.assertEqual(self.inventory.refresh(["aws_s3_bucket"]), {f"aws_s3_bucket@{GLOBAL_REGION}": {"error": 1}})
+        self.assertTrue(self.inventory.exists("aws_s3_bucket", "daten"))
+        stats = self.inventory.stats()
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(self.aws.calls["list_buckets"], 2)
+        self.assertIn("Throttling", stats["last_errors"][f"aws_s3_bucket@{GLOBAL_REGION}"])
+        del self.aws.failures["list_buckets"]
+        self.now[0] += 30
+        self.assertTrue(self.inventory.exists("aws_s3_bucket", "daten"))
+        self.assertEqual(self.aws.calls["list_buckets"], 3)
+        self.assertEqual(self.inventory.stats()["last_errors"], {})
+        with self.assertRaises(ValueError):
+            self.inventory.find("aws_lambda_function")
+
+
+class TestReconcile(unittest.TestCase):
+    """Test cases for matching planned resources against the inventory."""
+
+    def test_existing_resources_and_drift(self):
+        """Test that templates are matched by name and fixed attributes are compared."""
+        aws = LocalAWS()
+        aws.add("aws_instance", name="shop", InstanceType="t3.small")
+        aws.add("aws_ecs_cluster", name="shop")
+        inventory = CloudInventory(client_factory=aws.client)
+        resources = render_templates(["ec2", "s3", "ecs"], {
+            "region": "us-east-1", "name": "shop", "count": 1, "instance_type": "t3.micro", "bucket": None,
+            "versioning": False, "image": "nginx", "port": 80, "cpu": 256, "memory": 512,
+        })
+        self.assertIsNone(planned_name(resources[2]))  # bucket_prefix steht erst beim Anwenden fest
+
+        matches = inventory.reconcile(resources)
+        self.assertEqual([match["address"] for match in matches], ["aws_instance.shop", "aws_ecs_cluster.shop"])
+        self.assertEqual(matches[0]["drift"], {"instance_type": ("t3.micro", "t3.small")})
+        self.assertEqual(matches[1]["drift"], {})
+        self.assertTrue(matches[1]["ids"][0].endswith("cluster/shop"))
+
+        # Jede weitere Frage kommt ohne API-Aufruf aus
+        calls = dict(aws.calls)
+        started = time.perf_counter()
+        for _ in range(100):
+            inventory.reconcile(resources)
+        self.assertLess((time.perf_counter() - started) / 100, 0.05)
+        self.assertEqual(aws.calls, calls)
+
+
+class TestSetupCloudInfrastructure(unittest.TestCase):
+    """Test cases for reporting existing resources in the deployment step."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    @patch('dev_assistant_extended.show_plan')
+    @patch('dev_assistant_extended.traced_run')
+    def test_existing_resources_are_reported_and_invalidated(self, mock_run, mock_show):
+        """Test that existing resources are printed and applied types are refetched afterwards."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        plan = {"resource_changes": [{"address": "aws_instance.web", "type": "aws_instance",
+                                      "change": {"actions": ["create"]}}]}
+        mock_show.return_value = summarize_plan(io.StringIO(json.dumps(plan)))
+        aws = LocalAWS()
+        aws.add("aws_instance", name="web")
+        inventory = CloudInventory(client_factory=aws.client)
+        assistant = DevAssistantExtended(api_key="mock_api_key", answer_fn=lambda prompt: "j", inventory=inventory)
+
+        resources = [{"type": "aws_instance", "name": "web", "attributes": {"tags": {"Name": "web"}}}]
+        with patch('builtins.print') as mock_print:
+            result = assistant.setup_cloud_infrastructure(resources)
+        self.assertEqual(result, "Terraform-Konfiguration erfolgreich angewendet.")
+        printed = "\n".join(str(call.args[0]) for call in mock_print.call_args_list if call.args)
+        self.assertIn("Bereits vorhanden (1):", printed)
+        self.assertIn("aws_instance.web: i-", printed)
+        self.assertEqual(inventory.stale(["aws_instance"]), [("aws_instance", "us-east-1")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from code_index import CodeIndex, split_chunks, tokenize
+
+
+def git(root, *args):
+    subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+
+
+class TestCodeIndex(unittest.TestCase):
+    """Test cases for the incremental repository search index."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        git(self.tmp, "init", "-q")
+        git(self.tmp, "config", "user.email", "test@example.com")
+        git(self.tmp, "config", "user.name", "Test")
+        self.write("parser.py", "def parse_config(path):\n    return load_yaml(path)\n")
+        self.write("server.py", "class HttpServer:\n    def handle_request(self, request):\n        pass\n")
+        git(self.tmp, "add", ".")
+        git(self.tmp, "commit", "-q", "-m", "init")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, content):
+        with open(os.path.join(self.tmp, name), "w") as f:
+            f.write(content)
+
+    def test_tokenize_splits_identifiers(self):
+        """Test that snake_case and CamelCase identifiers are split into parts."""
+        tokens = tokenize("HttpServer.handle_request für die Aufgabe")
+        self.assertIn("httpserver", tokens)
+        self.assertIn("server", tokens)
+        self.assertIn("request", tokens)
+        self.assertNotIn("für", tokens)
+
+    def test_split_chunks_prefers_definitions(self):
+        """Test that long files are split at top-level definitions."""
+        text = "\n".join(["import os"] + ["x = 1"] * 9 + ["def f():", "    return 1"])
+        chunks = split_chunks(text)
+        self.assertEqual([(start, end) for start, end, _ in chunks], [(1, 10), (11, 12)])
+
+    def test_search_and_trigram_fallback(self):
+        """Test BM25 search and matching of unknown terms via trigrams."""
+        index = CodeIndex(self.tmp)
+        index.update()
+
+        self.assertEqual(index.search("handle request")[0].path, "server.py")
+        self.assertEqual(index.search("parse the confg")[0].path, "parser.py")
+        self.assertIn("# parser.py:1-2", index.context_for("parse_config"))
+        self.assertEqual(index.context_for("parse_config", token_budget=1), "")
+
+    def test_update_is_incremental(self):
+        """Test that only changed files are re-indexed and the index persists."""
+        first = CodeIndex(self.tmp).update()
+        self.assertEqual(first["reindexed"], 2)
+
+        self.write("server.py", "class HttpServer:\n    def shutdown_gracefully(self):\n        pass\n")
+        self.write("notes.md", "Deployment notes for the gracefully stopping server\n")
+        reloaded = CodeIndex(self.tmp)
+        with patch.object(reloaded, "_index_file", wraps=reloaded._index_file) as index_file:
+            stats = reloaded.update()
+
+        self.assertEqual(sorted(call.args[0] for call in index_file.call_args_list), ["notes.md", "server.py"])
+        self.assertEqual(stats["reindexed"], 2)
+        self.assertEqual(reloaded.search("handle_request"), [])
+        self.assertEqual(reloaded.search("shutdown")[0].path, "server.py")
+
+        os.remove(os.path.join(self.tmp, "parser.py"))
+        git(self.tmp, "add", "-A")
+        git(self.tmp, "commit", "-q", "-m", "change")
+        CodeIndex(self.tmp).update()
+        self.assertNotIn("parser.py", CodeIndex(self.tmp).files)
+
+    def test_embeddings_are_fused(self):
+        """Test that an embedding function contributes to the ranking."""
+        def embed(texts):
+            return np.array([[1.0, 0.0] if "HttpServer" in t or "web" in t else [0.0, 1.0] for t in texts])
+
+        index = CodeIndex(self.tmp, embed_fn=embed)
+        index.update()
+
+        self.assertEqual(index.search("web")[0].path, "server.py")
+        self.assertTrue(os.path.exists(index.index_path + ".npz"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from conversation import ConversationMemory, count_tokens, outline, truncate_tokens
+from dev_assistant_extended import DevAssistantExtended
+from testutils import make_response
+
+CODE = '''import os
+from typing import List
+
+LIMIT = 10
+
+
+def add(a: int, b: int) -> int:
+    """Addiert zwei Zahlen.
+
+    Ausführliche Beschreibung.
+    """
+    total = a + b
+    return total
+
+
+class Store:
+    """Ein Speicher."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self) -> List[str]:
+        return os.listdir(self.path)
+
+    def _internal(self):
+        pass
+'''
+
+
+class TestOutline(unittest.TestCase):
+    """Test cases for compressing code to its interface."""
+
+    def test_python_outline(self):
+        """Test that imports, signatures, first docstring lines and constants are kept."""
+        text = outline(CODE, "python")
+        self.assertIn("from typing import List", text)
+        self.assertIn("LIMIT = 10", text)
+        self.assertIn("def add(a: int, b: int) -> int: ...", text)
+        self.assertIn('"""Addiert zwei Zahlen."""', text)
+        self.assertIn("    def load(self) -> List[str]: ...", text)
+        self.assertNotIn("_internal", text)
+        self.assertNotIn("total = a + b", text)
+
+    def test_other_languages_and_text(self):
+        """Test declaration lines for Java and no outline for plain text."""
+        java = "import java.util.List;\npublic class A {\n    int x = 1;\n    public int get() { return x; }\n}\n"
+        self.assertEqual(outline(java, "java"),
+                         "import java.util.List;\npublic class A {\n    public int get() { return x; }")
+        self.assertEqual(outline("Nur Text", None), "")
+
+    def test_token_helpers(self):
+        """Test counting and truncation."""
+        self.assertGreater(count_tokens("hallo welt " * 50), 50)
+        short = truncate_tokens("wort " * 500, 20)
+        self.assertLessEqual(count_tokens(short), 22)
+        self.assertTrue(short.endswith(" ..."))
+        self.assertEqual(truncate_tokens("kurz", 20), "kurz")
+
+
+class TestConversationMemory(unittest.TestCase):
+    """Test cases for the token-bounded step memory."""
+
+    def test_recent_verbatim_older_summarized_oldest_omitted(self):
+        """Test the rolling window and the budget."""
+        memory = ConversationMemory("Baue einen Rechner", budget=10000, recent=1)
+        self.assertEqual(memory.messages(), [])
+        self.assertEqual(memory.digest(), "")
+
+        memory.add("Code (rechner.py)", CODE, "python")
+        memory.add("Tests (test_rechner.py)", "from rechner import add\nassert add(1, 2) == 3\n", "python")
+        text = memory.render()
+        self.assertTrue(text.startswith("Aufgabe: Baue einen Rechner"))
+        self.assertIn("### Code (rechner.py) (zusammengefasst)", text)
+        self.assertIn("assert add(1, 2) == 3", text)
+        self.assertLess(text.index("Code (rechner.py)"), text.index("Tests (test_rechner.py)"))
+        self.assertEqual(memory.last_stats["verbatim"], 1)
+        self.assertEqual(memory.last_stats["summarized"], 1)
+
+        digest = memory.digest()
+        memory.add("Notiz", "x " * 3000)
+        self.assertNotEqual(memory.digest(), digest)
+
+        tight = ConversationMemory("Aufgabe", budget=200, recent=2)
+        for i in range(20):
+            tight.add(f"Code {i}", CODE.replace("add", f"add{i}"), "python")
+        text = tight.render()
+        self.assertLessEqual(count_tokens(text), 200 + 20)
+        self.assertIn("ältere Ergebnisse ausgelassen", text)
+        self.assertIn("add19", text)
+        self.assertNotIn("add0(", text)
+
+
+class TestMemoryInRun(unittest.TestCase):
+    """Test cases for passing earlier results to later model calls."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def fake_create(self, **kwargs):
+        self.calls.append(kwargs["messages"])
+        if kwargs.get("response_format"):
+            return make_response('{"frameworks": [], "libraries": [], "tools": [], "resources": []}')
+        prompt = kwargs["messages"][-1]["content"]
+        if "Kernfunktionalität" in prompt:
+            return make_response("def berechne_preis(menge):\n    return menge * 2\n")
+        return make_response("print('ok')")
+
+    @patch('dev_assistant_extended.DevAssistantExtended.execute_command', return_value="ok")
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_tests_see_generated_code(self, mock_create, mock_command):
+        """Test that the test step receives the generated code after a stable prefix."""
+        mock_create.side_effect = self.fake_create
+
+        def answer(prompt):
+            if "Dateiname für den generierten Code" in prompt:
+                return os.path.join(self.tmp, "preis.py")
+            if "Dateiname für die Tests" in prompt:
+                return os.path.join(self.tmp, "test_preis.py")
+            return "n"
+
+        assistant = DevAssistantExtended(api_key="k", answer_fn=answer, project_dir=self.tmp)
+        assistant.run("Berechne Preise")
+
+        test_calls = [messages for messages in self.calls if "Schreibe Tests" in messages[-1]["content"]]
+        self.assertEqual(len(test_calls), 1)
+        system, history, request = test_calls[0]
+        self.assertEqual(system["role"], "system")
+        self.assertTrue(history["content"].startswith("Aufgabe: Berechne Preise"))
+        self.assertIn("def berechne_preis(menge)", history["content"])
+
+        code_calls = [messages for messages in self.calls if "Kernfunktionalität" in messages[-1]["content"]]
+        self.assertEqual(len(code_calls[0]), 2)
+
+        without = DevAssistantExtended(api_key="k", answer_fn=answer, memory_budget=0, project_dir=self.tmp)
+        self.calls.clear()
+        without.run("Berechne Preise")
+        self.assertTrue(all(len(messages) <= 2 for messages in self.calls))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -77,7 +77,7 @@ class TestDevAssistantExtended(unittest.TestCase):
         
         # Verify the result
         self.assertIn("Terraform-Konfiguration erstellt", result)
-        mock_file.assert_called_once_with("main.tf", "w")
+        mock_file.assert_called_once_with(os.path.join(".", "main.tf"), "w")
         
         # Get the written content
         written_content = ''
@@ -102,5 +102,81 @@ class TestDevAssistantExtended(unittest.TestCase):
         self.assertEqual(result, "Hello, World!")
         mock_execute_python.assert_called_once_with("print('Hello, World!')")
 
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_recommend_tools_fenced_output_and_cache(self, mock_create):
+        """Test that recommend_tools parses fenced JSON and caches per normalized task."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = (
+            'Hier sind meine Empfehlungen:\n```json\n'
+            '{"frameworks": ["Flask"], "libraries": ["requests"], "tools": ["pytest"]}\n```'
+        )
+        mock_create.return_value = mock_response
+        
+        first = self.dev_assistant.recommend_tools("Baue eine REST-API.")
+        second = self.dev_assistant.recommend_tools("  baue eine   REST-API ")
+        
+        self.assertEqual(first, {"frameworks": ["Flask"], "libraries": ["requests"], "tools": ["pytest"]})
+        self.assertEqual(second, first)
+        mock_create.assert_called_once()
+        self.assertEqual(mock_create.call_args.kwargs["response_format"], {"type": "json_object"})
+
+        # Veränderungen am Ergebnis dürfen den geteilten Cache nicht verfälschen
+        second["tools"].append("tox")
+        first.clear()
+        third = self.dev_assistant.recommend_tools("Baue eine REST-API.")
+        self.assertEqual(third, {"frameworks": ["Flask"], "libraries": ["requests"], "tools": ["pytest"]})
+
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_generate_project_shared_prefix(self, mock_create):
+        """Test that project files are generated with an identical prompt prefix and written to disk."""
+        manifest = ('{"entrypoint": "app/main.py", "files": ['
+                    '{"path": "app/main.py", "interface": "main()"}, '
+                    '{"path": "app/util.py", "interface": "helper() -> int"}, '
+                    '{"path": "../escape.py"}]}')
+        
+        def reply(**kwargs):
+            response = MagicMock()
+            response.choices = [MagicMock()]
+            if kwargs.get("response_format"):
+                response.choices[0].message.content = manifest
+            else:
+                path = kwargs["messages"][-1]["content"].split("Datei ")[1].split(" ")[0]
+                response.choices[0].message.content = f"```python\n# {path}\n```"
+            return response
+        
+        mock_create.side_effect = reply
+        
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            self.dev_assistant.project_dir = tmp
+            files = self.dev_assistant.generate_project("Baue ein CLI-Tool")
+            
+            self.assertEqual(set(files), {"app/main.py", "app/util.py"})
+            with open(os.path.join(tmp, "app", "util.py")) as f:
+                self.assertEqual(f.read().strip(), "# app/util.py")
+            self.assertFalse(os.path.exists(os.path.join(tmp, "..", "escape.py")))
+        
+        file_calls = [c.kwargs["messages"] for c in mock_create.call_args_list
+                      if not c.kwargs.get("response_format")]
+        self.assertEqual(len(file_calls), 3)
+        self.assertTrue(all(messages[:-1] == file_calls[0][:-1] for messages in file_calls))
+
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_generate_code_includes_repository_context(self, mock_create):
+        """Test that relevant repository snippets are injected into the prompt."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "pass"
+        mock_create.return_value = mock_response
+        
+        self.dev_assistant.code_index = MagicMock()
+        self.dev_assistant.code_index.context_for.return_value = "# util.py:1-2\ndef slugify(text): ..."
+        self.dev_assistant.generate_code("Nutze slugify")
+        
+        prompt = mock_create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("def slugify(text)", prompt)
+        self.dev_assistant.code_index.context_for.assert_called_once_with("Nutze slugify", 1500)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,155 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from dev_assistant_extended import DebugAgent
+from error_index import ErrorIndex, apply_template, find_remedy, fingerprint, make_template
+
+PYTHON_TRACEBACK = """Traceback (most recent call last):
+  File "{path}", line {line}, in <module>
+    import yaml
+ModuleNotFoundError: No module named 'yaml'
+"""
+
+JAVAC_OUTPUT = """/tmp/tmpab12/Main.java:5: error: cannot find symbol
+        List<String> items = new ArrayList<>();
+        ^
+  symbol:   class List
+  location: class Main
+/tmp/tmpab12/Main.java:5: error: cannot find symbol
+  symbol:   class ArrayList
+2 errors
+"""
+
+
+class TestErrorFingerprint(unittest.TestCase):
+    """Test cases for error normalization and deterministic remedies."""
+
+    def test_fingerprint_ignores_paths_and_lines(self):
+        """Test that the same error at different locations has the same fingerprint."""
+        first = fingerprint(PYTHON_TRACEBACK.format(path="/tmp/a/temp_script.py", line=3))
+        second = fingerprint(PYTHON_TRACEBACK.format(path="/home/x/other.py", line=41))
+
+        self.assertEqual(first.key, second.key)
+        self.assertEqual(first.error_type, "ModuleNotFoundError")
+        self.assertEqual(first.tokens, ["yaml"])
+
+    def test_fingerprint_java_and_julia(self):
+        """Test fingerprints of javac symbol errors and Julia UndefVarError."""
+        java = fingerprint(JAVAC_OUTPUT, "java")
+        self.assertEqual(java.error_type, "javac")
+        self.assertEqual(java.tokens, ["List", "ArrayList"])
+
+        julia = fingerprint("ERROR: LoadError: UndefVarError: `dataframe` not defined\nin expression starting at /tmp/x.jl:3", "julia")
+        self.assertEqual(julia.error_type, "UndefVarError")
+        self.assertIn("dataframe", julia.tokens)
+
+    def test_remedies(self):
+        """Test deterministic remedies for missing modules and imports."""
+        remedy = find_remedy(fingerprint(PYTHON_TRACEBACK.format(path="x.py", line=1)), "import yaml\n")
+        self.assertEqual(remedy.commands[0][-1], "pyyaml")
+
+        remedy = find_remedy(fingerprint("NameError: name 'json' is not defined"), "print(json.dumps(1))\n")
+        self.assertTrue(remedy.code.startswith("import json\n"))
+
+        code = "package demo;\npublic class Main {}\n"
+        remedy = find_remedy(fingerprint(JAVAC_OUTPUT, "java"), code)
+        self.assertEqual(remedy.code.splitlines()[1:3], ["import java.util.List;", "import java.util.ArrayList;"])
+
+        self.assertIsNone(find_remedy(fingerprint("ZeroDivisionError: division by zero"), "1/0"))
+
+    def test_no_install_for_symbols_or_local_modules(self):
+        """Test that "cannot import name" and project modules do not produce pip installs."""
+        error = "ImportError: cannot import name 'Mapping' from 'collections' (/usr/lib/python3.12/collections/__init__.py)"
+        self.assertIsNone(find_remedy(fingerprint(error), "from collections import Mapping\n"))
+
+        project = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(project, "utils"))
+            error = "ModuleNotFoundError: No module named 'utils.helpers'"
+            self.assertIsNone(find_remedy(fingerprint(error), "import utils.helpers\n", [project]))
+            self.assertEqual(find_remedy(fingerprint(error), "", [os.path.join(project, "leer")]).commands[0][-1],
+                             "utils")
+            error = "ModuleNotFoundError: No module named 'google.protobuf'"
+            self.assertEqual(find_remedy(fingerprint(error), "", [project]).commands[0][-1], "protobuf")
+        finally:
+            shutil.rmtree(project)
+
+
+class TestErrorIndex(unittest.TestCase):
+    """Test cases for the persistent index of successful fixes."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "errors.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_template_applies_to_new_code(self):
+        """Test that a recorded fix is reused as a patch template on different code."""
+        error = "ZeroDivisionError: division by zero"
+        code = "def ratio(a, b):\n    return a / b\n"
+        fixed = "def ratio(a, b):\n    if b == 0:\n        return 0\n    return a / b\n"
+        ErrorIndex(self.path).record(fingerprint(error), code, fixed)
+
+        index = ErrorIndex(self.path)
+        other = "import math\n\ndef ratio(a, b):\n    return a / b\n\nprint(ratio(1, 0))\n"
+        result, source = index.lookup(fingerprint(error), other)
+
+        self.assertEqual(source, "template")
+        self.assertIn("    if b == 0:\n        return 0\n    return a / b", result)
+        self.assertEqual(index.lookup(fingerprint(error), code), (fixed, "index"))
+
+    def test_template_rejects_missing_context(self):
+        """Test that templates are not applied when their anchor is missing."""
+        template = make_template("a = 1\nb = 2\n", "a = 1\nb = 3\n")
+        self.assertIsNone(apply_template("c = 4\n", template))
+
+
+class TestDebugAgentErrorIndex(unittest.TestCase):
+    """Test cases for DebugAgent using the error index before the model."""
+
+    @patch('dev_assistant_extended.traced_run')
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_known_errors_skip_llm(self, mock_create, mock_run):
+        """Test that remedies and recorded fixes avoid LLM calls and are counted."""
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "fixed"
+        mock_create.return_value = mock_response
+        questions = []
+        agent = DebugAgent(api_key="mock_api_key", ask=lambda prompt: questions.append(prompt) or "j")
+
+        result = agent.debug("import yaml\n", PYTHON_TRACEBACK.format(path="x.py", line=1))
+        self.assertEqual(result["source"], "remedy")
+        mock_run.assert_called_once()
+        self.assertIn("pyyaml", mock_run.call_args.args[0])
+        self.assertIn("pip install pyyaml", questions[0])
+
+        result = agent.debug("1/0", "ZeroDivisionError: division by zero")
+        self.assertEqual(result["source"], "llm")
+        self.assertEqual(mock_create.call_count, 2)
+        agent.remember_fix("1/0", "ZeroDivisionError: division by zero", "fixed")
+
+        result = agent.debug("1/0", "File \"/tmp/other.py\", line 9\nZeroDivisionError: division by zero")
+        self.assertEqual(result, {"analysis": result["analysis"], "fixed_code": "fixed", "source": "index"})
+        self.assertEqual(mock_create.call_count, 2)
+        self.assertAlmostEqual(agent.error_index.hit_rate(), 2 / 3)
+
+    @patch('dev_assistant_extended.traced_run')
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_install_requires_confirmation(self, mock_create, mock_run):
+        """Test that pip is not run when the install is declined or nobody can be asked."""
+        mock_create.return_value.choices = [MagicMock()]
+        mock_create.return_value.choices[0].message.content = "fixed"
+        traceback = PYTHON_TRACEBACK.format(path="x.py", line=1)
+        for agent in (DebugAgent(api_key="mock_api_key"), DebugAgent(api_key="mock_api_key", ask=lambda prompt: "n")):
+            self.assertEqual(agent.debug("import yaml\n", traceback)["source"], "llm")
+        mock_run.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
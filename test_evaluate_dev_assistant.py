@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmark_dev_assistant import StubLLMServer
+from evaluate_dev_assistant import compare_reports, load_tasks, pass_at_k, run_evaluation, run_tests
+from execution_scheduler import ExecutionScheduler
+
+
+class TestEvaluation(unittest.TestCase):
+    """Test cases for the evaluation harness."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_dataset(self, records):
+        path = os.path.join(self.tmp, "tasks.jsonl")
+        with open(path, "w") as f:
+            f.write("\n".join(json.dumps(record) for record in records))
+        return path
+
+    def test_pass_at_k(self):
+        """Test the unbiased pass@k estimator."""
+        self.assertAlmostEqual(pass_at_k(5, 1, 1), 0.2)
+        self.assertAlmostEqual(pass_at_k(5, 0, 3), 0.0)
+        self.assertAlmostEqual(pass_at_k(2, 1, 2), 1.0)
+        self.assertAlmostEqual(pass_at_k(4, 2, 2), 1 - 1 / 6)
+
+    def test_samples_run_under_the_execution_scheduler(self):
+        """Test that sample tests are admitted by the scheduler and a runaway sample hits its memory limit."""
+        scheduler = ExecutionScheduler(cpus=1, memory_mb=2000, limits="rlimit")
+        self.assertTrue(run_tests("def solution():\n    return 42\n", "assert solution() == 42", "python",
+                                  scheduler=scheduler)["passed"])
+        result = run_tests("data = bytearray(4 * 1024 ** 3)\n", "", "python", scheduler=scheduler)
+        self.assertFalse(result["passed"])
+        self.assertIn("MemoryError", result["error"])
+        self.assertEqual(scheduler.counters["admitted"], 2)
+        self.assertEqual(scheduler.running, 0)
+
+    def test_load_jsonl_and_hf_dataset(self):
+        """Test loading the native format, HumanEval fields and a saved HF dataset."""
+        path = self.write_dataset([
+            {"id": "a", "task": "Addiere", "tests": "assert add(1, 2) == 3"},
+            {"task_id": "HumanEval/0", "prompt": "def f():", "test": "def check(fn): pass", "entry_point": "f"},
+        ])
+        tasks = load_tasks(path)
+        self.assertEqual([t["id"] for t in tasks], ["a", "HumanEval/0"])
+        self.assertTrue(tasks[1]["tests"].endswith("check(f)\n"))
+        self.assertEqual(tasks[0]["language"], "python")
+
+        import datasets
+        directory = os.path.join(self.tmp, "hf")
+        datasets.Dataset.from_list([{"id": "x", "task": "t", "tests": ""}]).save_to_disk(directory)
+        self.assertEqual(load_tasks(directory)[0]["id"], "x")
+
+    def test_end_to_end_with_process_pool_and_cache(self):
+        """Test a pooled run against the stub server, including cache reuse on the second run."""
+        tasks = load_tasks(self.write_dataset([
+            {"id": "gut", "task": "Gib 42 zurück", "tests": "assert solution() == 42"},
+            {"id": "falsch", "task": "Gib 0 zurück", "tests": "assert solution() == 0"},
+        ]))
+        cache_dir = os.path.join(self.tmp, "cache")
+
+        with StubLLMServer() as server:
+            first = run_evaluation(tasks, samples=2, ks=[1, 2, 5], workers=2,
+                                   cache_dir=cache_dir, base_url=server.base_url)
+            second = run_evaluation(tasks, samples=2, ks=[1, 2], workers=2,
+                                    cache_dir=cache_dir, base_url=server.base_url)
+            requests = server.requests
+
+        self.assertEqual(first["config"]["k"], [1, 2])
+        self.assertEqual(first["metrics"]["pass@1"], 0.5)
+        self.assertEqual(first["tasks"]["gut"]["passed"], 2)
+        self.assertIn("AssertionError", first["tasks"]["falsch"]["error"])
+        self.assertGreater(first["metrics"]["tokens_total"], 0)
+        self.assertEqual(first["metrics"]["cache_hit_rate"], 0.0)
+
+        self.assertEqual(requests, 2)
+        self.assertEqual(second["metrics"]["cache_hit_rate"], 1.0)
+        self.assertEqual(second["tasks"]["gut"]["llm_calls"], 0)
+
+    def test_compare_reports(self):
+        """Test that metric changes and flipped tasks are listed."""
+        previous = {"metrics": {"pass@1": 0.5, "tokens_per_task": 100.0},
+                    "tasks": {"a": {"passed": 0}, "b": {"passed": 1}}}
+        current = {"metrics": {"pass@1": 0.75, "tokens_per_task": 120.0},
+                   "tasks": {"a": {"passed": 1}, "b": {"passed": 0}}}
+
+        lines = compare_reports(current, previous)
+
+        self.assertIn("pass@1: 0.5 -> 0.75 (besser)", lines)
+        self.assertIn("tokens_per_task: 100.0 -> 120.0 (schlechter)", lines)
+        self.assertTrue(any("a: jetzt bestanden" in line for line in lines))
+        self.assertTrue(any("b: jetzt fehlgeschlagen" in line for line in lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import sys
+import threading
+import time
+import unittest
+
+from dev_assistant_extended import CodeExecutionAgent
+from execution_scheduler import ExecutionScheduler, Footprint
+
+
+class TestAdmission(unittest.TestCase):
+    """Test cases for admitting executions within the CPU and memory budget."""
+
+    def hold(self, scheduler, footprint, priority="interactive", order=None, name=None):
+        """Belegt einen Slot in einem Thread, bis das zurückgegebene Event gesetzt wird."""
+        admitted, release = threading.Event(), threading.Event()
+
+        def worker():
+            with scheduler.slot(footprint, priority):
+                if order is not None:
+                    order.append(name)
+                admitted.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        return admitted, release, thread
+
+    def test_budget_limits_concurrency(self):
+        """Test that jobs beyond the CPU or memory budget wait until capacity is freed."""
+        scheduler = ExecutionScheduler(cpus=2, memory_mb=1000, limits="none")
+        first = self.hold(scheduler, Footprint(cpus=1, memory_mb=100))
+        second = self.hold(scheduler, Footprint(cpus=1, memory_mb=100))
+        third = self.hold(scheduler, Footprint(cpus=1, memory_mb=100))
+        self.assertTrue(first[0].wait(1) and second[0].wait(1))
+        self.assertFalse(third[0].wait(0.1))
+        self.assertEqual(scheduler.stats()["queued"], 1)
+
+        first[1].set()
+        self.assertTrue(third[0].wait(1))
+        memory = self.hold(scheduler, Footprint(cpus=0, memory_mb=900))
+        self.assertFalse(memory[0].wait(0.1))
+        for _, release, thread in (first, second, third, memory):
+            release.set()
+        self.assertTrue(memory[0].wait(1))
+        for _, _, thread in (first, second, third, memory):
+            thread.join()
+        self.assertEqual(scheduler.stats()["running"], 0)
+
+    def test_priority_and_bounded_overtaking(self):
+        """Test interactive before batch and that small jobs overtake a large one only a few times."""
+        scheduler = ExecutionScheduler(cpus=2, memory_mb=1000, limits="none", max_overtakes=1)
+        order = []
+        running = self.hold(scheduler, Footprint(cpus=1, memory_mb=10), order=order, name="läuft")
+        self.assertTrue(running[0].wait(1))
+        large = self.hold(scheduler, Footprint(cpus=2, memory_mb=10), "batch", order, "groß")
+        time.sleep(0.05)
+        small = self.hold(scheduler, Footprint(cpus=1, memory_mb=10), "batch", order, "klein")
+        self.assertTrue(small[0].wait(1))
+        blocked = self.hold(scheduler, Footprint(cpus=1, memory_mb=10), "batch", order, "blockiert")
+        time.sleep(0.05)
+        self.assertEqual(order, ["läuft", "klein"])
+
+        running[1].set()
+        time.sleep(0.05)
+        self.assertEqual(order, ["läuft", "klein"])
+        small[1].set()
+        self.assertTrue(large[0].wait(1))
+        large[1].set()
+        self.assertTrue(blocked[0].wait(1))
+        blocked[1].set()
+        self.assertEqual(order, ["läuft", "klein", "groß", "blockiert"])
+        self.assertEqual(scheduler.stats()["overtakes"], 1)
+        for _, _, thread in (running, large, small, blocked):
+            thread.join()
+
+        order.clear()
+        holder = self.hold(scheduler, Footprint(cpus=2, memory_mb=10), order=order, name="voll")
+        self.assertTrue(holder[0].wait(1))
+        batch = self.hold(scheduler, Footprint(cpus=1, memory_mb=10), "batch", order, "batch")
+        time.sleep(0.05)
+        interactive = self.hold(scheduler, Footprint(cpus=1, memory_mb=10), "interactive", order, "interaktiv")
+        time.sleep(0.05)
+        holder[1].set()
+        batch[1].set()
+        interactive[1].set()
+        for _, _, thread in (holder, batch, interactive):
+            thread.join()
+        self.assertEqual(order, ["voll", "interaktiv", "batch"])
+
+    def test_oversized_jobs_and_metrics(self):
+        """Test that oversized footprints run alone and that utilization and waits are reported."""
+        now = [0.0]
+        scheduler = ExecutionScheduler(cpus=2, memory_mb=1000, limits="none", clock=lambda: now[0])
+        with scheduler.slot(Footprint(cpus=8, memory_mb=64000)) as waited:
+            self.assertEqual(waited, 0.0)
+            self.assertEqual(scheduler.stats()["cpus_in_use"], 2)
+            now[0] = 10.0
+        now[0] = 20.0
+        stats = scheduler.stats()
+        self.assertAlmostEqual(stats["cpu_utilization"], 0.5)
+        self.assertAlmostEqual(stats["memory_utilization"], 0.5)
+        self.assertEqual(stats["admitted"], 1)
+        self.assertEqual(stats["queue_wait_p95"], 0.0)
+
+
+class TestLimits(unittest.TestCase):
+    """Test cases for per-job resource limits."""
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Ressourcenlimits nur unter Linux getestet")
+    def test_rlimits_stop_runaway_scripts(self):
+        """Test the memory and CPU limits and that limit kills are reported."""
+        scheduler = ExecutionScheduler(cpus=2, memory_mb=4000, limits="rlimit")
+        result = scheduler.run([sys.executable, "-c", "x = bytearray(400 * 1024 * 1024)"],
+                               Footprint(memory_mb=200), capture_output=True, text=True)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("MemoryError", result.stderr)
+
+        result = scheduler.run([sys.executable, "-c", "while True: pass"],
+                               Footprint(memory_mb=200, cpu_seconds=1), capture_output=True, text=True)
+        self.assertLess(result.returncode, 0)
+        self.assertIn("Ressourcenlimit überschritten", result.stderr)
+        self.assertEqual(scheduler.stats()["limit_kills"], 1)
+
+        result = scheduler.run([sys.executable, "-c", "print('ok')"], Footprint(), capture_output=True, text=True)
+        self.assertEqual(result.stdout, "ok\n")
+
+    def test_cgroup_requires_delegated_root(self):
+        """Test that cgroup limits are refused without a usable delegated cgroup."""
+        with self.assertRaises(ValueError):
+            ExecutionScheduler(limits="cgroup", cgroup_root="/nicht/vorhanden")
+        self.assertNotEqual(ExecutionScheduler(cgroup_root="/nicht/vorhanden").limits, "cgroup")
+
+
+class TestCodeExecutionAgent(unittest.TestCase):
+    """Test cases for runners declaring their footprint."""
+
+    def test_executions_go_through_the_scheduler(self):
+        """Test that execute_python is admitted by the agent's scheduler."""
+        scheduler = ExecutionScheduler(cpus=1, memory_mb=2000)
+        agent = CodeExecutionAgent(scheduler=scheduler, priority="batch")
+        self.assertEqual(agent.execute_python("print(6 * 7)"), "42\n")
+        self.assertTrue(agent.execute_python("import sys; sys.exit('kaputt')").startswith("Fehler:"))
+        self.assertEqual(scheduler.stats()["admitted"], 2)
+        self.assertFalse(agent.footprints["java"].address_space)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# Grobe Obergrenze für den kumulierten Import von dev_assistant_extended (Mikrosekunden).
+# Sie fängt nur grobe Ausreißer ab und lässt langsamen CI-Maschinen viel Luft; die
+# eigentliche Prüfung ist, dass keine schweren Module geladen werden.
+IMPORT_BUDGET_US = 2_000_000
+
+# Module, die erst bei Bedarf geladen werden dürfen
+HEAVY_MODULES = ["openai", "tenacity", "loguru", "numpy", "boto3", "botocore", "git", "fastapi", "starlette",
+                 "pydantic", "uvicorn", "redis", "datasets", "requests", "asyncio"]
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_python(*args):
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=PACKAGE_DIR)
+
+
+class TestImportTime(unittest.TestCase):
+    """Startup regression checks based on python -X importtime."""
+
+    def test_heavy_dependencies_are_not_imported_eagerly(self):
+        """Test that importing the assistant does not pull in heavy dependencies."""
+        result = run_python("-c", (
+            "import json, sys, dev_assistant_extended\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+        ))
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(json.loads(result.stdout), [])
+
+    def test_import_time_budget(self):
+        """Test that the cumulative import time stays within a generous budget."""
+        # Einmal vorab importieren, damit .pyc-Dateien existieren
+        run_python("-c", "import dev_assistant_extended")
+        result = run_python("-X", "importtime", "-c", "import dev_assistant_extended")
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        cumulative = None
+        for line in result.stderr.splitlines():
+            parts = [part.strip() for part in line.split("|")]
+            if len(parts) == 3 and parts[2] == "dev_assistant_extended":
+                cumulative = int(parts[1])
+        self.assertIsNotNone(cumulative)
+        self.assertLess(cumulative, IMPORT_BUDGET_US)
+
+    def test_agents_are_constructed_lazily(self):
+        """Test that agents are created on first access only."""
+        from dev_assistant_extended import DevAssistantExtended, DebugAgent
+
+        assistant = DevAssistantExtended(api_key="mock_api_key")
+        self.assertNotIn("debugger", vars(assistant))
+        self.assertIsInstance(assistant.debugger, DebugAgent)
+        self.assertIs(assistant.debugger, assistant.debugger)
+
+    def test_lazy_module_applies_pending_attributes(self):
+        """Test that attributes set before loading are applied to the real module."""
+        from lazy_imports import LazyModule
+
+        proxy = LazyModule("colorsys")
+        proxy.lazy_marker = "gesetzt"
+        self.assertIn("nicht geladen", repr(proxy))
+
+        self.assertEqual(proxy.rgb_to_hsv(0, 0, 0), (0.0, 0.0, 0.0))
+        import colorsys
+        self.assertEqual(colorsys.lazy_marker, "gesetzt")
+        del colorsys.lazy_marker
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from dev_assistant_extended import CloudAgent, DevAssistantExtended
+from infra_templates import classify_intent, extract_parameters, find_gaps, render_templates
+from testutils import make_response
+
+
+class TestInfraTemplates(unittest.TestCase):
+    """Test cases for template-based infrastructure generation."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def test_classify_intent(self):
+        """Test that tasks are mapped to templates including their dependencies."""
+        self.assertEqual(classify_intent("Erstelle ein Python-Skript, das AWS EC2-Instanzen mit Terraform provisioniert."), ["ec2"])
+        self.assertEqual(classify_intent("Deploye den Container als ECS-Service auf Fargate"), ["vpc", "ecs"])
+        self.assertEqual(classify_intent("Ein S3-Bucket für Logs"), ["s3"])
+        self.assertEqual(classify_intent("Baue eine REST-API"), [])
+
+    def test_extract_parameters(self):
+        """Test that region, instance type, count and names are read from the task."""
+        task = "Starte 3 EC2-Instanzen vom Typ t3.large namens web in eu-central-1"
+        params = extract_parameters(task, classify_intent(task))
+
+        self.assertEqual(params["region"], "eu-central-1")
+        self.assertEqual(params["instance_type"], "t3.large")
+        self.assertEqual(params["count"], 3)
+        self.assertEqual(params["name"], "web")
+
+        defaults = extract_parameters("S3-Bucket", ["s3"])
+        self.assertEqual(defaults["region"], "us-east-1")
+        self.assertIsNone(defaults["bucket"])
+        self.assertFalse(defaults["versioning"])
+
+    def test_rendered_config(self):
+        """Test that rendered resources produce valid-looking HCL with expressions and blocks."""
+        task = "EC2-Instanz t3.small in einem VPC mit 3 Subnetzen und ein versionierter S3-Bucket 'acme-logs'"
+        templates = classify_intent(task)
+        self.assertEqual(templates, ["vpc", "ec2", "s3"])
+        params = extract_parameters(task, templates)
+
+        result = CloudAgent().create_terraform_config(render_templates(templates, params), region=params["region"])
+        with open("main.tf") as f:
+            config = f.read()
+
+        self.assertIn("Terraform-Konfiguration erstellt", result)
+        self.assertIn('provider "aws" {\n  region = "us-east-1"\n}\n\n', config)
+        self.assertIn('data "aws_ami" "default" {', config)
+        self.assertIn("  subnet_id = aws_subnet.public[0].id\n", config)
+        self.assertIn("  count = 3\n", config)
+        self.assertIn('  bucket = "acme-logs"\n', config)
+        self.assertIn('  versioning_configuration {\n    status = "Enabled"\n  }', config)
+        self.assertIn('  tags = {\n    Name = "app"\n  }', config)
+        self.assertEqual(config.count("{"), config.count("}"))
+
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_plan_uses_model_only_for_gaps(self, mock_create):
+        """Test that known intents skip the model and uncovered requirements are delegated."""
+        assistant = DevAssistantExtended(api_key="mock_api_key")
+
+        plan = assistant.plan_infrastructure("Eine EC2-Instanz in us-west-2")
+        self.assertEqual(plan["templates"], ["ec2"])
+        self.assertEqual(plan["region"], "us-west-2")
+        mock_create.assert_not_called()
+
+        mock_create.return_value = make_response(
+            '{"resources": [{"type": "aws_db_instance", "name": "main", "attributes": {"engine": "postgres"}}, {"type": "x"}]}'
+        )
+        plan = assistant.plan_infrastructure("EC2-Instanz mit einer Postgres-Datenbank")
+        self.assertEqual(plan["gaps"], ["Datenbank (RDS)"])
+        self.assertEqual(plan["resources"][-1]["type"], "aws_db_instance")
+        self.assertEqual(len(plan["resources"]), 3)
+        prompt = mock_create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("resource aws_instance.app", prompt)
+        self.assertIn("Ergänze ausschließlich: Datenbank (RDS)", prompt)
+        self.assertEqual(find_gaps("Lambda hinter einem Load Balancer"), ["Load Balancer", "Lambda-Funktion"])
+
+
+if __name__ == '__main__':
+    unittest.main()
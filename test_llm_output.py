@@ -0,0 +1,53 @@
+import unittest
+
+from llm_output import normalize_task, parse_json_object, strip_code_fences, validate_syntax
+
+
+class TestLLMOutput(unittest.TestCase):
+    """Test cases for the tolerant model output parsing helpers."""
+
+    def test_plain_json(self):
+        """Test that plain JSON objects are parsed directly."""
+        self.assertEqual(parse_json_object('{"tools": ["git"]}'), {"tools": ["git"]})
+
+    def test_json_with_surrounding_text(self):
+        """Test that an object embedded in prose is found."""
+        text = 'Gerne! {"frameworks": ["Django"]} Viel Erfolg.'
+        self.assertEqual(parse_json_object(text), {"frameworks": ["Django"]})
+
+    def test_truncated_json(self):
+        """Test that an object cut off at the token limit is repaired."""
+        text = '```json\n{"frameworks": ["Django"], "libraries": ["requests", "bo'
+        self.assertEqual(
+            parse_json_object(text),
+            {"frameworks": ["Django"], "libraries": ["requests", "bo"]}
+        )
+
+    def test_truncated_after_key(self):
+        """Test that a dangling key without value is dropped."""
+        self.assertEqual(parse_json_object('{"a": 1, "b": '), {"a": 1})
+
+    def test_no_json(self):
+        """Test that None is returned when no object is present."""
+        self.assertIsNone(parse_json_object("Keine Empfehlungen."))
+
+    def test_strip_code_fences(self):
+        """Test that the content of a fenced block is returned."""
+        self.assertEqual(strip_code_fences("```python\nprint(1)\n```"), "print(1)\n")
+
+    def test_normalize_task(self):
+        """Test that casing and whitespace differences are normalized."""
+        self.assertEqual(normalize_task("  Baue  eine API. "), normalize_task("baue eine api"))
+
+    def test_validate_syntax(self):
+        """Test syntax checks for Python and bracket balance for Java and Julia."""
+        self.assertEqual(validate_syntax("def f():\n    return 1\n", "python"), "")
+        self.assertIn("SyntaxError", validate_syntax("def f(:\n    pass", "python"))
+        self.assertEqual(validate_syntax('class A { String s = "}"; // }\n}', "java"), "")
+        self.assertIn("'{'", validate_syntax("class A {", "java"))
+        self.assertIn("Zeile 2", validate_syntax("f(x) = x\n)", "julia"))
+        self.assertEqual(validate_syntax("  ", "python"), "Leerer Code")
+
+
+if __name__ == '__main__':
+    unittest.main()
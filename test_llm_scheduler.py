@@ -0,0 +1,152 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from llm_scheduler import LLMScheduler, estimate_tokens
+
+
+class FakeAPIError(Exception):
+    """An exception carrying an HTTP status code like the openai errors."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def make_response(total_tokens=10):
+    response = MagicMock()
+    response.usage.total_tokens = total_tokens
+    return response
+
+
+class TestLLMScheduler(unittest.TestCase):
+    """Test cases for the LLMScheduler."""
+
+    def setUp(self):
+        self.sleeps = []
+        self.scheduler = LLMScheduler(base_delay=0.01, max_delay=0.05, sleep=self.sleeps.append)
+        self.messages = [{"role": "user", "content": "Hallo"}]
+
+    def test_retries_rate_limit_and_halves_concurrency(self):
+        """Test that a 429 is retried and reduces the concurrency limit."""
+        response = make_response()
+        create = MagicMock(side_effect=[FakeAPIError(429), response])
+
+        result = self.scheduler.call(create, model="gpt-4", messages=self.messages)
+
+        self.assertIs(result, response)
+        self.assertEqual(create.call_count, 2)
+        self.assertEqual(len(self.sleeps), 1)
+        stats = self.scheduler.stats()["gpt-4"]
+        self.assertEqual(stats["rate_limited"], 1)
+        self.assertEqual(stats["retries"], 1)
+        self.assertLess(stats["limit"], self.scheduler.initial_concurrency)
+
+    def test_non_retryable_error_is_raised(self):
+        """Test that client errors are not retried."""
+        create = MagicMock(side_effect=FakeAPIError(400))
+
+        with self.assertRaises(FakeAPIError):
+            self.scheduler.call(create, model="gpt-4", messages=self.messages)
+        self.assertEqual(create.call_count, 1)
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that persistent transient errors are re-raised eventually."""
+        scheduler = LLMScheduler(max_attempts=3, base_delay=0, sleep=lambda _: None)
+        create = MagicMock(side_effect=FakeAPIError(503))
+
+        with self.assertRaises(FakeAPIError):
+            scheduler.call(create, model="gpt-4", messages=self.messages)
+        self.assertEqual(create.call_count, 3)
+
+    def test_success_increases_concurrency(self):
+        """Test the additive increase after successful calls."""
+        create = MagicMock(return_value=make_response(42))
+
+        self.scheduler.call(create, model="gpt-4", messages=self.messages)
+
+        stats = self.scheduler.stats()["gpt-4"]
+        self.assertGreater(stats["limit"], self.scheduler.initial_concurrency)
+        self.assertEqual(stats["tokens"], 42)
+
+    def test_interactive_calls_are_admitted_before_batch_calls(self):
+        """Test that queued interactive calls overtake queued batch calls."""
+        scheduler = LLMScheduler(initial_concurrency=1, max_concurrency=1)
+        release = threading.Event()
+        order = []
+
+        def blocking_create(**kwargs):
+            release.wait(5)
+            return make_response()
+
+        def recording_create(label):
+            def create(**kwargs):
+                order.append(label)
+                return make_response()
+            return create
+
+        holder = threading.Thread(
+            target=scheduler.call, args=(blocking_create, "gpt-4", self.messages))
+        holder.start()
+        while scheduler.stats().get("gpt-4", {}).get("in_flight") != 1:
+            time.sleep(0.001)
+
+        batch = threading.Thread(
+            target=scheduler.call, args=(recording_create("batch"), "gpt-4", self.messages),
+            kwargs={"priority": "batch"})
+        batch.start()
+        while scheduler.stats()["gpt-4"]["queued"] != 1:
+            time.sleep(0.001)
+        interactive = threading.Thread(
+            target=scheduler.call, args=(recording_create("interactive"), "gpt-4", self.messages))
+        interactive.start()
+        while scheduler.stats()["gpt-4"]["queued"] != 2:
+            time.sleep(0.001)
+
+        release.set()
+        for thread in (holder, batch, interactive):
+            thread.join(5)
+
+        self.assertEqual(order, ["interactive", "batch"])
+
+    def test_stream_holds_slot_until_consumed_or_closed(self):
+        """Test that a streamed call keeps its slot until the chunks are read or the stream is closed."""
+        chunks = [make_response(None), make_response(None), make_response(17)]
+        create = MagicMock(side_effect=lambda **kwargs: iter(chunks))
+
+        stream = self.scheduler.call(create, model="gpt-4", messages=self.messages, stream=True)
+        self.assertEqual(self.scheduler.stats()["gpt-4"]["in_flight"], 1)
+        self.assertEqual(len(list(stream)), 3)
+        stats = self.scheduler.stats()["gpt-4"]
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["tokens"], 17)
+
+        stream = self.scheduler.call(create, model="gpt-4", messages=self.messages, stream=True)
+        next(stream)
+        self.assertEqual(self.scheduler.stats()["gpt-4"]["in_flight"], 1)
+        stream.close()
+        stream.close()
+        self.assertEqual(self.scheduler.stats()["gpt-4"]["in_flight"], 0)
+
+    def test_stream_error_releases_slot(self):
+        """Test that an error while reading a stream releases the slot and counts as error."""
+        def broken(**kwargs):
+            yield make_response(None)
+            raise FakeAPIError(500)
+
+        stream = self.scheduler.call(broken, model="gpt-4", messages=self.messages, stream=True)
+        with self.assertRaises(FakeAPIError):
+            list(stream)
+        stats = self.scheduler.stats()["gpt-4"]
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["errors"], 1)
+
+    def test_estimate_tokens(self):
+        """Test the rough token estimate."""
+        messages = [{"role": "user", "content": "x" * 400}]
+        self.assertEqual(estimate_tokens(messages, max_tokens=100), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+
+from dev_assistant_extended import DebugAgent
+from patching import apply_edits, parse_patch
+from testutils import make_response
+
+CODE = """def load(path):
+    with open(path) as f:
+        return f.read()
+
+
+def total(values):
+    result = 0
+    for value in values:
+        result += value
+    return result
+"""
+
+
+class TestPatching(unittest.TestCase):
+    """Test cases for parsing and applying model patches."""
+
+    def test_search_replace_block(self):
+        """Test that an exact search/replace block is applied."""
+        edits = parse_patch(
+            "Hier die Korrektur:\n<<<<<<< SEARCH\n        result += value\n=======\n"
+            "        result += int(value)\n>>>>>>> REPLACE\n"
+        )
+        self.assertIn("        result += int(value)\n", apply_edits(CODE, edits))
+
+    def test_block_with_wrong_indentation_and_typo(self):
+        """Test that indentation differences and small typos are tolerated."""
+        edits = [("for value in values:\n    result += value\n",
+                  "for value in values:\n    result += float(value)\n")]
+        fixed = apply_edits(CODE, edits)
+        self.assertIn("    for value in values:\n        result += float(value)\n", fixed)
+
+        fuzzy = [("    with open(path) as fh:\n        return fh.read()\n",
+                  "    with open(path, encoding='utf-8') as f:\n        return f.read()\n")]
+        self.assertIn("open(path, encoding='utf-8')", apply_edits(CODE, fuzzy))
+
+    def test_unified_diff(self):
+        """Test that unified diff hunks are applied without relying on line numbers."""
+        diff = """```diff
+--- a/main.py
++++ b/main.py
+@@ -99,3 +99,3 @@
+ def total(values):
+-    result = 0
++    result = 0.0
+     for value in values:
+```"""
+        self.assertIn("    result = 0.0\n", apply_edits(CODE, parse_patch(diff)))
+
+    def test_unmatched_or_ambiguous_block(self):
+        """Test that blocks that cannot be located uniquely are rejected."""
+        self.assertIsNone(apply_edits(CODE, [("print('missing')\n", "pass\n")]))
+        self.assertIsNone(apply_edits("x = 1\nx = 1\n", [("x = 1", "x = 2")]))
+        self.assertIsNone(apply_edits(CODE, []))
+
+
+class TestFixErrorPatchMode(unittest.TestCase):
+    """Test cases for DebugAgent.fix_error in patch mode."""
+
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_patch_mode_and_fallback(self, mock_create):
+        """Test that patches are applied locally and unusable patches fall back to full code."""
+        agent = DebugAgent(api_key="mock_api_key", fix_mode="patch")
+
+        mock_create.return_value = make_response("<<<<<<< SEARCH\n    result = 0\n=======\n    result = 0.0\n>>>>>>> REPLACE")
+        self.assertEqual(agent.fix_error(CODE, "TypeError"), CODE.replace("result = 0\n", "result = 0.0\n"))
+        self.assertEqual(mock_create.call_count, 1)
+
+        mock_create.side_effect = [make_response("Keine Blöcke"), make_response("full file")]
+        self.assertEqual(agent.fix_error(CODE, "TypeError"), "full file")
+        self.assertEqual(mock_create.call_count, 3)
+
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_auto_mode_uses_full_file_for_small_code(self, mock_create):
+        """Test that small files are still fixed in full-file mode."""
+        mock_create.return_value = make_response("print(1)")
+        agent = DebugAgent(api_key="mock_api_key")
+
+        self.assertEqual(agent.fix_error("print(1", "SyntaxError"), "print(1)")
+        self.assertNotIn("SEARCH", mock_create.call_args.kwargs["messages"][1]["content"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from dev_assistant_extended import TEST_PROMPT, DevAssistantExtended
+from prefetch import MISSING, Prefetcher
+from testutils import make_response
+
+
+class TestPrefetcher(unittest.TestCase):
+    """Test cases for the speculative result cache."""
+
+    def test_take_waits_for_running_calls_and_handles_failures(self):
+        """Test results, in-flight calls, failures and unknown keys."""
+        prefetcher = Prefetcher()
+        release = threading.Event()
+        prefetcher.submit("a", lambda: "fertig")
+        prefetcher.submit("b", lambda: release.wait() and "spät")
+        prefetcher.submit("c", lambda: 1 / 0)
+        self.assertFalse(prefetcher.submit("a", lambda: "doppelt"))
+
+        self.assertEqual(prefetcher.take("a"), "fertig")
+        threading.Timer(0.05, release.set).start()
+        self.assertEqual(prefetcher.take("b"), "spät")
+        self.assertIs(prefetcher.take("c"), MISSING)
+        self.assertIs(prefetcher.take("a"), MISSING)
+        self.assertEqual(prefetcher.stats(), {"submitted": 3, "used": 2, "wasted": 1})
+        prefetcher.shutdown()
+
+    def test_expiry_and_cancel(self):
+        """Test that stale results expire and pending calls are cancelled."""
+        now = [0.0]
+        prefetcher = Prefetcher(max_workers=1, ttl=10, clock=lambda: now[0])
+        prefetcher.submit("alt", lambda: "x")
+        time.sleep(0.05)
+        now[0] = 11
+        self.assertIs(prefetcher.take("alt"), MISSING)
+
+        release, ran = threading.Event(), []
+        prefetcher.submit("blockiert", release.wait)
+        prefetcher.submit("wartend", lambda: ran.append(True))
+        self.assertEqual(prefetcher.cancel(), 2)
+        release.set()
+        prefetcher.shutdown()
+        self.assertEqual(ran, [])
+
+
+class TestSpeculativeRun(unittest.TestCase):
+    """Test cases for speculative execution in run()."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.prompts = []
+        self.test_call = threading.Event()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def fake_create(self, **kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        self.prompts.append(prompt)
+        if TEST_PROMPT.format(task="Baue eine API") in prompt:
+            self.test_call.set()
+        if kwargs.get("response_format"):
+            return make_response('{"frameworks": [], "libraries": [], "tools": [], "resources": []}')
+        return make_response("print('ok')")
+
+    @patch('dev_assistant_extended.DevAssistantExtended.execute_command', return_value="ok")
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_next_step_is_generated_while_user_types(self, mock_create, mock_command):
+        """Test that test generation starts during the code step's prompts and is not repeated."""
+        mock_create.side_effect = self.fake_create
+        answers = []
+
+        def slow_user(prompt):
+            answers.append(prompt)
+            if "Dateiname für den generierten Code" in prompt:
+                # Der Benutzer tippt; die Tests werden bereits im Hintergrund generiert
+                self.assertTrue(self.test_call.wait(5))
+                return os.path.join(self.tmp, "main.py")
+            if "Dateiname für die Tests" in prompt:
+                return os.path.join(self.tmp, "test_main.py")
+            return "n"
+
+        assistant = DevAssistantExtended(api_key="k", answer_fn=slow_user, speculate=True, project_dir=self.tmp)
+        assistant.run("Baue eine API")
+
+        code_prompts = [p for p in self.prompts if "Generiere python-Code" in p]
+        self.assertEqual(len(code_prompts), len(set(code_prompts)))
+        self.assertTrue(any("Schreibe Tests" in p for p in code_prompts))
+        self.assertIsNone(assistant._prefetcher)
+
+    @patch('dev_assistant_extended.DevAssistantExtended.execute_command', return_value="ok")
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_abort_discards_speculation(self, mock_create, mock_command):
+        """Test that an interrupted prompt shuts the prefetcher down."""
+        mock_create.side_effect = self.fake_create
+
+        def aborting_user(prompt):
+            raise KeyboardInterrupt
+
+        assistant = DevAssistantExtended(api_key="k", answer_fn=aborting_user, speculate=True, project_dir=self.tmp)
+        with self.assertRaises(KeyboardInterrupt):
+            assistant.run("Baue eine API")
+        self.assertIsNone(assistant._prefetcher)
+        self.assertFalse(DevAssistantExtended(api_key="k", answer_fn=aborting_user).speculate)
+
+
+if __name__ == '__main__':
+    unittest.main()
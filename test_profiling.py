@@ -0,0 +1,85 @@
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from dev_assistant_extended import CodeExecutionAgent, DevAssistantExtended
+from execution_scheduler import ExecutionScheduler
+from profiling import benchmark, prepare, run_profiled
+
+SLOW_CODE = """import time
+
+def compute():
+    time.sleep(0.2)
+    return sum(range(10))
+
+print(compute())
+"""
+
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for profiled execution."""
+
+    def test_run_profiled_measures_child(self):
+        """Test that wall time, CPU time and peak RSS of the child are collected."""
+        profile = run_profiled([sys.executable, "-c", "data = bytearray(50 * 1024 * 1024); print(len(data))"])
+
+        self.assertTrue(profile.ok)
+        self.assertEqual(profile.output.strip(), str(50 * 1024 * 1024))
+        self.assertGreater(profile.peak_rss_kb, 50 * 1024)
+        self.assertGreater(profile.cpu_seconds, 0)
+        self.assertIn("Spitzenspeicher", profile.format())
+
+    def test_python_hotspots(self):
+        """Test that cProfile and tracemalloc summaries are attached for Python."""
+        profile = CodeExecutionAgent().profile(SLOW_CODE, "python")
+
+        self.assertEqual(profile.output.strip(), "45")
+        self.assertGreaterEqual(profile.wall_seconds, 0.2)
+        self.assertIn("compute", profile.hotspots)
+        self.assertIn("tracemalloc", profile.hotspots)
+
+    def test_failures_and_benchmark(self):
+        """Test error reporting and repeated timed runs."""
+        profile = CodeExecutionAgent().profile("raise ValueError('kaputt')", "python")
+        self.assertFalse(profile.ok)
+        self.assertIn("kaputt", profile.output)
+
+        with tempfile.TemporaryDirectory() as workdir:
+            command, error = prepare("print('ok')", "python", workdir)
+            result = benchmark(command, workdir, repeats=3)
+        self.assertEqual(error, "")
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["output"], "ok\n")
+        self.assertEqual(result["runs"], 3)
+
+
+class TestOptimizeCode(unittest.TestCase):
+    """Test cases for the optimization loop."""
+
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_keeps_fastest_variant_with_identical_output(self, mock_create):
+        """Test that variants with different output are rejected and the fastest valid one wins."""
+        variants = ["print(sum(range(10)))\n", "```python\nprint(46)\n```"]
+        response = MagicMock()
+        response.choices = [MagicMock() for _ in variants]
+        for choice, text in zip(response.choices, variants):
+            choice.message.content = text
+        mock_create.return_value = response
+
+        scheduler = ExecutionScheduler(cpus=1, memory_mb=2000)
+        assistant = DevAssistantExtended(api_key="mock_api_key", execution_scheduler=scheduler)
+        result = assistant.optimize_code(SLOW_CODE, "python", repeats=2)
+
+        self.assertTrue(result["improved"])
+        self.assertEqual(result["code"], variants[0])
+        self.assertGreater(result["speedup"], 1.5)
+        self.assertEqual([r["valid"] for r in result["results"]], [True, True, False])
+        self.assertEqual(mock_create.call_args.kwargs["n"], 3)
+        self.assertIn("compute", mock_create.call_args.kwargs["messages"][1]["content"])
+        # Profil des Originals sowie die Messläufe von Original und beiden Varianten
+        self.assertEqual(scheduler.stats()["admitted"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from scaffold import materialize, parse_scaffold
+
+
+class TestScaffold(unittest.TestCase):
+    """Test cases for the in-process project scaffolder."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_materialize_creates_tree_with_templates(self):
+        """Test that directories and files are created in one pass."""
+        tree = {"src": {"app": {"__init__.py": ""}, "main.py": "# $project"}, "tests": {}, "README.md": None}
+
+        result = materialize(tree, self.tmp, variables={"project": "demo"})
+
+        self.assertTrue(os.path.isdir(os.path.join(self.tmp, "tests")))
+        with open(os.path.join(self.tmp, "src", "main.py")) as f:
+            self.assertEqual(f.read(), "# demo")
+        self.assertEqual(len(result.written), 3)
+        self.assertEqual(result.skipped, [])
+
+    def test_materialize_is_idempotent(self):
+        """Test that unchanged files are skipped and changed files rewritten."""
+        materialize({"a.txt": "eins", "b.txt": "zwei"}, self.tmp)
+
+        result = materialize({"a.txt": "eins", "b.txt": "drei"}, self.tmp)
+
+        self.assertEqual([os.path.basename(p) for p in result.skipped], ["a.txt"])
+        self.assertEqual([os.path.basename(p) for p in result.written], ["b.txt"])
+        self.assertEqual(result.directories, [])
+
+    def test_paths_outside_root_are_rejected(self):
+        """Test that the scaffold cannot escape the target directory."""
+        with self.assertRaises(ValueError):
+            materialize({"../evil.txt": "x"}, self.tmp)
+
+    def test_trailing_slash_keys_and_conflicts(self):
+        """Test that "dir/" keys are directories and file/directory clashes are rejected."""
+        result = materialize({"src/": "", "src/main.py": "x", "logs/": None}, self.tmp)
+        self.assertTrue(os.path.isfile(os.path.join(self.tmp, "src", "main.py")))
+        self.assertTrue(os.path.isdir(os.path.join(self.tmp, "logs")))
+        self.assertEqual(len(result.written), 1)
+
+        for tree in ({"src": "", "src/main.py": "x"}, {"a": "", "a/b": {"c.py": ""}}, {"d": "", "d/": {}}):
+            with self.assertRaises(ValueError):
+                materialize(tree, self.tmp)
+
+    def test_parse_json_tree_and_list_directories(self):
+        """Test parsing of fenced JSON with directories given as lists."""
+        text = '```json\n{"structure": {"src": ["main.py", "utils.py"], "docs/": {}}}\n```'
+
+        tree = parse_scaffold(text)
+        result = materialize(tree, self.tmp)
+
+        self.assertTrue(os.path.isfile(os.path.join(self.tmp, "src", "utils.py")))
+        self.assertTrue(os.path.isdir(os.path.join(self.tmp, "docs")))
+        self.assertEqual(len(result.written), 2)
+
+    def test_parse_mkdir_fallback(self):
+        """Test that mkdir commands are converted without running a shell."""
+        tree = parse_scaffold("mkdir -p projekt/src projekt/tests\n$ mkdir docs")
+
+        self.assertEqual(tree, {"projekt": {"src": {}, "tests": {}}, "docs": {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from dev_assistant_extended import DevAssistantExtended
+from semantic_cache import SemanticCache
+from testutils import make_response
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Test cases for the semantic near-duplicate cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_near_duplicates_hit_and_different_tasks_miss(self):
+        """Test rewording tolerance, site isolation and exact guard tokens."""
+        cache = SemanticCache(self.path, dim=256, capacity=8)
+        cache.put("generate_code", "Implementiere die Kernfunktionalität für einen URL-Shortener", "code")
+        cache.put("generate_code", "Starte einen Server auf Port 80", "port80")
+
+        self.assertEqual(cache.lookup("generate_code", "Implementiere bitte die Kernfunktionalität für einen URL-Shortener"), "code")
+        self.assertIsNone(cache.lookup("generate_code", "Implementiere die Kernfunktionalität für einen Webcrawler"))
+        self.assertIsNone(cache.lookup("recommend_tools", "Implementiere die Kernfunktionalität für einen URL-Shortener"))
+        self.assertIsNone(cache.lookup("generate_code", "Starte einen Server auf Port 8080"))
+        self.assertEqual(cache.lookup_many("generate_code", ["Starte einen Server auf Port 80.", "Sortiere eine Liste"]),
+                         ["port80", None])
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_verification_eviction_and_persistence(self):
+        """Test that rejected values are skipped, the LRU entry is evicted and entries survive a restart."""
+        cache = SemanticCache(self.path, dim=64, capacity=2, thresholds={"site": 0.99})
+        cache.put("site", "erste Aufgabe", "a")
+        cache.put("site", "zweite Aufgabe", "b")
+        self.assertIsNone(cache.lookup("site", "erste Aufgabe", verify=lambda value: False))
+        self.assertEqual(cache.stats()["rejected"], 1)
+
+        self.assertEqual(cache.lookup("site", "erste Aufgabe"), "a")
+        cache.put("site", "dritte Aufgabe", "c")
+        self.assertIsNone(cache.lookup("site", "zweite Aufgabe"))
+        cache.flush()
+
+        self.assertEqual(os.path.getsize(os.path.join(self.path, "vectors.f32")), 2 * 64 * 4)
+        reopened = SemanticCache(self.path, dim=64, capacity=2)
+        self.assertEqual(reopened.stats()["entries"], 2)
+        self.assertEqual(reopened.lookup("site", "dritte Aufgabe"), "c")
+
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_assistant_reuses_valid_code_and_recommendations(self, mock_create):
+        """Test the cache in front of generate_code and recommend_tools."""
+        assistant = DevAssistantExtended(api_key="mock_api_key", semantic_cache=SemanticCache(self.path))
+
+        mock_create.return_value = make_response("```python\ndef shorten(url):\n    return url[:8]\n```")
+        first = assistant.generate_code("Implementiere die Kernfunktionalität für einen URL-Shortener")
+        second = assistant.generate_code("Implementiere bitte die Kernfunktionalität für einen URL-Shortener")
+        self.assertEqual(first, second)
+        self.assertEqual(mock_create.call_count, 1)
+
+        # Ungültiger Code im Cache wird nicht wiederverwendet
+        mock_create.return_value = make_response("def broken(:\n")
+        assistant.generate_code("Implementiere einen Parser für CSV-Dateien")
+        mock_create.return_value = make_response("def parse(text):\n    return text.split(',')\n")
+        self.assertIn("def parse", assistant.generate_code("Implementiere bitte einen Parser für CSV-Dateien"))
+        self.assertEqual(mock_create.call_count, 3)
+
+        mock_create.return_value = make_response('{"frameworks": ["fastapi"], "libraries": [], "tools": []}')
+        assistant.recommend_tools("Baue eine REST-API für Todos mit FastAPI")
+        recommendations = assistant.recommend_tools("Erstelle eine REST API für Todos mit FastAPI")
+        self.assertEqual(recommendations["frameworks"], ["fastapi"])
+        self.assertEqual(mock_create.call_count, 4)
+        recommendations["frameworks"].append("flask")
+        again = assistant.recommend_tools("Erstelle eine REST API für Todos mit FastAPI")
+        self.assertEqual(again["frameworks"], ["fastapi"])
+        stored = assistant.semantic_cache.lookup("recommend_tools", "baue eine rest-api für todos mit fastapi")
+        self.assertEqual(stored["frameworks"], ["fastapi"])
+        self.assertEqual(mock_create.call_count, 4)
+
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_mutating_a_fresh_recommendation_keeps_the_shared_cache_intact(self, mock_create):
+        """Test that changing the result of a cache miss does not leak into other assistants."""
+        cache = SemanticCache(self.path)
+        mock_create.return_value = make_response('{"frameworks": ["fastapi"], "libraries": [], "tools": []}')
+        first = DevAssistantExtended(api_key="mock_api_key", semantic_cache=cache)
+        first.recommend_tools("Baue eine REST-API für Todos mit FastAPI")["frameworks"].append("POISON")
+
+        second = DevAssistantExtended(api_key="mock_api_key", semantic_cache=cache)
+        recommendations = second.recommend_tools("Erstelle eine REST API für Todos mit FastAPI")
+        self.assertEqual(recommendations["frameworks"], ["fastapi"])
+        self.assertEqual(mock_create.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
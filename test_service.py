@@ -0,0 +1,113 @@
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+from llm_scheduler import LLMScheduler
+import service
+from service import AssistantService, Job, TaskRequest, create_app
+
+
+def fake_create(**kwargs):
+    """Return a streamed or complete response depending on the request."""
+    if kwargs.get("stream"):
+        chunks = []
+        for text in ("print(", "'hallo')"):
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = text
+            chunks.append(chunk)
+        return iter(chunks)
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = '{"frameworks": ["fastapi"], "libraries": [], "tools": []}'
+    return response
+
+
+class TestService(unittest.TestCase):
+    """Test cases for the HTTP service mode."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.service = AssistantService(workers=1, scheduler=LLMScheduler(), workdir=self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    @patch('dev_assistant_extended.DevAssistantExtended.execute_command', return_value="ok")
+    @patch('dev_assistant_extended.openai.ChatCompletion.create', side_effect=fake_create)
+    def test_task_lifecycle_with_event_stream(self, mock_create, mock_command):
+        """Test submitting tasks, streaming progress and reading metrics."""
+        with TestClient(create_app(self.service)) as client:
+            first = client.post("/tasks", json={"task": "Baue eine API"}).json()
+            second = client.post("/tasks", json={"task": "baue eine api"}).json()
+
+            with client.stream("GET", f"/tasks/{first['id']}/events") as response:
+                body = "".join(response.iter_text())
+
+            events = [line[len("event: "):] for line in body.splitlines() if line.startswith("event: ")]
+            self.assertEqual(events[0], "task_started")
+            self.assertIn("code_delta", events)
+            self.assertIn("step_finished", events)
+            self.assertEqual(events[-1], "task_finished")
+
+            deadline = time.time() + 5
+            while client.get(f"/tasks/{second['id']}").json()["status"] != "finished":
+                self.assertLess(time.time(), deadline)
+                time.sleep(0.01)
+
+            status = client.get(f"/tasks/{first['id']}").json()
+            self.assertEqual(status["status"], "finished")
+            self.assertTrue(any(path.endswith("main.py") for path in status["artifacts"]))
+
+            metrics = client.get("/metrics").json()
+            self.assertEqual(metrics["queue_depth"], 0)
+            self.assertEqual(metrics["finished"], 2)
+            self.assertIsNotNone(metrics["run_seconds"]["p95"])
+
+        # Tool-Empfehlungen werden über Aufgaben hinweg geteilt
+        json_calls = [c for c in mock_create.call_args_list
+                      if "Softwareentwicklungstools" in c.kwargs["messages"][0]["content"]]
+        self.assertEqual(len(json_calls), 1)
+
+    def test_unknown_task_and_empty_submission(self):
+        """Test the error responses."""
+        with TestClient(create_app(self.service)) as client:
+            self.assertEqual(client.get("/tasks/42").status_code, 404)
+            self.assertEqual(client.post("/tasks", json={"task": "  "}).status_code, 400)
+
+    def test_finished_jobs_are_evicted_and_events_compacted(self):
+        """Test that finished jobs expire or are capped and their code deltas are merged."""
+        job = Job("1", TaskRequest(task="t"), self.tmp)
+        job.push("task_started", {})
+        for text in ("print(", "'hallo'", ")"):
+            job.push("code_delta", {"text": text})
+        job.push("task_finished", {})
+        job.compact()
+        self.assertEqual([(event["id"], event["event"]) for event in job.events],
+                         [(1, "task_started"), (4, "code_delta"), (5, "task_finished")])
+        self.assertEqual(job.events[1]["data"]["text"], "print('hallo')")
+        self.assertEqual([event["id"] for event in job.events_after(4)], [5])
+
+        with patch.object(service, "MAX_EVENTS", 3):
+            for _ in range(5):
+                job.push("step_started", {})
+        self.assertEqual([event["id"] for event in job.events], [8, 9, 10])
+
+        for index in range(4):
+            finished = Job(str(index), TaskRequest(task="t"), self.tmp)
+            finished.finished = 100.0 + index
+            self.service.jobs[finished.id] = finished
+        self.service.jobs["running"] = Job("running", TaskRequest(task="t"), self.tmp)
+        with patch.object(service, "MAX_FINISHED_JOBS", 3):
+            self.assertEqual(self.service.evict(now=200.0), 1)
+        self.assertEqual(sorted(self.service.jobs), ["1", "2", "3", "running"])
+        self.assertEqual(self.service.evict(now=102.5 + service.JOB_TTL), 2)
+        self.assertEqual(sorted(self.service.jobs), ["3", "running"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from task_queue import LocalRedis, QueueWorker, RedisTaskQueue, SQLiteTaskQueue, open_queue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAssistant:
+    """Records the tasks it runs; tasks containing "kaputt" raise."""
+
+    runs = []
+    lock = threading.Lock()
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def run(self, task):
+        with self.lock:
+            self.runs.append(task)
+        if "kaputt" in task:
+            raise RuntimeError("Absturz")
+
+
+class TaskQueueContract:
+    """Behaviour shared by all queue backends."""
+
+    def make_queue(self, clock):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.clock = FakeClock()
+        self.queue = self.make_queue(self.clock)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_tenants_are_served_round_robin(self):
+        """Test that a tenant with a backlog does not starve the others."""
+        for index in range(3):
+            self.queue.enqueue({"task": f"a{index}"}, tenant="a")
+        self.queue.enqueue({"task": "b0"}, tenant="b")
+
+        order = []
+        while (lease := self.queue.lease("w")) is not None:
+            order.append(lease.payload["task"])
+            self.assertTrue(self.queue.complete(lease, {"ok": True}))
+        self.assertEqual(order, ["a0", "b0", "a1", "a2"])
+
+    def test_expired_lease_is_reclaimed_and_fenced(self):
+        """Test that a dead worker's task is handed out again and its late result is rejected."""
+        task_id = self.queue.enqueue({"task": "x"}, max_attempts=2)
+        first = self.queue.lease("w1", visibility_timeout=10)
+        self.assertIsNone(self.queue.lease("w2"))
+
+        self.clock.now += 11
+        second = self.queue.lease("w2", visibility_timeout=10)
+        self.assertEqual(second.task_id, task_id)
+        self.assertEqual(second.attempt, 2)
+        self.assertFalse(self.queue.heartbeat(first))
+        self.assertFalse(self.queue.complete(first, "spät"))
+
+        self.clock.now += 11
+        self.assertEqual(self.queue.reclaim(), 1)
+        self.assertEqual(self.queue.get(task_id)["status"], "dead")
+        self.assertIsNone(self.queue.lease("w3"))
+
+    def test_heartbeat_keeps_lease_and_fail_retries(self):
+        """Test heartbeats, retries after failures and the final result."""
+        task_id = self.queue.enqueue({"task": "x"}, max_attempts=2)
+        lease = self.queue.lease("w1", visibility_timeout=10)
+        self.clock.now += 8
+        self.assertTrue(self.queue.heartbeat(lease, visibility_timeout=10))
+        self.clock.now += 8
+        self.assertEqual(self.queue.reclaim(), 0)
+
+        self.assertTrue(self.queue.fail(lease, "Fehler"))
+        retry = self.queue.lease("w1")
+        self.assertEqual(retry.attempt, 2)
+        self.assertTrue(self.queue.fail(retry, "wieder"))
+        task = self.queue.get(task_id)
+        self.assertEqual((task["status"], task["error"]), ("failed", "wieder"))
+
+    def test_worker_processes_tasks(self):
+        """Test that a worker runs tasks headlessly and reports results and failures."""
+        FakeAssistant.runs = []
+        ok = self.queue.enqueue({"task": "Baue eine API", "execute": True})
+        broken = self.queue.enqueue({"task": "kaputt"}, max_attempts=1)
+        worker = QueueWorker(self.queue, os.path.join(self.tmp, "jobs"), worker_id="w",
+                             assistant_factory=FakeAssistant)
+        worker.run(poll_interval=0, max_tasks=2)
+
+        self.assertEqual(FakeAssistant.runs, ["Baue eine API", "kaputt"])
+        self.assertEqual(self.queue.get(ok)["status"], "done")
+        self.assertEqual(self.queue.get(ok)["result"]["workdir"], os.path.join(self.tmp, "jobs", ok))
+        self.assertEqual(self.queue.get(broken)["status"], "failed")
+        self.assertEqual(worker.processed, 2)
+
+
+class TestSQLiteTaskQueue(TaskQueueContract, unittest.TestCase):
+    """Test cases for the SQLite backend."""
+
+    def make_queue(self, clock):
+        return SQLiteTaskQueue(os.path.join(self.tmp, "queue.db"), clock=clock)
+
+    def test_concurrent_workers_process_each_task_once(self):
+        """Test that workers on separate connections never lease the same task twice."""
+        FakeAssistant.runs = []
+        queue = open_queue("sqlite://" + os.path.join(self.tmp, "shared.db"))
+        for index in range(20):
+            queue.enqueue({"task": f"t{index}"}, tenant=f"team{index % 3}")
+
+        workers = [QueueWorker(open_queue("sqlite://" + os.path.join(self.tmp, "shared.db")),
+                               os.path.join(self.tmp, "jobs"), assistant_factory=FakeAssistant)
+                   for _ in range(4)]
+        stop = threading.Event()
+        threads = [threading.Thread(target=w.run, kwargs={"poll_interval": 0.01, "stop": stop}) for w in workers]
+        for thread in threads:
+            thread.start()
+        while queue.stats()["tasks"]["done"] < 20:
+            threading.Event().wait(0.01)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(FakeAssistant.runs), sorted(f"t{index}" for index in range(20)))
+        self.assertEqual(queue.stats()["tasks"]["queued"], 0)
+
+
+class TestRedisTaskQueue(TaskQueueContract, unittest.TestCase):
+    """Test cases for the Redis backend against the local stand-in."""
+
+    def make_queue(self, clock):
+        return RedisTaskQueue(LocalRedis(), prefix="test", clock=clock)
+
+    def crash_on(self, command):
+        """Lässt den nächsten Aufruf des Befehls scheitern, als fiele der Worker dort aus."""
+        client = self.queue.client
+        original = getattr(client, command)
+
+        def crash(*args, **kwargs):
+            setattr(client, command, original)
+            raise ConnectionError("Worker ausgefallen")
+        setattr(client, command, crash)
+
+    def test_worker_crash_during_claim_loses_no_task(self):
+        """Test that a task claimed by a worker that dies before or after the lease is redelivered once."""
+        for command in ("zadd", "lrem", "hset"):
+            self.queue.enqueue({"task": command})
+            self.crash_on(command)
+            with self.assertRaises(ConnectionError):
+                self.queue.lease("w1", visibility_timeout=10)
+            self.assertIsNone(self.queue.lease("w2"))
+
+            self.clock.now += self.queue.visibility_timeout + 11
+            self.queue.reclaim()
+            self.clock.now += self.queue.visibility_timeout + 11
+            lease = self.queue.lease("w2")
+            self.assertEqual(lease.payload, {"task": command})
+            self.assertTrue(self.queue.complete(lease))
+            self.clock.now += self.queue.visibility_timeout + 11
+            self.assertEqual(self.queue.reclaim(), 0)
+            self.assertIsNone(self.queue.lease("w3"))
+
+    def test_stalled_claim_does_not_steal_a_reclaimed_task(self):
+        """Test that a worker resuming after its claim was reclaimed leaves the new owner's lease alone."""
+        self.queue.enqueue({"task": "langsam"})
+        client = self.queue.client
+        original = client.zadd
+        leases = []
+
+        def stall(*args, **kwargs):
+            # w1 steht nach seinem LMOVE länger als die Frist; w2 übernimmt die Aufgabe
+            client.zadd = original
+            self.clock.now += self.queue.visibility_timeout + 11
+            self.queue.reclaim()
+            self.clock.now += self.queue.visibility_timeout + 11
+            leases.append(self.queue.lease("w2"))
+            return original(*args, **kwargs)
+        client.zadd = stall
+
+        self.assertIsNone(self.queue.lease("w1"))
+        lease = leases[0]
+        self.assertEqual(lease.payload, {"task": "langsam"})
+        self.assertTrue(self.queue.heartbeat(lease))
+        self.assertTrue(self.queue.complete(lease))
+        self.assertEqual(self.queue.get(lease.task_id)["status"], "done")
+        self.clock.now += self.queue.visibility_timeout + 11
+        self.assertEqual(self.queue.reclaim(), 0)
+        self.assertIsNone(self.queue.lease("w3"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from dev_assistant_extended import DevAssistantExtended
+from terraform_plan import JsonStream, iter_resource_changes, show_plan, summarize_plan
+
+
+def change(address, actions, module=None):
+    resource_type = address.split(".")[-2]
+    entry = {"address": address, "type": resource_type, "name": address.split(".")[-1],
+             "change": {"actions": actions, "before": None, "after": {"tags": {"Name": "x"}}}}
+    if module:
+        entry["module_address"] = module
+    return entry
+
+
+def plan_json(changes):
+    # Andere Schlüssel mit verschachtelten Werten und irreführenden Zeichenketten
+    return json.dumps({
+        "format_version": "1.2",
+        "variables": {"note": {"value": "enthält \"resource_changes\": [ und } \\\\"}},
+        "planned_values": {"root_module": {"resources": [{"values": {"list": [1, [2, {"a": None}]]}}]}},
+        "resource_drift": [change("aws_s3_bucket.drift", ["update"])],
+        "resource_changes": changes,
+        "errored": False,
+        "prior_state": {"values": {"root_module": {}}},
+    }, indent=1)
+
+
+class TestPlanParsing(unittest.TestCase):
+    """Test cases for the streaming plan parser."""
+
+    def test_only_resource_changes_are_decoded(self):
+        """Test that other keys are skipped, including tricky strings and tiny chunks."""
+        changes = [change("aws_instance.web", ["create"]), change("aws_vpc.main", ["no-op"])]
+        for chunk_size in (1, 7, 4096):
+            parsed = list(iter_resource_changes(io.StringIO(plan_json(changes)), chunk_size))
+            self.assertEqual(parsed, changes)
+        self.assertEqual(list(iter_resource_changes(io.StringIO('{"resource_changes": []}'))), [])
+        self.assertEqual(list(iter_resource_changes(io.StringIO("{}"))), [])
+
+    def test_malformed_input(self):
+        """Test that truncated plans raise instead of silently stopping."""
+        with self.assertRaises(ValueError):
+            list(iter_resource_changes(io.StringIO(plan_json([change("aws_instance.a", ["create"])])[:-40])))
+
+    def test_large_plan_is_summarized_with_bounded_buffer(self):
+        """Test counts per type and module and that the buffer stays small."""
+        changes = []
+        for i in range(20000):
+            module = "module.app" if i % 2 else None
+            actions = [["create"], ["update"], ["delete", "create"], ["delete"]][i % 4]
+            changes.append(change(f"aws_instance.i{i}" if i % 5 else f"aws_subnet.s{i}", actions, module))
+        text = plan_json(changes)
+
+        stream = io.StringIO(text)
+        summary = summarize_plan(stream)
+        self.assertEqual(summary.to_dict()["totals"], {"create": 5000, "update": 5000, "replace": 5000, "delete": 5000})
+        self.assertEqual(sum(summary.by_type["aws_subnet"].values()), 4000)
+        self.assertEqual(summary.by_module["(root)"]["create"] + summary.by_module["module.app"]["create"], 5000)
+        self.assertEqual(summary.destructive_count, 10000)
+        self.assertEqual(len(summary.destructive), 20)
+
+        reader = JsonStream(io.StringIO(text), 4096)
+        reader.expect("{")
+        while True:
+            reader.read_string()
+            reader.expect(":")
+            reader.skip_value()
+            if reader.expect(",}") == "}":
+                break
+        self.assertLess(reader.max_buffer, 4096 * 2)
+
+        text = summary.format()
+        self.assertIn("Plan: 5000 zu erstellen, 5000 zu ändern, 5000 zu ersetzen, 5000 zu löschen", text)
+        self.assertIn("Nach Modul:", text)
+        self.assertIn("ACHTUNG: 10000 destruktive Änderung(en):", text)
+        self.assertIn("... und 9980 weitere", text)
+
+    def test_show_plan_streams_command_output(self):
+        """Test show_plan() with a command that prints a plan and with a failing command."""
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, "plan.json")
+            with open(path, "w") as f:
+                f.write(plan_json([change("aws_instance.web", ["delete"])]))
+            summary = show_plan(command=[sys.executable, "-c", f"print(open({path!r}).read())"])
+            self.assertTrue(summary.is_destructive)
+            self.assertEqual(summary.destructive, [("aws_instance.web", "delete")])
+
+            with self.assertRaises(RuntimeError):
+                show_plan(command=[sys.executable, "-c", "import sys; print('{}'); sys.exit(1)"])
+        finally:
+            shutil.rmtree(tmp)
+
+
+class TestSetupCloudInfrastructure(unittest.TestCase):
+    """Test cases for showing the plan summary before approval."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    @patch('dev_assistant_extended.show_plan')
+    @patch('dev_assistant_extended.traced_run')
+    def test_summary_is_shown_before_approval(self, mock_run, mock_show):
+        """Test that the summary is printed and destructive plans are flagged in the question."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        mock_show.return_value = summarize_plan(io.StringIO(plan_json([change("aws_instance.web", ["delete"])])))
+        questions = []
+        assistant = DevAssistantExtended(api_key="mock_api_key",
+                                         answer_fn=lambda prompt: questions.append(prompt) or "n")
+
+        with patch('builtins.print') as mock_print:
+            result = assistant.setup_cloud_infrastructure([{"type": "aws_instance", "name": "web"}])
+        self.assertEqual(result, "Terraform-Anwendung abgebrochen.")
+        self.assertTrue(questions[0].startswith("Der Plan löscht oder ersetzt Ressourcen."))
+        printed = "\n".join(str(call.args[0]) for call in mock_print.call_args_list if call.args)
+        self.assertIn("1 zu löschen", printed)
+        commands = [call.args[0][:2] for call in mock_run.call_args_list]
+        self.assertNotIn(["terraform", "apply"], commands)
+
+        mock_show.return_value = summarize_plan(io.StringIO(plan_json([])))
+        self.assertEqual(assistant.setup_cloud_infrastructure([{"type": "aws_instance", "name": "web"}]),
+                         "Keine Änderungen anzuwenden.")
+        self.assertEqual(len(questions), 1)
+
+    @patch('dev_assistant_extended.show_plan')
+    @patch('dev_assistant_extended.traced_run')
+    def test_each_job_uses_its_project_dir(self, mock_run, mock_show):
+        """Test that config, plan and apply of concurrent jobs stay in their own directories."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="", stderr="")
+        mock_show.return_value = summarize_plan(io.StringIO(plan_json([change("aws_instance.web", ["create"])])))
+        for job in ("a", "b"):
+            project_dir = os.path.join(self.tmp, job)
+            assistant = DevAssistantExtended(api_key="mock_api_key", answer_fn=lambda prompt: "j",
+                                             project_dir=project_dir)
+            assistant.setup_cloud_infrastructure([{"type": "aws_instance", "name": job}])
+            with open(os.path.join(project_dir, "main.tf")) as f:
+                self.assertIn(f'resource "aws_instance" "{job}"', f.read())
+            terraform = [call for call in mock_run.call_args_list if call.args[0][0] == "terraform"]
+            self.assertEqual({call.kwargs.get("cwd") for call in terraform}, {project_dir})
+            self.assertEqual(mock_show.call_args.kwargs["cwd"], project_dir)
+            mock_run.reset_mock()
+        self.assertFalse(os.path.exists(os.path.join(self.tmp, "main.tf")))
+
+
+if __name__ == '__main__':
+    unittest.main()
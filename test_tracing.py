@@ -0,0 +1,79 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from tracing import Tracer, current_tracer, span, traced_run
+
+
+class TestTracing(unittest.TestCase):
+    """Test cases for the tracing module."""
+
+    def test_nested_spans_and_summary(self):
+        """Test that nested spans are linked and summarized per step."""
+        tracer = Tracer()
+        with tracer.activate():
+            with span("Schritt 1", "step"):
+                with span("llm", "llm", model="gpt-4") as llm_span:
+                    llm_span.set(total_tokens=12)
+                with span("input", "input"):
+                    pass
+
+        self.assertIsNone(current_tracer())
+        by_name = {s.name: s for s in tracer.spans}
+        self.assertEqual(by_name["llm"].parent_id, by_name["Schritt 1"].span_id)
+        self.assertEqual(by_name["llm"].attributes["total_tokens"], 12)
+
+        summary = tracer.summary()
+        self.assertEqual(len(summary), 1)
+        self.assertEqual(set(summary[0]["breakdown"]), {"llm", "input"})
+        self.assertIn("Schritt 1", tracer.format_summary())
+
+    def test_span_without_tracer_is_noop(self):
+        """Test that spans outside an active tracer do nothing."""
+        with span("llm", "llm") as active:
+            active.set(total_tokens=1)
+
+    def test_traced_run_records_exit_code_and_output_size(self):
+        """Test that subprocess spans carry exit code and output bytes."""
+        tracer = Tracer()
+        with tracer.activate():
+            result = traced_run([sys.executable, "-c", "print('hallo')"],
+                                capture_output=True, text=True)
+
+        self.assertEqual(result.returncode, 0)
+        (recorded,) = tracer.spans
+        self.assertEqual(recorded.category, "subprocess")
+        self.assertEqual(recorded.attributes["exit_code"], 0)
+        self.assertEqual(recorded.attributes["stdout_bytes"], len("hallo\n"))
+
+    def test_error_is_recorded(self):
+        """Test that exceptions are stored on the span and re-raised."""
+        tracer = Tracer()
+        with self.assertRaises(ValueError):
+            with tracer.span("kaputt"):
+                raise ValueError("boom")
+        self.assertEqual(tracer.spans[0].error, "ValueError: boom")
+
+    def test_export_formats(self):
+        """Test the JSON lines and Chrome trace exports."""
+        tracer = Tracer()
+        with tracer.span("Schritt 1", "step"):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            jsonl_path = tracer.export(os.path.join(tmp, "trace.jsonl"))
+            chrome_path = tracer.export(os.path.join(tmp, "trace.json"))
+            with open(jsonl_path) as f:
+                lines = [json.loads(line) for line in f]
+            with open(chrome_path) as f:
+                chrome = json.load(f)
+
+        self.assertEqual(lines[0]["name"], "Schritt 1")
+        self.assertEqual(chrome["traceEvents"][0]["ph"], "X")
+        self.assertEqual(chrome["traceEvents"][0]["cat"], "step")
+
+
+if __name__ == '__main__':
+    unittest.main()
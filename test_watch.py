@@ -0,0 +1,155 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from dev_assistant_extended import DevAssistantExtended
+from testutils import make_response
+from watch import FileWatcher, WarmPython, WatchSession, imported_modules
+
+
+def write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+class TestFileWatcher(unittest.TestCase):
+    """Test cases for change detection with inotify and polling."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "main.py")
+        write(self.path, "print(1)\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def check_backend(self, use_inotify):
+        watcher = FileWatcher([self.path], debounce=0.1, poll_interval=0.01, use_inotify=use_inotify)
+        self.assertEqual(watcher.changes(timeout=0.05), set())
+
+        def burst():
+            for i in range(3):
+                time.sleep(0.02)
+                write(self.path, f"print({i})\n")
+                write(os.path.join(self.tmp, "andere.txt"), "x")
+
+        thread = threading.Thread(target=burst)
+        thread.start()
+        self.assertEqual(watcher.changes(timeout=2), {self.path})
+        thread.join()
+        self.assertEqual(watcher.changes(timeout=0.05), set())
+        watcher.close()
+        return watcher
+
+    def test_polling_debounces_changes(self):
+        """Test that a burst of writes is reported once by the polling backend."""
+        self.assertEqual(self.check_backend(False).backend, "polling")
+
+    def test_inotify_debounces_changes(self):
+        """Test the inotify backend where the platform provides it."""
+        self.check_backend(True)
+
+
+class TestWarmPython(unittest.TestCase):
+    """Test cases for the forking pre-warmed interpreter."""
+
+    def test_run_output_exit_code_and_timeout(self):
+        """Test stdout, failures, local imports and timeouts in forked runs."""
+        if not hasattr(os, "fork"):
+            self.skipTest("fork nicht verfügbar")
+        tmp = tempfile.mkdtemp()
+        runner = WarmPython(preload=["json"])
+        try:
+            write(os.path.join(tmp, "helfer.py"), "WERT = 42\n")
+            write(os.path.join(tmp, "main.py"), "import helfer\nprint(helfer.WERT)\n")
+            write(os.path.join(tmp, "kaputt.py"), "raise ValueError('kaputt')\n")
+            write(os.path.join(tmp, "langsam.py"), "import time\ntime.sleep(5)\n")
+
+            self.assertEqual(runner.run(os.path.join(tmp, "main.py")),
+                             {"exit_code": 0, "stdout": "42\n", "stderr": ""})
+            result = runner.run(os.path.join(tmp, "kaputt.py"))
+            self.assertEqual(result["exit_code"], 1)
+            self.assertIn("ValueError: kaputt", result["stderr"])
+            self.assertEqual(runner.run(os.path.join(tmp, "langsam.py"), timeout=0.2)["exit_code"], -9)
+            self.assertIn("json", runner.preloaded)
+        finally:
+            runner.close()
+            shutil.rmtree(tmp)
+
+
+class TestWatchSession(unittest.TestCase):
+    """Test cases for incremental re-validation after changes."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.code = os.path.join(self.tmp, "rechner.py")
+        self.other = os.path.join(self.tmp, "anderes.py")
+        self.test = os.path.join(self.tmp, "test_rechner.py")
+        self.unrelated = os.path.join(self.tmp, "test_anderes.py")
+        write(self.code, "def add(a, b):\n    return a + b\n")
+        write(self.other, "X = 1\n")
+        write(self.test, "from rechner import add\nassert add(1, 2) == 3\nprint('ok')\n")
+        write(self.unrelated, "import anderes\nassert anderes.X == 1\n")
+        self.answers = []
+        self.assistant = DevAssistantExtended(api_key="mock_api_key", speculate=False,
+                                              answer_fn=lambda prompt: self.answers.pop(0))
+        self.session = WatchSession(self.assistant, [self.code, self.other], [self.test, self.unrelated],
+                                    watcher=FileWatcher([], use_inotify=False))
+
+    def tearDown(self):
+        self.session.close()
+        shutil.rmtree(self.tmp)
+
+    def test_imported_modules(self):
+        """Test extraction of top-level imported module names."""
+        self.assertEqual(imported_modules("import os, sys as s\nfrom a.b import c\n  import numpy.linalg\n"),
+                         {"os", "sys", "a", "numpy"})
+
+    def test_affected_tests(self):
+        """Test that only tests importing the changed module are selected."""
+        self.assertEqual(self.session.affected_tests({self.code}), [self.test])
+        self.assertEqual(self.session.affected_tests({self.unrelated}), [self.unrelated])
+        write(self.test, "assert True\n")
+        self.assertEqual(self.session.affected_tests({self.other}), [self.test, self.unrelated])
+
+    def test_process_runs_only_affected_stages(self):
+        """Test validation, execution, affected tests and skipping unchanged content."""
+        report = self.session.process({self.code})
+        self.assertEqual(report["validated"], {self.code: ""})
+        self.assertEqual(report["executed"], {self.code: ""})
+        self.assertEqual(report["tests"], {self.test: True})
+        self.assertEqual(self.session.process({self.code})["executed"], {})
+
+        write(self.code, "def add(a, b)\n    return a + b\n")
+        report = self.session.process({self.code})
+        self.assertTrue(report["validated"][self.code])
+        self.assertEqual(report["executed"], {})
+        self.assertEqual(report["tests"], {})
+
+    @patch('dev_assistant_extended.openai.ChatCompletion.create')
+    def test_failure_is_debugged_and_fix_applied(self, mock_create):
+        """Test that failing tests are sent to the debugger and the fix is saved on request."""
+        fixed = "def add(a, b):\n    return a + b\n"
+        mock_create.side_effect = [make_response("Falscher Operator."), make_response(fixed)]
+        self.session.process({self.code})
+        write(self.code, "def add(a, b):\n    return a - b\n")
+        self.answers.append("j")
+
+        report = self.session.process({self.code})
+        self.assertEqual(report["tests"], {self.test: False})
+        self.assertEqual(report["debugged"], [self.code])
+        self.assertEqual(mock_create.call_count, 2)
+        with open(self.code) as f:
+            self.assertEqual(f.read(), fixed)
+
+    def test_watch_without_files(self):
+        """Test that watch() returns when nothing was generated yet."""
+        self.assistant.watch()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,11 @@
+"""Shared helpers for the unit tests."""
+
+from unittest.mock import MagicMock
+
+
+def make_response(content):
+    """Build a chat completion response whose first choice carries content."""
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
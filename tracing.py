@@ -0,0 +1,251 @@
+"""
+Strukturiertes Tracing für den Entwicklerassistenten.
+
+Ein Tracer sammelt verschachtelte Spans (Plan-Schritte, LLM-Aufrufe, Subprozesse,
+Code-Ausführungen, Benutzereingaben) mit Dauer und Attributen. Der aktive Tracer wird
+über eine ContextVar gesetzt, sodass Agenten ihn nicht als Parameter brauchen. Spans
+lassen sich als JSON Lines oder im Chrome-Trace-Format (chrome://tracing, Perfetto)
+exportieren.
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from lazy_imports import lazy_module
+
+loguru = lazy_module("loguru")
+
+_current_tracer: contextvars.ContextVar = contextvars.ContextVar("current_tracer", default=None)
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """Ein einzelner, zeitlich begrenzter Abschnitt."""
+
+    def __init__(self, span_id: int, name: str, category: str, parent_id: Optional[int],
+                 attributes: Dict[str, Any]):
+        self.span_id = span_id
+        self.name = name
+        self.category = category
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.thread_id = threading.get_ident()
+        self.start_wall = time.time()
+        self._start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        """Ergänzt Attribute des Spans."""
+        self.attributes.update(attributes)
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "category": self.category,
+            "start": self.start_wall,
+            "duration": self.duration,
+            "thread_id": self.thread_id,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NullSpan:
+    """Platzhalter, wenn kein Tracer aktiv ist."""
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+class Tracer:
+    """Sammelt die Spans einer Aufgabe."""
+
+    def __init__(self, name: str = "task"):
+        self.name = name
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Setzt diesen Tracer als aktiven Tracer des aktuellen Kontexts."""
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+
+    @contextmanager
+    def span(self, name: str, category: str = "default", **attributes) -> Iterator[Span]:
+        """Zeichnet einen Span auf.
+
+        Args:
+            name: Der Name des Spans
+            category: Die Kategorie, z.B. "step", "llm", "subprocess", "execute" oder "input"
+            **attributes: Zusätzliche Attribute
+
+        Yields:
+            Der laufende Span, dessen Attribute ergänzt werden können
+        """
+        parent = _current_span.get()
+        span = Span(next(self._ids), name, category, parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+            with self._lock:
+                self.spans.append(span)
+            loguru.logger.trace("span {} [{}] {:.3f}s {}", name, category, span.duration, span.attributes)
+
+    def to_jsonl(self) -> str:
+        """Gibt alle Spans als JSON Lines zurück."""
+        spans = sorted(self.spans, key=lambda s: s.start_wall)
+        return "".join(json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n" for s in spans)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Gibt alle Spans im Chrome-Trace-Format zurück."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": s.name,
+                "cat": s.category,
+                "ph": "X",
+                "ts": int(s.start_wall * 1_000_000),
+                "dur": int((s.duration or 0) * 1_000_000),
+                "pid": pid,
+                "tid": s.thread_id,
+                "args": dict(s.attributes, error=s.error) if s.error else s.attributes,
+            }
+            for s in self.spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> str:
+        """Schreibt den Trace in eine Datei.
+
+        Dateien mit der Endung ".jsonl" werden als JSON Lines geschrieben, alle anderen
+        im Chrome-Trace-Format.
+
+        Args:
+            path: Der Zielpfad
+
+        Returns:
+            Der Zielpfad
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                f.write(self.to_jsonl())
+            else:
+                json.dump(self.to_chrome_trace(), f, default=str)
+        return path
+
+    def summary(self, category: str = "step") -> List[Dict[str, Any]]:
+        """Fasst die Dauer der Spans einer Kategorie zusammen.
+
+        Für jeden Span der Kategorie wird zusätzlich die Zeit seiner Nachfahren nach
+        Kategorie aufgeschlüsselt (z.B. wie viel eines Schritts auf LLM-Aufrufe entfiel).
+
+        Args:
+            category: Die zusammenzufassende Kategorie
+
+        Returns:
+            Eine Liste mit Name, Dauer und Aufschlüsselung pro Span
+        """
+        children: Dict[Optional[int], List[Span]] = {}
+        for s in self.spans:
+            children.setdefault(s.parent_id, []).append(s)
+
+        def breakdown(span_id: int, totals: Dict[str, float]) -> Dict[str, float]:
+            for child in children.get(span_id, []):
+                totals[child.category] = totals.get(child.category, 0.0) + (child.duration or 0.0)
+                # Verschachtelte Spans derselben Kategorie nicht doppelt zählen
+                nested: Dict[str, float] = {}
+                breakdown(child.span_id, nested)
+                for key, value in nested.items():
+                    if key != child.category:
+                        totals[key] = totals.get(key, 0.0) + value
+            return totals
+
+        return [
+            {"name": s.name, "duration": s.duration or 0.0, "breakdown": breakdown(s.span_id, {})}
+            for s in sorted(self.spans, key=lambda s: s.start_wall)
+            if s.category == category
+        ]
+
+    def format_summary(self) -> str:
+        """Formatiert die Schritt-Zusammenfassung für die Konsole."""
+        lines = ["Zeitübersicht:"]
+        for entry in self.summary():
+            details = ", ".join(f"{key} {value:.2f}s" for key, value in sorted(entry["breakdown"].items()))
+            line = f"  {entry['name']}: {entry['duration']:.2f}s"
+            lines.append(f"{line} ({details})" if details else line)
+        return "\n".join(lines)
+
+
+def current_tracer() -> Optional[Tracer]:
+    """Gibt den aktiven Tracer zurück oder None."""
+    return _current_tracer.get()
+
+
+@contextmanager
+def span(name: str, category: str = "default", **attributes) -> Iterator[Any]:
+    """Zeichnet einen Span im aktiven Tracer auf; ohne aktiven Tracer ein No-op."""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield _NullSpan()
+        return
+    with tracer.span(name, category, **attributes) as active:
+        yield active
+
+
+def _output_size(output: Any) -> int:
+    if isinstance(output, bytes):
+        return len(output)
+    if isinstance(output, str):
+        return len(output.encode("utf-8", errors="replace"))
+    return 0
+
+
+def traced_run(command, **kwargs) -> subprocess.CompletedProcess:
+    """Führt subprocess.run aus und zeichnet Exit-Code, Dauer und Ausgabegröße auf.
+
+    Args:
+        command: Der Befehl wie bei subprocess.run
+        **kwargs: Weitere Argumente für subprocess.run
+
+    Returns:
+        Das Ergebnis von subprocess.run
+    """
+    if isinstance(command, str):
+        name = command.split()[0] if command.split() else command
+        display = command
+    else:
+        name = os.path.basename(str(command[0]))
+        display = " ".join(str(part) for part in command)
+
+    with span(name, "subprocess", command=display) as active:
+        result = subprocess.run(command, **kwargs)
+        active.set(
+            exit_code=result.returncode,
+            stdout_bytes=_output_size(result.stdout),
+            stderr_bytes=_output_size(result.stderr),
+        )
+    return result
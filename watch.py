@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Watch-Modus: generierte Dateien beobachten und nur die betroffenen Stufen wiederholen.
+
+Nach einer Änderung werden gebündelte Ereignisse (Debounce) einer Datei in dieser
+Reihenfolge verarbeitet:
+    1. Syntaxprüfung (validate_syntax), ohne etwas auszuführen
+    2. Ausführung der geänderten Datei
+    3. die betroffenen Tests (Tests, die das geänderte Modul importieren, oder die
+       geänderte Testdatei selbst)
+    4. bei einem Fehler der DebugAgent (bekannte Korrekturen zuerst, dann das Modell)
+
+Dateien werden per inotify beobachtet (Linux, über ctypes ohne Zusatzpaket), sonst
+per Abfrage von Änderungszeit und Größe. Python-Code läuft in einem vorgewärmten
+Interpreter: ein langlebiger Prozess importiert die Abhängigkeiten einmal und forkt
+pro Lauf, sodass weder Interpreterstart noch schwere Importe wiederholt werden.
+Unveränderte Inhalte (gleicher Hash) werden nicht erneut verarbeitet; Planung,
+Tool-Empfehlungen und Installationen entfallen vollständig.
+
+Verwendung:
+    python watch.py main.py test_main.py
+"""
+
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import re
+import select
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from dev_assistant_extended import DevAssistantExtended, is_error_output
+from llm_output import validate_syntax
+from tracing import span
+
+# Wartezeit nach dem letzten Ereignis, bevor eine Änderung verarbeitet wird (Sekunden)
+DEBOUNCE_SECONDS = 0.15
+
+# Abfrageintervall ohne inotify (Sekunden)
+POLL_INTERVAL = 0.25
+
+# Zeitlimit für einen Lauf im Watch-Modus (Sekunden)
+RUN_TIMEOUT = 60
+
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_EVENT_HEADER = struct.Struct("iIII")
+
+_IMPORT_RE = re.compile(r"^\s*(?:from\s+([\w.]+)\s+import|import\s+([\w., ]+))", re.MULTILINE)
+
+LANGUAGE_BY_EXTENSION = {".py": "python", ".java": "java", ".jl": "julia"}
+
+
+def file_hash(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class FileWatcher:
+    """Meldet Änderungen an einer festen Menge von Dateien."""
+
+    def __init__(self, paths: Iterable[str], debounce: float = DEBOUNCE_SECONDS,
+                 poll_interval: float = POLL_INTERVAL, use_inotify: bool = True):
+        """Initialisiert den Watcher.
+
+        Args:
+            paths: Die zu beobachtenden Dateien
+            debounce: Ruhezeit, nach der gesammelte Änderungen gemeldet werden
+            poll_interval: Abfrageintervall ohne inotify
+            use_inotify: inotify verwenden, falls verfügbar
+        """
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+        self._watches: Dict[int, str] = {}
+        if use_inotify and sys.platform.startswith("linux"):
+            self._init_inotify()
+        self._stats = {path: self._stat(path) for path in self.paths}
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._fd is not None else "polling"
+
+    def _init_inotify(self) -> None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            # Verzeichnisse beobachten: Editoren ersetzen Dateien oft per Umbenennung
+            mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+            for directory in {os.path.dirname(path) for path in self.paths}:
+                wd = libc.inotify_add_watch(fd, directory.encode(), mask)
+                if wd >= 0:
+                    self._watches[wd] = directory
+            if self._watches:
+                self._fd = fd
+            else:
+                os.close(fd)
+        except (OSError, AttributeError):
+            self._fd = None
+
+    @staticmethod
+    def _stat(path: str) -> Optional[tuple]:
+        try:
+            result = os.stat(path)
+            return result.st_mtime_ns, result.st_size
+        except OSError:
+            return None
+
+    def _read_inotify(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed: Set[str] = set()
+        # Ereignisse anderer Dateien im selben Verzeichnis verlängern das Warten nicht
+        while not changed:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                break
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += _EVENT_HEADER.size + length
+                path = os.path.join(self._watches.get(wd, ""), name.decode(errors="replace"))
+                if path in self.paths:
+                    changed.add(path)
+        return changed
+
+    def _poll(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path in self.paths:
+                current = self._stat(path)
+                if current != self._stats[path]:
+                    self._stats[path] = current
+                    changed.add(path)
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.poll_interval if deadline is None else
+                       max(0.0, min(self.poll_interval, deadline - time.monotonic())))
+
+    def _wait(self, timeout: Optional[float]) -> Set[str]:
+        return self._read_inotify(timeout) if self._fd is not None else self._poll(timeout)
+
+    def changes(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wartet auf Änderungen und bündelt alle, die bis zur Ruhezeit folgen.
+
+        Args:
+            timeout: Maximale Wartezeit auf die erste Änderung (None: unbegrenzt)
+
+        Returns:
+            Die geänderten Dateien (leer nach Ablauf von timeout)
+        """
+        changed = self._wait(timeout)
+        if not changed:
+            return changed
+        while True:
+            more = self._wait(self.debounce)
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+# Läuft im vorgewärmten Interpreter: liest Aufträge als JSON-Zeilen von stdin
+_WARM_SERVER = r"""
+import importlib, json, os, runpy, signal, sys, time
+for line in sys.stdin:
+    request = json.loads(line)
+    if "preload" in request:
+        loaded = []
+        for name in request["preload"]:
+            try:
+                importlib.import_module(name)
+                loaded.append(name)
+            except Exception:
+                pass
+        print(json.dumps({"loaded": loaded}), flush=True)
+        continue
+    pid = os.fork()
+    if pid == 0:
+        out = os.open(request["stdout"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        err = os.open(request["stderr"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        os.dup2(out, 1)
+        os.dup2(err, 2)
+        os.chdir(request["cwd"])
+        sys.path.insert(0, os.path.dirname(request["path"]))
+        sys.argv = [request["path"]]
+        code = 0
+        try:
+            runpy.run_path(request["path"], run_name="__main__")
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            import traceback
+            traceback.print_exc()
+            code = 1
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+    deadline = time.monotonic() + request["timeout"]
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            break
+        if time.monotonic() > deadline:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            status = None
+            break
+        time.sleep(0.002)
+    code = -9 if status is None else os.waitstatus_to_exitcode(status)
+    print(json.dumps({"exit_code": code}), flush=True)
+"""
+
+
+class WarmPython:
+    """Ein vorgewärmter Python-Interpreter, der jeden Lauf in einem Fork ausführt."""
+
+    def __init__(self, preload: Iterable[str] = ()):
+        """Startet den Interpreter.
+
+        Args:
+            preload: Module, die einmalig vorab importiert werden
+        """
+        self.process = subprocess.Popen([sys.executable, "-c", _WARM_SERVER], stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, text=True)
+        self.preloaded: Set[str] = set()
+        self.preload(preload)
+
+    def _request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("Vorgewärmter Interpreter beendet")
+        return json.loads(line)
+
+    def preload(self, modules: Iterable[str]) -> None:
+        """Importiert Module im Interpreter, damit Läufe sie bereits geladen vorfinden."""
+        missing = sorted(set(modules) - self.preloaded)
+        if missing:
+            self.preloaded.update(self._request({"preload": missing})["loaded"])
+            self.preloaded.update(missing)
+
+    def run(self, path: str, timeout: float = RUN_TIMEOUT) -> Dict[str, Any]:
+        """Führt eine Datei als __main__ in ihrem Verzeichnis aus.
+
+        Returns:
+            Exitcode, stdout und stderr
+        """
+        with tempfile.TemporaryDirectory(prefix="dev_assistant_watch_") as workdir:
+            stdout, stderr = os.path.join(workdir, "stdout"), os.path.join(workdir, "stderr")
+            response = self._request({"path": os.path.abspath(path), "cwd": os.path.dirname(os.path.abspath(path)),
+                                      "stdout": stdout, "stderr": stderr, "timeout": timeout})
+            with open(stdout, errors="replace") as out, open(stderr, errors="replace") as err:
+                return {"exit_code": response["exit_code"], "stdout": out.read(), "stderr": err.read()}
+
+    def close(self) -> None:
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+
+
+def imported_modules(code: str) -> Set[str]:
+    """Liefert die Namen der (obersten) Module, die der Python-Code importiert."""
+    names = set()
+    for from_name, import_names in _IMPORT_RE.findall(code):
+        if from_name:
+            names.add(from_name.split(".")[0])
+        for name in (import_names or "").split(","):
+            name = name.strip().split(" ")[0]
+            if name:
+                names.add(name.split(".")[0])
+    return {name for name in names if name}
+
+
+class WatchSession:
+    """Führt nach Änderungen nur die betroffenen Stufen erneut aus."""
+
+    def __init__(self, assistant: Any, code_files: Iterable[str], test_files: Iterable[str] = (),
+                 debug: bool = True, warm: bool = True, watcher: Optional[FileWatcher] = None):
+        """Initialisiert die Sitzung.
+
+        Args:
+            assistant: Der DevAssistantExtended (mit seinen Caches und dem Fehlerindex)
+            code_files: Die beobachteten Code-Dateien
+            test_files: Die beobachteten Testdateien
+            debug: Bei Fehlern den DebugAgent befragen
+            warm: Python-Dateien im vorgewärmten Interpreter ausführen
+            watcher: Ein eigener FileWatcher (Standard: über alle Dateien)
+        """
+        self.assistant = assistant
+        self.code_files = [os.path.abspath(path) for path in code_files]
+        self.test_files = [os.path.abspath(path) for path in test_files]
+        self.debug = debug
+        self.warm = warm and hasattr(os, "fork")
+        self.watcher = watcher or FileWatcher(self.code_files + self.test_files)
+        self._hashes: Dict[str, Optional[str]] = {}
+        self._runner: Optional[WarmPython] = None
+
+    @staticmethod
+    def language(path: str) -> Optional[str]:
+        return LANGUAGE_BY_EXTENSION.get(os.path.splitext(path)[1])
+
+    def _local_modules(self) -> Set[str]:
+        return {os.path.splitext(os.path.basename(path))[0] for path in self.code_files + self.test_files}
+
+    def affected_tests(self, changed: Set[str]) -> List[str]:
+        """Bestimmt die Tests, die nach einer Änderung erneut laufen müssen.
+
+        Eine Testdatei ist betroffen, wenn sie selbst geändert wurde oder ein geändertes
+        Modul importiert. Tests, die keines der beobachteten Module importieren, gelten
+        als von jeder Code-Änderung betroffen.
+        """
+        changed_modules = {os.path.splitext(os.path.basename(path))[0]
+                           for path in changed if path in self.code_files}
+        local = self._local_modules()
+        affected = []
+        for test in self.test_files:
+            if test in changed:
+                affected.append(test)
+                continue
+            if not changed_modules:
+                continue
+            try:
+                with open(test) as f:
+                    imports = imported_modules(f.read()) & local
+            except OSError:
+                continue
+            if not imports or imports & changed_modules:
+                affected.append(test)
+        return affected
+
+    def _run(self, path: str, code: str, language: str) -> str:
+        """Führt eine Datei aus; Ausgabe im Format von execute_code."""
+        if language == "python" and self.warm:
+            if self._runner is None:
+                self._runner = WarmPython()
+            # Nur fremde Abhängigkeiten vorladen, beobachtete Module ändern sich
+            self._runner.preload(imported_modules(code) - self._local_modules())
+            with span("warm_run", "execute", path=os.path.basename(path)):
+                result = self._runner.run(path)
+            return result["stdout"] if result["exit_code"] == 0 else f"Fehler: {result['stderr']}"
+        return self.assistant.execute_code(code, language)
+
+    def _handle_failure(self, path: str, code: str, language: str, error: str) -> Dict[str, Any]:
+        print(f"Fehler in {os.path.basename(path)}:\n{error.strip()}")
+        if not self.debug:
+            return {}
+        with span("watch_debug", "debug"):
+            result = self.assistant.debug_code(code, error, language)
+        print(f"Analyse ({result.get('source', 'llm')}):\n{result.get('analysis', '').strip()}")
+        fixed = result.get("fixed_code", "")
+        if fixed and fixed != code and not is_error_output(result.get("output", "")):
+            answer = self.assistant._ask(f"Korrektur für {os.path.basename(path)} übernehmen? (j/n): ")
+            if answer.lower() == "j":
+                with open(path, "w") as f:
+                    f.write(fixed)
+                print(f"Korrektur in {path} gespeichert.")
+        return result
+
+    def process(self, changed: Set[str]) -> Dict[str, Any]:
+        """Verarbeitet eine Menge geänderter Dateien.
+
+        Returns:
+            Pro Stufe die Ergebnisse ("validated", "executed", "tests", "debugged")
+        """
+        report: Dict[str, Any] = {"validated": {}, "executed": {}, "tests": {}, "debugged": []}
+        fresh = set()
+        for path in changed:
+            digest = file_hash(path)
+            if digest is not None and digest != self._hashes.get(path):
+                self._hashes[path] = digest
+                fresh.add(path)
+        if not fresh:
+            return report
+
+        start = time.perf_counter()
+        with span("watch_cycle", "watch", files=len(fresh)):
+            for path in sorted(fresh):
+                language = self.language(path)
+                if language is None:
+                    continue
+                with open(path) as f:
+                    code = f.read()
+                error = validate_syntax(code, language)
+                report["validated"][path] = error
+                if error:
+                    print(f"{os.path.basename(path)}: {error}")
+                    continue
+                if path in self.code_files:
+                    output = self._run(path, code, language)
+                    report["executed"][path] = output
+                    print(f"Ausgabe von {os.path.basename(path)}:\n{output.rstrip()}")
+                    if is_error_output(output):
+                        report["debugged"].append(path)
+                        self._handle_failure(path, code, language, output)
+
+            if any(report["validated"].get(path) for path in fresh):
+                return report
+            for test in self.affected_tests(fresh):
+                language = self.language(test)
+                if language is None:
+                    continue
+                with open(test) as f:
+                    tests = f.read()
+                output = self._run(test, tests, language)
+                passed = not is_error_output(output)
+                report["tests"][test] = passed
+                print(f"Tests {os.path.basename(test)}: {'bestanden' if passed else 'fehlgeschlagen'}")
+                if not passed:
+                    # Ist der Test unverändert, liegt der Fehler im geänderten Code
+                    target = test if test in fresh else next(
+                        (path for path in sorted(fresh) if path in self.code_files), test)
+                    with open(target) as f:
+                        target_code = f.read()
+                    report["debugged"].append(target)
+                    self._handle_failure(target, target_code, self.language(target) or language, output)
+        report["seconds"] = time.perf_counter() - start
+        print(f"Durchlauf in {report['seconds'] * 1000:.0f} ms")
+        return report
+
+    def run(self, stop: Optional[Callable[[], bool]] = None, timeout: Optional[float] = None) -> None:
+        """Beobachtet die Dateien, bis stop() True liefert oder Strg+C gedrückt wird.
+
+        Args:
+            stop: Abbruchbedingung, geprüft nach jeder Wartephase
+            timeout: Maximale Wartezeit pro Wartephase
+        """
+        files = ", ".join(os.path.basename(path) for path in self.code_files + self.test_files)
+        print(f"Beobachte {files} ({self.watcher.backend}); Strg+C beendet den Watch-Modus.")
+        for path in self.code_files + self.test_files:
+            self._hashes[path] = file_hash(path)
+        try:
+            while stop is None or not stop():
+                changed = self.watcher.changes(timeout=timeout if stop is not None else None)
+                if changed:
+                    self.process(changed)
+        except KeyboardInterrupt:
+            print("\nWatch-Modus beendet.")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.watcher.close()
+        if self._runner is not None:
+            self._runner.close()
+            self._runner = None
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generierte Dateien beobachten und inkrementell prüfen")
+    parser.add_argument("files", nargs="+", help="Code- und Testdateien (Tests: Name beginnt mit test_)")
+    parser.add_argument("--no-debug", action="store_true", help="Bei Fehlern nicht den DebugAgent befragen")
+    args = parser.parse_args()
+
+    tests = [path for path in args.files if os.path.basename(path).startswith("test_")]
+    code = [path for path in args.files if path not in tests]
+    assistant = DevAssistantExtended(api_key=os.environ.get("OPENAI_API_KEY") or None,
+                                     error_index_path=os.environ.get("DEV_ASSISTANT_ERROR_INDEX"))
+    WatchSession(assistant, code, tests, debug=not args.no_debug).run()
+
+
+if __name__ == "__main__":
+    main()